@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-17 05:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0006_leaverequest_attendancelog'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='employeeperformance',
+            name='points',
+            field=models.IntegerField(db_index=True, default=0, help_text='Total lifetime points earned'),
+        ),
+    ]
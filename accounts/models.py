@@ -2,8 +2,10 @@ import uuid
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 
+from core.tracking import FieldTrackingMixin
 
-class User(AbstractUser):
+
+class User(FieldTrackingMixin, AbstractUser):
     """
     Custom User model extending AbstractUser.
     Supports role-based access control with branch-level data isolation.
@@ -68,7 +70,7 @@ class EmployeePerformance(models.Model):
     )
     
     # Gamification
-    points = models.IntegerField(default=0, help_text="Total lifetime points earned")
+    points = models.IntegerField(default=0, db_index=True, help_text="Total lifetime points earned")
     xp = models.IntegerField(default=0, help_text="Experience points toward next level")
     level = models.IntegerField(default=1)
     
@@ -94,7 +96,7 @@ class EmployeePerformance(models.Model):
     class Meta:
         verbose_name = "Employee Performance"
         verbose_name_plural = "Employee Performances"
-class EmployeeDossier(models.Model):
+class EmployeeDossier(FieldTrackingMixin, models.Model):
     """
     Tracks sensitive HR and employment data for employees.
     """
@@ -109,10 +109,21 @@ class EmployeeLeaderboardSerializer(serializers.ModelSerializer):
     """Serializer for competitive employee rankings."""
     performance = EmployeePerformanceSerializer(read_only=True)
     full_name = serializers.CharField(source='get_full_name', read_only=True)
+    counters = serializers.SerializerMethodField()
     
     class Meta:
         model = User
-        fields = ['id', 'full_name', 'email', 'role', 'performance']
+        fields = ['id', 'full_name', 'email', 'role', 'performance', 'counters']
+
+    def get_counters(self, obj):
+        """Lead counters from the leaderboard store (context['counters']: {user id: counter})."""
+        counter = self.context.get('counters', {}).get(obj.id)
+        return {
+            'leads': counter.leads if counter else 0,
+            'hot_leads': counter.hot_leads if counter else 0,
+            'conversions': counter.conversions if counter else 0,
+            'students': counter.students if counter else 0,
+        }
 
 
 
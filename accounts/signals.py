@@ -19,34 +19,28 @@ def log_change(target_user, field_name, old_value, new_value, actor=None, event_
 
 @receiver(pre_save, sender=User)
 def audit_user_changes(sender, instance, **kwargs):
-    if instance.pk:
-        try:
-            old_instance = User.objects.get(pk=instance.pk)
-            # Fields to audit
-            fields_to_audit = ['role', 'branch', 'is_active', 'email']
-            for field in fields_to_audit:
-                old_val = getattr(old_instance, field)
-                new_val = getattr(instance, field)
-                if old_val != new_val:
-                    # In a real app, actor would come from thread-local middleware
-                    # For now, we log it with actor=None (SYSTEM)
-                    log_change(instance, field, old_val, new_val)
-        except User.DoesNotExist:
-            pass
+    # Fields to audit; compared against the loaded values (no re-fetch)
+    fields_to_audit = ['role', 'branch', 'is_active', 'email']
+    if not instance.is_tracking(*fields_to_audit):
+        return
+    for field in fields_to_audit:
+        if instance.has_changed(field):
+            old_val = instance.previous_value(field)
+            if field == 'branch' and old_val is not None:
+                from branches.models import Branch
+                old_val = Branch.objects.filter(pk=old_val).first()
+            # In a real app, actor would come from thread-local middleware
+            # For now, we log it with actor=None (SYSTEM)
+            log_change(instance, field, old_val, getattr(instance, field))
 
 @receiver(pre_save, sender=EmployeeDossier)
 def audit_dossier_changes(sender, instance, **kwargs):
-    if instance.pk:
-        try:
-            old_instance = EmployeeDossier.objects.get(pk=instance.pk)
-            fields_to_audit = ['base_salary', 'contract_type', 'probation_end_date']
-            for field in fields_to_audit:
-                old_val = getattr(old_instance, field)
-                new_val = getattr(instance, field)
-                if old_val != new_val:
-                    log_change(instance.user, f"dossier.{field}", old_val, new_val)
-        except EmployeeDossier.DoesNotExist:
-            pass
+    fields_to_audit = ['base_salary', 'contract_type', 'probation_end_date']
+    if not instance.is_tracking(*fields_to_audit):
+        return
+    for field in fields_to_audit:
+        if instance.has_changed(field):
+            log_change(instance.user, f"dossier.{field}", instance.previous_value(field), getattr(instance, field))
 
 @receiver(post_save, sender=User)
 def ensure_performance_and_dossier(sender, instance, created, **kwargs):
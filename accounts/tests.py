@@ -4,7 +4,7 @@ from rest_framework.test import APIClient
 from rest_framework_simplejwt.tokens import RefreshToken
 
 from branches.models import Branch
-from accounts.models import User
+from accounts.models import EmployeeAuditLog, User
 
 
 class AuthEndpointTests(TestCase):
@@ -47,3 +47,15 @@ class AuthEndpointTests(TestCase):
             format='json'
         )
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_profile_changes_are_audited(self):
+        other = Branch.objects.create(code='OTHER', name='Other Branch', country='Testland', currency='USD')
+        user = User.objects.get(pk=self.user.pk)
+        user.save()
+        self.assertFalse(EmployeeAuditLog.objects.filter(target_user=user).exists())
+
+        user.role = User.Role.BRANCH_MANAGER
+        user.branch = other
+        user.save()
+        changes = dict(EmployeeAuditLog.objects.filter(target_user=user).values_list('field_name', 'old_value'))
+        self.assertEqual(changes, {'role': User.Role.COUNSELOR, 'branch': str(self.branch)})
@@ -19,6 +19,7 @@ from .serializers import (
 )
 from datetime import datetime
 from django.utils import timezone
+from django.db.models import F
 from django.http import HttpResponse
 from decimal import Decimal
 from accounts.permissions import UserManagementPermission
@@ -70,7 +71,12 @@ class UserViewSet(AuditLogMixin, BranchIsolationMixin, BranchIsolationCreateMixi
 
     @action(detail=False, methods=['get'], permission_classes=[IsAuthenticated])
     def leaderboard(self, request):
-        """Get the ranked leaderboard of employees."""
+        """
+        Get the ranked leaderboard of employees, with their lead counters
+        (students.leaderboard). ?limit=k returns only the top k.
+        """
+        from students.leaderboard import counselor_counters, window_from_param
+
         # Optional: Filter by branch from query params
         branch_id = request.query_params.get('branch')
         
@@ -79,10 +85,20 @@ class UserViewSet(AuditLogMixin, BranchIsolationMixin, BranchIsolationCreateMixi
         if branch_id:
             users = users.filter(branch_id=branch_id)
             
-        # Select related performance join to avoid N+1
-        users = users.select_related('performance').order_by('-performance__points')
-        
-        serializer = EmployeeLeaderboardSerializer(users, many=True)
+        # Select related performance join to avoid N+1; points is indexed, so the top k is an index scan
+        users = users.select_related('performance').order_by(F('performance__points').desc(nulls_last=True), 'id')
+
+        limit = request.query_params.get('limit')
+        if limit:
+            if not limit.isdigit():
+                raise ValidationError({'limit': 'Must be a positive integer.'})
+            users = users[:int(limit)]
+
+        users = list(users)
+        counters = counselor_counters(
+            [user.id for user in users], window_from_param(request.query_params.get('window'))
+        )
+        serializer = EmployeeLeaderboardSerializer(users, many=True, context={'counters': counters})
         return Response(serializer.data)
     @action(detail=True, methods=['get'], permission_classes=[IsAuthenticated])
     def stats(self, request, pk=None):
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import BranchKpiInput, MetricSnapshot
+from .models import BranchKpiInput, MetricSnapshot, StageDurationRollup
 
 
 @admin.register(BranchKpiInput)
@@ -12,3 +12,9 @@ class BranchKpiInputAdmin(admin.ModelAdmin):
 class MetricSnapshotAdmin(admin.ModelAdmin):
     list_display = ('metric_type', 'branch', 'generated_at')
     list_filter = ('metric_type',)
+
+
+@admin.register(StageDurationRollup)
+class StageDurationRollupAdmin(admin.ModelAdmin):
+    list_display = ('day', 'branch', 'university', 'intake', 'stage', 'next_stage', 'count')
+    list_filter = ('stage', 'branch')
@@ -0,0 +1,40 @@
+"""
+Recompute the daily application stage-duration rollups (analytics.pipeline).
+
+Usage:
+    python manage.py rollup_stage_durations --days 365
+    python manage.py rollup_stage_durations --start 2026-01-01 --end 2026-03-31
+
+Celery Beat rolls up the last two days nightly; run this once to backfill
+history, and after imports or edits to application status logs.
+"""
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from analytics.pipeline import rollup_stage_durations
+
+
+class Command(BaseCommand):
+    help = 'Roll up application stage durations per day, branch, university and intake'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', help='First day (YYYY-MM-DD)')
+        parser.add_argument('--end', help='Last day (YYYY-MM-DD, default: today)')
+        parser.add_argument('--days', type=int, default=30, help='Days back from --end when --start is not given')
+
+    def handle(self, *args, **options):
+        try:
+            end = datetime.strptime(options['end'], '%Y-%m-%d').date() if options['end'] else timezone.localdate()
+            start = (
+                datetime.strptime(options['start'], '%Y-%m-%d').date() if options['start']
+                else end - timedelta(days=max(1, options['days']) - 1)
+            )
+        except ValueError:
+            raise CommandError('Invalid date format. Use YYYY-MM-DD.')
+        if start > end:
+            raise CommandError('--start must not be after --end.')
+
+        rows = rollup_stage_durations(start, end)
+        self.stdout.write(self.style.SUCCESS(f"Rolled up {start} to {end}: {rows} rows"))
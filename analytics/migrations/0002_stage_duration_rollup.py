@@ -0,0 +1,41 @@
+# Generated by Django 6.0.2 on 2026-10-17 05:41
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0001_initial'),
+        ('branches', '0007_alter_branchanalyticssnapshot_snapshot_date'),
+        ('universities', '0013_intake_month_ordering'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StageDurationRollup',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('day', models.DateField(help_text='Local date the applications left the stage')),
+                ('intake', models.CharField(blank=True, default='', max_length=50)),
+                ('stage', models.CharField(choices=[('DRAFT', 'Draft'), ('DOCUMENTS_READY', 'Documents Ready'), ('SUBMITTED', 'Submitted'), ('UNDER_REVIEW', 'Under Review'), ('INTERVIEW_SCHEDULED', 'Interview Scheduled'), ('CONDITIONAL_OFFER', 'Conditional Offer'), ('UNCONDITIONAL_OFFER', 'Unconditional Offer'), ('OFFER_ACCEPTED', 'Offer Accepted'), ('OFFER_DECLINED', 'Offer Declined'), ('CAS_REQUESTED', 'CAS Requested'), ('CAS_RECEIVED', 'CAS Received'), ('ENROLLED', 'Enrolled'), ('REJECTED', 'Rejected'), ('WITHDRAWN', 'Withdrawn')], max_length=25)),
+                ('next_stage', models.CharField(choices=[('DRAFT', 'Draft'), ('DOCUMENTS_READY', 'Documents Ready'), ('SUBMITTED', 'Submitted'), ('UNDER_REVIEW', 'Under Review'), ('INTERVIEW_SCHEDULED', 'Interview Scheduled'), ('CONDITIONAL_OFFER', 'Conditional Offer'), ('UNCONDITIONAL_OFFER', 'Unconditional Offer'), ('OFFER_ACCEPTED', 'Offer Accepted'), ('OFFER_DECLINED', 'Offer Declined'), ('CAS_REQUESTED', 'CAS Requested'), ('CAS_RECEIVED', 'CAS Received'), ('ENROLLED', 'Enrolled'), ('REJECTED', 'Rejected'), ('WITHDRAWN', 'Withdrawn')], max_length=25)),
+                ('count', models.IntegerField(default=0)),
+                ('total_seconds', models.FloatField(default=0)),
+                ('min_seconds', models.FloatField(default=0)),
+                ('max_seconds', models.FloatField(default=0)),
+                ('histogram', models.JSONField(blank=True, default=list, help_text='Stay counts per analytics.pipeline.BUCKET_HOURS bucket')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('branch', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='branches.branch')),
+                ('university', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='universities.university')),
+            ],
+            options={
+                'verbose_name': 'Stage Duration Rollup',
+                'verbose_name_plural': 'Stage Duration Rollups',
+                'ordering': ['-day', 'stage'],
+                'indexes': [models.Index(fields=['day', 'branch'], name='idx_stagerollup_day_branch'), models.Index(fields=['branch', 'day'], name='idx_stagerollup_branch_day')],
+            },
+        ),
+    ]
@@ -1,6 +1,9 @@
+import uuid
+
 from django.conf import settings
 from django.db import models
 
+from applications.models import Application
 from core.models import TenantAwareModel
 
 
@@ -55,3 +58,50 @@ class MetricSnapshot(TenantAwareModel):
 
     def __str__(self):
         return f"{self.get_metric_type_display()} ({self.generated_at.date()})"
+
+
+class StageDurationRollup(models.Model):
+    """
+    Daily rollup of completed application stage stays (analytics.pipeline):
+    how many applications left `stage` for `next_stage` on `day`, how long
+    they had spent in it, and a histogram of those durations, per branch,
+    university and intake. Reports read these rows instead of the log table.
+    """
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    day = models.DateField(help_text="Local date the applications left the stage")
+    branch = models.ForeignKey(
+        'branches.Branch',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    university = models.ForeignKey(
+        'universities.University',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    intake = models.CharField(max_length=50, blank=True, default='')
+    stage = models.CharField(max_length=25, choices=Application.Status.choices)
+    next_stage = models.CharField(max_length=25, choices=Application.Status.choices)
+    count = models.IntegerField(default=0)
+    total_seconds = models.FloatField(default=0)
+    min_seconds = models.FloatField(default=0)
+    max_seconds = models.FloatField(default=0)
+    histogram = models.JSONField(default=list, blank=True, help_text="Stay counts per analytics.pipeline.BUCKET_HOURS bucket")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-day', 'stage']
+        verbose_name = "Stage Duration Rollup"
+        verbose_name_plural = "Stage Duration Rollups"
+        indexes = [
+            models.Index(fields=['day', 'branch'], name='idx_stagerollup_day_branch'),
+            models.Index(fields=['branch', 'day'], name='idx_stagerollup_branch_day'),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.stage} -> {self.next_stage} ({self.count})"
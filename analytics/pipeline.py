@@ -0,0 +1,260 @@
+"""
+Application pipeline stage durations.
+
+A stage stay runs from the status log entry that moved an application into
+a status to the next entry for the same application, read in one query
+with window functions (LEAD over changed_at per application); an
+application's first stay starts at its creation. Completed stays are
+rolled up per local day they ended into StageDurationRollup rows (one per
+branch, university, intake, stage and next stage), holding the count,
+the total, min and max duration and a histogram over BUCKET_HOURS, so
+reports over months of history read rollups instead of the log table.
+
+rollup_stage_durations() recomputes given days; Celery Beat rolls up the
+last two days nightly (analytics.tasks) and the rollup_stage_durations
+command backfills history. stage_report() merges rollups into per-stage
+mean, median and p90 durations and stage-to-stage conversion rates;
+medians and p90s are interpolated within histogram buckets.
+"""
+import uuid
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import F, Window
+from django.db.models.functions import Lead, RowNumber
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from applications.models import ApplicationStatusLog
+from .models import StageDurationRollup
+
+
+# Upper bounds (hours) of the duration histogram buckets; the last bucket is open
+BUCKET_HOURS = (1, 4, 12, 24, 48, 72, 120, 168, 240, 336, 504, 720, 1080, 1440, 2160)
+
+DIMENSIONS = ('branch_id', 'university_id', 'intake')
+GROUP_BY_PARAMS = {'branch': 'branch_id', 'university': 'university_id', 'intake': 'intake'}
+
+# Days covered by a report without ?start=
+REPORT_DAYS = 90
+
+# Days rolled up by the nightly task: yesterday, plus today so far
+NIGHTLY_DAYS = 2
+
+
+def bucket_for(seconds):
+    hours = seconds / 3600
+    for index, bound in enumerate(BUCKET_HOURS):
+        if hours <= bound:
+            return index
+    return len(BUCKET_HOURS)
+
+
+def day_bounds(day):
+    """Aware [start, end) datetimes of a local date."""
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    return start, timezone.make_aware(datetime.combine(day + timedelta(days=1), time.min))
+
+
+def stage_stays(start, end):
+    """
+    Stage stays that ended in [start, end), as (left_at, dimensions,
+    stage, next_stage, seconds) tuples.
+    """
+    touched = ApplicationStatusLog.objects.filter(changed_at__gte=start, changed_at__lt=end).values('application_id')
+    per_application = {
+        'partition_by': F('application_id'),
+        'order_by': [F('changed_at').asc(), F('id').asc()],
+    }
+    logs = (
+        ApplicationStatusLog.objects
+        .filter(application_id__in=touched, changed_at__lt=end, application__is_deleted=False)
+        .order_by()
+        .annotate(
+            left_at=Window(Lead('changed_at'), **per_application),
+            next_stage=Window(Lead('to_status'), **per_application),
+            position=Window(RowNumber(), **per_application),
+        )
+        .values(
+            'changed_at', 'from_status', 'to_status', 'left_at', 'next_stage', 'position',
+            'application__created_at', 'application__branch_id', 'application__university_id', 'application__intake',
+        )
+    )
+    for log in logs:
+        dimensions = (log['application__branch_id'], log['application__university_id'], log['application__intake'] or '')
+        stays = [(log['to_status'], log['changed_at'], log['left_at'], log['next_stage'])]
+        if log['position'] == 1 and log['from_status']:
+            stays.append((log['from_status'], log['application__created_at'], log['changed_at'], log['to_status']))
+        for stage, entered_at, left_at, next_stage in stays:
+            if left_at is None or not start <= left_at < end or entered_at is None:
+                continue
+            yield left_at, dimensions, stage, next_stage, max((left_at - entered_at).total_seconds(), 0)
+
+
+def rollup_day(day):
+    """Recompute the rollups of one local date. Returns the number of rows written."""
+    start, end = day_bounds(day)
+    groups = {}
+    for _, dimensions, stage, next_stage, seconds in stage_stays(start, end):
+        key = (*dimensions, stage, next_stage)
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = {
+                'count': 0, 'total_seconds': 0.0, 'min_seconds': seconds, 'max_seconds': seconds,
+                'histogram': [0] * (len(BUCKET_HOURS) + 1),
+            }
+        group['count'] += 1
+        group['total_seconds'] += seconds
+        group['min_seconds'] = min(group['min_seconds'], seconds)
+        group['max_seconds'] = max(group['max_seconds'], seconds)
+        group['histogram'][bucket_for(seconds)] += 1
+
+    rollups = [
+        StageDurationRollup(
+            day=day, branch_id=branch_id, university_id=university_id, intake=intake,
+            stage=stage, next_stage=next_stage, **values,
+        )
+        for (branch_id, university_id, intake, stage, next_stage), values in groups.items()
+    ]
+    with transaction.atomic():
+        StageDurationRollup.objects.filter(day=day).delete()
+        StageDurationRollup.objects.bulk_create(rollups)
+    return len(rollups)
+
+
+def rollup_stage_durations(start_day, end_day=None):
+    """Recompute the rollups of every local date from start_day to end_day (inclusive)."""
+    end_day = end_day or start_day
+    written, day = 0, start_day
+    while day <= end_day:
+        written += rollup_day(day)
+        day += timedelta(days=1)
+    return written
+
+
+def percentile(histogram, count, fraction, min_seconds, max_seconds):
+    """
+    Duration (seconds) below which `fraction` of the stays fall,
+    interpolated within its bucket narrowed to the observed min and max.
+    """
+    if not count:
+        return None
+    rank = fraction * count
+    seen = 0
+    for index, in_bucket in enumerate(histogram):
+        if in_bucket and seen + in_bucket >= rank:
+            lower = BUCKET_HOURS[index - 1] * 3600 if index else 0
+            upper = BUCKET_HOURS[index] * 3600 if index < len(BUCKET_HOURS) else max_seconds
+            upper = min(upper, max_seconds)
+            lower = min(max(lower, min_seconds), upper)
+            return lower + (upper - lower) * (rank - seen) / in_bucket
+        seen += in_bucket
+    return max_seconds
+
+
+def _hours(seconds):
+    return round(seconds / 3600, 2) if seconds is not None else None
+
+
+def _stage_summary(rows):
+    """Durations per stage and conversions per stage pair for a list of rollup value dicts."""
+    stages, pairs = {}, defaultdict(int)
+    for row in rows:
+        stage = stages.get(row['stage'])
+        if stage is None:
+            stage = stages[row['stage']] = {
+                'count': 0, 'total_seconds': 0.0, 'min_seconds': row['min_seconds'], 'max_seconds': 0.0,
+                'histogram': [0] * (len(BUCKET_HOURS) + 1),
+            }
+        stage['count'] += row['count']
+        stage['total_seconds'] += row['total_seconds']
+        stage['min_seconds'] = min(stage['min_seconds'], row['min_seconds'])
+        stage['max_seconds'] = max(stage['max_seconds'], row['max_seconds'])
+        for index, in_bucket in enumerate(row['histogram'] or ()):
+            stage['histogram'][index] += in_bucket
+        pairs[(row['stage'], row['next_stage'])] += row['count']
+
+    durations = []
+    for name, stage in sorted(stages.items()):
+        count = stage['count']
+        durations.append({
+            'stage': name,
+            'count': count,
+            'mean_hours': _hours(stage['total_seconds'] / count),
+            'median_hours': _hours(percentile(stage['histogram'], count, 0.5, stage['min_seconds'], stage['max_seconds'])),
+            'p90_hours': _hours(percentile(stage['histogram'], count, 0.9, stage['min_seconds'], stage['max_seconds'])),
+        })
+    conversions = [
+        {
+            'stage': stage,
+            'next_stage': next_stage,
+            'count': count,
+            'rate': round(count * 100 / stages[stage]['count'], 2),
+        }
+        for (stage, next_stage), count in sorted(pairs.items())
+    ]
+    bottleneck = max(durations, key=lambda entry: entry['median_hours'], default=None)
+    return {
+        'stage_durations': durations,
+        'stage_conversions': conversions,
+        'bottleneck_stage': bottleneck['stage'] if bottleneck else None,
+    }
+
+
+def group_by_from_param(value):
+    """Rollup dimension for a ?group_by= query parameter (None: no grouping)."""
+    if not value:
+        return None
+    try:
+        return GROUP_BY_PARAMS[value.lower()]
+    except KeyError:
+        raise ValidationError({'group_by': f"Choose one of: {', '.join(GROUP_BY_PARAMS)}."})
+
+
+def rollups_from_params(rollups, params, default_days=REPORT_DAYS):
+    """
+    Narrow a StageDurationRollup queryset by the ?start= and ?end=
+    (YYYY-MM-DD; default: the last default_days days), ?university= and
+    ?intake= query parameters. Returns (rollups, start_day, end_day).
+    """
+    try:
+        end_day = datetime.strptime(params['end'], '%Y-%m-%d').date() if params.get('end') else timezone.localdate()
+        start_day = (
+            datetime.strptime(params['start'], '%Y-%m-%d').date() if params.get('start')
+            else end_day - timedelta(days=default_days)
+        )
+    except ValueError:
+        raise ValidationError('Invalid date format. Use YYYY-MM-DD.')
+    if start_day > end_day:
+        raise ValidationError('start must not be after end.')
+
+    rollups = rollups.filter(day__range=(start_day, end_day))
+    if params.get('university'):
+        try:
+            rollups = rollups.filter(university_id=uuid.UUID(params['university']))
+        except ValueError:
+            raise ValidationError({'university': 'Must be a valid UUID.'})
+    if params.get('intake'):
+        rollups = rollups.filter(intake=params['intake'])
+    return rollups, start_day, end_day
+
+
+def stage_report(rollups, group_by=None):
+    """
+    Stage durations (hours) and conversion rates (% of the stays leaving
+    a stage that moved to next_stage) of a StageDurationRollup queryset,
+    overall and, with group_by ('branch_id', 'university_id' or 'intake'),
+    per value of that dimension.
+    """
+    rows = list(rollups.order_by().values('stage', 'next_stage', 'count', 'total_seconds', 'min_seconds', 'max_seconds', 'histogram', *DIMENSIONS))
+    report = _stage_summary(rows)
+    if group_by:
+        grouped = defaultdict(list)
+        for row in rows:
+            grouped[row[group_by]].append(row)
+        report['groups'] = [
+            {group_by: str(value) if value is not None else None, **_stage_summary(group_rows)}
+            for value, group_rows in sorted(grouped.items(), key=lambda item: str(item[0]))
+        ]
+    return report
@@ -0,0 +1,17 @@
+from datetime import timedelta
+
+from celery import shared_task
+from django.utils import timezone
+
+from .pipeline import NIGHTLY_DAYS, rollup_stage_durations
+
+
+@shared_task
+def rollup_application_stage_durations():
+    """
+    Roll up the application stage stays (analytics.pipeline) that ended
+    yesterday and today so far. Scheduled nightly via Celery Beat.
+    """
+    today = timezone.localdate()
+    rows = rollup_stage_durations(today - timedelta(days=NIGHTLY_DAYS - 1), today)
+    return f"Wrote {rows} stage duration rollups."
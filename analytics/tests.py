@@ -1,8 +1,17 @@
+from datetime import date, datetime, time, timedelta
+
 from django.test import TestCase
-from rest_framework.test import APIRequestFactory
+from django.utils import timezone
+from rest_framework.test import APIClient, APIRequestFactory
 from rest_framework.exceptions import ValidationError
 from rest_framework.request import Request
 
+from accounts.models import User
+from applications.models import Application, ApplicationStatusLog
+from branches.models import Branch
+from students.models import Student
+from .models import StageDurationRollup
+from .pipeline import rollup_stage_durations, stage_report
 from .views import AnalyticsViewSet
 
 
@@ -15,3 +24,81 @@ class AnalyticsTests(TestCase):
         viewset.request = request
         with self.assertRaises(ValidationError):
             viewset._parse_period(request)
+
+
+class StageDurationRollupTests(TestCase):
+    def setUp(self):
+        self.branch = Branch.objects.create(code='SD', name='Stage Branch', country='Testland', currency='USD')
+        self.admin = User.objects.create_superuser(
+            username='stage.admin', email='stage.admin@example.com', password='StrongPass123!'
+        )
+        self.student = Student.objects.create(
+            branch=self.branch, first_name='Stage', last_name='Student', email='stage.student@example.com'
+        )
+        self.day = date(2026, 3, 2)
+
+    def _at(self, day_offset, hour):
+        return timezone.make_aware(datetime.combine(self.day + timedelta(days=day_offset), time(hour)))
+
+    def _application(self, created_at, transitions, intake='Sep 2026'):
+        application = Application.objects.create(student=self.student, branch=self.branch, intake=intake)
+        Application.objects.filter(pk=application.pk).update(created_at=created_at)
+        for from_status, to_status, changed_at in transitions:
+            log = ApplicationStatusLog.objects.create(application=application, from_status=from_status, to_status=to_status)
+            ApplicationStatusLog.objects.filter(pk=log.pk).update(changed_at=changed_at)
+        return application
+
+    def test_rollup_reports_durations_and_conversions(self):
+        Status = Application.Status
+        self._application(self._at(0, 9), [
+            (Status.DRAFT, Status.SUBMITTED, self._at(0, 12)),
+            (Status.SUBMITTED, Status.UNDER_REVIEW, self._at(1, 12)),
+        ])
+        self._application(self._at(0, 9), [
+            (Status.DRAFT, Status.SUBMITTED, self._at(0, 10)),
+            (Status.SUBMITTED, Status.REJECTED, self._at(1, 22)),
+        ], intake='Jan 2027')
+
+        rollup_stage_durations(self.day, self.day + timedelta(days=1))
+
+        self.assertEqual(StageDurationRollup.objects.filter(day=self.day, stage=Status.DRAFT).count(), 2)
+        report = stage_report(StageDurationRollup.objects.all(), group_by='intake')
+        durations = {entry['stage']: entry for entry in report['stage_durations']}
+        self.assertEqual(set(durations), {Status.DRAFT, Status.SUBMITTED})
+        self.assertEqual(durations[Status.DRAFT]['count'], 2)
+        self.assertEqual(durations[Status.DRAFT]['mean_hours'], 2)
+        self.assertEqual(durations[Status.SUBMITTED]['mean_hours'], 30)
+        self.assertLessEqual(durations[Status.SUBMITTED]['median_hours'], durations[Status.SUBMITTED]['p90_hours'])
+        self.assertEqual(report['bottleneck_stage'], Status.SUBMITTED)
+
+        rates = {(entry['stage'], entry['next_stage']): entry['rate'] for entry in report['stage_conversions']}
+        self.assertEqual(rates[(Status.DRAFT, Status.SUBMITTED)], 100)
+        self.assertEqual(rates[(Status.SUBMITTED, Status.UNDER_REVIEW)], 50)
+        self.assertEqual(rates[(Status.SUBMITTED, Status.REJECTED)], 50)
+        self.assertEqual([group['intake'] for group in report['groups']], ['Jan 2027', 'Sep 2026'])
+
+        # Recomputing a day replaces its rows instead of adding to them
+        rollup_stage_durations(self.day)
+        self.assertEqual(stage_report(StageDurationRollup.objects.all())['stage_durations'][0]['count'], 2)
+
+    def test_pipeline_analysis_reads_rollups(self):
+        Status = Application.Status
+        self._application(self._at(0, 9), [(Status.DRAFT, Status.SUBMITTED, self._at(0, 12))])
+        rollup_stage_durations(self.day)
+
+        client = APIClient()
+        client.force_authenticate(user=self.admin)
+        url = f'/api/v1/branches/{self.branch.id}/pipeline-analysis/'
+        response = client.get(url, {'start': '2026-03-01', 'end': '2026-03-31'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['applications_by_status'], {Status.DRAFT: 1})
+        self.assertEqual(response.data['stage_durations'][0]['median_hours'], 3)
+
+        response = client.get('/api/v1/analytics/reports/stage-durations/', {
+            'start': '2026-03-01', 'end': '2026-03-31', 'branch_id': str(self.branch.id), 'group_by': 'branch',
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['groups'][0]['branch_id'], str(self.branch.id))
+
+        response = client.get(url, {'group_by': 'counselor'})
+        self.assertEqual(response.status_code, 400)
@@ -17,7 +17,8 @@ from students.models import Lead, Student
 from finance.models import Transaction
 from tasks.models import Task
 from accounts.models import User
-from .models import BranchKpiInput, MetricSnapshot
+from .models import BranchKpiInput, MetricSnapshot, StageDurationRollup
+from .pipeline import group_by_from_param, rollups_from_params, stage_report
 from .serializers import BranchKpiInputSerializer, MetricSnapshotSerializer
 
 
@@ -45,7 +46,8 @@ class AnalyticsViewSet(viewsets.ViewSet):
             'endpoints': [
                 'analytics/reports/branch-performance/',
                 'analytics/reports/counselor-kpis/',
-                'analytics/reports/forecast/'
+                'analytics/reports/forecast/',
+                'analytics/reports/stage-durations/'
             ]
         })
 
@@ -233,3 +235,18 @@ class AnalyticsViewSet(viewsets.ViewSet):
             })
 
         return Response({'results': results})
+
+    @action(detail=False, methods=['get'], url_path='stage-durations')
+    def stage_durations(self, request):
+        """
+        Mean, median and p90 time in each application stage and stage-to-stage
+        conversion rates over the accessible branches, from the daily rollups.
+        Sliced by ?branch_id=, ?university=, ?intake=, ?start=/?end= and
+        broken down with ?group_by=branch|university|intake.
+        """
+        branches = self._resolve_branches(request)
+        rollups, start, end = rollups_from_params(
+            StageDurationRollup.objects.filter(branch__in=branches), request.query_params
+        )
+        report = stage_report(rollups, group_by_from_param(request.query_params.get('group_by')))
+        return Response({'period_start': str(start), 'period_end': str(end), **report})
@@ -0,0 +1,152 @@
+"""
+Bulk application status transitions.
+
+ApplicationViewSet.bulk_transition moves a batch of applications to one
+status, chunk by chunk. Each chunk is one transaction: the rows are read
+and locked once, moved with a single UPDATE, and given their status logs,
+visa cases (on CAS_RECEIVED) and templated tasks with one bulk INSERT
+each, as ApplicationService.perform_transition does for one application.
+
+As the UPDATE bypasses the model signals, a chunk also refreshes the
+commission forecast of the universities involved, bumps the dashboards of
+their branches and emits the ApplicationStatusChanged events
+(applications.events). A chunk that fails is rolled back and reported as
+failed; the chunks around it still commit.
+"""
+import logging
+
+from django.db import transaction
+from django.utils import timezone
+
+from students.dashboard import bump_dashboard_version
+from tasks.models import Task, TaskTemplate
+from universities.forecast import bucket_for, refresh_forecast
+from .events import ApplicationStatusChanged, emit
+from .models import Application, ApplicationStatusLog
+
+
+logger = logging.getLogger(__name__)
+
+BULK_TRANSITION_LIMIT = 1000
+CHUNK_SIZE = 200
+
+TRANSITIONED = 'transitioned'
+UNCHANGED = 'unchanged'
+NOT_FOUND = 'not_found'
+FAILED = 'failed'
+
+
+def _visa_cases(rows):
+    from visas.models import VisaCase
+
+    existing = set(
+        VisaCase.objects.filter(application_id__in=[row['id'] for row in rows]).values_list('application_id', flat=True)
+    )
+    return VisaCase.objects.bulk_create([
+        VisaCase(
+            student_id=row['student_id'],
+            application_id=row['id'],
+            branch_id=row['branch_id'],
+            status=VisaCase.Status.CAS_RECEIVED,
+        )
+        for row in rows if row['id'] not in existing
+    ])
+
+
+def _templated_tasks(rows, templates, user, now):
+    existing = set(
+        Task.objects.filter(
+            application_id__in=[row['id'] for row in rows],
+            title__in=[template.title for template in templates],
+        ).values_list('application_id', 'title')
+    )
+    tasks = []
+    for row in rows:
+        assignee_id = row['assigned_to_id'] or row['student__counselor_id'] or user.id
+        for template in templates:
+            if (row['id'], template.title) in existing:
+                continue
+            tasks.append(Task(
+                title=template.title,
+                application_id=row['id'],
+                description=template.description,
+                assigned_to_id=assignee_id,
+                created_by=user,
+                student_id=row['student_id'],
+                branch_id=row['branch_id'],
+                due_date=now + timezone.timedelta(days=template.due_days_offset or 7),
+                priority=Task.Priority.MEDIUM,
+                category=template.category or Task.Category.ADMISSION,
+                status=Task.Status.PENDING,
+            ))
+    return Task.objects.bulk_create(tasks)
+
+
+def _transition_chunk(applications, ids, user, to_status, note, templates):
+    """Move one chunk inside the current transaction; returns {id: result}."""
+    now = timezone.now()
+    rows = list(
+        applications.order_by().filter(id__in=ids).select_for_update(of=('self',)).values(
+            'id', 'status', 'student_id', 'branch_id', 'university_id',
+            'assigned_to_id', 'student__counselor_id', 'student__branch_id',
+        )
+    )
+    results = {row['id']: {'result': UNCHANGED, 'from_status': row['status']} for row in rows}
+    moving = [row for row in rows if row['status'] != to_status]
+    if not moving:
+        return results
+
+    Application.objects.filter(id__in=[row['id'] for row in moving]).update(
+        status=to_status, status_changed_at=now, last_activity_at=now, updated_at=now,
+    )
+    ApplicationStatusLog.objects.bulk_create([
+        ApplicationStatusLog(
+            application_id=row['id'],
+            from_status=row['status'],
+            to_status=to_status,
+            changed_by=user,
+            note=note,
+            metadata={'bulk': True},
+        )
+        for row in moving
+    ])
+    if to_status == Application.Status.CAS_RECEIVED:
+        _visa_cases(moving)
+    if templates:
+        _templated_tasks(moving, templates, user, now)
+
+    refresh_forecast({
+        row['university_id'] for row in moving
+        if row['university_id'] and bucket_for(row['status']) != bucket_for(to_status)
+    })
+    for branch_id in {row['student__branch_id'] for row in moving}:
+        bump_dashboard_version(branch_id)
+    for row in moving:
+        emit(ApplicationStatusChanged(row['id'], row['status'], to_status))
+        results[row['id']]['result'] = TRANSITIONED
+    return results
+
+
+def bulk_transition(applications, application_ids, user, to_status, note='', chunk_size=CHUNK_SIZE):
+    """
+    Move the listed applications that are in `applications` (the queryset
+    the user may change) to to_status. Returns one result per distinct id,
+    in request order: {'id', 'result', 'from_status'}, where result is
+    transitioned, unchanged (already in to_status), not_found or failed.
+    """
+    ids = list(dict.fromkeys(application_ids))
+    templates = list(TaskTemplate.objects.filter(is_active=True, trigger_status=to_status))
+    results = {}
+    for start in range(0, len(ids), chunk_size):
+        chunk = ids[start:start + chunk_size]
+        try:
+            with transaction.atomic():
+                results.update(_transition_chunk(applications, chunk, user, to_status, note, templates))
+        except Exception:
+            logger.exception("Bulk transition to %s failed for a chunk of %s applications", to_status, len(chunk))
+            results.update({application_id: {'result': FAILED, 'from_status': None} for application_id in chunk})
+
+    return [
+        {'id': str(application_id), **results.get(application_id, {'result': NOT_FOUND, 'from_status': None})}
+        for application_id in ids
+    ]
@@ -0,0 +1,103 @@
+"""
+Compiled checklist-template index.
+
+Which ApplicationChecklistTemplates apply to an application depends only on
+its scope: (branch, university, university country, course level). The
+active templates are compiled once into a list of rules, cached under a
+version token that every template write replaces (applications.signals),
+the same scheme as the university catalog (universities.catalog). Each
+process keeps the compiled TemplateIndex for the current version and
+memoizes the templates resolved per scope, so initializing checklists for
+a batch of applications reads the templates at most once.
+"""
+import uuid
+
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import ApplicationChecklistTemplate
+
+
+CHECKLIST_VERSION_KEY = 'checklist_templates:version'
+INDEX_CACHE_TIMEOUT = 60 * 60 * 6
+
+RULE_FIELDS = (
+    'id', 'title', 'category', 'is_required', 'due_days_offset',
+    'branch_id', 'university_id', 'country', 'level',
+)
+
+# {version: TemplateIndex} compiled in this process
+_compiled = {}
+
+
+def get_checklist_version():
+    """Return the current checklist template version token."""
+    version = cache.get(CHECKLIST_VERSION_KEY)
+    if version is None:
+        cache.add(CHECKLIST_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+        version = cache.get(CHECKLIST_VERSION_KEY)
+    return version
+
+
+def bump_checklist_version():
+    """
+    Invalidate the compiled index. Bumped immediately and again on commit,
+    so readers that compiled pre-commit templates meanwhile are invalidated too.
+    """
+    cache.set(CHECKLIST_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+    transaction.on_commit(lambda: cache.set(CHECKLIST_VERSION_KEY, uuid.uuid4().hex, timeout=None))
+
+
+def scope_for(branch_id, university_id=None, country=None, level=None):
+    """
+    Index key of an application: the university country only matters with
+    a university, and a blank level means none.
+    """
+    return branch_id, university_id, country if university_id else None, level or None
+
+
+class TemplateIndex:
+    """Active checklist templates as rules, in checklist order, resolved per scope."""
+
+    def __init__(self, rules):
+        self.rules = rules
+        self._resolved = {}
+
+    @staticmethod
+    def applies(rule, scope):
+        branch_id, university_id, country, level = scope
+        if rule['branch_id'] not in (None, branch_id):
+            return False
+        if university_id is None:
+            if rule['university_id'] is not None:
+                return False
+        elif rule['university_id'] not in (None, university_id) or rule['country'] not in (None, '', country):
+            return False
+        return not level or rule['level'] in (None, '', level)
+
+    def resolve(self, scope):
+        """The rules applying to a scope_for() key."""
+        if scope not in self._resolved:
+            self._resolved[scope] = [rule for rule in self.rules if self.applies(rule, scope)]
+        return self._resolved[scope]
+
+
+def template_index():
+    """The TemplateIndex of the current template version."""
+    version = get_checklist_version()
+    index = _compiled.get(version)
+    if index is None:
+        key = f'checklist_templates:index:{version}'
+        rules = cache.get(key)
+        if rules is None:
+            rules = list(
+                ApplicationChecklistTemplate.objects.filter(is_active=True)
+                .order_by('sort_order', 'title')
+                .values(*RULE_FIELDS)
+            )
+            cache.set(key, rules, INDEX_CACHE_TIMEOUT)
+        index = TemplateIndex(rules)
+        # Indexes of replaced versions are never read again
+        _compiled.clear()
+        _compiled[version] = index
+    return index
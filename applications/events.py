@@ -0,0 +1,117 @@
+"""
+Application domain events.
+
+Side effects of an application changing status (follow-up tasks, commission
+claims) used to run as post_save receivers on every Application.save(),
+querying even when the status had not changed. Instead, applications.signals
+detects actual status transitions (and creations) and emits one
+ApplicationStatusChanged event for each once the transaction commits; a
+single Celery task per event then runs the handlers registered for the new
+status, in registration order, so a plain field edit costs one UPDATE.
+When the broker cannot take the task, the handlers run in-process instead,
+so an outage neither fails the status change nor drops its side effects.
+
+Handlers take (application, event) and register from their app's signals
+module, so they are known to web and worker processes alike:
+
+    @on_status_changed(Application.Status.ENROLLED)
+    def create_claim(application, event):
+        ...
+
+Without statuses a handler receives every event. Handlers should be
+idempotent: an application can pass through the same status twice.
+"""
+import logging
+from functools import partial
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+logger = logging.getLogger(__name__)
+
+# [(handler, statuses or None for all)], in registration order
+HANDLERS = []
+
+
+class ApplicationStatusChanged:
+    """An application entered to_status (from from_status; None when just created)."""
+
+    def __init__(self, application_id, from_status, to_status, created=False, occurred_at=None):
+        self.application_id = str(application_id)
+        self.from_status = from_status
+        self.to_status = to_status
+        self.created = created
+        self.occurred_at = occurred_at or timezone.now()
+
+    def __repr__(self):
+        return f"ApplicationStatusChanged({self.application_id}: {self.from_status} -> {self.to_status})"
+
+    def as_payload(self):
+        """JSON-serializable form passed to Celery."""
+        return {
+            'application_id': self.application_id,
+            'from_status': self.from_status,
+            'to_status': self.to_status,
+            'created': self.created,
+            'occurred_at': self.occurred_at.isoformat(),
+        }
+
+    @classmethod
+    def from_payload(cls, payload):
+        return cls(**{**payload, 'occurred_at': parse_datetime(payload['occurred_at'])})
+
+
+def on_status_changed(*statuses):
+    """Register a handler for transitions into any of statuses (any status when none are given)."""
+    def register(handler):
+        HANDLERS.append((handler, frozenset(statuses) or None))
+        return handler
+    return register
+
+
+def handlers_for(event):
+    return [handler for handler, statuses in HANDLERS if statuses is None or event.to_status in statuses]
+
+
+def emit(event):
+    """Queue the event's handlers to run in the background once the current transaction commits."""
+    if not handlers_for(event):
+        return
+    transaction.on_commit(partial(publish, event.as_payload()), robust=True)
+
+
+def publish(payload):
+    """Queue a committed event's handlers, running them in-process when the broker is unavailable."""
+    from .tasks import handle_application_event
+
+    try:
+        handle_application_event.delay(payload)
+    except Exception:
+        logger.exception("Could not queue application event %s; running its handlers in-process", payload)
+        dispatch(ApplicationStatusChanged.from_payload(payload))
+
+
+def dispatch(event):
+    """
+    Run the handlers registered for an event against the current application
+    row. A failing handler is logged and does not stop the others.
+    """
+    from .models import Application
+
+    application = (
+        Application.objects.select_related('student__counselor', 'branch', 'university', 'course')
+        .filter(pk=event.application_id)
+        .first()
+    )
+    if application is None:
+        return 0
+    ran = 0
+    for handler in handlers_for(event):
+        try:
+            with transaction.atomic():
+                handler(application, event)
+            ran += 1
+        except Exception:
+            logger.exception("Application event handler %s failed for %r", handler.__qualname__, event)
+    return ran
@@ -0,0 +1,47 @@
+# Generated by Django 6.0.2 on 2026-10-17 05:36
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_status_changed_at(apps, schema_editor):
+    """
+    When each application entered its current status: the latest status
+    log entry into that status, else its latest status log entry, else
+    its creation.
+    """
+    Application = apps.get_model('applications', 'Application')
+    ApplicationStatusLog = apps.get_model('applications', 'ApplicationStatusLog')
+
+    logs = ApplicationStatusLog.objects.filter(application_id=OuterRef('pk')).order_by('-changed_at')
+    Application.objects.filter(status_changed_at__isnull=True).update(status_changed_at=Coalesce(
+        Subquery(logs.filter(to_status=OuterRef('status')).values('changed_at')[:1]),
+        Subquery(logs.values('changed_at')[:1]),
+        F('created_at'),
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0006_alter_applicationnote_application'),
+        ('branches', '0007_alter_branchanalyticssnapshot_snapshot_date'),
+        ('students', '0011_leaderboard_counter'),
+        ('universities', '0013_intake_month_ordering'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='application',
+            name='status_changed_at',
+            field=models.DateTimeField(blank=True, editable=False, help_text='When the current status was entered, derived on save', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='application',
+            index=models.Index(fields=['status', 'status_changed_at'], name='idx_application_status_since'),
+        ),
+        migrations.RunPython(backfill_status_changed_at, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,10 @@
 import uuid
+from datetime import timedelta
 from django.conf import settings
 from django.db import models
 from django.db.models import Q
+from django.utils import timezone
+from core.derived import DerivedField
 from core.models import TenantAwareModel
 from core.managers import TenantQuerySet
 from core.fields import EncryptedTextField
@@ -152,6 +155,19 @@ class Application(TenantAwareModel):
         default=ApplicationType.DIRECT
     )
     status = models.CharField(max_length=25, choices=Status.choices, default=Status.DRAFT)
+    status_changed_at = models.DateTimeField(
+        null=True, blank=True, editable=False,
+        help_text="When the current status was entered, derived on save"
+    )
+
+    derived_fields = (
+        DerivedField('status_changed_at', 'calculate_status_changed_at', depends_on=('status',)),
+    )
+
+    # Risk flag thresholds (days in the current status)
+    STUCK_AFTER_DAYS = 14
+    CAS_DELAYED_AFTER_DAYS = 7
+    SETTLED_STATUSES = (Status.OFFER_ACCEPTED, Status.CAS_RECEIVED)
 
     # Assignment and scoring
     assigned_to = models.ForeignKey(
@@ -203,6 +219,9 @@ class Application(TenantAwareModel):
         verbose_name = "Application"
         verbose_name_plural = "Applications"
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'status_changed_at'], name='idx_application_status_since'),
+        ]
     
     # objects = ApplicationManager() # Handled by TenantAwareModel
     
@@ -211,6 +230,55 @@ class Application(TenantAwareModel):
         uni_name = self.university.name if self.university else self.university_name or 'Unknown'
         return f"{self.student.student_code} → {uni_name} ({self.get_status_display()})"
 
+    def calculate_status_changed_at(self):
+        """
+        Now when the status changes; otherwise the stored value, falling back
+        to the last status log entry (or updated_at) for rows saved before
+        the column existed.
+        """
+        if self._state.adding or self.has_changed('status'):
+            return timezone.now()
+        if self.status_changed_at:
+            return self.status_changed_at
+        logged = self.status_logs.filter(to_status=self.status).values_list('changed_at', flat=True).first()
+        return logged or self.updated_at
+
+    def days_in_current_status(self, now=None):
+        if not self.status_changed_at:
+            return 0
+        return ((now or timezone.now()) - self.status_changed_at).days
+
+    def risk_flags(self, now=None):
+        """Operational risk flags: 'stuck', 'cas_pending_delayed', 'missing_conditions'."""
+        flags = []
+        days = self.days_in_current_status(now)
+        if days > self.STUCK_AFTER_DAYS and self.status not in self.SETTLED_STATUSES:
+            flags.append('stuck')
+        if self.status == self.Status.CAS_REQUESTED and days > self.CAS_DELAYED_AFTER_DAYS:
+            flags.append('cas_pending_delayed')
+        if self.status == self.Status.CONDITIONAL_OFFER and not self.offer_conditions:
+            flags.append('missing_conditions')
+        return flags
+
+    @classmethod
+    def risk_filter(cls, flag, now=None):
+        """Q matching the applications risk_flags() reports `flag` for."""
+        now = now or timezone.now()
+
+        def in_status_since(days):
+            # More than `days` whole days in the current status
+            return Q(status_changed_at__lte=now - timedelta(days=days + 1))
+
+        if flag == 'stuck':
+            return in_status_since(cls.STUCK_AFTER_DAYS) & ~Q(status__in=cls.SETTLED_STATUSES)
+        if flag == 'cas_pending_delayed':
+            return in_status_since(cls.CAS_DELAYED_AFTER_DAYS) & Q(status=cls.Status.CAS_REQUESTED)
+        if flag == 'missing_conditions':
+            return Q(status=cls.Status.CONDITIONAL_OFFER) & (
+                Q(offer_conditions__isnull=True) | Q(offer_conditions=[]) | Q(offer_conditions={})
+            )
+        raise ValueError(f"Unknown risk flag: {flag}")
+
 
 class ApplicationChecklistTemplate(TenantAwareModel):
     """
@@ -2,6 +2,8 @@ from rest_framework import serializers
 from accounts.serializers import UserListSerializer
 from students.serializers import StudentListSerializer, DocumentListSerializer
 from universities.serializers import UniversityListSerializer, CourseListSerializer
+from .bulk import BULK_TRANSITION_LIMIT
+from .services import checklist_stats
 from .models import (
     Application,
     ApplicationStatusLog,
@@ -10,7 +12,14 @@ from .models import (
     ApplicationChecklistItem,
     ApplicationNote
 )
-from django.utils import timezone
+
+
+def checklist_progress(application):
+    """{'total', 'completed', 'percent'} of an application's checklist (completed: verified items)."""
+    total, completed, _missing_required = checklist_stats(application)
+    percent = int((completed / total) * 100) if total else 0
+    return {'total': total, 'completed': completed, 'percent': percent}
+
 
 class ApplicationStatusLogSerializer(serializers.ModelSerializer):
     """Serializer for Application Status History."""
@@ -83,30 +92,14 @@ class ApplicationDetailSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
 
     def get_risk_flags(self, obj):
-        flags = []
-        days = (timezone.now() - obj.updated_at).days if obj.updated_at else 0
-        if days > 14 and obj.status not in [Application.Status.OFFER_ACCEPTED, Application.Status.CAS_RECEIVED]:
-            flags.append('stuck')
-        if obj.status == Application.Status.CAS_REQUESTED and days > 7:
-            flags.append('cas_pending_delayed')
-        if obj.status == Application.Status.CONDITIONAL_OFFER and not obj.offer_conditions:
-            flags.append('missing_conditions')
-        if obj.checklist_items.filter(is_required=True).exists():
-            missing_required = obj.checklist_items.filter(
-                is_required=True,
-                status__in=[ApplicationChecklistItem.Status.MISSING, ApplicationChecklistItem.Status.REJECTED]
-            ).exists()
-            if missing_required:
-                flags.append('docs_missing')
+        flags = obj.risk_flags()
+        _total, _verified, missing_required = checklist_stats(obj)
+        if missing_required:
+            flags.append('docs_missing')
         return flags
 
     def get_checklist_progress(self, obj):
-        total = obj.checklist_items.count()
-        if total == 0:
-            return {'total': 0, 'completed': 0, 'percent': 0}
-        completed = obj.checklist_items.filter(status=ApplicationChecklistItem.Status.VERIFIED).count()
-        percent = int((completed / total) * 100)
-        return {'total': total, 'completed': completed, 'percent': percent}
+        return checklist_progress(obj)
 
     def validate(self, attrs):
         request = self.context.get('request')
@@ -195,7 +188,7 @@ class ApplicationListSerializer(serializers.ModelSerializer):
             'intake_date', 'status', 'status_display', 'cas_number', 
             'application_ref', 'priority', 'fit_score', 'risk_score',
             'target_offer_date', 'target_cas_date', 'next_action_at', 'last_activity_at',
-            'updated_at', 'days_in_current_status', 'risk_flags', 'checklist_progress'
+            'updated_at', 'status_changed_at', 'days_in_current_status', 'risk_flags', 'checklist_progress'
         ]
     
     def get_university_name_display(self, obj):
@@ -213,39 +206,14 @@ class ApplicationListSerializer(serializers.ModelSerializer):
         return None
 
     def get_days_in_current_status(self, obj):
-        if not obj.updated_at:
-            return 0
-        return (timezone.now() - obj.updated_at).days
+        return obj.days_in_current_status()
 
     def get_risk_flags(self, obj):
-        flags = []
-        
-        # Risk 1: Stuck in status for too long (e.g., > 14 days)
-        # Note: days_in_current_status is annotated in ViewSet
-        days = self.get_days_in_current_status(obj) or 0
-        if days > 14 and obj.status not in [Application.Status.OFFER_ACCEPTED, Application.Status.CAS_RECEIVED]:
-            flags.append('stuck')
-            
-        # Risk 2: CAS Requested but not received > 7 days
-        if obj.status == Application.Status.CAS_REQUESTED and days > 7:
-            flags.append('cas_pending_delayed')
-            
-        # Risk 3: Conditional Offer but no conditions logged
-        if obj.status == Application.Status.CONDITIONAL_OFFER and not obj.offer_conditions:
-            flags.append('missing_conditions')
-            
-        return flags
+        # Derived from the stored status_changed_at (Application.risk_flags)
+        return obj.risk_flags()
 
     def get_checklist_progress(self, obj):
-        total = getattr(obj, 'checklist_items', None)
-        if not total:
-            return {'total': 0, 'completed': 0, 'percent': 0}
-        total_count = total.count()
-        if total_count == 0:
-            return {'total': 0, 'completed': 0, 'percent': 0}
-        completed = total.filter(status=ApplicationChecklistItem.Status.VERIFIED).count()
-        percent = int((completed / total_count) * 100)
-        return {'total': total_count, 'completed': completed, 'percent': percent}
+        return checklist_progress(obj)
 
 
 class ApplicationSubmissionSerializer(serializers.ModelSerializer):
@@ -262,3 +230,12 @@ class ApplicationSubmissionSerializer(serializers.ModelSerializer):
         if application and attrs.get('branch') and attrs['branch'] != application.student.branch:
             raise serializers.ValidationError({'branch': 'Branch must match application student branch.'})
         return attrs
+
+
+class BulkApplicationTransitionSerializer(serializers.Serializer):
+    """Serializer for moving a batch of applications to one status."""
+    application_ids = serializers.ListField(
+        child=serializers.UUIDField(), allow_empty=False, max_length=BULK_TRANSITION_LIMIT
+    )
+    to_status = serializers.ChoiceField(choices=Application.Status.choices)
+    note = serializers.CharField(required=False, allow_blank=True, default='')
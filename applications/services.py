@@ -1,15 +1,81 @@
 from django.db import transaction
 from django.utils import timezone
-from django.db.models import Q
+from django.db.models import Count, Exists, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
 from rest_framework.exceptions import ValidationError
+from core.sequences import allocate, max_suffix
 from tasks.models import Task, TaskTemplate
+from .checklists import scope_for, template_index
 from .models import (
     Application,
     ApplicationStatusLog,
-    ApplicationChecklistTemplate,
     ApplicationChecklistItem
 )
 
+APPLICATION_REF_PREFIX = 'BWBS'
+
+
+def assign_application_refs(applications, year=None):
+    """
+    Give every application without a reference one (BWBS-YEAR-SEQUENCE),
+    reserving the numbers as one block.
+    """
+    pending = [application for application in applications if not application.application_ref]
+    if not pending:
+        return
+    year = year or timezone.now().year
+    code_prefix = f"{APPLICATION_REF_PREFIX}-{year}-"
+    numbers = allocate(
+        'application', len(pending), year=year,
+        seed=lambda: max_suffix(Application.all_objects, 'application_ref', code_prefix),
+    )
+    for application, number in zip(pending, numbers):
+        application.application_ref = f"{code_prefix}{number:05d}"
+
+
+CHECKLIST_OUTSTANDING_STATUSES = (
+    ApplicationChecklistItem.Status.MISSING,
+    ApplicationChecklistItem.Status.REJECTED,
+)
+
+
+def with_checklist_stats(queryset):
+    """
+    Annotate applications with their live checklist item counts
+    (checklist_total, checklist_verified) and whether a required item is
+    still missing or rejected (checklist_missing_required), as one
+    correlated subquery each, so serializing a page costs no per-row queries.
+    """
+    items = ApplicationChecklistItem.objects.filter(application=OuterRef('pk'))
+
+    def count(**filters):
+        counted = items.filter(**filters).order_by().values('application').annotate(n=Count('id')).values('n')
+        return Coalesce(Subquery(counted, output_field=IntegerField()), Value(0))
+
+    return queryset.annotate(
+        checklist_total=count(),
+        checklist_verified=count(status=ApplicationChecklistItem.Status.VERIFIED),
+        checklist_missing_required=Exists(
+            items.filter(is_required=True, status__in=CHECKLIST_OUTSTANDING_STATUSES)
+        ),
+    )
+
+
+def checklist_stats(application):
+    """
+    (total, verified, missing_required) for an application, read from the
+    with_checklist_stats() annotations when present, queried otherwise.
+    """
+    if hasattr(application, 'checklist_total'):
+        return application.checklist_total, application.checklist_verified, application.checklist_missing_required
+    items = application.checklist_items.all()
+    return (
+        items.count(),
+        items.filter(status=ApplicationChecklistItem.Status.VERIFIED).count(),
+        items.filter(is_required=True, status__in=CHECKLIST_OUTSTANDING_STATUSES).exists(),
+    )
+
+
 class ApplicationService:
     """
     Service layer for Application business logic.
@@ -88,41 +154,56 @@ class ApplicationService:
         """
         Generate checklist items from templates based on university/country/level.
         """
-        templates = ApplicationChecklistTemplate.objects.filter(is_active=True)
-        templates = templates.filter(Q(branch=application.branch) | Q(branch__isnull=True))
+        ApplicationService.initialize_checklists([application])
 
-        if application.university:
-            templates = templates.filter(
-                Q(university=application.university) | Q(university__isnull=True)
-            )
-            templates = templates.filter(
-                Q(country=application.university.country) | Q(country__isnull=True) | Q(country='')
-            )
-        else:
-            templates = templates.filter(Q(university__isnull=True))
+    @staticmethod
+    def initialize_checklists(applications):
+        """
+        Generate the checklist items of a batch of applications from the
+        compiled template index (applications.checklists), reading the
+        universities and courses involved once and inserting every item
+        with a single bulk_create. Returns the items created.
+        """
+        from universities.models import Course, University
 
-        if application.course and application.course.level:
-            templates = templates.filter(
-                Q(level=application.course.level) | Q(level__isnull=True) | Q(level='')
-            )
+        countries = dict(
+            University.all_objects.filter(
+                id__in={application.university_id for application in applications if application.university_id}
+            ).values_list('id', 'country')
+        )
+        levels = dict(
+            Course.all_objects.filter(
+                id__in={application.course_id for application in applications if application.course_id}
+            ).values_list('id', 'level')
+        )
 
+        index = template_index()
+        now = timezone.now()
         items = []
-        for template in templates.order_by('sort_order', 'title'):
-            due_date = None
-            if template.due_days_offset is not None:
-                due_date = (timezone.now() + timezone.timedelta(days=template.due_days_offset)).date()
-            items.append(ApplicationChecklistItem(
-                application=application,
-                branch=application.branch,
-                template=template,
-                title=template.title,
-                category=template.category,
-                is_required=template.is_required,
-                due_date=due_date
-            ))
+        for application in applications:
+            scope = scope_for(
+                application.branch_id,
+                application.university_id,
+                countries.get(application.university_id),
+                levels.get(application.course_id),
+            )
+            for rule in index.resolve(scope):
+                due_date = None
+                if rule['due_days_offset'] is not None:
+                    due_date = (now + timezone.timedelta(days=rule['due_days_offset'])).date()
+                items.append(ApplicationChecklistItem(
+                    application=application,
+                    branch_id=application.branch_id,
+                    template_id=rule['id'],
+                    title=rule['title'],
+                    category=rule['category'],
+                    is_required=rule['is_required'],
+                    due_date=due_date
+                ))
 
         if items:
             ApplicationChecklistItem.objects.bulk_create(items)
+        return items
 
     @staticmethod
     def _generate_tasks_for_status(application: Application, user, to_status: str):
@@ -1,14 +1,48 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
-from .models import Application
+
+from .checklists import bump_checklist_version
+from .events import ApplicationStatusChanged, emit, on_status_changed
+from .models import Application, ApplicationChecklistTemplate
 from finance.services import CommissionService
 
+
+@receiver(pre_save, sender=Application)
+def capture_previous_status(sender, instance, **kwargs):
+    if instance._state.adding:
+        instance._status_before = None
+    elif instance.is_tracking('status'):
+        instance._status_before = instance.previous_value('status')
+    else:
+        # Not loaded from the database (or status deferred): read the stored row
+        instance._status_before = sender.all_objects.filter(pk=instance.pk).values_list('status', flat=True).first()
+
+
 @receiver(post_save, sender=Application)
-def handle_application_commission(sender, instance, created, **kwargs):
+def emit_status_changed(sender, instance, created, **kwargs):
+    """Emit an ApplicationStatusChanged event for creations and actual status transitions."""
+    from_status = getattr(instance, '_status_before', None)
+    if not created and from_status == instance.status:
+        return
+    emit(ApplicationStatusChanged(instance.pk, from_status, instance.status, created=created))
+
+
+@on_status_changed(Application.Status.ENROLLED)
+def handle_application_commission(application, event):
     """
     Triggers commission calculation when an application status changes to ENROLLED.
     This ensures that revenue is recognized as soon as a student is confirmed.
     """
-    if instance.status == Application.Status.ENROLLED:
-        # Trigger the automated calculation service
-        CommissionService.calculate_commission(instance)
+    # Trigger the automated calculation service
+    CommissionService.calculate_commission(application)
+
+
+@receiver(post_save, sender=ApplicationChecklistTemplate)
+@receiver(post_delete, sender=ApplicationChecklistTemplate)
+@receiver(post_delete, sender='universities.University')
+def invalidate_checklist_templates(sender, **kwargs):
+    """
+    Template writes invalidate the compiled template index; so do university
+    deletions, which unscope their templates without saving them.
+    """
+    bump_checklist_version()
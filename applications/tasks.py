@@ -0,0 +1,11 @@
+from celery import shared_task
+
+from .events import ApplicationStatusChanged, dispatch
+
+
+@shared_task
+def handle_application_event(payload):
+    """Run the handlers of a committed ApplicationStatusChanged event (applications.events)."""
+    event = ApplicationStatusChanged.from_payload(payload)
+    ran = dispatch(event)
+    return f"{event!r}: {ran} handlers ran."
@@ -1,11 +1,21 @@
+from unittest import mock
+
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
+from rest_framework.test import APIClient
 
 from branches.models import Branch
 from accounts.models import User
 from students.models import Student
-from applications.models import Application
-from tasks.models import Task
+from applications.events import ApplicationStatusChanged, dispatch
+from applications.models import (
+    Application, ApplicationChecklistItem, ApplicationChecklistTemplate, ApplicationStatusLog
+)
+from applications.services import ApplicationService
+from tasks.models import Task, TaskTemplate
+from universities.models import Course, University
 
 
 class ApplicationSignalTests(TestCase):
@@ -42,10 +52,245 @@ class ApplicationSignalTests(TestCase):
     def test_cas_received_creates_task(self):
         self.application.status = Application.Status.CAS_RECEIVED
         self.application.submission_date = timezone.now().date()
-        self.application.save()
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.application.save()
+        self.assertEqual(len(callbacks), 1)
+
+        # Side effects run in the background once the transition commits
+        dispatch(ApplicationStatusChanged(self.application.pk, Application.Status.DRAFT, Application.Status.CAS_RECEIVED))
 
         task = Task.objects.filter(
             assigned_to=self.counselor,
             title__icontains='Prepare Visa Case'
         ).first()
         self.assertIsNotNone(task)
+
+    def test_broker_outage_runs_handlers_in_process(self):
+        self.application.status = Application.Status.CAS_RECEIVED
+        with mock.patch('applications.tasks.handle_application_event.delay', side_effect=ConnectionError), \
+                self.assertLogs('applications.events', 'ERROR'), \
+                self.captureOnCommitCallbacks(execute=True):
+            self.application.save()
+
+        self.application.refresh_from_db()
+        self.assertEqual(self.application.status, Application.Status.CAS_RECEIVED)
+        self.assertTrue(Task.objects.filter(assigned_to=self.counselor, title__icontains='Prepare Visa Case').exists())
+
+    def test_plain_edit_emits_no_event(self):
+        application = Application.objects.get(pk=self.application.pk)
+        application.notes = 'Called the student'
+        # The UPDATE, plus the dashboard cache's branch lookup (students.signals)
+        with self.captureOnCommitCallbacks() as callbacks, self.assertNumQueries(2):
+            application.save()
+        self.assertEqual(callbacks, [])
+
+    def test_untracked_instance_transition_is_detected(self):
+        # status deferred: the stored value is read before saving
+        application = Application.objects.only('id', 'student', 'branch').get(pk=self.application.pk)
+        application.status = Application.Status.ENROLLED
+        with self.captureOnCommitCallbacks() as callbacks:
+            application.save()
+        self.assertEqual(len(callbacks), 1)
+
+    def test_application_ref_is_allocated(self):
+        year = timezone.now().year
+        self.assertEqual(self.application.application_ref, f'BWBS-{year}-00001')
+        second = Application.objects.create(student=self.student, branch=self.branch, intake='Jan 2027')
+        self.assertEqual(second.application_ref, f'BWBS-{year}-00002')
+
+    def test_status_changed_at_is_derived_and_filterable(self):
+        entered = self.application.status_changed_at
+        self.assertIsNotNone(entered)
+
+        # Saves that leave the status alone keep the timestamp
+        self.application.notes = 'Chasing the university'
+        self.application.save()
+        self.assertEqual(self.application.status_changed_at, entered)
+
+        self.application.status = Application.Status.CAS_REQUESTED
+        self.application.save(update_fields=['status', 'updated_at'])
+        self.application.refresh_from_db()
+        self.assertGreater(self.application.status_changed_at, entered)
+        self.assertEqual(self.application.risk_flags(), [])
+
+        later = timezone.now() + timezone.timedelta(days=10)
+        self.assertEqual(self.application.risk_flags(now=later), ['cas_pending_delayed'])
+        delayed = Application.objects.filter(Application.risk_filter('cas_pending_delayed', now=later))
+        self.assertEqual(list(delayed), [self.application])
+        self.assertFalse(Application.objects.filter(Application.risk_filter('stuck', now=later)).exists())
+
+
+class ApplicationListQueryTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.branch = Branch.objects.create(code='AQ', name='Query Branch', country='Testland', currency='USD')
+        self.manager = User.objects.create_user(
+            username='app.manager', email='app.manager@example.com', role=User.Role.BRANCH_MANAGER,
+            branch=self.branch, password='StrongPass123!'
+        )
+        self.client.force_authenticate(user=self.manager)
+        self.student = Student.objects.create(
+            branch=self.branch, first_name='Query', last_name='Student', email='query.student@example.com'
+        )
+
+    def _application(self, statuses):
+        application = Application.objects.create(student=self.student, branch=self.branch, intake='Sep 2026')
+        for index, status in enumerate(statuses):
+            ApplicationChecklistItem.objects.create(
+                application=application, branch=self.branch, title=f'Item {index}',
+                category='PASSPORT', status=status,
+            )
+        return application
+
+    def _list_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/v1/applications/')
+        self.assertEqual(response.status_code, 200)
+        return response, len(queries)
+
+    def test_checklist_progress_is_annotated(self):
+        Status = ApplicationChecklistItem.Status
+        first = self._application([Status.VERIFIED, Status.MISSING, Status.VERIFIED, Status.UPLOADED])
+        _response, baseline = self._list_queries()
+
+        for _ in range(4):
+            self._application([Status.VERIFIED, Status.REJECTED])
+        response, queries = self._list_queries()
+        self.assertEqual(queries, baseline)
+
+        rows = {row['id']: row for row in response.data['results']}
+        self.assertEqual(rows[str(first.id)]['checklist_progress'], {'total': 4, 'completed': 2, 'percent': 50})
+
+        detail = self.client.get(f'/api/v1/applications/{first.id}/').data
+        self.assertEqual(detail['checklist_progress'], {'total': 4, 'completed': 2, 'percent': 50})
+        self.assertIn('docs_missing', detail['risk_flags'])
+
+
+class BulkTransitionTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.branch = Branch.objects.create(code='BT', name='Bulk Branch', country='Testland', currency='USD')
+        self.other_branch = Branch.objects.create(code='BO', name='Other Branch', country='Testland', currency='USD')
+        self.manager = User.objects.create_user(
+            username='bulk.manager', email='bulk.manager@example.com', role=User.Role.BRANCH_MANAGER,
+            branch=self.branch, password='StrongPass123!'
+        )
+        self.client.force_authenticate(user=self.manager)
+        self.student = Student.objects.create(
+            branch=self.branch, first_name='Bulk', last_name='Student', email='bulk.student@example.com'
+        )
+        TaskTemplate.objects.create(title='Chase decision', trigger_status=Application.Status.UNDER_REVIEW)
+
+    def _application(self, status, student=None):
+        student = student or self.student
+        return Application.objects.create(student=student, branch=student.branch, intake='Sep 2026', status=status)
+
+    def test_bulk_transition_reports_each_application(self):
+        Status = Application.Status
+        submitted = [self._application(Status.SUBMITTED) for _ in range(3)]
+        already = self._application(Status.UNDER_REVIEW)
+        outsider = self._application(Status.SUBMITTED, student=Student.objects.create(
+            branch=self.other_branch, first_name='Other', last_name='Student', email='other.student@example.com'
+        ))
+        ids = [str(application.id) for application in (*submitted, already, outsider)]
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.post('/api/v1/applications/bulk-transition/', {
+                'application_ids': ids, 'to_status': Status.UNDER_REVIEW, 'note': 'Intake deadline',
+            }, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['transitioned'], 3)
+        self.assertEqual(
+            [item['result'] for item in response.data['results']],
+            ['transitioned'] * 3 + ['unchanged', 'not_found'],
+        )
+        self.assertEqual(len(callbacks), 3)
+
+        moved = Application.objects.filter(id__in=[application.id for application in submitted])
+        self.assertEqual(set(moved.values_list('status', flat=True)), {Status.UNDER_REVIEW})
+        for application in moved:
+            self.assertGreater(application.status_changed_at, submitted[0].status_changed_at)
+        logs = ApplicationStatusLog.objects.filter(application__in=moved)
+        self.assertEqual(logs.count(), 3)
+        self.assertEqual(set(logs.values_list('from_status', 'note')), {(Status.SUBMITTED, 'Intake deadline')})
+        self.assertEqual(Task.objects.filter(title='Chase decision', application__in=moved).count(), 3)
+        outsider.refresh_from_db()
+        self.assertEqual(outsider.status, Status.SUBMITTED)
+
+    def test_cas_received_creates_visa_cases_once(self):
+        from visas.models import VisaCase
+
+        applications = [self._application(Application.Status.CAS_REQUESTED) for _ in range(2)]
+        VisaCase.objects.create(student=self.student, application=applications[0], branch=self.branch)
+        response = self.client.post('/api/v1/applications/bulk-transition/', {
+            'application_ids': [str(application.id) for application in applications],
+            'to_status': Application.Status.CAS_RECEIVED,
+        }, format='json')
+        self.assertEqual(response.data['transitioned'], 2)
+        self.assertEqual(VisaCase.objects.filter(application__in=applications).count(), 2)
+
+    def test_invalid_status_is_rejected(self):
+        response = self.client.post('/api/v1/applications/bulk-transition/', {
+            'application_ids': [str(self._application(Application.Status.DRAFT).id)], 'to_status': 'LOST',
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('to_status', response.data['errors'])
+
+
+class ChecklistTemplateIndexTests(TestCase):
+    def setUp(self):
+        self.branch = Branch.objects.create(code='CK', name='Checklist Branch', country='Testland', currency='USD')
+        other_branch = Branch.objects.create(code='CO', name='Other Checklist Branch', country='Testland', currency='USD')
+        self.student = Student.objects.create(
+            branch=self.branch, first_name='Check', last_name='List', email='check.list@example.com'
+        )
+        self.university = University.objects.create(name='Checklist University', country='UK')
+        other_university = University.objects.create(name='Elsewhere University', country='CANADA')
+        self.course = Course.objects.create(
+            university=self.university, name='MSc Checklists', level='PG', duration='1 Year', tuition_fee=15000
+        )
+        for title, scope in (
+            ('Passport', {}),
+            ('Branch form', {'branch': self.branch}),
+            ('Other branch form', {'branch': other_branch}),
+            ('University form', {'university': self.university}),
+            ('Other university form', {'university': other_university}),
+            ('UK visa letter', {'country': 'UK', 'university': None}),
+            ('PG transcript', {'level': 'PG'}),
+            ('UG transcript', {'level': 'UG'}),
+        ):
+            ApplicationChecklistTemplate.objects.create(title=title, category='PASSPORT', **scope)
+
+    def _titles(self, application):
+        return set(application.checklist_items.values_list('title', flat=True))
+
+    def test_batch_initialization_resolves_templates_once(self):
+        scoped = [
+            Application.objects.create(
+                student=self.student, branch=self.branch, intake='Sep 2026', university=self.university, course=self.course
+            )
+            for _ in range(3)
+        ]
+        unscoped = Application.objects.create(student=self.student, branch=self.branch, intake='Sep 2026')
+
+        ApplicationService.initialize_checklists([scoped[0]])
+        # Index compiled: universities, courses and one INSERT for the whole batch
+        with self.assertNumQueries(3):
+            ApplicationService.initialize_checklists([*scoped[1:], unscoped])
+
+        expected = {'Passport', 'Branch form', 'University form', 'UK visa letter', 'PG transcript'}
+        for application in scoped:
+            self.assertEqual(self._titles(application), expected)
+        self.assertEqual(self._titles(unscoped), {'Passport', 'Branch form', 'UK visa letter', 'PG transcript', 'UG transcript'})
+
+    def test_template_writes_invalidate_the_index(self):
+        first = Application.objects.create(student=self.student, branch=self.branch, intake='Sep 2026')
+        ApplicationService.initialize_checklist(first)
+        ApplicationChecklistTemplate.objects.create(title='Bank statement', category='PASSPORT')
+        ApplicationChecklistTemplate.objects.filter(title='Passport').get().delete()
+
+        second = Application.objects.create(student=self.student, branch=self.branch, intake='Sep 2026')
+        ApplicationService.initialize_checklist(second)
+        self.assertIn('Bank statement', self._titles(second))
+        self.assertNotIn('Bank statement', self._titles(first))
+        self.assertNotIn('Passport', self._titles(second))
@@ -1,4 +1,4 @@
-from rest_framework import viewsets, status
+from rest_framework import viewsets, status, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
@@ -8,6 +8,7 @@ from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
 from visa_crm_backend.mixins import BranchIsolationMixin
 from audit.mixins import AuditLogMixin
+from core.pagination import KeysetPagination
 from accounts.models import User
 from accounts.permissions import ApplicationPermission
 from .models import (
@@ -18,7 +19,8 @@ from .models import (
     ApplicationChecklistItem,
     ApplicationNote
 )
-from .services import ApplicationService
+from .bulk import bulk_transition, TRANSITIONED
+from .services import ApplicationService, with_checklist_stats
 from .serializers import (
     ApplicationDetailSerializer, 
     ApplicationListSerializer, 
@@ -26,7 +28,8 @@ from .serializers import (
     ApplicationSubmissionSerializer,
     ApplicationChecklistTemplateSerializer,
     ApplicationChecklistItemSerializer,
-    ApplicationNoteSerializer
+    ApplicationNoteSerializer,
+    BulkApplicationTransitionSerializer
 )
 
 
@@ -39,10 +42,13 @@ class ApplicationViewSet(AuditLogMixin, BranchIsolationMixin, viewsets.ModelView
     queryset = Application.objects.select_related(
         'student', 'student__branch', 'student__counselor', 'university', 'course', 'assigned_to'
     ).prefetch_related('checklist_items', 'application_notes').all()
+    pagination_class = KeysetPagination
     branch_field = 'student__branch'  # Filter through student's branch
     permission_classes = [IsAuthenticated, ApplicationPermission]
-    filter_backends = [DjangoFilterBackend]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ['status', 'priority', 'assigned_to', 'student', 'university', 'course', 'intake']
+    ordering_fields = ['created_at', 'status_changed_at', 'priority']
+    RISK_FLAGS = ('stuck', 'cas_pending_delayed', 'missing_conditions')
     
     def get_serializer_class(self):
         if self.action == 'list':
@@ -54,8 +60,18 @@ class ApplicationViewSet(AuditLogMixin, BranchIsolationMixin, viewsets.ModelView
         Use custom manager method for cleaner filtering.
         Branch isolation is applied by BranchIsolationMixin via filter_queryset usually,
         but we can chain it if needed or rely on the mixin.
+        ?risk=<flag> keeps applications carrying that risk flag.
+        Checklist progress is annotated (with_checklist_stats); list rows
+        don't render notes or checklist items, so nothing is prefetched for them.
         """
-        queryset = super().get_queryset()
+        queryset = with_checklist_stats(super().get_queryset())
+        if self.action == 'list':
+            queryset = queryset.prefetch_related(None)
+        risk = self.request.query_params.get('risk')
+        if risk:
+            if risk not in self.RISK_FLAGS:
+                raise ValidationError({'risk': f"Choose one of: {', '.join(self.RISK_FLAGS)}."})
+            queryset = queryset.filter(Application.risk_filter(risk))
         return queryset.for_user(self.request.user)
 
     def _handle_status_transition(self, request, application):
@@ -141,6 +157,30 @@ class ApplicationViewSet(AuditLogMixin, BranchIsolationMixin, viewsets.ModelView
         except ValidationError as e:
             return Response(e.detail, status=status.HTTP_400_BAD_REQUEST)
 
+    @action(detail=False, methods=['post'], url_path='bulk-transition')
+    def bulk_transition(self, request):
+        """
+        Move a batch of applications to one status (applications.bulk).
+        Returns a result per application: transitioned, unchanged,
+        not_found (missing or out of scope) or failed.
+        """
+        serializer = BulkApplicationTransitionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        to_status = serializer.validated_data['to_status']
+        results = bulk_transition(
+            self.get_queryset().prefetch_related(None),
+            serializer.validated_data['application_ids'],
+            request.user,
+            to_status,
+            note=serializer.validated_data['note'],
+        )
+        return Response({
+            'to_status': to_status,
+            'transitioned': sum(1 for item in results if item['result'] == TRANSITIONED),
+            'results': results,
+        })
+
     @action(detail=True, methods=['get'])
     def timeline(self, request, pk=None):
         """Return audit log history."""
@@ -0,0 +1,20 @@
+# Generated by Django 6.0.2 on 2026-10-17 05:32
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('audit', '0001_initial'),
+        ('branches', '0007_alter_branchanalyticssnapshot_snapshot_date'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['-created_at', '-id'], name='idx_auditlog_created'),
+        ),
+    ]
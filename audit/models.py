@@ -38,6 +38,10 @@ class AuditLog(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination order (core.pagination)
+            models.Index(fields=['-created_at', '-id'], name='idx_auditlog_created'),
+        ]
         verbose_name = "Audit Log"
         verbose_name_plural = "Audit Logs"
 
@@ -2,6 +2,7 @@ from rest_framework import viewsets, filters
 from django_filters.rest_framework import DjangoFilterBackend
 
 from accounts.permissions import AuditLogPermission
+from core.pagination import KeysetPagination
 from visa_crm_backend.mixins import BranchIsolationMixin
 from .models import AuditLog
 from .serializers import AuditLogSerializer
@@ -12,6 +13,7 @@ class AuditLogViewSet(BranchIsolationMixin, viewsets.ReadOnlyModelViewSet):
     Read-only access to audit logs for Super Admins and Auditors.
     """
     queryset = AuditLog.objects.select_related('actor', 'branch').all()
+    pagination_class = KeysetPagination
     serializer_class = AuditLogSerializer
     permission_classes = [AuditLogPermission]
     branch_field = 'branch'
@@ -1,6 +1,7 @@
 from django.core.management.base import BaseCommand
 from branches.models import Branch, BranchAnalyticsSnapshot
 from branches.views import BranchViewSet
+from rest_framework.request import Request
 from rest_framework.test import APIRequestFactory
 from django.utils import timezone
 
@@ -23,7 +24,7 @@ class Command(BaseCommand):
         for branch in branches:
             try:
                 # Mock a request and setup viewset
-                request = factory.get('/')
+                request = Request(factory.get('/'))
                 request.user = user
                 viewset.request = request
                 viewset.format_kwarg = None
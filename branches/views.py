@@ -137,6 +137,8 @@ class BranchViewSet(AuditLogMixin, BranchIsolationMixin, viewsets.ModelViewSet):
             writer.writerow([f'Leads ({stage})', count])
         for stage, count in pipeline_data['applications_by_status'].items():
             writer.writerow([f'Apps ({stage})', count])
+        for entry in pipeline_data['stage_durations']:
+            writer.writerow([f"Median Hours in {entry['stage']}", entry['median_hours']])
 
         writer.writerow([])
         writer.writerow(['--- FINANCIAL SUMMARY ---'])
@@ -149,23 +151,35 @@ class BranchViewSet(AuditLogMixin, BranchIsolationMixin, viewsets.ModelViewSet):
 
     @action(detail=True, methods=['get'], url_path='pipeline-analysis')
     def pipeline_analysis(self, request, pk=None):
-        """Deeper pipeline analysis for leads and applications."""
+        """
+        Deeper pipeline analysis for leads and applications: status counts,
+        plus time in stage and stage-to-stage conversion rates from the daily
+        stage-duration rollups (?start=, ?end=, ?university=, ?intake=,
+        ?group_by=university|intake).
+        """
         branch = self.get_object()
         from students.models import Lead, Student
         from applications.models import Application
+        from analytics.models import StageDurationRollup
+        from analytics.pipeline import group_by_from_param, rollups_from_params, stage_report
         from django.db.models import Count
-        
+
         leads_by_status = Lead.objects.filter(branch=branch).values('status').annotate(count=Count('id'))
         leads_by_priority = Lead.objects.filter(branch=branch).values('priority').annotate(count=Count('id'))
         apps_by_status = Application.objects.filter(branch=branch).values('status').annotate(count=Count('id'))
-        
-        # Bottleneck analysis (simplified)
-        # In a real system, we'd use ApplicationStatusLog to calculate avg time in status
-        
+
+        rollups, start, end = rollups_from_params(
+            StageDurationRollup.objects.filter(branch=branch), request.query_params
+        )
+        bottlenecks = stage_report(rollups, group_by_from_param(request.query_params.get('group_by')))
+
         return Response({
             'leads_by_status': {item['status']: item['count'] for item in leads_by_status},
             'leads_by_priority': {item['priority']: item['count'] for item in leads_by_priority},
             'applications_by_status': {item['status']: item['count'] for item in apps_by_status},
+            'period_start': str(start),
+            'period_end': str(end),
+            **bottlenecks,
         })
 
     @action(detail=True, methods=['get'], url_path='staff-performance')
@@ -202,28 +216,22 @@ class BranchViewSet(AuditLogMixin, BranchIsolationMixin, viewsets.ModelViewSet):
 
     @action(detail=False, methods=['get'])
     def leaderboard(self, request):
-        from students.models import Lead, Student
-        branches = self.get_queryset()
+        """Branches ranked by conversion rate, read from the leaderboard counters."""
+        from students.leaderboard import branch_rankings, window_from_param
+
+        window = window_from_param(request.query_params.get('window'))
         leaderboard_data = []
-        
-        for branch in branches:
-            total_leads = Lead.objects.filter(branch=branch).count()
-            converted_leads = Lead.objects.filter(branch=branch, status='CONVERTED').count()
-            conversion_rate = (converted_leads / total_leads * 100) if total_leads > 0 else 0
-            active_students = Student.objects.filter(branch=branch).count()
-            
+        for branch, counter in branch_rankings(self.get_queryset(), window):
+            conversion_rate = round(counter.conversion_rate, 2) if counter else 0
             leaderboard_data.append({
                 'id': branch.id,
                 'name': branch.name,
                 'code': branch.code,
-                'total_leads': total_leads,
-                'conversion_rate': round(conversion_rate, 2),
-                'active_students': active_students,
+                'total_leads': counter.leads if counter else 0,
+                'conversion_rate': conversion_rate,
+                'active_students': counter.students if counter else 0,
                 'rank_emoji': '🔥' if conversion_rate > 50 else '⚡' if conversion_rate > 20 else '❄️'
             })
-            
-        # Sort by conversion rate descending
-        leaderboard_data.sort(key=lambda x: x['conversion_rate'], reverse=True)
         return Response(leaderboard_data)
 
     @action(detail=False, methods=['get'])
@@ -209,9 +209,28 @@ export const bulkLeadAction = async (data: {
     action: 'ASSIGN' | 'STATUS_UPDATE' | 'WHATSAPP_TEMPLATE';
     assigned_to?: string;
     status?: LeadStatus;
-    template_id?: number;
-}): Promise<{ message: string }> => {
-    const response = await api.post<{ message: string }>('/leads/bulk-action/', data);
+    template_id?: string;
+}): Promise<LeadBulkJob & { message: string }> => {
+    const response = await api.post<LeadBulkJob & { message: string }>('/leads/bulk-action/', data);
+    return response.data;
+};
+
+export interface LeadBulkJob {
+    id: string;
+    action: 'ASSIGN' | 'STATUS_UPDATE' | 'WHATSAPP_TEMPLATE';
+    status: 'PENDING' | 'PROCESSING' | 'COMPLETED' | 'FAILED';
+    total_count: number;
+    processed_count: number;
+    affected_count: number;
+    progress: number;
+    error_message: string;
+    started_at: string | null;
+    finished_at: string | null;
+    created_at: string;
+}
+
+export const getLeadBulkJob = async (id: string): Promise<LeadBulkJob> => {
+    const response = await api.get<LeadBulkJob>(`/lead-bulk-jobs/${id}/`);
     return response.data;
 };
 
@@ -6,6 +6,7 @@ from django_filters.rest_framework import DjangoFilterBackend
 from accounts.models import User
 from accounts.permissions import CommunicationPermission
 from audit.mixins import AuditLogMixin
+from core.pagination import KeysetPagination
 from core.utils.branch_context import assert_branch_access
 from visa_crm_backend.mixins import BranchIsolationMixin
 from rest_framework.decorators import action
@@ -18,6 +19,7 @@ from students.models import Student
 
 class CommunicationLogViewSet(AuditLogMixin, BranchIsolationMixin, viewsets.ModelViewSet):
     queryset = CommunicationLog.objects.select_related('student', 'student__branch', 'logged_by').all()
+    pagination_class = KeysetPagination
     serializer_class = CommunicationLogSerializer
     permission_classes = [IsAuthenticated, CommunicationPermission]
     branch_field = 'student__branch'
@@ -0,0 +1,95 @@
+"""
+Persisted derived fields.
+
+A derived field is an ordinary model column whose value is computed from
+other fields of the same row, so it can be filtered, ordered and indexed
+like any other column. Models list DerivedField declarations in
+`derived_fields`; DerivedFieldsMixin (part of TenantAwareModel) recomputes
+a field on save() only for new instances or when one of its dependencies
+changed (FieldTrackingMixin), and backfill_derived_fields() recomputes
+stored values in chunks after a rule changes or rows were written without
+save() (management command backfill_derived_fields).
+"""
+from django.db import transaction
+
+
+class DerivedField:
+    """
+    Declares that column `name` holds compute(instance), which only reads
+    the fields listed in depends_on. compute is a callable taking the
+    instance, or the name of a model method taking no arguments.
+    """
+
+    def __init__(self, name, compute, depends_on):
+        self.name = name
+        self.compute = compute
+        self.depends_on = tuple(depends_on)
+
+    def __repr__(self):
+        return f"DerivedField({self.name!r}, depends_on={self.depends_on!r})"
+
+    def value_for(self, instance):
+        if isinstance(self.compute, str):
+            return getattr(instance, self.compute)()
+        return self.compute(instance)
+
+    def is_stale(self, instance):
+        """Whether the stored value may no longer match the dependencies."""
+        return not instance.is_tracking() or any(instance.has_changed(field) for field in self.depends_on)
+
+
+class DerivedFieldsMixin:
+    """Recomputes a model's derived_fields on save() when their inputs change."""
+    derived_fields = ()
+
+    def refresh_derived_fields(self, update_fields=None):
+        """
+        Recompute the stale derived fields (only those depending on
+        update_fields, when given). Returns the names recomputed.
+        """
+        refreshed = []
+        for derived in self.derived_fields:
+            if update_fields is not None and not set(derived.depends_on) & set(update_fields):
+                continue
+            if derived.is_stale(self):
+                setattr(self, derived.name, derived.value_for(self))
+                refreshed.append(derived.name)
+        return refreshed
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        refreshed = self.refresh_derived_fields(update_fields)
+        if update_fields is not None and refreshed:
+            kwargs['update_fields'] = set(update_fields) | set(refreshed)
+        super().save(*args, **kwargs)
+
+
+def backfill_derived_fields(model, fields=None, batch_size=1000):
+    """
+    Recompute the derived fields of every row of model (soft-deleted
+    included), or only those named in fields, walking the table in
+    primary-key chunks and writing only stale rows. Returns the count.
+    """
+    derived = [field for field in model.derived_fields if fields is None or field.name in fields]
+    if not derived:
+        return 0
+    names = [field.name for field in derived]
+    rows = model._base_manager.order_by('pk')
+    updated, last_pk = 0, None
+    while True:
+        chunk = list((rows if last_pk is None else rows.filter(pk__gt=last_pk))[:batch_size])
+        if not chunk:
+            return updated
+        last_pk = chunk[-1].pk
+
+        stale = []
+        for instance in chunk:
+            values = {field.name: field.value_for(instance) for field in derived}
+            if any(getattr(instance, name) != value for name, value in values.items()):
+                for name, value in values.items():
+                    setattr(instance, name, value)
+                stale.append(instance)
+        if stale:
+            with transaction.atomic():
+                model._base_manager.bulk_update(stale, names)
+            updated += len(stale)
@@ -0,0 +1,42 @@
+"""
+Recompute persisted derived fields (core.derived).
+
+Usage:
+    python manage.py backfill_derived_fields
+    python manage.py backfill_derived_fields students.Student --field profile_completeness
+
+Saves keep derived fields current on their own; run this after adding a
+derived field, after changing how one is computed, and after bulk loads,
+queryset.update() calls or raw SQL edits to the fields they depend on.
+"""
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+
+from core.derived import backfill_derived_fields
+
+
+class Command(BaseCommand):
+    help = 'Recompute stored derived fields in chunks, writing only stale rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument('models', nargs='*', help='app_label.Model (default: every model declaring derived fields)')
+        parser.add_argument('--field', action='append', dest='fields', help='Only this derived field (repeatable)')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows read and written per chunk')
+
+    def handle(self, *args, **options):
+        if options['models']:
+            try:
+                models = [apps.get_model(label) for label in options['models']]
+            except (LookupError, ValueError) as exc:
+                raise CommandError(str(exc))
+        else:
+            models = [model for model in apps.get_models() if getattr(model, 'derived_fields', ())]
+
+        batch_size = max(1, options['batch_size'])
+        for model in models:
+            if not getattr(model, 'derived_fields', ()):
+                raise CommandError(f"{model._meta.label} declares no derived fields")
+            updated = backfill_derived_fields(model, fields=options['fields'], batch_size=batch_size)
+            self.stdout.write(self.style.SUCCESS(
+                f"{model._meta.verbose_name_plural}: updated {updated} rows"
+            ))
@@ -1,12 +1,16 @@
 import uuid
 from django.db import models
+from .derived import DerivedFieldsMixin
 from .managers import TenantManager
+from .tracking import FieldTrackingMixin
 
 
-class TenantAwareModel(models.Model):
+class TenantAwareModel(DerivedFieldsMixin, FieldTrackingMixin, models.Model):
     """
     Base Template for ALL Models.
-    Includes: UUID, Branch Link, Soft Delete, GDPR Anonymization, Timestamps.
+    Includes: UUID, Branch Link, Soft Delete, GDPR Anonymization, Timestamps,
+    field change tracking (FieldTrackingMixin) and persisted derived fields
+    (DerivedFieldsMixin).
     """
     # Universal UUID Primary Key
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -50,3 +54,24 @@ class TenantAwareModel(models.Model):
         self.deleted_at = timezone.now()
         self.save(update_fields=['is_deleted', 'deleted_at', 'updated_at'])
 
+
+
+class Sequence(models.Model):
+    """
+    Counter for a human-readable numbering series (student codes,
+    application refs, invoice numbers), one row per (prefix, year).
+    Numbers are handed out by core.sequences under a row lock.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    prefix = models.CharField(max_length=50, help_text="Series key, e.g. 'student/LHR', 'application', 'invoice'")
+    year = models.PositiveIntegerField()
+    last_value = models.PositiveBigIntegerField(default=0, help_text="Highest number handed out")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Sequence"
+        verbose_name_plural = "Sequences"
+        unique_together = ('prefix', 'year')
+
+    def __str__(self):
+        return f"{self.prefix} {self.year}: {self.last_value}"
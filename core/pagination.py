@@ -0,0 +1,159 @@
+"""
+Pagination for high-volume list endpoints.
+
+KeysetPagination pages on (created_at, id), newest first: the position is
+carried in an opaque ?cursor= token, so each page is one indexed range
+query instead of COUNT(*) plus OFFSET. Viewsets opt in through
+pagination_class. Requests without ?cursor= keep the project-wide
+page-number behaviour (?page=, exact count), so existing clients work
+unchanged; an empty ?cursor= starts at the first page. Cursor pages
+cannot be combined with an ?ordering= other than newest first, which
+is rejected with a 400 rather than silently ignored.
+"""
+import base64
+import binascii
+import json
+import uuid
+
+from django.db import connections
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+# Below this planner estimate an exact COUNT(*) is cheap enough to run instead
+EXACT_COUNT_BELOW = 1000
+
+
+def estimated_count(queryset):
+    """
+    Row count of a queryset from the PostgreSQL planner estimate, or an
+    exact count for small results and other databases.
+    """
+    if connections[queryset.db].vendor != 'postgresql':
+        return queryset.count()
+    plan = json.loads(queryset.order_by().explain(format='json'))
+    estimate = int(plan[0]['Plan']['Plan Rows'])
+    return queryset.count() if estimate < EXACT_COUNT_BELOW else estimate
+
+
+class KeysetPagination(PageNumberPagination):
+    """
+    Cursor pagination keyed on (created_at, id) with a page-number fallback.
+
+    ?cursor=<token> pages by keyset; the response holds next/previous
+    links and results, plus count when ?count=estimate or ?count=exact is
+    given. Cursor pages are always ordered newest first, so ?cursor=
+    with any other ?ordering= is a validation error.
+    """
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    ordering = ('-created_at', '-id')
+
+    cursor_mode = False
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_mode = self.cursor_query_param in request.query_params
+        if not self.cursor_mode:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.check_ordering(request)
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        page_size = self.get_page_size(request)
+        position, reverse = self.decode_cursor(request)
+
+        self.count = None
+        count_mode = request.query_params.get(self.count_query_param)
+        if count_mode == 'exact':
+            self.count = queryset.count()
+        elif count_mode == 'estimate':
+            self.count = estimated_count(queryset)
+
+        if reverse:
+            queryset = queryset.order_by('created_at', 'id')
+        else:
+            queryset = queryset.order_by(*self.ordering)
+        if position is not None:
+            created_at, pk = position
+            if reverse:
+                queryset = queryset.filter(Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk))
+            else:
+                queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+
+        rows = list(queryset[:page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if reverse:
+            rows.reverse()
+        has_next, has_previous = (position is not None, has_more) if reverse else (has_more, position is not None)
+
+        self.next_position = self._position(rows[-1]) if has_next and rows else None
+        self.previous_position = self._position(rows[0]) if has_previous and rows else None
+        return rows
+
+    def get_paginated_response(self, data):
+        if not self.cursor_mode:
+            return super().get_paginated_response(data)
+        payload = {'next': self.get_next_link(), 'previous': self.get_previous_link()}
+        if self.count is not None:
+            payload['count'] = self.count
+        payload['results'] = data
+        return Response(payload)
+
+    def get_next_link(self):
+        if not self.cursor_mode:
+            return super().get_next_link()
+        return self._link(self.next_position, reverse=False)
+
+    def get_previous_link(self):
+        if not self.cursor_mode:
+            return super().get_previous_link()
+        return self._link(self.previous_position, reverse=True)
+
+    def check_ordering(self, request):
+        """Reject an ?ordering= the keyset order cannot honour."""
+        requested = [
+            field.strip() for field in request.query_params.get(api_settings.ORDERING_PARAM, '').split(',')
+            if field.strip()
+        ]
+        if requested != list(self.ordering[:len(requested)]):
+            raise ValidationError({
+                api_settings.ORDERING_PARAM: 'Cursor pagination only supports ordering by -created_at; '
+                                             'use page numbers (omit cursor) for other orderings.'
+            })
+
+    @staticmethod
+    def _position(instance):
+        return instance.created_at, instance.pk
+
+    def _link(self, position, reverse):
+        if position is None:
+            return None
+        created_at, pk = position
+        token = f"{'p' if reverse else 'n'}|{created_at.isoformat()}|{pk}"
+        encoded = base64.urlsafe_b64encode(token.encode()).decode()
+        # The count is only reported on the page that asks for it
+        url = remove_query_param(self.base_url, self.page_query_param)
+        url = remove_query_param(url, self.count_query_param)
+        return replace_query_param(url, self.cursor_query_param, encoded)
+
+    def decode_cursor(self, request):
+        """((created_at, id) or None, reverse) from the ?cursor= token."""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            direction, created_at, pk = base64.urlsafe_b64decode(encoded.encode()).decode().split('|')
+            position = (parse_datetime(created_at), uuid.UUID(pk))
+        except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+            raise NotFound('Invalid cursor')
+        if direction not in ('n', 'p') or position[0] is None:
+            raise NotFound('Invalid cursor')
+        return position, direction == 'p'
@@ -0,0 +1,55 @@
+"""
+Sequence allocation for human-readable identifiers.
+
+Each numbering series is a core.Sequence row keyed by (prefix, year).
+allocate() locks that row with SELECT ... FOR UPDATE, bumps last_value by
+the number of values requested and returns the reserved range, so
+concurrent writers never receive the same number and bulk imports can
+reserve a whole block in one round trip.
+
+A series that predates this table is seeded once, when its row is first
+created, from the highest number already stored (see max_suffix()).
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Sequence
+
+
+def allocate(prefix, count=1, year=None, seed=None):
+    """
+    Reserve `count` consecutive numbers of the (prefix, year) series and
+    return them as a range. `seed` is called, only when the series row is
+    created, to get the highest number already in use.
+    """
+    if count < 1:
+        raise ValueError("count must be at least 1")
+    year = year or timezone.now().year
+    with transaction.atomic():
+        # Callable defaults are only evaluated when the row is created
+        sequence, _ = Sequence.objects.select_for_update().get_or_create(
+            prefix=prefix, year=year, defaults={'last_value': seed or 0}
+        )
+        start = sequence.last_value + 1
+        sequence.last_value += count
+        sequence.save(update_fields=['last_value', 'updated_at'])
+    return range(start, start + count)
+
+
+def next_value(prefix, year=None, seed=None):
+    """The next number of the (prefix, year) series."""
+    return allocate(prefix, 1, year=year, seed=seed)[0]
+
+
+def max_suffix(queryset, field, code_prefix):
+    """
+    Highest numeric suffix among `field` values that start with
+    code_prefix (0 if none). Used to seed a series from existing codes.
+    """
+    highest = 0
+    values = queryset.filter(**{f'{field}__startswith': code_prefix}).values_list(field, flat=True)
+    for value in values.iterator():
+        suffix = value[len(code_prefix):]
+        if suffix.isdigit():
+            highest = max(highest, int(suffix))
+    return highest
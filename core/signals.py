@@ -7,6 +7,9 @@ from django.dispatch import receiver
 from django.utils import timezone
 import logging
 
+from applications.events import on_status_changed
+from applications.models import Application
+
 logger = logging.getLogger(__name__)
 
 
@@ -67,16 +70,12 @@ def lead_created_notification(sender, instance, created, **kwargs):
 def lead_status_change_audit(sender, instance, **kwargs):
     """
     Track status changes for leads.
+    Compares against the values the lead was loaded with (no re-fetch).
     """
-    if instance.pk:
-        try:
-            old_instance = sender.objects.get(pk=instance.pk)
-            if old_instance.status != instance.status:
-                logger.info(
-                    f"Lead {instance.id} status changed: {old_instance.status} -> {instance.status}"
-                )
-        except sender.DoesNotExist:
-            pass
+    if instance.is_tracking('status') and instance.has_changed('status'):
+        logger.info(
+            f"Lead {instance.id} status changed: {instance.previous_value('status')} -> {instance.status}"
+        )
 
 
 @receiver(pre_save, sender='students.Lead')
@@ -84,71 +83,12 @@ def calculate_lead_score(sender, instance, **kwargs):
     """
     Automated Lead Scoring Algorithm.
     Scores 0-100 based on profile completeness and activity.
-    Sets Priority: HOT (>=70), WARM (30-69), COLD (<30).
+    Sets Priority: HOT (>=70), WARM (30-69), COLD (<30), win probability
+    and SLA/ghost status. The rules live in students.scoring, shared with
+    the nightly rescoring job.
     """
-    score = 0
-    
-    # 1. Profile Completeness (+30 max)
-    fields = [instance.first_name, instance.last_name, instance.email, instance.phone]
-    filled_fields = sum(1 for f in fields if f)
-    score += (filled_fields / len(fields)) * 30
-    
-    # 2. Intent Details (+30 max)
-    if instance.target_country: score += 10
-    if instance.intended_intake: score += 10
-    if instance.budget_range: score += 10
-    
-    # 3. Activity Level (+40 max)
-    # Note: Interaction count is better handled via a signal on Interaction creation,
-    # but for pre_save we can check if last_interaction_at exists
-    if instance.last_interaction_at:
-        # Give points if interaction was recent (last 7 days)
-        days_since = (timezone.now() - instance.last_interaction_at).days
-        if days_since < 7:
-            score += 40
-        elif days_since < 30:
-            score += 20
-    
-    instance.score = int(score)
-    
-    # Set Priority
-    from students.models import Lead
-    if score >= 70:
-        instance.priority = Lead.Priority.HOT
-    elif score >= 30:
-        instance.priority = Lead.Priority.WARM
-    else:
-        instance.priority = Lead.Priority.COLD
-
-    # 4. AI Win Probability Logic
-    prob = 50.0  # Base probability
-    if instance.target_country == 'United Kingdom': prob += 10
-    elif instance.target_country == 'Australia': prob += 15
-    elif instance.target_country == 'Canada': prob += 5
-    
-    if instance.priority == Lead.Priority.HOT: prob += 20
-    elif instance.priority == Lead.Priority.WARM: prob += 5
-    else: prob -= 20
-    
-    if instance.budget_range: prob += 10
-    prob += (filled_fields / len(fields)) * 15  # Up to +15 for completeness
-    
-    instance.win_probability = min(max(prob, 1.0), 99.0)
-
-    # 5. SLA & Ghost Detection
-    # If NEW and older than 24h with no interaction
-    is_violated = False
-    if instance.status == Lead.Status.NEW and not instance.last_interaction_at:
-        age_hours = (timezone.now() - instance.created_at).total_seconds() / 3600 if instance.created_at else 0
-        if age_hours > 24:
-            is_violated = True
-    elif instance.last_interaction_at:
-        # Ghost Detection: If HOT/WARM but no interaction for 3 days
-        days_since = (timezone.now() - instance.last_interaction_at).days
-        if days_since > 3 and instance.status != Lead.Status.CONVERTED:
-            is_violated = True
-    
-    instance.is_sla_violated = is_violated
+    from students.scoring import score_lead
+    score_lead(instance)
 
 
 # ============================================================
@@ -158,97 +98,85 @@ def calculate_lead_score(sender, instance, **kwargs):
 def generate_student_code(sender, instance, **kwargs):
     """
     Auto-generate student code if not provided.
-    Format: BRANCH-YEAR-SEQUENCE (e.g., LHR-2026-00001)
+    Format: BRANCH-YEAR-SEQUENCE (e.g., LHR-2026-00001), numbered from the
+    branch's sequence (core.sequences) rather than by scanning codes.
     """
     if not instance.student_code:
         # Avoid circular import
-        from students.models import Student
-        
-        year = timezone.now().year
-        # Extract short branch code (e.g. 'UK-LHR' -> 'LHR')
-        branch_code = instance.branch.code.split('-')[-1] if instance.branch else 'HQ'
-        
-        prefix = f"{branch_code}-{year}-"
-        
-        # Get latest sequence for this prefix
-        # Use .all_objects to include soft-deleted for unique sequence
-        latest = Student.all_objects.filter(
-            student_code__startswith=prefix
-        ).order_by('-student_code').first()
-        
-        if latest:
-            try:
-                # Extract sequence from "XXX-YYYY-SSSSS"
-                last_seq = int(latest.student_code.split('-')[-1])
-                seq = last_seq + 1
-            except (ValueError, IndexError):
-                seq = 1
-        else:
-            seq = 1
-        
-        instance.student_code = f"{prefix}{seq:05d}"
+        from students.services import assign_student_codes
+
+        assign_student_codes([instance])
         logger.info(f"Auto-generated student code: {instance.student_code}")
 
 
 # ============================================================
 # APPLICATION SIGNALS
 # ============================================================
-@receiver(post_save, sender='applications.Application')
-def application_status_actions(sender, instance, created, **kwargs):
+@receiver(pre_save, sender='applications.Application')
+def generate_application_ref(sender, instance, **kwargs):
     """
-    Automated actions based on Application status changes.
+    Auto-generate the application reference if not provided.
+    Format: BWBS-YEAR-SEQUENCE (e.g., BWBS-2026-00001).
     """
-    if created:
-        logger.info(f"New application created: {instance.id} - Student: {instance.student}")
-    else:
-        try:
-            from tasks.models import Task
-            from applications.models import Application
+    if not instance.application_ref:
+        from applications.services import assign_application_refs
+        assign_application_refs([instance])
 
-            assignee = _resolve_task_assignee(
-                student=instance.student,
-                branch=instance.branch,
-            )
 
-            # Logic for status transitions
-            if instance.status in (
-                Application.Status.CONDITIONAL_OFFER,
-                Application.Status.UNCONDITIONAL_OFFER,
-            ):
-                if not assignee:
-                    logger.warning("No assignee found for offer review task.")
-                    return
-                Task.objects.get_or_create(
-                    title=f"Review University Offer: {instance.university.name if instance.university else 'University'}",
-                    student=instance.student,
-                    branch=instance.branch,
-                    defaults={
-                        'description': f"Application {instance.id} received an offer. Review and notify student.",
-                        'priority': 'HIGH',
-                        'assigned_to': assignee,
-                        'created_by': assignee,
-                        'due_date': timezone.now() + timezone.timedelta(days=2),
-                    }
-                )
-            elif instance.status == Application.Status.CAS_RECEIVED:
-                if not assignee:
-                    logger.warning("No assignee found for visa preparation task.")
-                    return
-                # Auto-create Visa Task
-                Task.objects.get_or_create(
-                    title=f"Prepare Visa Case: {instance.student.full_name}",
-                    student=instance.student,
-                    branch=instance.branch,
-                    defaults={
-                        'description': f"CAS received for {instance.university.name if instance.university else 'university'}. Start Visa preparation.",
-                        'priority': 'URGENT',
-                        'assigned_to': assignee,
-                        'created_by': assignee,
-                        'due_date': timezone.now() + timezone.timedelta(days=1),
-                    }
-                )
-        except Exception as e:
-            logger.warning(f"Failed to create application status task: {e}")
+@on_status_changed(
+    Application.Status.CONDITIONAL_OFFER,
+    Application.Status.UNCONDITIONAL_OFFER,
+    Application.Status.CAS_RECEIVED,
+)
+def application_status_actions(application, event):
+    """
+    Automated actions when an application enters an offer or CAS status
+    (an applications.events handler, run after the transition commits).
+    """
+    from tasks.models import Task
+
+    assignee = _resolve_task_assignee(
+        student=application.student,
+        branch=application.branch,
+    )
+
+    # Logic for status transitions
+    if event.to_status in (
+        Application.Status.CONDITIONAL_OFFER,
+        Application.Status.UNCONDITIONAL_OFFER,
+    ):
+        if not assignee:
+            logger.warning("No assignee found for offer review task.")
+            return
+        Task.objects.get_or_create(
+            title=f"Review University Offer: {application.university.name if application.university else 'University'}",
+            student=application.student,
+            branch=application.branch,
+            defaults={
+                'description': f"Application {application.id} received an offer. Review and notify student.",
+                'priority': 'HIGH',
+                'assigned_to': assignee,
+                'created_by': assignee,
+                'due_date': timezone.now() + timezone.timedelta(days=2),
+            }
+        )
+    elif event.to_status == Application.Status.CAS_RECEIVED:
+        if not assignee:
+            logger.warning("No assignee found for visa preparation task.")
+            return
+        # Auto-create Visa Task
+        Task.objects.get_or_create(
+            title=f"Prepare Visa Case: {application.student.full_name}",
+            student=application.student,
+            branch=application.branch,
+            defaults={
+                'description': f"CAS received for {application.university.name if application.university else 'university'}. Start Visa preparation.",
+                'priority': 'URGENT',
+                'assigned_to': assignee,
+                'created_by': assignee,
+                'due_date': timezone.now() + timezone.timedelta(days=1),
+            }
+        )
 
 
 # ============================================================
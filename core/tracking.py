@@ -0,0 +1,85 @@
+"""
+Field change tracking for models.
+"""
+import copy
+
+
+class FieldTrackingMixin:
+    """
+    Remembers the field values an instance was loaded with, so signals and
+    save() overrides can tell what changed without re-reading the row.
+
+    The snapshot is taken in from_db() and refreshed after save() and
+    refresh_from_db(); pre_save and post_save receivers still see the
+    values as they were before the save. Instances that were neither
+    loaded nor saved (new objects, or ones built with an explicit pk) have
+    no snapshot and report every field as changed.
+    """
+    _tracked_values = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._tracked_values = {
+            name: copy.deepcopy(value) if isinstance(value, (dict, list)) else value
+            for name, value in zip(field_names, values)
+        }
+        return instance
+
+    def _snapshot(self, attnames):
+        if self._tracked_values is None:
+            self._tracked_values = {}
+        for attname in attnames:
+            if attname in self.__dict__:
+                value = self.__dict__[attname]
+                self._tracked_values[attname] = copy.deepcopy(value) if isinstance(value, (dict, list)) else value
+
+    def _tracked_attnames(self, fields=None):
+        concrete = self._meta.concrete_fields
+        if fields is None:
+            return [field.attname for field in concrete]
+        fields = set(fields)
+        return [field.attname for field in concrete if field.name in fields or field.attname in fields]
+
+    def is_tracking(self, *fields):
+        """
+        Whether stored values are known to compare against: for the given
+        fields, or for the instance at all when none are given.
+        """
+        if self._tracked_values is None or self._state.adding:
+            return False
+        return all(self._meta.get_field(name).attname in self._tracked_values for name in fields)
+
+    def previous_value(self, field):
+        """Value of a field as last loaded or saved (None when unknown)."""
+        if not self.is_tracking():
+            return None
+        return self._tracked_values.get(self._meta.get_field(field).attname)
+
+    def has_changed(self, field):
+        """Whether a field differs from its loaded/saved value."""
+        if not self.is_tracking():
+            return True
+        attname = self._meta.get_field(field).attname
+        if attname not in self._tracked_values:
+            # Deferred when loaded: changed only if it has been assigned since
+            return attname in self.__dict__
+        return self.__dict__.get(attname) != self._tracked_values[attname]
+
+    @property
+    def changed_fields(self):
+        """{field name: previous value} for every concrete field that changed."""
+        return {
+            field.name: self.previous_value(field.name)
+            for field in self._meta.concrete_fields
+            if self.has_changed(field.name)
+        }
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        self._snapshot(self._tracked_attnames(update_fields))
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
+        self._snapshot(self._tracked_attnames(fields))
@@ -1,6 +1,20 @@
+from django.utils import timezone
+from core.sequences import max_suffix, next_value
 from core.utils.pdf import render_to_pdf
 from .models import CommissionClaim
 
+
+def next_invoice_number(year=None):
+    """Next commission invoice number (INV-YEAR-SEQUENCE)."""
+    year = year or timezone.now().year
+    code_prefix = f"INV-{year}-"
+    number = next_value(
+        'invoice', year=year,
+        seed=lambda: max_suffix(CommissionClaim.all_objects, 'invoice_number', code_prefix),
+    )
+    return f"{code_prefix}{number:05d}"
+
+
 class InvoiceService:
     """
     Service layer for Finance/Invoicing.
@@ -15,6 +29,12 @@ class InvoiceService:
         if not claim.university:
              return None
              
+        # Number the invoice before rendering so it appears on the PDF
+        numbered = not claim.invoice_number
+        if numbered:
+            claim.invoice_number = next_invoice_number()
+            claim.invoice_date = claim.invoice_date or timezone.now().date()
+
         context = {
             'claim': claim
         }
@@ -29,6 +49,8 @@ class InvoiceService:
             if claim.status == CommissionClaim.Status.PENDING:
                 claim.status = CommissionClaim.Status.INVOICED
                 claim.save()
+            elif numbered:
+                claim.save(update_fields=['invoice_number', 'invoice_date', 'updated_at'])
                 
         return pdf_response
 
@@ -1,21 +1,23 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import pre_save
+from django.utils import timezone
 from django.dispatch import receiver
+from applications.events import on_status_changed
 from applications.models import Application
 from .models import CommissionClaim
 from decimal import Decimal
 
-@receiver(post_save, sender=Application)
-def create_commission_claim(sender, instance, created, **kwargs):
+@on_status_changed(Application.Status.ENROLLED)
+def create_commission_claim(application, event):
     """
     Auto-create Commission Claim when Application is ENROLLED.
     """
-    if instance.status == Application.Status.ENROLLED:
+    if application.status == Application.Status.ENROLLED:
         # Check if already exists to avoid duplicates
-        if CommissionClaim.objects.filter(application=instance).exists():
+        if CommissionClaim.objects.filter(application=application).exists():
             return
             
-        university = instance.university
-        course = instance.course
+        university = application.university
+        course = application.course
         
         # Only proceed if we have necessary data
         if not university or not course:
@@ -32,10 +34,25 @@ def create_commission_claim(sender, instance, created, **kwargs):
             expected_amount = Decimal('0.00')
             
         CommissionClaim.objects.create(
-            application=instance,
+            application=application,
             university=university,
             expected_amount=expected_amount,
             currency=course.currency, # Match course currency
             status=CommissionClaim.Status.PENDING,
             notes=f"Auto-generated from enrollment. Rate: {rate}%"
         )
+
+
+@receiver(pre_save, sender=CommissionClaim)
+def number_commission_invoice(sender, instance, **kwargs):
+    """
+    Invoiced claims always carry an invoice number, allocated from the
+    'invoice' sequence.
+    """
+    if instance.invoice_number or instance.status not in (
+        CommissionClaim.Status.INVOICED, CommissionClaim.Status.RECEIVED
+    ):
+        return
+    from .services import next_invoice_number
+    instance.invoice_number = next_invoice_number()
+    instance.invoice_date = instance.invoice_date or timezone.now().date()
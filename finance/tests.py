@@ -1,3 +1,24 @@
+from decimal import Decimal
+
 from django.test import TestCase
+from django.utils import timezone
+
+from applications.models import Application
+from branches.models import Branch
+from students.models import Student
+from .models import CommissionClaim
+
+
+class CommissionInvoiceNumberTests(TestCase):
+    def test_invoiced_claims_are_numbered(self):
+        branch = Branch.objects.create(code='FIN', name='Finance Branch', country='Testland', currency='GBP')
+        student = Student.objects.create(branch=branch, first_name='Fee', last_name='Payer', email='fee@example.com')
+        application = Application.objects.create(student=student, branch=branch, intake='Sep 2026')
+        claim = CommissionClaim.objects.create(application=application, expected_amount=Decimal('1500.00'))
+        self.assertIsNone(claim.invoice_number)
 
-# Create your tests here.
+        claim.status = CommissionClaim.Status.INVOICED
+        claim.save()
+        year = timezone.now().year
+        self.assertEqual(claim.invoice_number, f'INV-{year}-00001')
+        self.assertEqual(claim.invoice_date, timezone.now().date())
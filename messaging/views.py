@@ -2,6 +2,7 @@ from rest_framework import viewsets
 from accounts.permissions import CommunicationPermission
 
 from audit.mixins import AuditLogMixin
+from core.pagination import KeysetPagination
 from visa_crm_backend.mixins import BranchIsolationMixin, BranchIsolationCreateMixin
 from core.utils.branch_context import resolve_branch_from_request
 from .models import MessageTemplate, MessageLog
@@ -24,6 +25,7 @@ class MessageTemplateViewSet(AuditLogMixin, BranchIsolationMixin, BranchIsolatio
 
 class MessageLogViewSet(AuditLogMixin, BranchIsolationMixin, BranchIsolationCreateMixin, viewsets.ModelViewSet):
     queryset = MessageLog.objects.select_related('template', 'lead', 'student').all()
+    pagination_class = KeysetPagination
     serializer_class = MessageLogSerializer
     permission_classes = [CommunicationPermission]
 
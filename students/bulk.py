@@ -0,0 +1,149 @@
+"""
+Chunked execution of lead bulk actions.
+
+LeadViewSet.bulk_action records a LeadBulkJob and queues
+students.tasks.run_lead_bulk_job once the request commits. The worker
+walks job.lead_ids in chunks; each chunk is one transaction that applies
+the action with a single UPDATE (or one bulk INSERT of interactions) and
+advances job.processed_count; updates also carry their leaderboard deltas
+(students.leaderboard), as they bypass the model signals. If a chunk fails
+the job stops as FAILED with everything before it committed, and
+resume_job() continues from processed_count.
+
+A job the broker refuses is marked FAILED straight away, and a job left
+PENDING or PROCESSING by a worker that died is stalled once untouched for
+STALE_AFTER; both can be resumed.
+"""
+import logging
+import uuid
+from datetime import timedelta
+from functools import partial
+
+from django.db import transaction
+from django.utils import timezone
+
+from .dashboard import bump_dashboard_version
+from .leaderboard import TRACKED_FIELDS, record_changes
+from .models import Lead, LeadBulkJob, LeadInteraction, WhatsAppTemplate
+
+
+logger = logging.getLogger(__name__)
+
+# A pending or processing job untouched this long has lost its worker
+STALE_AFTER = timedelta(minutes=30)
+
+
+def enqueue_job(job):
+    """Queue a saved job for the worker once the current transaction commits."""
+    transaction.on_commit(partial(publish_job, job.id), robust=True)
+
+
+def publish_job(job_id):
+    """Hand a committed job to the worker, failing it when the broker is unavailable."""
+    from .tasks import run_lead_bulk_job
+
+    try:
+        run_lead_bulk_job.delay(str(job_id))
+    except Exception as exc:
+        logger.exception("Could not queue lead bulk job %s", job_id)
+        now = timezone.now()
+        LeadBulkJob.objects.filter(id=job_id, status=LeadBulkJob.Status.PENDING).update(
+            status=LeadBulkJob.Status.FAILED, error_message=f"Could not queue the job: {exc}",
+            finished_at=now, updated_at=now,
+        )
+
+
+def can_resume(job, now=None):
+    """Whether a job is failed, or stalled: pending or processing but untouched for STALE_AFTER."""
+    if job.status == LeadBulkJob.Status.FAILED:
+        return True
+    stalled = (LeadBulkJob.Status.PENDING, LeadBulkJob.Status.PROCESSING)
+    return job.status in stalled and job.updated_at < (now or timezone.now()) - STALE_AFTER
+
+
+def resume_job(job):
+    """
+    Re-queue a failed or stalled job; it continues after its last committed
+    chunk. Returns False if the job changed since it was read (another
+    resume, or a worker that was only slow).
+    """
+    resumed = LeadBulkJob.objects.filter(id=job.id, status=job.status, updated_at=job.updated_at).update(
+        status=LeadBulkJob.Status.PENDING, error_message='', finished_at=None, updated_at=timezone.now(),
+    )
+    job.refresh_from_db()
+    if resumed:
+        enqueue_job(job)
+    return bool(resumed)
+
+
+def chunk_handler(job):
+    """
+    Callable applying the job's action to a chunk of lead ids inside the
+    current transaction; it returns the number of leads affected.
+    """
+    leads = Lead.objects.all()
+
+    def update(lead_ids, now, **values):
+        chunk = leads.filter(id__in=lead_ids)
+        before = list(chunk.select_for_update().values(*TRACKED_FIELDS[Lead]))
+        updated = chunk.update(**values, updated_at=now)
+        record_changes(Lead, [(row, {**row, **values}) for row in before], now=now)
+        return updated
+
+    if job.action == LeadBulkJob.Action.ASSIGN:
+        return lambda lead_ids, now: update(lead_ids, now, assigned_to_id=uuid.UUID(job.params['assigned_to']))
+
+    if job.action == LeadBulkJob.Action.STATUS_UPDATE:
+        return lambda lead_ids, now: update(lead_ids, now, status=job.params['status'])
+
+    template = WhatsAppTemplate.objects.get(id=job.params['template_id'])
+
+    def send_template(lead_ids, now):
+        chunk = leads.filter(id__in=lead_ids).only('id', 'first_name', 'last_name', 'target_country', 'branch_id')
+        return len(LeadInteraction.objects.bulk_create([
+            LeadInteraction(
+                lead=lead,
+                type=LeadInteraction.Type.WHATSAPP,
+                content=template.format_message(lead),
+                staff_id=job.requested_by_id,
+                branch_id=lead.branch_id,
+            )
+            for lead in chunk
+        ]))
+    return send_template
+
+
+def run_job(job_id):
+    """
+    Process the remaining chunks of a pending job. Returns the job, or
+    None if it does not exist or another worker has already claimed it.
+    """
+    claimed = LeadBulkJob.objects.filter(id=job_id, status=LeadBulkJob.Status.PENDING).update(
+        status=LeadBulkJob.Status.PROCESSING, updated_at=timezone.now()
+    )
+    if not claimed:
+        return None
+    job = LeadBulkJob.objects.get(id=job_id)
+    job.started_at = job.started_at or timezone.now()
+    job.save(update_fields=['started_at', 'updated_at'])
+
+    try:
+        handler = chunk_handler(job)
+        while job.processed_count < len(job.lead_ids):
+            chunk = job.lead_ids[job.processed_count:job.processed_count + job.chunk_size]
+            with transaction.atomic():
+                now = timezone.now()
+                job.affected_count += handler(chunk, now)
+                job.processed_count += len(chunk)
+                job.save(update_fields=['processed_count', 'affected_count', 'updated_at'])
+    except Exception as exc:
+        job.refresh_from_db(fields=['processed_count', 'affected_count'])
+        logger.exception("Lead bulk job %s failed after %s leads", job.id, job.processed_count)
+        job.status = LeadBulkJob.Status.FAILED
+        job.error_message = str(exc)
+    else:
+        job.status = LeadBulkJob.Status.COMPLETED
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'error_message', 'finished_at', 'updated_at'])
+    bump_dashboard_version(job.branch_id)
+    return job
@@ -0,0 +1,57 @@
+"""
+Contact normalization for duplicate detection.
+
+Emails are compared lower-cased and stripped. Phones are reduced to
+E.164-style digits without the "+": an international prefix ("+" or "00")
+is dropped, and a national trunk "0" is replaced by
+settings.DEFAULT_PHONE_COUNTRY_CODE, so "+92 300 1234567", "0092-300-1234567"
+and "03001234567" all normalize to "923001234567".
+
+Lead and Student keep the normalized forms in email_normalized and
+phone_normalized, declared as derived fields (CONTACT_KEY_FIELDS).
+"""
+import re
+
+from django.conf import settings
+
+from core.derived import DerivedField, backfill_derived_fields
+
+
+MIN_PHONE_DIGITS = 7
+MAX_PHONE_DIGITS = 15  # E.164 limit
+
+_NON_DIGITS = re.compile(r'\D')
+
+
+def normalize_email(email):
+    return (email or '').strip().lower()
+
+
+def normalize_phone(phone, country_code=None):
+    """Digits-only international form of a phone number, or '' if it is not usable."""
+    text = (phone or '').strip()
+    digits = _NON_DIGITS.sub('', text)
+    if not text.startswith('+'):
+        if digits.startswith('00'):
+            digits = digits[2:]
+        elif digits.startswith('0'):
+            digits = (country_code or settings.DEFAULT_PHONE_COUNTRY_CODE) + digits[1:]
+    if not MIN_PHONE_DIGITS <= len(digits) <= MAX_PHONE_DIGITS:
+        return ''
+    return digits
+
+
+CONTACT_KEY_FIELDS = (
+    DerivedField('email_normalized', lambda contact: normalize_email(contact.email), depends_on=('email',)),
+    DerivedField('phone_normalized', lambda contact: normalize_phone(contact.phone), depends_on=('phone',)),
+)
+
+
+def backfill_contact_keys(model, batch_size=2000):
+    """
+    Recompute the normalized contact columns of every row of model
+    (soft-deleted included), writing only stale rows. Returns the count.
+    """
+    return backfill_derived_fields(
+        model, fields=[field.name for field in CONTACT_KEY_FIELDS], batch_size=batch_size
+    )
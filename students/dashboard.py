@@ -0,0 +1,170 @@
+"""
+Dashboard statistics.
+
+The shared part of DashboardStatsView (cards, pipeline, visa alerts,
+revenue, lead sources) depends only on the branch scope and, for
+counselors, on the counselor. It is computed with one conditional
+aggregation query per model and cached per (branch, counselor, day).
+
+Cache entries are keyed on a per-branch version token that is replaced
+whenever a Student, Lead, Application, VisaCase or Transaction of that
+branch is saved or deleted (see students.signals); DASHBOARD_CACHE_TIMEOUT
+is a short safety net for writes that bypass signals (queryset.update()).
+"""
+import datetime
+import uuid
+
+from django.core.cache import cache
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from applications.models import Application
+from finance.models import Transaction
+from visas.models import VisaCase
+from .models import Lead, Student
+
+
+DASHBOARD_CACHE_TIMEOUT = 60
+
+# Statuses not counted as active applications (DOCUMENTS_READY is treated as draft)
+INACTIVE_APPLICATION_STATUSES = (Application.Status.REJECTED, Application.Status.DOCUMENTS_READY)
+
+STALLED_VISA_DAYS = 14
+REVENUE_TREND_DAYS = 180
+
+
+def _version_key(branch_id):
+    return f'dashboard:version:{branch_id or "all"}'
+
+
+def get_dashboard_version(branch_id=None):
+    """Current version token for a branch (None: the all-branches scope)."""
+    key = _version_key(branch_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_dashboard_version(branch_id=None):
+    """Invalidate cached dashboards of a branch and of the all-branches scope."""
+    keys = {_version_key(None), _version_key(branch_id)}
+    cache.set_many({key: uuid.uuid4().hex for key in keys}, timeout=None)
+
+
+def scope_stats(branch, counselor=None):
+    """
+    Cached shared dashboard data for a branch (None: all branches),
+    optionally restricted to one counselor's students and leads.
+    """
+    branch_id = branch.pk if branch is not None else None
+    key = 'dashboard:stats:{}:{}:{}:{}'.format(
+        branch_id or 'all',
+        counselor.pk if counselor is not None else 'all',
+        datetime.date.today().isoformat(),
+        get_dashboard_version(branch_id),
+    )
+    stats = cache.get(key)
+    if stats is None:
+        stats = compute_scope_stats(branch, counselor)
+        cache.set(key, stats, DASHBOARD_CACHE_TIMEOUT)
+    return stats
+
+
+def compute_scope_stats(branch, counselor=None):
+    """Dashboard cards for a scope, one conditional-aggregation query per model."""
+    students_qs = Student.objects.all()
+    leads_qs = Lead.objects.all()
+    applications_qs = Application.objects.all()
+    visas_qs = VisaCase.objects.all()
+    revenue_qs = Transaction.objects.filter(status='PAID', transaction_type='CREDIT')
+    if branch is not None:
+        students_qs = students_qs.filter(branch=branch)
+        leads_qs = leads_qs.filter(branch=branch)
+        applications_qs = applications_qs.filter(student__branch=branch)
+        visas_qs = visas_qs.filter(student__branch=branch)
+        revenue_qs = revenue_qs.filter(student__branch=branch)
+    if counselor is not None:
+        students_qs = students_qs.filter(counselor=counselor)
+        leads_qs = leads_qs.filter(assigned_to=counselor)
+        applications_qs = applications_qs.filter(student__counselor=counselor)
+        visas_qs = visas_qs.filter(student__counselor=counselor)
+
+    now = timezone.now()
+
+    total_students = students_qs.count()
+
+    # Leads: per-source counts with today's new leads; totals are rolled up
+    today = datetime.date.today()
+    lead_sources = list(
+        leads_qs.order_by().values('source')
+        .annotate(count=Count('id'), today=Count('id', filter=Q(created_at__date=today)))
+    )
+    total_leads = sum(row['count'] for row in lead_sources)
+    new_leads_today = sum(row['today'] for row in lead_sources)
+
+    # Applications: pipeline by status; active count is rolled up from it
+    pipeline = sorted(
+        applications_qs.order_by().values('status').annotate(count=Count('id')),
+        key=lambda row: (row['count'], row['status']),
+    )
+    active_applications = sum(
+        row['count'] for row in pipeline if row['status'] not in INACTIVE_APPLICATION_STATUSES
+    )
+
+    # Visas
+    visa_counts = visas_qs.aggregate(
+        pending=Count('id', filter=Q(decision_status=VisaCase.DecisionStatus.PENDING)),
+        decided=Count('id', filter=~Q(decision_status=VisaCase.DecisionStatus.PENDING)),
+        granted=Count('id', filter=Q(decision_status=VisaCase.DecisionStatus.APPROVED)),
+    )
+    if visa_counts['decided'] > 0:
+        visa_success_rate = round((visa_counts['granted'] / visa_counts['decided']) * 100, 1)
+    else:
+        visa_success_rate = 0.0
+
+    # Visa alerts: pending visas created more than STALLED_VISA_DAYS ago
+    stalled_visas = visas_qs.filter(
+        decision_status=VisaCase.DecisionStatus.PENDING,
+        created_at__lte=now - timezone.timedelta(days=STALLED_VISA_DAYS),
+    ).select_related('student').order_by('created_at')[:5]
+    visa_alerts = [
+        {
+            'id': str(v.id),
+            'student_name': str(v.student),
+            'country': v.student.target_country if v.student else 'Unknown',
+            'days_pending': (now.date() - v.created_at.date()).days,
+        }
+        for v in stalled_visas
+    ]
+
+    # Revenue: monthly totals, with the recent-window sum alongside for the trend
+    months = revenue_qs.order_by().annotate(month=TruncMonth('created_at')).values('month').annotate(
+        total=Sum('amount'),
+        recent=Sum('amount', filter=Q(created_at__gte=now - timezone.timedelta(days=REVENUE_TREND_DAYS))),
+    ).order_by('month')
+    total_revenue = 0
+    revenue_trend = []
+    for row in months:
+        total_revenue += row['total']
+        if row['recent'] is not None:
+            revenue_trend.append({'month': row['month'], 'amount': row['recent']})
+
+    return {
+        'total_students': total_students,
+        'total_leads': total_leads,
+        'active_applications': active_applications,
+        'pending_visas': visa_counts['pending'],
+        'visa_success_rate': visa_success_rate,
+        'new_leads_today': new_leads_today,
+        'total_revenue': total_revenue,
+        'revenue_trend': revenue_trend,
+        'lead_sources': [
+            {'source': row['source'], 'count': row['count']}
+            for row in sorted(lead_sources, key=lambda row: (-row['count'], row['source'] or ''))
+        ],
+        'pipeline_stats': [{'stage': row['status'], 'count': row['count']} for row in pipeline],
+        'visa_alerts': visa_alerts,
+    }
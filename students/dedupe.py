@@ -0,0 +1,220 @@
+"""
+Batch duplicate detection for leads.
+
+All live leads are loaded once into a DataFrame and compared block-wise
+instead of pairwise:
+
+* exact blocks on email_normalized and phone_normalized;
+* name blocks (first three letters of the last name + first initial,
+  refined for very common names), in which every pair is scored with
+  trigram Jaccard similarity from one binary matrix product per block.
+
+Matching pairs are unioned into clusters; every member of a cluster is
+suggested as a duplicate of the cluster's oldest lead (LeadMergeCandidate).
+"""
+import logging
+import re
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+from django.db import transaction
+
+from .models import Lead, LeadMergeCandidate
+
+
+logger = logging.getLogger(__name__)
+
+EMAIL_SCORE = 1.0
+PHONE_SCORE = 0.95
+NAME_WEIGHT = 0.8
+NAME_SIMILARITY = 0.75  # trigram Jaccard; one typo in a short name scores ~0.8
+MAX_NAME_BLOCK = 500  # larger blocks are split by full last name (_name_blocks)
+
+_NON_ALNUM = re.compile(r'[^a-z0-9]+')
+
+
+def _clean_name(value):
+    return _NON_ALNUM.sub(' ', (value or '').lower()).strip()
+
+
+def load_leads():
+    """Live leads as a DataFrame, oldest first."""
+    rows = Lead.objects.order_by('created_at', 'id').values_list(
+        'id', 'first_name', 'last_name', 'email_normalized', 'phone_normalized', 'branch_id', 'created_at'
+    )
+    frame = pd.DataFrame.from_records(
+        list(rows),
+        columns=['id', 'first_name', 'last_name', 'email', 'phone', 'branch_id', 'created_at'],
+    )
+    frame['name'] = (frame['first_name'].map(_clean_name) + ' ' + frame['last_name'].map(_clean_name)).str.strip()
+    frame['name_block'] = (
+        frame['last_name'].map(_clean_name).str.replace(' ', '').str[:3]
+        + frame['first_name'].map(_clean_name).str[:1]
+    )
+    return frame
+
+
+def _exact_pairs(frame, column, score):
+    """(left, right, score, reason) rows linking each member of a key group to its first row."""
+    keyed = frame[frame[column] != '']
+    first = keyed.groupby(column)['position'].transform('first')
+    linked = keyed[keyed['position'] != first]
+    return pd.DataFrame({
+        'left': first[linked.index].to_numpy(),
+        'right': linked['position'].to_numpy(),
+        'score': score,
+        'reason': column,
+    })
+
+
+def _trigrams(name):
+    padded = f'  {name} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _fine_block(frame, positions):
+    """Finer name key for an oversized block: the full last name and first three letters of the first name."""
+    rows = frame.iloc[positions.to_numpy()]
+    return (
+        rows['last_name'].map(_clean_name).str.replace(' ', '')
+        + rows['first_name'].map(_clean_name).str.replace(' ', '').str[:3]
+    )
+
+
+def _name_blocks(frame):
+    """
+    Row positions of each name block of two or more leads. A block larger
+    than MAX_NAME_BLOCK (a common name) is split by _fine_block(); a
+    sub-block that is still too large is skipped and logged.
+    """
+    blocks = frame[frame['name_block'].str.len() >= 2].groupby('name_block')['position']
+    for _key, positions in blocks:
+        if len(positions) < 2:
+            continue
+        if len(positions) <= MAX_NAME_BLOCK:
+            yield positions
+            continue
+        for fine_key, fine_positions in positions.groupby(_fine_block(frame, positions)):
+            if len(fine_positions) < 2:
+                continue
+            if len(fine_positions) > MAX_NAME_BLOCK:
+                logger.warning(
+                    "Duplicate detection skipped name block %r (%s leads, max %s)",
+                    fine_key, len(fine_positions), MAX_NAME_BLOCK,
+                )
+                continue
+            yield fine_positions
+
+
+def _name_pairs(frame):
+    """Pairs within each name block whose trigram Jaccard similarity is high enough."""
+    lefts, rights, scores = [], [], []
+    for positions in _name_blocks(frame):
+        grams = [_trigrams(name) for name in frame['name'].to_numpy()[positions.to_numpy()]]
+        vocabulary = {gram: index for index, gram in enumerate(set().union(*grams))}
+        matrix = np.zeros((len(grams), len(vocabulary)), dtype=np.float32)
+        for row, row_grams in enumerate(grams):
+            matrix[row, [vocabulary[gram] for gram in row_grams]] = 1
+        shared = matrix @ matrix.T
+        sizes = matrix.sum(axis=1)
+        similarity = shared / (sizes[:, None] + sizes[None, :] - shared)
+        left, right = np.nonzero(np.triu(similarity >= NAME_SIMILARITY, k=1))
+        lefts.append(positions.to_numpy()[left])
+        rights.append(positions.to_numpy()[right])
+        scores.append(similarity[left, right] * NAME_WEIGHT)
+    if not lefts:
+        return pd.DataFrame(columns=['left', 'right', 'score', 'reason'])
+    return pd.DataFrame({
+        'left': np.concatenate(lefts),
+        'right': np.concatenate(rights),
+        'score': np.concatenate(scores),
+        'reason': 'name',
+    })
+
+
+def _clusters(size, lefts, rights):
+    """Union-find over row positions; returns each row's root (its oldest member)."""
+    parent = list(range(size))
+
+    def find(node):
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    for left, right in zip(lefts, rights):
+        a, b = find(left), find(right)
+        if a != b:
+            # Rows are ordered oldest first, so the smaller position is the older lead
+            parent[max(a, b)] = min(a, b)
+    return [find(node) for node in range(size)]
+
+
+def find_duplicates(frame=None):
+    """
+    Duplicate suggestions as a list of
+    {'lead': primary id, 'duplicate': id, 'branch_id', 'score', 'reasons'}.
+    """
+    frame = load_leads() if frame is None else frame
+    if frame.empty:
+        return []
+    frame = frame.reset_index(drop=True)
+    frame['position'] = frame.index
+
+    edges = pd.concat([
+        _exact_pairs(frame, 'email', EMAIL_SCORE),
+        _exact_pairs(frame, 'phone', PHONE_SCORE),
+        _name_pairs(frame),
+    ], ignore_index=True)
+    if edges.empty:
+        return []
+    edges = edges.astype({'left': int, 'right': int, 'score': float})
+
+    roots = np.asarray(_clusters(len(frame), edges['left'], edges['right']))
+
+    # A member's score is its strongest edge, its reasons every signal it matched on
+    ends = pd.concat([
+        edges[['left', 'score', 'reason']].rename(columns={'left': 'position'}),
+        edges[['right', 'score', 'reason']].rename(columns={'right': 'position'}),
+    ])
+    ends = ends[roots[ends['position'].to_numpy()] != ends['position'].to_numpy()]
+    members = ends.groupby('position').agg(score=('score', 'max'), reasons=('reason', lambda r: sorted(set(r))))
+
+    ids = frame['id'].to_numpy()
+    branches = frame['branch_id'].to_numpy()
+    return [
+        {
+            'lead': ids[roots[position]],
+            'duplicate': ids[position],
+            'branch_id': branches[roots[position]],
+            'score': Decimal(str(round(row.score, 3))),
+            'reasons': row.reasons,
+        }
+        for position, row in zip(members.index, members.itertuples())
+    ]
+
+
+def refresh_merge_candidates(batch_size=1000):
+    """
+    Replace the pending merge suggestions with a fresh run of
+    find_duplicates(). Pairs already dismissed or merged are not
+    suggested again. Returns (suggested, skipped).
+    """
+    suggestions = find_duplicates()
+    with transaction.atomic():
+        LeadMergeCandidate.all_objects.filter(status=LeadMergeCandidate.Status.PENDING).delete()
+        reviewed = set(LeadMergeCandidate.all_objects.values_list('lead_id', 'duplicate_id'))
+        candidates = [
+            LeadMergeCandidate(
+                lead_id=item['lead'],
+                duplicate_id=item['duplicate'],
+                branch_id=item['branch_id'],
+                score=item['score'],
+                reasons=item['reasons'],
+            )
+            for item in suggestions
+            if (item['lead'], item['duplicate']) not in reviewed
+        ]
+        LeadMergeCandidate.objects.bulk_create(candidates, batch_size=batch_size)
+    return len(candidates), len(suggestions) - len(candidates)
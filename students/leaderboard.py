@@ -0,0 +1,211 @@
+"""
+Leaderboard counters.
+
+LeaderboardCounter keeps, per counselor and per branch, the number of live
+leads, hot leads, conversions and students, over all time and over the
+last 30 days (by creation date). Counters are changed by deltas:
+
+* Lead and Student saves and deletes, through students.signals, which
+  compare the stored values (FieldTrackingMixin) with the saved ones;
+* queryset updates that bypass signals (students.bulk, students.scoring),
+  through record_changes() with each row's values before and after.
+
+A lead leaves the 30-day window only when the counters are recounted, so
+rebuild_leaderboards() runs nightly (students.tasks); run the
+rebuild_leaderboards command after migrating, imports or raw SQL edits.
+"""
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Case, Count, F, FloatField, Q, Value, When
+from django.db.models.functions import Cast
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from .models import LeaderboardCounter, Lead, Student
+
+
+Scope = LeaderboardCounter.Scope
+Window = LeaderboardCounter.Window
+
+WINDOW_DAYS = {Window.ALL: None, Window.LAST_30_DAYS: 30}
+WINDOW_PARAMS = {'all': Window.ALL, '30d': Window.LAST_30_DAYS}
+
+COUNTERS = ('leads', 'hot_leads', 'conversions', 'students')
+TRACKED_FIELDS = {
+    Lead: ('assigned_to_id', 'branch_id', 'status', 'priority', 'is_deleted', 'created_at'),
+    Student: ('counselor_id', 'branch_id', 'is_deleted', 'created_at'),
+}
+OWNER_FIELDS = {Lead: 'assigned_to_id', Student: 'counselor_id'}
+
+RANKING = {
+    Scope.COUNSELOR: ('-conversions', '-hot_leads'),
+    Scope.BRANCH: ('-conversion_rate',),
+}
+
+
+def window_starts(now=None):
+    """{window: earliest created_at it counts (None: no limit)}."""
+    now = now or timezone.now()
+    return {window: now - timedelta(days=days) if days else None for window, days in WINDOW_DAYS.items()}
+
+
+def window_from_param(value):
+    """Window for a ?window= query parameter (default: all time)."""
+    if not value:
+        return Window.ALL
+    try:
+        return WINDOW_PARAMS[value.lower()]
+    except KeyError:
+        raise ValidationError({'window': f"Choose one of: {', '.join(WINDOW_PARAMS)}."})
+
+
+def conversion_rate(leads, conversions):
+    return round(conversions * 100 / leads, 2) if leads else 0
+
+
+def instance_values(instance):
+    """The values of a Lead or Student that its counters depend on."""
+    return {field: getattr(instance, field) for field in TRACKED_FIELDS[type(instance)]}
+
+
+def _contributions(model, values, starts):
+    """{(scope, window, subject_id): counts} one row adds to the counters."""
+    if values is None or values['is_deleted']:
+        return {}
+    if model is Lead:
+        counts = {
+            'leads': 1,
+            'hot_leads': int(values['priority'] == Lead.Priority.HOT),
+            'conversions': int(values['status'] == Lead.Status.CONVERTED),
+        }
+    else:
+        counts = {'students': 1}
+
+    subjects = ((Scope.COUNSELOR, values[OWNER_FIELDS[model]]), (Scope.BRANCH, values['branch_id']))
+    contributions = {}
+    for window, start in starts.items():
+        if start is not None and (values['created_at'] is None or values['created_at'] < start):
+            continue
+        for scope, subject_id in subjects:
+            if subject_id is not None:
+                contributions[(scope, window, subject_id)] = counts
+    return contributions
+
+
+def _apply(scope, window, subject_id, delta):
+    rows = LeaderboardCounter.objects.filter(scope=scope, window=window, subject_id=subject_id)
+    leads = delta.get('leads', 0)
+    updates = {name: F(name) + value for name, value in delta.items()}
+    updates['conversion_rate'] = Case(
+        When(leads__gt=-leads, then=Cast(F('conversions') + delta.get('conversions', 0), FloatField()) * 100.0 / (F('leads') + leads)),
+        default=Value(0.0),
+        output_field=FloatField(),
+    )
+    if rows.update(**updates, updated_at=timezone.now()):
+        return
+    _, created = LeaderboardCounter.objects.get_or_create(
+        scope=scope, window=window, subject_id=subject_id,
+        defaults={**delta, 'conversion_rate': conversion_rate(leads, delta.get('conversions', 0))},
+    )
+    if not created:
+        rows.update(**updates, updated_at=timezone.now())
+
+
+def record_changes(model, changes, now=None):
+    """
+    Update the counters for changed Lead or Student rows. changes holds
+    (before, after) pairs of TRACKED_FIELDS value dicts; None stands for
+    a row that did not exist before or no longer exists.
+    """
+    starts = window_starts(now)
+    deltas = defaultdict(Counter)
+    for before, after in changes:
+        for key, counts in _contributions(model, before, starts).items():
+            deltas[key].subtract(counts)
+        for key, counts in _contributions(model, after, starts).items():
+            deltas[key].update(counts)
+
+    for (scope, window, subject_id), delta in deltas.items():
+        delta = {name: value for name, value in delta.items() if value}
+        if delta:
+            _apply(scope, window, subject_id, delta)
+
+
+def count_window(start=None):
+    """{(scope, subject_id): Counter} recounted from the live rows created since start."""
+    lead_counts = {
+        'leads': Count('id'),
+        'hot_leads': Count('id', filter=Q(priority=Lead.Priority.HOT)),
+        'conversions': Count('id', filter=Q(status=Lead.Status.CONVERTED)),
+    }
+    totals = defaultdict(Counter)
+    for model, counts in ((Lead, lead_counts), (Student, {'students': Count('id')})):
+        rows = model.objects.order_by()
+        if start is not None:
+            rows = rows.filter(created_at__gte=start)
+        for scope, owner in ((Scope.COUNSELOR, OWNER_FIELDS[model]), (Scope.BRANCH, 'branch_id')):
+            for row in rows.values(owner).annotate(**counts):
+                subject_id = row.pop(owner)
+                if subject_id is not None:
+                    totals[(scope, subject_id)].update(row)
+    return totals
+
+
+def rebuild_leaderboards(now=None, batch_size=1000):
+    """Recount every counter from scratch. Returns the number of counter rows."""
+    counters = [
+        LeaderboardCounter(
+            scope=scope,
+            window=window,
+            subject_id=subject_id,
+            conversion_rate=conversion_rate(counts['leads'], counts['conversions']),
+            **{name: counts[name] for name in COUNTERS},
+        )
+        for window, start in window_starts(now).items()
+        for (scope, subject_id), counts in count_window(start).items()
+    ]
+    with transaction.atomic():
+        LeaderboardCounter.objects.all().delete()
+        LeaderboardCounter.objects.bulk_create(counters, batch_size=batch_size)
+    return len(counters)
+
+
+def ranked(scope, window, subject_ids):
+    """Counters of the given subjects (ids or an id queryset) in leaderboard order."""
+    return LeaderboardCounter.objects.filter(
+        scope=scope, window=window, subject_id__in=subject_ids
+    ).order_by(*RANKING[scope], 'subject_id')
+
+
+def top_counselors(counselors, window=Window.ALL, limit=10):
+    """
+    The top `limit` of a User queryset as (user, counter) pairs; counselors
+    without a counter row (nothing assigned) fill up the list with None.
+    """
+    counters = list(ranked(Scope.COUNSELOR, window, counselors.values('id'))[:limit])
+    users = counselors.in_bulk([counter.subject_id for counter in counters])
+    entries = [(users[counter.subject_id], counter) for counter in counters if counter.subject_id in users]
+    if len(entries) < limit:
+        idle = counselors.exclude(id__in=[user.id for user, _ in entries]).order_by('first_name', 'last_name')
+        entries += [(user, None) for user in idle[:limit - len(entries)]]
+    return entries
+
+
+def branch_rankings(branches, window=Window.ALL):
+    """Every branch of a queryset as (branch, counter) pairs in leaderboard order."""
+    counters = ranked(Scope.BRANCH, window, branches.values('id'))
+    by_id = branches.in_bulk()
+    entries = [(by_id.pop(counter.subject_id), counter) for counter in counters if counter.subject_id in by_id]
+    return entries + [(branch, None) for branch in by_id.values()]
+
+
+def counselor_counters(user_ids, window=Window.ALL):
+    """{user id: counter} for the given users."""
+    return {
+        counter.subject_id: counter
+        for counter in LeaderboardCounter.objects.filter(
+            scope=Scope.COUNSELOR, window=window, subject_id__in=user_ids
+        )
+    }
@@ -0,0 +1,29 @@
+"""
+Recompute normalized email/phone columns on leads and students.
+
+Usage:
+    python manage.py backfill_contact_keys
+
+Saves keep the columns current on their own; run this once after the
+columns are added, after changing DEFAULT_PHONE_COUNTRY_CODE, and after
+bulk loads or raw SQL edits to contact details.
+"""
+from django.core.management.base import BaseCommand
+
+from students.contacts import backfill_contact_keys
+from students.models import Lead, Student
+
+
+class Command(BaseCommand):
+    help = 'Backfill normalized contact keys used for duplicate detection'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000, help='Rows written per transaction')
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options['batch_size'])
+        for model in (Lead, Student):
+            updated = backfill_contact_keys(model, batch_size=batch_size)
+            self.stdout.write(self.style.SUCCESS(
+                f"{model._meta.verbose_name_plural}: updated {updated} rows"
+            ))
@@ -0,0 +1,24 @@
+"""
+Recount the leaderboard counters from leads and students.
+
+Usage:
+    python manage.py rebuild_leaderboards
+
+Saves and bulk jobs keep the counters current on their own and Celery Beat
+rebuilds them nightly; run this once after the table is created, and after
+imports or raw SQL edits to leads and students.
+"""
+from django.core.management.base import BaseCommand
+
+from students.leaderboard import rebuild_leaderboards
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the per-counselor and per-branch leaderboard counters'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows inserted per query')
+
+    def handle(self, *args, **options):
+        rows = rebuild_leaderboards(batch_size=max(1, options['batch_size']))
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rows} leaderboard counters"))
@@ -0,0 +1,103 @@
+# Generated by Django 6.0.2 on 2026-10-17 05:06
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('branches', '0007_alter_branchanalyticssnapshot_snapshot_date'),
+        ('students', '0008_document_application_lead_suggested_universities'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeadMergeCandidate',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('is_deleted', models.BooleanField(db_index=True, default=False)),
+                ('deleted_at', models.DateTimeField(blank=True, null=True)),
+                ('is_anonymized', models.BooleanField(default=False)),
+                ('anonymized_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('score', models.DecimalField(decimal_places=3, help_text='Match confidence (0-1)', max_digits=4)),
+                ('reasons', models.JSONField(blank=True, default=list, help_text='Matching signals: email, phone, name')),
+                ('status', models.CharField(choices=[('PENDING', 'Pending Review'), ('DISMISSED', 'Not a Duplicate'), ('MERGED', 'Merged')], default='PENDING', max_length=20)),
+                ('reviewed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Lead Merge Candidate',
+                'verbose_name_plural': 'Lead Merge Candidates',
+                'ordering': ['-score', '-created_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='lead',
+            name='email_normalized',
+            field=models.CharField(blank=True, default='', editable=False, max_length=254),
+        ),
+        migrations.AddField(
+            model_name='lead',
+            name='phone_normalized',
+            field=models.CharField(blank=True, default='', editable=False, max_length=20),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='email_normalized',
+            field=models.CharField(blank=True, default='', editable=False, max_length=254),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='phone_normalized',
+            field=models.CharField(blank=True, default='', editable=False, max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='lead',
+            index=models.Index(fields=['email_normalized'], name='idx_lead_email_norm'),
+        ),
+        migrations.AddIndex(
+            model_name='lead',
+            index=models.Index(fields=['phone_normalized'], name='idx_lead_phone_norm'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['email_normalized'], name='idx_student_email_norm'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['phone_normalized'], name='idx_student_phone_norm'),
+        ),
+        migrations.AddField(
+            model_name='leadmergecandidate',
+            name='branch',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='%(class)s_branch', to='branches.branch'),
+        ),
+        migrations.AddField(
+            model_name='leadmergecandidate',
+            name='duplicate',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='duplicate_of', to='students.lead'),
+        ),
+        migrations.AddField(
+            model_name='leadmergecandidate',
+            name='lead',
+            field=models.ForeignKey(help_text='Oldest lead of the cluster', on_delete=django.db.models.deletion.CASCADE, related_name='merge_candidates', to='students.lead'),
+        ),
+        migrations.AddField(
+            model_name='leadmergecandidate',
+            name='reviewed_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='reviewed_merge_candidates', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='leadmergecandidate',
+            index=models.Index(fields=['status'], name='idx_merge_candidate_status'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='leadmergecandidate',
+            unique_together={('lead', 'duplicate')},
+        ),
+    ]
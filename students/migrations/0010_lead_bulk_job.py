@@ -0,0 +1,48 @@
+# Generated by Django 6.0.2 on 2026-10-17 05:13
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('branches', '0007_alter_branchanalyticssnapshot_snapshot_date'),
+        ('students', '0009_normalized_contacts'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeadBulkJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('is_deleted', models.BooleanField(db_index=True, default=False)),
+                ('deleted_at', models.DateTimeField(blank=True, null=True)),
+                ('is_anonymized', models.BooleanField(default=False)),
+                ('anonymized_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('action', models.CharField(choices=[('ASSIGN', 'Assign Counselor'), ('STATUS_UPDATE', 'Update Status'), ('WHATSAPP_TEMPLATE', 'Send WhatsApp Template')], max_length=30)),
+                ('params', models.JSONField(blank=True, default=dict, help_text='assigned_to / status / template_id')),
+                ('lead_ids', models.JSONField(blank=True, default=list, help_text='Target leads, in processing order')),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('PROCESSING', 'Processing'), ('COMPLETED', 'Completed'), ('FAILED', 'Failed')], default='PENDING', max_length=20)),
+                ('chunk_size', models.PositiveIntegerField(default=500)),
+                ('total_count', models.PositiveIntegerField(default=0)),
+                ('processed_count', models.PositiveIntegerField(default=0, help_text='Leads covered by committed chunks')),
+                ('affected_count', models.PositiveIntegerField(default=0, help_text='Leads updated or messaged')),
+                ('error_message', models.TextField(blank=True, default='')),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('branch', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='%(class)s_branch', to='branches.branch')),
+                ('requested_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='lead_bulk_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Lead Bulk Job',
+                'verbose_name_plural': 'Lead Bulk Jobs',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,86 @@
+# Generated by Django 6.0.2 on 2026-10-17 05:29
+
+import uuid
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+from django.utils import timezone
+
+
+def count_leaderboards(apps, schema_editor):
+    """
+    Fill the counters from the existing leads and students, as
+    students.leaderboard.rebuild_leaderboards() does on the live models.
+    """
+    Lead = apps.get_model('students', 'Lead')
+    Student = apps.get_model('students', 'Student')
+    LeaderboardCounter = apps.get_model('students', 'LeaderboardCounter')
+
+    lead_counts = {
+        'leads': Count('id'),
+        'hot_leads': Count('id', filter=Q(priority='HOT')),
+        'conversions': Count('id', filter=Q(status='CONVERTED')),
+    }
+    sources = (
+        (Lead, 'assigned_to_id', lead_counts),
+        (Student, 'counselor_id', {'students': Count('id')}),
+    )
+    counters = []
+    for window, start in (('ALL', None), ('30D', timezone.now() - timedelta(days=30))):
+        totals = defaultdict(Counter)
+        for model, owner, counts in sources:
+            # Historical managers do not hide soft-deleted rows
+            rows = model.objects.filter(is_deleted=False).order_by()
+            if start is not None:
+                rows = rows.filter(created_at__gte=start)
+            for scope, field in (('COUNSELOR', owner), ('BRANCH', 'branch_id')):
+                for row in rows.values(field).annotate(**counts):
+                    subject_id = row.pop(field)
+                    if subject_id is not None:
+                        totals[(scope, subject_id)].update(row)
+        for (scope, subject_id), row in totals.items():
+            counters.append(LeaderboardCounter(
+                scope=scope,
+                window=window,
+                subject_id=subject_id,
+                leads=row['leads'],
+                hot_leads=row['hot_leads'],
+                conversions=row['conversions'],
+                students=row['students'],
+                conversion_rate=round(row['conversions'] * 100 / row['leads'], 2) if row['leads'] else 0,
+            ))
+    LeaderboardCounter.objects.bulk_create(counters, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0010_lead_bulk_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardCounter',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('scope', models.CharField(choices=[('COUNSELOR', 'Counselor'), ('BRANCH', 'Branch')], max_length=20)),
+                ('window', models.CharField(choices=[('ALL', 'All Time'), ('30D', 'Last 30 Days')], default='ALL', max_length=5)),
+                ('subject_id', models.UUIDField(help_text='Counselor (User) or Branch id')),
+                ('leads', models.IntegerField(default=0)),
+                ('hot_leads', models.IntegerField(default=0)),
+                ('conversions', models.IntegerField(default=0, help_text='Leads in CONVERTED status')),
+                ('students', models.IntegerField(default=0)),
+                ('conversion_rate', models.FloatField(default=0, help_text='Conversions per 100 leads')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Leaderboard Counter',
+                'verbose_name_plural': 'Leaderboard Counters',
+                'indexes': [models.Index(fields=['scope', 'window', '-conversions', '-hot_leads'], name='idx_leaderboard_conversions'), models.Index(fields=['scope', 'window', '-conversion_rate'], name='idx_leaderboard_rate')],
+                'unique_together': {('scope', 'window', 'subject_id')},
+            },
+        ),
+        migrations.RunPython(count_leaderboards, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 6.0.2 on 2026-10-17 05:36
+
+from django.conf import settings
+from django.db import migrations, models
+
+# Student.PROFILE_FIELDS when this migration was written
+PROFILE_FIELDS = (
+    'first_name', 'last_name', 'email', 'phone', 'date_of_birth', 'nationality',
+    'passport_number', 'passport_expiry', 'academic_history', 'english_test_type',
+)
+
+
+def backfill_profile_completeness(apps, schema_editor):
+    """Recompute profile_completeness as Student.calculate_profile_completeness() does."""
+    Student = apps.get_model('students', 'Student')
+
+    changed = []
+    for student in Student.objects.order_by().only('id', 'profile_completeness', *PROFILE_FIELDS).iterator(chunk_size=1000):
+        filled = sum(1 for field in PROFILE_FIELDS if getattr(student, field))
+        completeness = int((filled / len(PROFILE_FIELDS)) * 100)
+        if completeness != student.profile_completeness:
+            student.profile_completeness = completeness
+            changed.append(student)
+        if len(changed) >= 1000:
+            Student.objects.bulk_update(changed, ['profile_completeness'])
+            changed = []
+    Student.objects.bulk_update(changed, ['profile_completeness'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('branches', '0007_alter_branchanalyticssnapshot_snapshot_date'),
+        ('students', '0011_leaderboard_counter'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='student',
+            name='profile_completeness',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Percentage of profile completion (0-100), derived on save'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['profile_completeness'], name='idx_student_completeness'),
+        ),
+        migrations.RunPython(backfill_profile_completeness, migrations.RunPython.noop),
+    ]
@@ -4,6 +4,8 @@ from django.conf import settings
 from django.utils import timezone
 from core.models import TenantAwareModel
 from core.managers import TenantQuerySet
+from core.derived import DerivedField
+from .contacts import CONTACT_KEY_FIELDS
 
 
 class LeadQuerySet(TenantQuerySet):
@@ -102,6 +104,12 @@ class Lead(TenantAwareModel):
     email = models.EmailField()
     phone = models.CharField(max_length=20, blank=True, null=True)
     
+    # Duplicate detection keys, kept in step with email/phone on save (students.contacts)
+    email_normalized = models.CharField(max_length=254, blank=True, default='', editable=False)
+    phone_normalized = models.CharField(max_length=20, blank=True, default='', editable=False)
+    
+    derived_fields = CONTACT_KEY_FIELDS
+    
     # Lead Details
     source = models.CharField(max_length=20, choices=Source.choices, default=Source.WALK_IN)
     status = models.CharField(max_length=20, choices=Status.choices, default=Status.NEW)
@@ -143,6 +151,8 @@ class Lead(TenantAwareModel):
             models.Index(fields=['email'], name='idx_lead_email'),
             models.Index(fields=['status'], name='idx_lead_status'),
             models.Index(fields=['assigned_to'], name='idx_lead_assigned'),
+            models.Index(fields=['email_normalized'], name='idx_lead_email_norm'),
+            models.Index(fields=['phone_normalized'], name='idx_lead_phone_norm'),
         ]
     
     # objects = LeadQuerySet.as_manager() # Handled by TenantAwareModel
@@ -230,6 +240,8 @@ class Student(TenantAwareModel):
     last_name = models.CharField(max_length=100)
     email = models.EmailField()
     phone = models.CharField(max_length=20, blank=True, null=True)
+    email_normalized = models.CharField(max_length=254, blank=True, default='', editable=False)
+    phone_normalized = models.CharField(max_length=20, blank=True, default='', editable=False)
     date_of_birth = models.DateField(null=True, blank=True)
     nationality = models.CharField(max_length=100, blank=True, null=True)
     current_address = models.TextField(blank=True, null=True)
@@ -264,9 +276,18 @@ class Student(TenantAwareModel):
     # Profile tracking
     profile_completeness = models.PositiveIntegerField(
         default=0,
-        help_text="Percentage of profile completion (0-100)"
+        editable=False,
+        help_text="Percentage of profile completion (0-100), derived on save"
     )
     status = models.CharField(max_length=20, choices=Status.choices, default=Status.ACTIVE)
+
+    PROFILE_FIELDS = (
+        'first_name', 'last_name', 'email', 'phone', 'date_of_birth', 'nationality',
+        'passport_number', 'passport_expiry', 'academic_history', 'english_test_type',
+    )
+    derived_fields = CONTACT_KEY_FIELDS + (
+        DerivedField('profile_completeness', 'calculate_profile_completeness', depends_on=PROFILE_FIELDS),
+    )
     
     # Timestamps (Handled by TenantAwareModel)
     
@@ -285,6 +306,9 @@ class Student(TenantAwareModel):
             models.Index(fields=['student_code'], name='idx_student_code'),
             models.Index(fields=['status'], name='idx_student_status'),
             models.Index(fields=['counselor'], name='idx_student_counselor'),
+            models.Index(fields=['email_normalized'], name='idx_student_email_norm'),
+            models.Index(fields=['phone_normalized'], name='idx_student_phone_norm'),
+            models.Index(fields=['profile_completeness'], name='idx_student_completeness'),
         ]
     
     def __str__(self):
@@ -295,15 +319,10 @@ class Student(TenantAwareModel):
         return f"{self.first_name} {self.last_name}"
     
     def calculate_profile_completeness(self):
-        """Calculate profile completeness percentage."""
-        fields_to_check = [
-            self.first_name, self.last_name, self.email, self.phone,
-            self.date_of_birth, self.nationality, self.passport_number,
-            self.passport_expiry, self.academic_history, self.english_test_type
-        ]
+        """Profile completeness percentage (stored in profile_completeness on save)."""
+        fields_to_check = [getattr(self, field) for field in self.PROFILE_FIELDS]
         filled = sum(1 for f in fields_to_check if f)
-        self.profile_completeness = int((filled / len(fields_to_check)) * 100)
-        return self.profile_completeness
+        return int((filled / len(fields_to_check)) * 100)
 
     def anonymize(self):
         """Remove personal data for GDPR compliance."""
@@ -513,6 +532,130 @@ class LeadInteraction(TenantAwareModel):
         return f"{self.get_type_display()} - {self.lead.full_name} ({self.timestamp.date()})"
 
 
+class LeadMergeCandidate(TenantAwareModel):
+    """
+    A lead that is probably the same person as an earlier lead.
+    Produced nightly by students.dedupe: every member of a duplicate
+    cluster is paired with the cluster's oldest lead. Dismissed pairs are
+    remembered and not suggested again.
+    """
+    class Status(models.TextChoices):
+        PENDING = 'PENDING', 'Pending Review'
+        DISMISSED = 'DISMISSED', 'Not a Duplicate'
+        MERGED = 'MERGED', 'Merged'
+
+    lead = models.ForeignKey(Lead, on_delete=models.CASCADE, related_name='merge_candidates',
+                             help_text="Oldest lead of the cluster")
+    duplicate = models.ForeignKey(Lead, on_delete=models.CASCADE, related_name='duplicate_of')
+    score = models.DecimalField(max_digits=4, decimal_places=3, help_text="Match confidence (0-1)")
+    reasons = models.JSONField(default=list, blank=True, help_text="Matching signals: email, phone, name")
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
+    reviewed_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='reviewed_merge_candidates'
+    )
+    reviewed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Lead Merge Candidate"
+        verbose_name_plural = "Lead Merge Candidates"
+        ordering = ['-score', '-created_at']
+        unique_together = ('lead', 'duplicate')
+        indexes = [
+            models.Index(fields=['status'], name='idx_merge_candidate_status'),
+        ]
+
+    def __str__(self):
+        return f"{self.duplicate.full_name} ~ {self.lead.full_name} ({self.score})"
+
+
+class LeadBulkJob(TenantAwareModel):
+    """
+    A bulk action over many leads, run in chunks by a Celery worker
+    (students.bulk). Every chunk commits together with the job's progress,
+    so a failed job can be resumed from the first unprocessed chunk.
+    """
+    class Action(models.TextChoices):
+        ASSIGN = 'ASSIGN', 'Assign Counselor'
+        STATUS_UPDATE = 'STATUS_UPDATE', 'Update Status'
+        WHATSAPP_TEMPLATE = 'WHATSAPP_TEMPLATE', 'Send WhatsApp Template'
+
+    class Status(models.TextChoices):
+        PENDING = 'PENDING', 'Pending'
+        PROCESSING = 'PROCESSING', 'Processing'
+        COMPLETED = 'COMPLETED', 'Completed'
+        FAILED = 'FAILED', 'Failed'
+
+    action = models.CharField(max_length=30, choices=Action.choices)
+    params = models.JSONField(default=dict, blank=True, help_text="assigned_to / status / template_id")
+    lead_ids = models.JSONField(default=list, blank=True, help_text="Target leads, in processing order")
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
+    chunk_size = models.PositiveIntegerField(default=500)
+    total_count = models.PositiveIntegerField(default=0)
+    processed_count = models.PositiveIntegerField(default=0, help_text="Leads covered by committed chunks")
+    affected_count = models.PositiveIntegerField(default=0, help_text="Leads updated or messaged")
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='lead_bulk_jobs'
+    )
+    error_message = models.TextField(blank=True, default='')
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Lead Bulk Job"
+        verbose_name_plural = "Lead Bulk Jobs"
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.get_action_display()} - {self.processed_count}/{self.total_count} ({self.status})"
+
+    @property
+    def progress(self):
+        """Percentage of leads processed."""
+        if not self.total_count:
+            return 100
+        return round(self.processed_count * 100 / self.total_count)
+
+
+class LeaderboardCounter(models.Model):
+    """
+    Leaderboard totals of one counselor or branch over one window, kept
+    current incrementally as leads and students change (students.leaderboard)
+    so the leaderboards read the top rows off an index instead of counting.
+    """
+    class Scope(models.TextChoices):
+        COUNSELOR = 'COUNSELOR', 'Counselor'
+        BRANCH = 'BRANCH', 'Branch'
+
+    class Window(models.TextChoices):
+        ALL = 'ALL', 'All Time'
+        LAST_30_DAYS = '30D', 'Last 30 Days'
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    scope = models.CharField(max_length=20, choices=Scope.choices)
+    window = models.CharField(max_length=5, choices=Window.choices, default=Window.ALL)
+    subject_id = models.UUIDField(help_text="Counselor (User) or Branch id")
+    leads = models.IntegerField(default=0)
+    hot_leads = models.IntegerField(default=0)
+    conversions = models.IntegerField(default=0, help_text="Leads in CONVERTED status")
+    students = models.IntegerField(default=0)
+    conversion_rate = models.FloatField(default=0, help_text="Conversions per 100 leads")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Leaderboard Counter"
+        verbose_name_plural = "Leaderboard Counters"
+        unique_together = ('scope', 'window', 'subject_id')
+        indexes = [
+            models.Index(fields=['scope', 'window', '-conversions', '-hot_leads'], name='idx_leaderboard_conversions'),
+            models.Index(fields=['scope', 'window', '-conversion_rate'], name='idx_leaderboard_rate'),
+        ]
+
+    def __str__(self):
+        return f"{self.scope} {self.subject_id} ({self.window}): {self.conversions}/{self.leads}"
+
+
 class WhatsAppTemplate(TenantAwareModel):
     """
     Standardized WhatsApp messages for quick sales engagement.
@@ -0,0 +1,179 @@
+"""
+Lead scoring.
+
+Score (0-100), priority, win probability and SLA status are derived from a
+lead's profile completeness, intent details, recency of contact and age.
+The rules are written once, over numpy arrays (score_arrays):
+calculate_lead_score (core.signals) applies them to the lead being saved
+as length-1 arrays, and rescore_open_leads() applies them to every open
+lead in one pass so time-dependent values (recency, SLA, ghosting) don't
+go stale between edits. Priority changes made by the nightly pass are
+passed on to the leaderboard counters (students.leaderboard).
+"""
+import numpy as np
+import pandas as pd
+from django.db import transaction
+from django.utils import timezone
+
+from .leaderboard import record_changes
+from .models import Lead
+
+
+CONTACT_FIELDS = ('first_name', 'last_name', 'email', 'phone')
+INTENT_FIELDS = ('target_country', 'intended_intake', 'budget_range')
+SCORING_FIELDS = CONTACT_FIELDS + INTENT_FIELDS + ('last_interaction_at', 'status', 'created_at')
+SCORED_FIELDS = ('score', 'priority', 'win_probability', 'is_sla_violated')
+
+HOT_SCORE = 70
+WARM_SCORE = 30
+COUNTRY_WIN_BONUS = {'United Kingdom': 10, 'Australia': 15, 'Canada': 5}
+PRIORITY_WIN_BONUS = {Lead.Priority.HOT.value: 20, Lead.Priority.WARM.value: 5, Lead.Priority.COLD.value: -20}
+NEW_LEAD_SLA_HOURS = 24
+GHOST_DAYS = 3
+
+OPEN_STATUSES = (Lead.Status.NEW, Lead.Status.CONTACTED, Lead.Status.QUALIFIED)
+
+
+def score_arrays(inputs):
+    """
+    Apply the scoring rules to equally long numpy arrays:
+    completeness (0-1 share of CONTACT_FIELDS filled), has_<intent field>,
+    target_country, status, days_since_interaction and age_hours (NaN when
+    unknown). Returns {scored field: array}.
+    """
+    completeness = inputs['completeness']
+    days_since = inputs['days_since_interaction']
+
+    # 1. Profile completeness (+30 max), 2. intent details (+30 max)
+    score = completeness * 30
+    for field in INTENT_FIELDS:
+        score = score + inputs[f'has_{field}'] * 10
+
+    # 3. Activity level (+40 max): recent interactions
+    with np.errstate(invalid='ignore'):
+        score = score + np.select([days_since < 7, days_since < 30], [40, 20], default=0)
+
+    priority = np.select(
+        [score >= HOT_SCORE, score >= WARM_SCORE],
+        [Lead.Priority.HOT.value, Lead.Priority.WARM.value],
+        default=Lead.Priority.COLD.value,
+    )
+
+    # 4. Win probability
+    probability = np.clip(
+        50.0
+        + np.array([COUNTRY_WIN_BONUS.get(country, 0) for country in inputs['target_country']])
+        + np.array([PRIORITY_WIN_BONUS[value] for value in priority])
+        + inputs['has_budget_range'] * 10
+        + completeness * 15,
+        1.0, 99.0,
+    )
+
+    # 5. SLA & ghost detection: NEW leads untouched for a day, or no contact for GHOST_DAYS
+    status = inputs['status']
+    contacted = ~np.isnan(days_since)
+    with np.errstate(invalid='ignore'):
+        violated = np.where(
+            (status == Lead.Status.NEW.value) & ~contacted,
+            np.nan_to_num(inputs['age_hours']) > NEW_LEAD_SLA_HOURS,
+            contacted & (days_since > GHOST_DAYS) & (status != Lead.Status.CONVERTED.value),
+        )
+
+    return {
+        'score': score.astype(int),
+        'priority': priority,
+        'win_probability': probability.round(2),
+        'is_sla_violated': violated.astype(bool),
+    }
+
+
+def frame_inputs(frame, now):
+    """score_arrays() inputs for a DataFrame holding SCORING_FIELDS columns."""
+    def filled(field):
+        return (frame[field].notna() & frame[field].astype(str).ne('')).to_numpy()
+
+    now = pd.Timestamp(now)
+    last_interaction = pd.to_datetime(frame['last_interaction_at'], utc=True)
+    created_at = pd.to_datetime(frame['created_at'], utc=True)
+    inputs = {
+        'completeness': sum(filled(field).astype(int) for field in CONTACT_FIELDS) / len(CONTACT_FIELDS),
+        'target_country': frame['target_country'].to_numpy(),
+        'status': frame['status'].to_numpy().astype(str),
+        'days_since_interaction': (now - last_interaction).dt.days.to_numpy(dtype=float),
+        'age_hours': ((now - created_at).dt.total_seconds() / 3600).to_numpy(dtype=float),
+    }
+    for field in INTENT_FIELDS:
+        inputs[f'has_{field}'] = filled(field)
+    return inputs
+
+
+def lead_inputs(lead, now):
+    """score_arrays() inputs (length 1) for a single lead."""
+    last_interaction, created_at = lead.last_interaction_at, lead.created_at
+    inputs = {
+        'completeness': np.array([sum(1 for field in CONTACT_FIELDS if getattr(lead, field)) / len(CONTACT_FIELDS)]),
+        'target_country': np.array([lead.target_country], dtype=object),
+        'status': np.array([lead.status], dtype=str),
+        'days_since_interaction': np.array([(now - last_interaction).days if last_interaction else np.nan]),
+        'age_hours': np.array([(now - created_at).total_seconds() / 3600 if created_at else np.nan]),
+    }
+    for field in INTENT_FIELDS:
+        inputs[f'has_{field}'] = np.array([bool(getattr(lead, field))])
+    return inputs
+
+
+def score_lead(lead, now=None):
+    """Set the scored fields of a single lead in place."""
+    scored = score_arrays(lead_inputs(lead, now or timezone.now()))
+    lead.score = int(scored['score'][0])
+    lead.priority = str(scored['priority'][0])
+    lead.win_probability = float(scored['win_probability'][0])
+    lead.is_sla_violated = bool(scored['is_sla_violated'][0])
+
+
+def rescore_open_leads(batch_size=1000, now=None):
+    """
+    Recompute the scored fields of every open lead and write back only
+    the rows whose values changed. Returns (scanned, updated).
+    """
+    now = now or timezone.now()
+    columns = ['id', 'assigned_to_id', 'branch_id', *SCORING_FIELDS, *SCORED_FIELDS]
+    rows = Lead.objects.filter(status__in=OPEN_STATUSES).order_by().values_list(*columns)
+    frame = pd.DataFrame.from_records(list(rows), columns=columns)
+    if frame.empty:
+        return 0, 0
+
+    fresh = pd.DataFrame(score_arrays(frame_inputs(frame, now)), index=frame.index)
+    stored_probability = frame['win_probability'].astype(float).round(2)
+    changed = (
+        (fresh['score'] != frame['score'])
+        | (fresh['priority'] != frame['priority'])
+        | (fresh['win_probability'] != stored_probability)
+        | (fresh['is_sla_violated'] != frame['is_sla_violated'].astype(bool))
+    )
+    updates = [
+        Lead(
+            id=lead_id, score=int(score), priority=priority,
+            win_probability=float(probability), is_sla_violated=bool(violated),
+        )
+        for lead_id, score, priority, probability, violated in zip(
+            frame.loc[changed, 'id'], *(fresh.loc[changed, field] for field in SCORED_FIELDS)
+        )
+    ]
+    # Leaderboard values of the reprioritized leads, keyed by id
+    reprioritized = {
+        row.id: {
+            'assigned_to_id': row.assigned_to_id, 'branch_id': row.branch_id, 'status': row.status,
+            'priority': row.priority, 'is_deleted': False, 'created_at': row.created_at,
+        }
+        for row in frame.loc[changed & (fresh['priority'] != frame['priority'])].itertuples()
+    }
+    for start in range(0, len(updates), batch_size):
+        batch = updates[start:start + batch_size]
+        with transaction.atomic():
+            Lead.objects.bulk_update(batch, list(SCORED_FIELDS))
+            record_changes(Lead, [
+                (reprioritized[lead.id], {**reprioritized[lead.id], 'priority': lead.priority})
+                for lead in batch if lead.id in reprioritized
+            ], now=now)
+    return len(frame), len(updates)
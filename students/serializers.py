@@ -1,5 +1,8 @@
 from rest_framework import serializers
-from .models import Lead, Student, Document, DocumentAlert, LeadInteraction, WhatsAppTemplate, CounselorAvailability
+from .models import (
+    Lead, Student, Document, DocumentAlert, LeadInteraction, LeadMergeCandidate, LeadBulkJob,
+    WhatsAppTemplate, CounselorAvailability
+)
 from branches.serializers import BranchListSerializer
 from accounts.serializers import UserListSerializer
 
@@ -99,19 +102,12 @@ class StudentSerializer(serializers.ModelSerializer):
     counselor_details = UserListSerializer(source='counselor', read_only=True)
     status_display = serializers.CharField(source='get_status_display', read_only=True)
     full_name = serializers.CharField(read_only=True)
-    profile_completeness = serializers.SerializerMethodField()
     
     class Meta:
         model = Student
         fields = '__all__'
         read_only_fields = ['id', 'created_at', 'updated_at', 'profile_completeness', 'branch', 'counselor']
 
-    def get_profile_completeness(self, obj):
-        try:
-            return obj.calculate_profile_completeness()
-        except Exception:
-            return obj.profile_completeness
-
 
 class StudentListSerializer(serializers.ModelSerializer):
     """Lightweight serializer for Student listings."""
@@ -119,7 +115,6 @@ class StudentListSerializer(serializers.ModelSerializer):
     status_display = serializers.CharField(source='get_status_display', read_only=True)
     branch_details = BranchListSerializer(source='branch', read_only=True)
     counselor_details = UserListSerializer(source='counselor', read_only=True)
-    profile_completeness = serializers.SerializerMethodField()
     
     class Meta:
         model = Student
@@ -129,12 +124,6 @@ class StudentListSerializer(serializers.ModelSerializer):
             'profile_completeness', 'status', 'status_display', 'created_at'
         ]
 
-    def get_profile_completeness(self, obj):
-        try:
-            return obj.calculate_profile_completeness()
-        except Exception:
-            return obj.profile_completeness
-
 
 class DocumentSerializer(serializers.ModelSerializer):
     """Serializer for Document model."""
@@ -224,6 +213,36 @@ class LeadInteractionSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'timestamp', 'branch', 'staff']
 
 
+class MergeCandidateLeadSerializer(serializers.ModelSerializer):
+    """Compact lead summary shown side by side in duplicate review."""
+    full_name = serializers.CharField(read_only=True)
+    status_display = serializers.CharField(source='get_status_display', read_only=True)
+    assigned_to_name = serializers.CharField(source='assigned_to.get_full_name', read_only=True, default=None)
+
+    class Meta:
+        model = Lead
+        fields = [
+            'id', 'full_name', 'email', 'phone', 'status', 'status_display',
+            'assigned_to', 'assigned_to_name', 'branch', 'created_at'
+        ]
+
+
+class LeadMergeCandidateSerializer(serializers.ModelSerializer):
+    """Serializer for suggested lead duplicates."""
+    lead_details = MergeCandidateLeadSerializer(source='lead', read_only=True)
+    duplicate_details = MergeCandidateLeadSerializer(source='duplicate', read_only=True)
+    status_display = serializers.CharField(source='get_status_display', read_only=True)
+    reviewed_by_name = serializers.CharField(source='reviewed_by.get_full_name', read_only=True, default=None)
+
+    class Meta:
+        model = LeadMergeCandidate
+        fields = [
+            'id', 'lead', 'lead_details', 'duplicate', 'duplicate_details', 'score', 'reasons',
+            'status', 'status_display', 'reviewed_by', 'reviewed_by_name', 'reviewed_at', 'created_at'
+        ]
+        read_only_fields = fields
+
+
 class CounselorAvailabilitySerializer(serializers.ModelSerializer):
     """Serializer for counselor availability slots."""
     user_name = serializers.CharField(source='user.get_full_name', read_only=True)
@@ -243,7 +262,35 @@ class BulkLeadActionSerializer(serializers.Serializer):
     # Optional fields based on action
     assigned_to = serializers.UUIDField(required=False)
     status = serializers.ChoiceField(choices=Lead.Status.choices, required=False)
-    template_id = serializers.IntegerField(required=False)
+    template_id = serializers.UUIDField(required=False)
+
+    REQUIRED_FIELDS = {
+        'ASSIGN': 'assigned_to',
+        'STATUS_UPDATE': 'status',
+        'WHATSAPP_TEMPLATE': 'template_id',
+    }
+
+    def validate(self, attrs):
+        field = self.REQUIRED_FIELDS[attrs['action']]
+        if attrs.get(field) is None:
+            raise serializers.ValidationError({field: f"This field is required for {attrs['action']}."})
+        return attrs
+
+
+class LeadBulkJobSerializer(serializers.ModelSerializer):
+    """Progress of a queued bulk lead action."""
+    action_display = serializers.CharField(source='get_action_display', read_only=True)
+    status_display = serializers.CharField(source='get_status_display', read_only=True)
+    progress = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = LeadBulkJob
+        fields = [
+            'id', 'action', 'action_display', 'params', 'status', 'status_display',
+            'total_count', 'processed_count', 'affected_count', 'progress', 'chunk_size',
+            'error_message', 'requested_by', 'started_at', 'finished_at', 'created_at'
+        ]
+        read_only_fields = fields
 
 
 class WhatsAppTemplateSerializer(serializers.ModelSerializer):
@@ -1,8 +1,36 @@
+from collections import defaultdict
 from django.db import transaction
+from django.utils import timezone
 from rest_framework.exceptions import ValidationError
 import datetime
+from core.sequences import allocate, max_suffix
 from .models import Student, Lead
 
+
+def assign_student_codes(students, year=None):
+    """
+    Give every student without a code one, formatted BRANCH-YEAR-SEQUENCE
+    (e.g. LHR-2026-00001), reserving one block of numbers per branch.
+    Used by the pre_save signal and by bulk inserts, which skip signals.
+    """
+    year = year or timezone.now().year
+    pending = defaultdict(list)
+    for student in students:
+        if not student.student_code:
+            # Extract short branch code (e.g. 'UK-LHR' -> 'LHR')
+            branch_code = student.branch.code.split('-')[-1] if student.branch else 'HQ'
+            pending[branch_code].append(student)
+
+    for branch_code, group in pending.items():
+        code_prefix = f"{branch_code}-{year}-"
+        numbers = allocate(
+            f"student/{branch_code}", len(group), year=year,
+            # Include soft-deleted students so numbers are never reused
+            seed=lambda: max_suffix(Student.all_objects, 'student_code', code_prefix),
+        )
+        for student, number in zip(group, numbers):
+            student.student_code = f"{code_prefix}{number:05d}"
+
 class StudentService:
     """
     Service layer for Student business logic.
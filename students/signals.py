@@ -1,57 +1,82 @@
 """
-Auto-suggestion signal for Lead → University mapping.
-Triggers when a Lead is created to suggest matching universities.
+Student/lead signals.
+
+- Auto-suggestion for Lead → University mapping when a Lead is created.
+- Dashboard cache invalidation on writes to the models the dashboard counts.
+- Leaderboard counter updates when leads and students change.
 """
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete, pre_save
 from django.dispatch import receiver
-from decimal import Decimal
 
-from .models import Lead
+from . import leaderboard
+from .dashboard import bump_dashboard_version
+from .models import Lead, Student
 
 
 @receiver(post_save, sender=Lead)
 def auto_suggest_universities(sender, instance, created, **kwargs):
     """
     Automatically suggest universities for newly created leads
-    based on their profile (target country, budget, preferred level).
+    based on their profile (target country). Matching runs in a Celery
+    task after the lead is committed (students.suggestions).
     """
-    if not created:
+    if not created or not instance.target_country:
         return
-    
-    # Avoid circular import
-    from universities.models import University
-    from universities.services import UniversityMatchingService
-    
-    # Only process if lead has enough profile data
-    if not instance.target_country:
+
+    from .suggestions import queue_university_suggestions
+    queue_university_suggestions([instance.id])
+
+
+# ============================================================
+# DASHBOARD CACHE
+# ============================================================
+
+def _dashboard_branch_id(instance):
+    """Branch the dashboard counts this record under."""
+    if isinstance(instance, (Lead, Student)):
+        return instance.branch_id
+    return Student.all_objects.filter(pk=instance.student_id).values_list('branch_id', flat=True).first()
+
+
+def invalidate_dashboard(sender, instance, **kwargs):
+    bump_dashboard_version(_dashboard_branch_id(instance))
+
+
+for _sender in (Lead, Student, 'applications.Application', 'visas.VisaCase', 'finance.Transaction'):
+    _name = _sender if isinstance(_sender, str) else _sender._meta.label
+    post_save.connect(invalidate_dashboard, sender=_sender, dispatch_uid=f'dashboard_save_{_name}')
+    post_delete.connect(invalidate_dashboard, sender=_sender, dispatch_uid=f'dashboard_delete_{_name}')
+
+
+# ============================================================
+# LEADERBOARD COUNTERS
+# ============================================================
+
+@receiver(pre_save, sender=Lead)
+@receiver(pre_save, sender=Student)
+def remember_leaderboard_values(sender, instance, **kwargs):
+    """Read the stored values of instances that carry no snapshot of them."""
+    fields = leaderboard.TRACKED_FIELDS[sender]
+    if instance._state.adding or instance.is_tracking(*fields):
         return
-    
-    try:
-        # Build matching profile from lead data
-        profile = {
-            'target_country': instance.target_country,
-            'cgpa': 60,  # Default assumption
-            'ielts': Decimal('6.0'),  # Default assumption
-            'gap_years': 0,
-        }
-        
-        # Run matching algorithm
-        result = UniversityMatchingService.find_matches(profile)
-        
-        if result and 'results' in result:
-            # Get top 5 university IDs from matches
-            matched_ids = []
-            for match in result['results'][:5]:
-                if 'id' in match:
-                    matched_ids.append(match['id'])
-            
-            if matched_ids:
-                # Get university objects and add to suggested
-                universities = University.objects.filter(id__in=matched_ids)
-                instance.suggested_universities.set(universities)
-                
-    except Exception as e:
-        # Log error but don't break lead creation
-        import logging
-        logger = logging.getLogger(__name__)
-        logger.warning(f"Failed to auto-suggest universities for lead {instance.id}: {e}")
+    instance._leaderboard_before = sender.all_objects.filter(pk=instance.pk).values(*fields).first()
+
+
+@receiver(post_save, sender=Lead)
+@receiver(post_save, sender=Student)
+def update_leaderboard_counters(sender, instance, created, **kwargs):
+    if created:
+        before = None
+    elif '_leaderboard_before' in instance.__dict__:
+        before = instance.__dict__.pop('_leaderboard_before')
+    else:
+        before = {field: instance.previous_value(field) for field in leaderboard.TRACKED_FIELDS[sender]}
+    after = leaderboard.instance_values(instance)
+    if before != after:
+        leaderboard.record_changes(sender, [(before, after)])
+
+
+@receiver(post_delete, sender=Lead)
+@receiver(post_delete, sender=Student)
+def remove_from_leaderboard_counters(sender, instance, **kwargs):
+    leaderboard.record_changes(sender, [(leaderboard.instance_values(instance), None)])
@@ -0,0 +1,121 @@
+"""
+University suggestions for new leads.
+
+A lead's matching profile is its target country plus fixed defaults, so
+most leads share one of a handful of profiles. Match results are memoized
+per (profile, catalog version) through the catalog cache, and the
+suggestions of a batch of leads are written with one bulk insert into the
+suggested_universities table. New leads are queued by students.signals
+(bulk imports may call queue_university_suggestions() with all their ids
+directly); the leads queued during one transaction go to the worker as a
+single task once it commits.
+"""
+import logging
+import threading
+from decimal import Decimal
+
+from django.db import transaction
+
+from universities.catalog import catalog_cached
+from .models import Lead
+
+
+logger = logging.getLogger(__name__)
+
+SUGGESTION_COUNT = 5
+
+# Lead ids queued in this thread and not yet sent to the worker
+_pending = threading.local()
+
+# Leads carry no academic data yet; assume an average profile
+DEFAULT_PROFILE = {
+    'cgpa': 60,
+    'ielts': Decimal('6.0'),
+    'gap_years': 0,
+}
+
+
+def lead_profile(target_country):
+    """Matching profile for a lead with the given target country."""
+    return {'target_country': target_country, **DEFAULT_PROFILE}
+
+
+def suggested_university_ids(profile):
+    """Top university ids for a profile, cached until the catalog changes."""
+    def compute():
+        from universities.services import UniversityMatchingService
+        result = UniversityMatchingService.find_matches(profile)
+        if not result or 'results' not in result:
+            return []
+        return [match['id'] for match in result['results'][:SUGGESTION_COUNT] if 'id' in match]
+
+    return catalog_cached('lead_suggestions', profile, compute)
+
+
+def queue_university_suggestions(lead_ids):
+    """
+    Suggest universities for the given leads in the background once the
+    transaction commits. Leads queued during one transaction (a bulk
+    import, or many single creates) are sent to one task together.
+    """
+    if not lead_ids:
+        return
+    pending = _pending_lead_ids()
+    pending.update(dict.fromkeys(str(lead_id) for lead_id in lead_ids))
+    transaction.on_commit(send_pending_suggestions)
+
+
+def _pending_lead_ids():
+    if not hasattr(_pending, 'lead_ids'):
+        _pending.lead_ids = {}
+    return _pending.lead_ids
+
+
+def send_pending_suggestions():
+    """
+    Queue one suggestion task for every lead id pending in this thread.
+    Ids of leads whose transaction rolled back may ride along; the task
+    skips leads that do not exist. Suggestions are best effort: a broker
+    outage is logged and never fails the request that created the leads.
+    """
+    lead_ids = list(_pending_lead_ids())
+    _pending.lead_ids = {}
+    if not lead_ids:
+        return
+    from .tasks import suggest_universities_for_leads
+    try:
+        suggest_universities_for_leads.delay(lead_ids)
+    except Exception:
+        logger.exception("Could not queue university suggestions for %s leads", len(lead_ids))
+
+
+def apply_university_suggestions(lead_ids):
+    """
+    Replace the suggested universities of the given leads, computing each
+    distinct profile once. Leads without a target country are skipped.
+    Returns the number of suggestion rows written.
+    """
+    leads = Lead.objects.filter(id__in=lead_ids).exclude(target_country__isnull=True).exclude(target_country='').order_by()
+    by_profile = {}
+    for lead_id, target_country in leads.values_list('id', 'target_country'):
+        by_profile.setdefault(target_country, []).append(lead_id)
+
+    through = Lead.suggested_universities.through
+    rows = []
+    for target_country, ids in by_profile.items():
+        try:
+            university_ids = suggested_university_ids(lead_profile(target_country))
+        except Exception as e:
+            # Log error but keep suggesting for the other profiles
+            logger.warning(f"Failed to match universities for target country {target_country}: {e}")
+            continue
+        rows.extend(
+            through(lead_id=lead_id, university_id=university_id)
+            for lead_id in ids
+            for university_id in university_ids
+        )
+
+    with transaction.atomic():
+        through.objects.filter(lead_id__in=[lead_id for ids in by_profile.values() for lead_id in ids]).delete()
+        through.objects.bulk_create(rows, ignore_conflicts=True)
+    return len(rows)
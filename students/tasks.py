@@ -0,0 +1,54 @@
+from celery import shared_task
+
+from .bulk import run_job
+from .dedupe import refresh_merge_candidates
+from .leaderboard import rebuild_leaderboards
+from .scoring import rescore_open_leads
+from .suggestions import apply_university_suggestions
+
+
+@shared_task
+def detect_lead_duplicates():
+    """
+    Recompute lead merge suggestions (students.dedupe).
+    Scheduled nightly via Celery Beat.
+    """
+    suggested, skipped = refresh_merge_candidates()
+    return f"{suggested} merge candidates suggested, {skipped} previously reviewed pairs skipped."
+
+
+@shared_task
+def rebuild_leaderboard_counters():
+    """
+    Recount the leaderboard counters (students.leaderboard), which drops
+    leads and students that have aged out of the rolling windows.
+    Scheduled nightly via Celery Beat.
+    """
+    rows = rebuild_leaderboards()
+    return f"Rebuilt {rows} leaderboard counters."
+
+
+@shared_task
+def run_lead_bulk_job(job_id):
+    """Process a queued LeadBulkJob (students.bulk) chunk by chunk."""
+    job = run_job(job_id)
+    if job is None:
+        return 'not_pending'
+    return f"{job.status}: {job.processed_count}/{job.total_count} leads processed, {job.affected_count} affected."
+
+
+@shared_task
+def rescore_leads():
+    """
+    Recompute score, priority, win probability and SLA status of open
+    leads, which go stale as time passes. Scheduled nightly via Celery Beat.
+    """
+    scanned, updated = rescore_open_leads()
+    return f"Rescored {scanned} open leads, {updated} changed."
+
+
+@shared_task
+def suggest_universities_for_leads(lead_ids):
+    """Apply university suggestions to a batch of new leads (students.suggestions)."""
+    written = apply_university_suggestions(lead_ids)
+    return f"Suggested universities for {len(lead_ids)} leads ({written} suggestions)."
@@ -1,11 +1,32 @@
+import uuid
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 from rest_framework.test import APIClient
 from rest_framework import status
 
 from branches.models import Branch
-from accounts.models import User
-from students.models import Lead, Student
+from accounts.models import EmployeePerformance, User
+from core.models import Sequence
+from students.contacts import normalize_phone
+from students.dedupe import find_duplicates, refresh_merge_candidates
+from students.leaderboard import rebuild_leaderboards
+from students.scoring import rescore_open_leads
+from students.services import assign_student_codes
+from students.suggestions import apply_university_suggestions
+from students.models import (
+    LeaderboardCounter, Lead, LeadBulkJob, LeadInteraction, LeadMergeCandidate, Student, WhatsAppTemplate
+)
+from students.tasks import run_lead_bulk_job
 from tasks.models import Task
+from universities.models import University
 
 
 class LeadAndStudentAccessTests(TestCase):
@@ -97,3 +118,552 @@ class LeadAndStudentAccessTests(TestCase):
         )
         task = Task.objects.filter(assigned_to=self.counselor_1, title__icontains=lead.full_name).first()
         self.assertIsNotNone(task)
+
+
+class DashboardStatsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.branch = Branch.objects.create(code='DB', name='Dashboard Branch', country='Testland', currency='USD')
+        self.manager = User.objects.create_user(
+            username='manager', email='manager@example.com', role=User.Role.BRANCH_MANAGER,
+            branch=self.branch, password='StrongPass123!'
+        )
+        self.counselor = User.objects.create_user(
+            username='dash.counselor', email='dash.counselor@example.com', role=User.Role.COUNSELOR,
+            branch=self.branch, password='StrongPass123!'
+        )
+        Lead.objects.create(first_name='A', last_name='Lead', email='a.lead@example.com',
+                            branch=self.branch, assigned_to=self.counselor, source='WEBSITE')
+        Lead.objects.create(first_name='B', last_name='Lead', email='b.lead@example.com',
+                            branch=self.branch, source='WEBSITE')
+        Student.objects.create(branch=self.branch, counselor=self.counselor, first_name='S',
+                               last_name='One', email='s.one@example.com')
+
+    def get_stats(self, user):
+        self.client.force_authenticate(user=user)
+        response = self.client.get('/api/v1/dashboard/stats/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_branch_and_counselor_scopes(self):
+        stats = self.get_stats(self.manager)['stats']
+        self.assertEqual((stats['total_leads'], stats['new_leads_today'], stats['total_students']), (2, 2, 1))
+
+        data = self.get_stats(self.counselor)
+        self.assertEqual(data['stats']['total_leads'], 1)
+        self.assertEqual(data['analytics']['lead_sources'], [{'source': 'WEBSITE', 'count': 1}])
+
+    def test_cached_until_branch_write(self):
+        self.get_stats(self.manager)
+        with CaptureQueriesContext(connection) as cached:
+            self.get_stats(self.manager)
+        with CaptureQueriesContext(connection) as uncached:
+            cache.clear()
+            self.get_stats(self.manager)
+        self.assertLess(len(cached), len(uncached) - 4)
+
+        Lead.objects.create(first_name='C', last_name='Lead', email='c.lead@example.com', branch=self.branch)
+        self.assertEqual(self.get_stats(self.manager)['stats']['total_leads'], 3)
+
+
+class LeadDuplicateTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.branch = Branch.objects.create(code='DD', name='Dedupe Branch', country='Testland', currency='USD')
+        self.manager = User.objects.create_user(
+            username='dedupe.manager', email='dedupe.manager@example.com', role=User.Role.BRANCH_MANAGER,
+            branch=self.branch, password='StrongPass123!'
+        )
+        self.client.force_authenticate(user=self.manager)
+        self.original = Lead.objects.create(first_name='Ayesha', last_name='Khan', email='Ayesha.Khan@Example.com',
+                                            phone='+92 300 1234567', branch=self.branch)
+
+    def test_phone_normalization(self):
+        for phone in ('+92 300 1234567', '03001234567', '0092-300-1234567', '(0300) 123 4567'):
+            self.assertEqual(normalize_phone(phone), '923001234567')
+        self.assertEqual(normalize_phone('12345'), '')
+        self.assertEqual(self.original.email_normalized, 'ayesha.khan@example.com')
+
+    def test_check_duplicate_ignores_formatting(self):
+        response = self.client.get('/api/v1/leads/check_duplicate/', {'phone': '0300-123-4567'})
+        self.assertTrue(response.data['exists'])
+        self.assertEqual(response.data['lead']['id'], self.original.id)
+
+        response = self.client.get('/api/v1/leads/check_duplicate/', {'email': ' ayesha.khan@EXAMPLE.com'})
+        self.assertTrue(response.data['exists'])
+
+        response = self.client.get('/api/v1/leads/check_duplicate/', {'email': 'someone@example.com'})
+        self.assertFalse(response.data['exists'])
+
+    def test_duplicates_clustered_and_dismissable(self):
+        by_phone = Lead.objects.create(first_name='A.', last_name='Khan', phone='03001234567', branch=self.branch)
+        by_name = Lead.objects.create(first_name='Ayesha', last_name='Khann', branch=self.branch)
+        Lead.objects.create(first_name='Bilal', last_name='Ahmed', email='bilal@example.com', branch=self.branch)
+
+        self.assertEqual(refresh_merge_candidates(), (2, 0))
+        pairs = {
+            candidate.duplicate_id: candidate
+            for candidate in LeadMergeCandidate.objects.filter(lead=self.original)
+        }
+        self.assertEqual(set(pairs), {by_phone.id, by_name.id})
+        self.assertEqual(pairs[by_phone.id].reasons, ['phone'])
+        self.assertEqual(pairs[by_name.id].reasons, ['name'])
+
+        response = self.client.get('/api/v1/lead-merge-candidates/', {'status': 'PENDING'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data.get('results', response.data)
+        self.assertEqual(len(results), 2)
+        self.assertEqual(results[0]['duplicate'], by_phone.id)
+
+        response = self.client.post(f'/api/v1/lead-merge-candidates/{pairs[by_name.id].id}/dismiss/')
+        self.assertEqual(response.data['status'], LeadMergeCandidate.Status.DISMISSED)
+
+        # Dismissed pairs stay dismissed on the next run
+        self.assertEqual(refresh_merge_candidates(), (1, 1))
+
+    def test_common_name_blocks_are_split_not_dropped(self):
+        for first_name in ('Asad', 'Amir', 'Adil'):
+            Lead.objects.create(first_name=first_name, last_name='Khan', branch=self.branch)
+        typo = Lead.objects.create(first_name='Ayeshaa', last_name='Khan', branch=self.branch)
+
+        # The 'khaa' block (5 leads) exceeds the limit and is split by full last name + first name prefix
+        with mock.patch('students.dedupe.MAX_NAME_BLOCK', 3):
+            suggestions = find_duplicates()
+        self.assertIn((self.original.id, typo.id), {(row['lead'], row['duplicate']) for row in suggestions})
+
+        with mock.patch('students.dedupe.MAX_NAME_BLOCK', 1), self.assertLogs('students.dedupe', 'WARNING') as logs:
+            self.assertEqual(find_duplicates(), [])
+        self.assertIn("'khanaye' (2 leads", logs.output[0])
+
+
+class LeadBulkJobTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.branch = Branch.objects.create(code='BJ', name='Bulk Branch', country='Testland', currency='USD')
+        self.manager = User.objects.create_user(
+            username='bulk.manager', email='bulk.manager@example.com', role=User.Role.BRANCH_MANAGER,
+            branch=self.branch, password='StrongPass123!'
+        )
+        self.client.force_authenticate(user=self.manager)
+        self.leads = [
+            Lead.objects.create(first_name=f'Lead{i}', last_name='Bulk', branch=self.branch, target_country='UK')
+            for i in range(5)
+        ]
+        self.lead_ids = [str(lead.id) for lead in self.leads]
+
+    def test_bulk_action_is_queued_and_processed_in_chunks(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.post('/api/v1/leads/bulk-action/', {
+                'lead_ids': self.lead_ids, 'action': 'STATUS_UPDATE', 'status': Lead.Status.CONTACTED,
+            }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual((response.data['status'], response.data['total_count']), (LeadBulkJob.Status.PENDING, 5))
+        self.assertEqual(len(callbacks), 1)
+        self.assertFalse(Lead.objects.filter(status=Lead.Status.CONTACTED).exists())
+
+        LeadBulkJob.objects.filter(id=response.data['id']).update(chunk_size=2)
+        with CaptureQueriesContext(connection) as queries:
+            run_lead_bulk_job(response.data['id'])
+        lead_updates = [q['sql'] for q in queries.captured_queries if q['sql'].startswith('UPDATE "students_lead" ')]
+        self.assertEqual(len(lead_updates), 3)  # one UPDATE per chunk of 2
+
+        response = self.client.get(f"/api/v1/lead-bulk-jobs/{response.data['id']}/")
+        self.assertEqual(response.data['status'], LeadBulkJob.Status.COMPLETED)
+        self.assertEqual((response.data['processed_count'], response.data['progress']), (5, 100))
+        self.assertEqual(Lead.objects.filter(status=Lead.Status.CONTACTED).count(), 5)
+
+    def test_missing_action_parameter_is_rejected(self):
+        response = self.client.post('/api/v1/leads/bulk-action/', {
+            'lead_ids': self.lead_ids, 'action': 'WHATSAPP_TEMPLATE',
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('template_id', response.data['errors'])
+
+    def test_failed_job_resumes_after_committed_chunks(self):
+        template = WhatsAppTemplate.objects.create(title='Hi', content='Hi {first_name}, about {target_country}')
+        job = LeadBulkJob.objects.create(
+            action=LeadBulkJob.Action.WHATSAPP_TEMPLATE, params={'template_id': str(template.id)},
+            lead_ids=self.lead_ids, total_count=5, chunk_size=2, branch=self.branch,
+        )
+        # No requesting user to log the interactions as
+        run_lead_bulk_job(str(job.id))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.processed_count), (LeadBulkJob.Status.FAILED, 0))
+        self.assertTrue(job.error_message)
+
+        # Pretend the first chunk had been committed before the failure
+        LeadBulkJob.objects.filter(id=job.id).update(requested_by=self.manager, processed_count=2)
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.post(f'/api/v1/lead-bulk-jobs/{job.id}/resume/')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(len(callbacks), 1)
+        run_lead_bulk_job(str(job.id))
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.processed_count, job.affected_count), (LeadBulkJob.Status.COMPLETED, 5, 3))
+        messages = LeadInteraction.objects.filter(type=LeadInteraction.Type.WHATSAPP)
+        self.assertEqual(set(messages.values_list('lead_id', flat=True)), {lead.id for lead in self.leads[2:]})
+        self.assertEqual(messages.get(lead=self.leads[4]).content, 'Hi Lead4, about UK')
+
+    def test_broker_outage_fails_the_job_for_resuming(self):
+        with mock.patch('students.tasks.run_lead_bulk_job.delay', side_effect=ConnectionError), \
+                self.assertLogs('students.bulk', 'ERROR'), \
+                self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/v1/leads/bulk-action/', {
+                'lead_ids': self.lead_ids, 'action': 'STATUS_UPDATE', 'status': Lead.Status.CONTACTED,
+            }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        job = LeadBulkJob.objects.get(id=response.data['id'])
+        self.assertEqual(job.status, LeadBulkJob.Status.FAILED)
+        self.assertIn('Could not queue', job.error_message)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.post(f'/api/v1/lead-bulk-jobs/{job.id}/resume/')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(len(callbacks), 1)
+        run_lead_bulk_job(str(job.id))
+        self.assertEqual(Lead.objects.filter(status=Lead.Status.CONTACTED).count(), 5)
+
+    def test_only_stalled_jobs_resume_while_pending_or_processing(self):
+        job = LeadBulkJob.objects.create(
+            action=LeadBulkJob.Action.STATUS_UPDATE, params={'status': Lead.Status.CONTACTED},
+            lead_ids=self.lead_ids, total_count=5, status=LeadBulkJob.Status.PROCESSING, branch=self.branch,
+        )
+        response = self.client.post(f'/api/v1/lead-bulk-jobs/{job.id}/resume/')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        # The worker died: nothing has touched the job for an hour
+        LeadBulkJob.objects.filter(id=job.id).update(updated_at=timezone.now() - timezone.timedelta(hours=1))
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.post(f'/api/v1/lead-bulk-jobs/{job.id}/resume/')
+        self.assertEqual((response.status_code, response.data['status']), (status.HTTP_202_ACCEPTED, LeadBulkJob.Status.PENDING))
+        self.assertEqual(len(callbacks), 1)
+
+
+class LeadFieldTrackingTests(TestCase):
+    def setUp(self):
+        self.branch = Branch.objects.create(code='FT', name='Tracking Branch', country='Testland', currency='USD')
+        Lead.objects.create(first_name='Track', last_name='Me', email='track@example.com', branch=self.branch)
+
+    def test_changes_are_known_without_refetching(self):
+        lead = Lead.objects.get(email='track@example.com')
+        self.assertEqual(lead.changed_fields, {})
+
+        lead.status = Lead.Status.CONTACTED
+        lead.branch = None
+        self.assertTrue(lead.has_changed('status'))
+        self.assertEqual(lead.previous_value('status'), Lead.Status.NEW)
+        self.assertEqual(set(lead.changed_fields), {'status', 'branch'})
+
+        with self.assertLogs('core.signals', level='INFO') as logs, CaptureQueriesContext(connection) as queries:
+            lead.save()
+        self.assertIn('status changed: NEW -> CONTACTED', logs.output[0])
+        self.assertFalse([q for q in queries.captured_queries if q['sql'].startswith('SELECT')])
+
+        # The snapshot follows the save
+        self.assertFalse(lead.has_changed('status'))
+        self.assertEqual(lead.previous_value('status'), Lead.Status.CONTACTED)
+
+    def test_deferred_and_unsaved_instances(self):
+        lead = Lead.objects.only('id', 'first_name').get(email='track@example.com')
+        self.assertFalse(lead.has_changed('status'))
+        self.assertFalse(lead.is_tracking('status'))
+        lead.status  # loads the deferred field
+        self.assertTrue(lead.is_tracking('status'))
+
+        self.assertTrue(Lead(first_name='New').has_changed('first_name'))
+
+
+class LeadRescoringTests(TestCase):
+    def test_nightly_rescoring_catches_stale_leads(self):
+        branch = Branch.objects.create(code='RS', name='Rescore Branch', country='Testland', currency='USD')
+        now = timezone.now()
+        ghost = Lead.objects.create(first_name='Ghost', last_name='Lead', email='ghost@example.com',
+                                    target_country='Canada', branch=branch, status=Lead.Status.CONTACTED,
+                                    last_interaction_at=now)
+        fresh = Lead.objects.create(first_name='Fresh', last_name='Lead', branch=branch, last_interaction_at=now)
+        Lead.objects.create(first_name='Won', last_name='Lead', branch=branch, status=Lead.Status.CONVERTED)
+        self.assertEqual((ghost.score, ghost.priority, ghost.is_sla_violated), (72, Lead.Priority.HOT, False))
+
+        # Time passes without anyone touching the lead
+        Lead.objects.filter(pk=ghost.pk).update(last_interaction_at=now - timezone.timedelta(days=10))
+        self.assertEqual(rescore_open_leads(), (2, 1))
+
+        ghost.refresh_from_db()
+        self.assertEqual((ghost.score, ghost.priority, ghost.is_sla_violated), (52, Lead.Priority.WARM, True))
+        self.assertEqual(ghost.win_probability, Decimal('71.25'))
+        # The recently contacted lead was scanned but left as it was
+        scored = (fresh.score, fresh.priority, fresh.is_sla_violated, fresh.win_probability)
+        fresh.refresh_from_db()
+        self.assertEqual((fresh.score, fresh.priority, fresh.is_sla_violated, fresh.win_probability), scored)
+
+        # Saving recomputes the same values through the signal
+        ghost.save()
+        ghost.refresh_from_db()
+        self.assertEqual((ghost.score, ghost.is_sla_violated, ghost.win_probability), (52, True, Decimal('71.25')))
+        self.assertEqual(rescore_open_leads(), (2, 0))
+
+
+class StudentCodeSequenceTests(TestCase):
+    def setUp(self):
+        self.branch = Branch.objects.create(code='UK-LHR', name='London', country='UK', currency='GBP')
+        self.year = timezone.now().year
+
+    def test_codes_continue_existing_series_without_scanning(self):
+        Student.objects.create(branch=self.branch, first_name='Legacy', last_name='Code',
+                               email='legacy@example.com', student_code=f'LHR-{self.year}-00041')
+        first = Student.objects.create(branch=self.branch, first_name='A', last_name='One', email='a1@example.com')
+        self.assertEqual(first.student_code, f'LHR-{self.year}-00042')
+
+        # The series is seeded once; later inserts only touch the sequence row
+        with CaptureQueriesContext(connection) as queries:
+            second = Student.objects.create(branch=self.branch, first_name='B', last_name='Two', email='b2@example.com')
+        self.assertEqual(second.student_code, f'LHR-{self.year}-00043')
+        self.assertFalse([q for q in queries.captured_queries if 'student_code' in q['sql'] and 'LIKE' in q['sql']])
+
+    def test_bulk_inserts_reserve_one_block(self):
+        students = [
+            Student(branch=self.branch, first_name='Bulk', last_name=str(i), email=f'bulk{i}@example.com')
+            for i in range(3)
+        ]
+        assign_student_codes(students)
+        Student.objects.bulk_create(students)
+        self.assertEqual(
+            [student.student_code for student in students],
+            [f'LHR-{self.year}-0000{i}' for i in (1, 2, 3)],
+        )
+        self.assertEqual(Sequence.objects.get(prefix='student/LHR', year=self.year).last_value, 3)
+
+
+class LeadUniversitySuggestionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.branch = Branch.objects.create(code='SG', name='Suggest Branch', country='Testland', currency='USD')
+        self.partner = University.objects.create(name='Partner University', country='UK', is_partner=True)
+        self.other = University.objects.create(name='Other University', country='UK')
+        University.objects.create(name='Maple University', country='CANADA')
+
+    def test_suggestions_are_queued_and_applied_in_one_batch(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            leads = [
+                Lead.objects.create(first_name=f'Uk{i}', last_name='Lead', target_country='UK', branch=self.branch)
+                for i in range(3)
+            ]
+            Lead.objects.create(first_name='No', last_name='Country', branch=self.branch)
+        self.assertFalse(leads[0].suggested_universities.exists())
+
+        # The leads created in one transaction are sent to a single task
+        with mock.patch('students.tasks.suggest_universities_for_leads.delay') as delay:
+            for callback in callbacks:
+                callback()
+        delay.assert_called_once_with([str(lead.id) for lead in leads])
+
+        self.assertEqual(apply_university_suggestions([lead.id for lead in leads]), 6)
+        for lead in leads:
+            self.assertEqual(set(lead.suggested_universities.all()), {self.partner, self.other})
+
+        # Same profile and catalog version: no matching queries, just load, delete, insert (+ savepoint pair)
+        with self.assertNumQueries(5):
+            apply_university_suggestions([leads[0].id])
+
+
+    def test_broker_outage_does_not_fail_lead_creation(self):
+        with mock.patch('students.tasks.suggest_universities_for_leads.delay', side_effect=OSError('broker down')):
+            with self.assertLogs('students.suggestions', 'ERROR'):
+                with self.captureOnCommitCallbacks(execute=True):
+                    lead = Lead.objects.create(first_name='Down', last_name='Broker', target_country='UK', branch=self.branch)
+        self.assertTrue(Lead.objects.filter(pk=lead.pk).exists())
+
+
+class LeaderboardCounterTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.branch = Branch.objects.create(code='LB', name='Leaderboard Branch', country='Testland', currency='USD')
+        self.admin = User.objects.create_user(
+            username='lb.admin', email='lb.admin@example.com', role=User.Role.SUPER_ADMIN,
+            password='StrongPass123!', is_superuser=True
+        )
+        self.ana, self.ben, self.cy = [
+            User.objects.create_user(
+                username=f'lb.{name.lower()}', email=f'{name.lower()}@example.com', first_name=name, last_name='Counselor',
+                role=User.Role.COUNSELOR, branch=self.branch, password='StrongPass123!'
+            )
+            for name in ('Ana', 'Ben', 'Cy')
+        ]
+        self.client.force_authenticate(user=self.admin)
+
+    def _lead(self, counselor, hot=False, **fields):
+        if hot:
+            fields.update(email=f'{uuid.uuid4().hex}@example.com', target_country='Canada',
+                          status=fields.get('status', Lead.Status.CONTACTED), last_interaction_at=timezone.now())
+        return Lead.objects.create(first_name='Board', last_name='Lead', branch=self.branch, assigned_to=counselor, **fields)
+
+    def _counts(self, subject, window=LeaderboardCounter.Window.ALL):
+        counter = LeaderboardCounter.objects.get(subject_id=subject.id, window=window)
+        return counter.leads, counter.hot_leads, counter.conversions, counter.students
+
+    def _snapshot(self):
+        return set(LeaderboardCounter.objects.exclude(leads=0, students=0).values_list(
+            'scope', 'window', 'subject_id', 'leads', 'hot_leads', 'conversions', 'students'))
+
+    def test_counters_follow_changes_and_match_a_rebuild(self):
+        hot = self._lead(self.ana, hot=True)
+        plain = self._lead(self.ana)
+        won = self._lead(self.ben, status=Lead.Status.CONVERTED)
+        Student.objects.create(branch=self.branch, counselor=self.ana, first_name='Stu', last_name='Dent', email='stu@example.com')
+        self.assertEqual(self._counts(self.ana), (2, 1, 0, 1))
+        self.assertEqual(self._counts(self.branch), (3, 1, 1, 1))
+
+        plain.status = Lead.Status.CONVERTED
+        plain.save()
+        hot.assigned_to = self.ben
+        hot.save()
+        won.delete()
+        self.assertEqual(self._counts(self.ana), (1, 0, 1, 1))
+        self.assertEqual(self._counts(self.ben), (1, 1, 0, 0))
+        self.assertEqual(self._counts(self.branch, LeaderboardCounter.Window.LAST_30_DAYS), (2, 1, 1, 1))
+
+        # Bulk jobs update rows without signals and pass their deltas on
+        job = LeadBulkJob.objects.create(
+            action=LeadBulkJob.Action.ASSIGN, params={'assigned_to': str(self.cy.id)},
+            lead_ids=[str(hot.id), str(plain.id)], total_count=2,
+        )
+        run_lead_bulk_job(str(job.id))
+        self.assertEqual(self._counts(self.cy), (2, 1, 1, 0))
+        self.assertEqual(self._counts(self.ana)[:3], (0, 0, 0))
+
+        incremental = self._snapshot()
+        rebuild_leaderboards()
+        self.assertEqual(self._snapshot(), incremental)
+
+        # Old leads only count in the all-time window
+        Lead.objects.filter(pk=plain.pk).update(created_at=timezone.now() - timezone.timedelta(days=40))
+        rebuild_leaderboards()
+        self.assertEqual(self._counts(self.cy), (2, 1, 1, 0))
+        self.assertEqual(self._counts(self.cy, LeaderboardCounter.Window.LAST_30_DAYS), (1, 1, 0, 0))
+
+    def test_leaderboards_read_the_counters(self):
+        self._lead(self.ana, hot=True)
+        self._lead(self.ben, status=Lead.Status.CONVERTED)
+        self._lead(self.ben)
+
+        with self.assertNumQueries(3):  # counters, their users, idle counselors
+            response = self.client.get('/api/v1/leads/leaderboard/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(row['name'], row['conversions'], row['hot_leads'], row['total_leads']) for row in response.data],
+            [('Ben Counselor', 1, 0, 2), ('Ana Counselor', 0, 1, 1), ('Cy Counselor', 0, 0, 0)],
+        )
+
+        response = self.client.get('/api/v1/branches/leaderboard/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            (response.data[0]['code'], response.data[0]['total_leads'], response.data[0]['conversion_rate']),
+            ('LB', 3, 33.33),
+        )
+
+        for user, points in ((self.ana, 5), (self.ben, 20), (self.cy, 10)):
+            EmployeePerformance.objects.update_or_create(user=user, defaults={'points': points})
+        response = self.client.get('/api/v1/users/leaderboard/', {'branch': str(self.branch.id), 'limit': 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([row['id'] for row in response.data], [str(self.ben.id), str(self.cy.id)])
+        self.assertEqual(response.data[0]['counters'], {'leads': 2, 'hot_leads': 0, 'conversions': 1, 'students': 0})
+
+        response = self.client.get('/api/v1/leads/leaderboard/', {'window': 'year'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class LeadCursorPaginationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.branch = Branch.objects.create(code='CP', name='Cursor Branch', country='Testland', currency='USD')
+        self.manager = User.objects.create_user(
+            username='cursor.manager', email='cursor.manager@example.com', role=User.Role.BRANCH_MANAGER,
+            branch=self.branch, password='StrongPass123!'
+        )
+        self.client.force_authenticate(user=self.manager)
+        leads = [Lead.objects.create(first_name=f'Page{i}', last_name='Lead', branch=self.branch) for i in range(5)]
+        # Three leads share a timestamp; the id breaks the tie
+        now = timezone.now()
+        Lead.objects.filter(pk__in=[lead.pk for lead in leads[:3]]).update(created_at=now)
+        Lead.objects.filter(pk__in=[lead.pk for lead in leads[3:]]).update(created_at=now - timezone.timedelta(hours=1))
+        self.expected = [
+            str(pk) for pk in Lead.objects.order_by('-created_at', '-id').values_list('id', flat=True)
+        ]
+
+    def test_cursor_pages_walk_forward_and_back(self):
+        response = self.client.get('/api/v1/leads/', {'cursor': '', 'page_size': 2, 'count': 'estimate'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((response.data['count'], response.data['previous']), (5, None))
+
+        pages = [[row['id'] for row in response.data['results']]]
+        while response.data['next']:
+            response = self.client.get(response.data['next'])
+            pages.append([row['id'] for row in response.data['results']])
+        self.assertEqual([len(page) for page in pages], [2, 2, 1])
+        self.assertEqual(sum(pages, []), self.expected)
+        self.assertNotIn('count', response.data)
+
+        response = self.client.get(response.data['previous'])
+        self.assertEqual([row['id'] for row in response.data['results']], pages[1])
+        response = self.client.get(response.data['previous'])
+        self.assertEqual([row['id'] for row in response.data['results']], pages[0])
+        self.assertIsNone(response.data['previous'])
+
+    def test_page_numbers_still_work_without_a_cursor(self):
+        response = self.client.get('/api/v1/leads/', {'page': 2, 'page_size': 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((response.data['count'], len(response.data['results'])), (5, 2))
+        self.assertIn('page=3', response.data['next'])
+
+        response = self.client.get('/api/v1/leads/', {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_cursor_rejects_orderings_it_cannot_honour(self):
+        response = self.client.get('/api/v1/leads/', {'cursor': '', 'ordering': 'first_name'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('ordering', response.data['errors'])
+        response = self.client.get('/api/v1/leads/', {'cursor': '', 'ordering': 'created_at'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.get('/api/v1/leads/', {'cursor': '', 'ordering': '-created_at'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([row['id'] for row in response.data['results']], self.expected)
+        response = self.client.get('/api/v1/leads/', {'page': 1, 'ordering': 'first_name'})
+        self.assertEqual([row['first_name'] for row in response.data['results']], [f'Page{i}' for i in range(5)])
+
+
+class StudentProfileCompletenessTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.branch = Branch.objects.create(code='PC', name='Profile Branch', country='Testland', currency='USD')
+        self.manager = User.objects.create_user(
+            username='profile.manager', email='profile.manager@example.com', role=User.Role.BRANCH_MANAGER,
+            branch=self.branch, password='StrongPass123!'
+        )
+        self.client.force_authenticate(user=self.manager)
+
+    def test_completeness_is_stored_on_save_and_backfilled(self):
+        sparse = Student.objects.create(branch=self.branch, first_name='Sparse', last_name='Profile', email='sparse@example.com')
+        full = Student.objects.create(
+            branch=self.branch, first_name='Full', last_name='Profile', email='full@example.com', phone='+447700900123',
+            nationality='PK', passport_number='AB123456',
+        )
+        self.assertEqual((sparse.profile_completeness, full.profile_completeness), (30, 60))
+
+        # Only saves touching a dependency recompute it
+        full.nationality = None
+        full.save(update_fields=['nationality', 'updated_at'])
+        full.refresh_from_db()
+        self.assertEqual(full.profile_completeness, 50)
+
+        response = self.client.get('/api/v1/students/', {'ordering': '-profile_completeness', 'profile_completeness__gte': 40})
+        self.assertEqual([row['id'] for row in response.data['results']], [str(full.id)])
+        self.assertEqual(response.data['results'][0]['profile_completeness'], 50)
+
+        # Writes that bypass save() are caught up by the backfill command
+        Student.objects.filter(pk=sparse.pk).update(phone='+447700900456', profile_completeness=0, phone_normalized='')
+        call_command('backfill_derived_fields', 'students.Student', '--batch-size', '1', stdout=StringIO())
+        sparse.refresh_from_db()
+        self.assertEqual((sparse.profile_completeness, sparse.phone_normalized), (40, '447700900456'))
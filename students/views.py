@@ -1,25 +1,30 @@
-from rest_framework import viewsets, status
+from rest_framework import viewsets, status, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.exceptions import ValidationError
-import datetime
 from django_filters.rest_framework import DjangoFilterBackend
 from django.utils import timezone
-from django.db.models.functions import TruncMonth
 from visa_crm_backend.mixins import BranchIsolationMixin, BranchIsolationCreateMixin
 from audit.mixins import AuditLogMixin
+from core.pagination import KeysetPagination
 from core.utils.branch_context import assert_branch_access
 from core.utils.upload_validation import validate_upload
 from accounts.models import User
 from accounts.permissions import LeadPermission, StudentPermission, DocumentPermission, CommunicationPermission
-from .models import Lead, Student, Document, DocumentAlert, LeadInteraction, WhatsAppTemplate, CounselorAvailability
+from .models import (
+    Lead, Student, Document, DocumentAlert, LeadInteraction, LeadMergeCandidate, LeadBulkJob,
+    WhatsAppTemplate, CounselorAvailability
+)
 from .services import StudentService
+from .bulk import can_resume, enqueue_job, resume_job
+from .contacts import normalize_email, normalize_phone
+from .dashboard import scope_stats
 from .serializers import (
     LeadSerializer, LeadListSerializer, StudentSerializer, StudentListSerializer,
     DocumentSerializer, DocumentListSerializer, DocumentAlertSerializer,
-    LeadInteractionSerializer, WhatsAppTemplateSerializer,
-    CounselorAvailabilitySerializer, BulkLeadActionSerializer
+    LeadInteractionSerializer, LeadMergeCandidateSerializer, WhatsAppTemplateSerializer,
+    CounselorAvailabilitySerializer, BulkLeadActionSerializer, LeadBulkJobSerializer
 )
 
 
@@ -29,6 +34,7 @@ class LeadViewSet(AuditLogMixin, BranchIsolationMixin, BranchIsolationCreateMixi
     Branch isolation is enforced via BranchIsolationMixin.
     """
     queryset = Lead.objects.select_related('branch', 'assigned_to').all()
+    pagination_class = KeysetPagination
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['status', 'source', 'priority', 'target_country', 'is_sla_violated']
     permission_classes = [IsAuthenticated, LeadPermission]
@@ -92,39 +98,39 @@ class LeadViewSet(AuditLogMixin, BranchIsolationMixin, BranchIsolationCreateMixi
 
     @action(detail=False, methods=['get'])
     def leaderboard(self, request):
-        """Gamified leaderboard showing top performing counselors."""
-        from django.db.models import Count, Q
+        """
+        Gamified leaderboard showing top performing counselors, read from the
+        leaderboard counters. ?window=30d ranks on leads created in the last 30 days.
+        """
         from accounts.models import User
-        
-        # Get stats for last 30 days
-        thirty_days_ago = timezone.now() - timezone.timedelta(days=30)
-        
+        from .leaderboard import top_counselors, window_from_param
+
         counselors = User.objects.filter(role=User.Role.COUNSELOR)
         if resolve_branch_from_request(request):
             counselors = counselors.filter(branch=resolve_branch_from_request(request))
-            
-        stats = counselors.annotate(
-            total_leads=Count('assigned_leads'),
-            hot_leads=Count('assigned_leads', filter=Q(assigned_leads__priority='HOT')),
-            conversions=Count('assigned_leads', filter=Q(assigned_leads__status='CONVERTED')),
-        ).order_by('-conversions', '-hot_leads')[:10]
-        
+
+        entries = top_counselors(counselors, window_from_param(request.query_params.get('window')))
+
         leaderboard_data = []
-        for counselor in stats:
+        for counselor, counter in entries:
             leaderboard_data.append({
                 'id': counselor.id,
                 'name': f"{counselor.first_name} {counselor.last_name}",
-                'conversions': counselor.conversions,
-                'hot_leads': counselor.hot_leads,
-                'total_leads': counselor.total_leads,
+                'conversions': counter.conversions if counter else 0,
+                'hot_leads': counter.hot_leads if counter else 0,
+                'total_leads': counter.leads if counter else 0,
                 'rank_emoji': '👑' if len(leaderboard_data) == 0 else '🔥' if len(leaderboard_data) < 3 else '⭐️'
             })
-            
+
         return Response(leaderboard_data)
 
     @action(detail=False, methods=['post'], url_path='bulk-action')
     def bulk_action(self, request):
-        """Perform bulk actions like assign, status update, or WhatsApp."""
+        """
+        Queue a bulk action (assign, status update, or WhatsApp) over the
+        selected leads. Returns 202 with the job; poll
+        /lead-bulk-jobs/<id>/ for progress.
+        """
         serializer = BulkLeadActionSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         
@@ -132,49 +138,50 @@ class LeadViewSet(AuditLogMixin, BranchIsolationMixin, BranchIsolationCreateMixi
         action = serializer.validated_data['action']
         leads = Lead.objects.filter(id__in=lead_ids)
         
-        if resolve_branch_from_request(request):
-            leads = leads.filter(branch=resolve_branch_from_request(request))
-            
-        count = 0
+        branch = resolve_branch_from_request(request)
+        if branch:
+            leads = leads.filter(branch=branch)
+
+        params = {}
         if action == 'ASSIGN':
-            assigned_to_id = serializer.validated_data.get('assigned_to')
-            from accounts.models import User
-            try:
-                user = User.objects.get(id=assigned_to_id)
-                leads.update(assigned_to=user)
-                count = leads.count()
-            except User.DoesNotExist:
+            assigned_to_id = serializer.validated_data['assigned_to']
+            if not User.objects.filter(id=assigned_to_id).exists():
                 return Response({'error': 'User not found'}, status=404)
+            params['assigned_to'] = str(assigned_to_id)
                 
         elif action == 'STATUS_UPDATE':
-            status = serializer.validated_data.get('status')
-            leads.update(status=status)
-            count = leads.count()
+            params['status'] = serializer.validated_data['status']
             
         elif action == 'WHATSAPP_TEMPLATE':
-            template_id = serializer.validated_data.get('template_id')
-            try:
-                template = WhatsAppTemplate.objects.get(id=template_id)
-                # Log interaction for each lead
-                for lead in leads:
-                    LeadInteraction.objects.create(
-                        lead=lead,
-                        type=LeadInteraction.Type.WHATSAPP,
-                        content=template.format_message(lead),
-                        staff=request.user,
-                        branch=lead.branch
-                    )
-                count = leads.count()
-            except WhatsAppTemplate.DoesNotExist:
+            template_id = serializer.validated_data['template_id']
+            if not WhatsAppTemplate.objects.filter(id=template_id).exists():
                 return Response({'error': 'Template not found'}, status=404)
-                
-        return Response({'message': f'Successfully processed {count} leads.'})
+            params['template_id'] = str(template_id)
+
+        # Keep the caller's order; ids outside the branch scope are dropped
+        allowed = set(leads.values_list('id', flat=True))
+        scoped_ids = [str(lead_id) for lead_id in dict.fromkeys(lead_ids) if lead_id in allowed]
+        job = LeadBulkJob.objects.create(
+            action=action,
+            params=params,
+            lead_ids=scoped_ids,
+            total_count=len(scoped_ids),
+            requested_by=request.user,
+            branch=branch,
+        )
+        enqueue_job(job)
+        data = LeadBulkJobSerializer(job).data
+        data['message'] = f'Queued {job.total_count} leads for processing.'
+        return Response(data, status=status.HTTP_202_ACCEPTED)
 
     @action(detail=False, methods=['get'])
     def check_duplicate(self, request):
-        """Real-time duplicate check for email or phone."""
-        email = request.query_params.get('email')
-        phone = request.query_params.get('phone')
+        """
+        Real-time duplicate check for email or phone. Both are compared in
+        normalized form, so case, spacing and phone formatting don't matter.
+        """
+        email = normalize_email(request.query_params.get('email'))
+        phone = normalize_phone(request.query_params.get('phone'))
         
         if not email and not phone:
             return Response({'error': 'Email or phone required'}, status=400)
@@ -182,17 +189,17 @@ class LeadViewSet(AuditLogMixin, BranchIsolationMixin, BranchIsolationCreateMixi
         from django.db.models import Q
         query = Q()
         if email:
-            query |= Q(email=email)
+            query |= Q(email_normalized=email)
         if phone:
-            query |= Q(phone=phone)
+            query |= Q(phone_normalized=phone)
             
-        duplicates = Lead.objects.filter(query)
+        duplicates = Lead.objects.filter(query).select_related('assigned_to').order_by('created_at')
         from core.utils.branch_context import resolve_branch_from_request
         if resolve_branch_from_request(request):
             duplicates = duplicates.filter(branch=resolve_branch_from_request(request))
             
-        if duplicates.exists():
-            duplicate = duplicates.first()
+        duplicate = duplicates.first()
+        if duplicate is not None:
             return Response({
                 'exists': True,
                 'lead': {
@@ -247,7 +254,11 @@ class StudentViewSet(AuditLogMixin, BranchIsolationMixin, BranchIsolationCreateM
     Branch isolation is enforced via BranchIsolationMixin.
     """
     queryset = Student.objects.select_related('branch', 'counselor', 'lead').all()
+    pagination_class = KeysetPagination
     permission_classes = [IsAuthenticated, StudentPermission]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    filterset_fields = {'status': ['exact'], 'profile_completeness': ['gte', 'lte']}
+    ordering_fields = ['created_at', 'profile_completeness']
     
     def get_serializer_class(self):
         if self.action == 'list':
@@ -263,22 +274,14 @@ class StudentViewSet(AuditLogMixin, BranchIsolationMixin, BranchIsolationCreateM
         return queryset.for_user(user)
     
     def perform_create(self, serializer):
-        """Calculate profile completeness on create."""
+        """Assign counselors their own new students (profile completeness is derived on save)."""
         # Call parent's perform_create for branch assignment
         super().perform_create(serializer)
-        # Calculate completeness if instance was created
         if serializer.instance:
             user = self.request.user
             if not user.is_superuser and getattr(user, 'role', None) == User.Role.COUNSELOR and serializer.instance.counselor_id is None:
                 serializer.instance.counselor = user
-            serializer.instance.calculate_profile_completeness()
-            serializer.instance.save()
-    
-    def perform_update(self, serializer):
-        """Recalculate profile completeness on update."""
-        instance = serializer.save()
-        instance.calculate_profile_completeness()
-        instance.save()
+                serializer.instance.save(update_fields=['counselor', 'updated_at'])
 
     @action(detail=True, methods=['get'], permission_classes=[IsAuthenticated, CommunicationPermission])
     def communications(self, request, pk=None):
@@ -403,6 +406,57 @@ class LeadInteractionViewSet(AuditLogMixin, BranchIsolationMixin, BranchIsolatio
         )
 
 
+class LeadMergeCandidateViewSet(BranchIsolationMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Suggested lead duplicates produced by the nightly dedupe job
+    (students.tasks.detect_lead_duplicates), strongest matches first.
+    """
+    queryset = LeadMergeCandidate.objects.select_related(
+        'lead', 'lead__assigned_to', 'duplicate', 'duplicate__assigned_to', 'reviewed_by'
+    ).all()
+    serializer_class = LeadMergeCandidateSerializer
+    permission_classes = [IsAuthenticated, LeadPermission]
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['status', 'lead', 'duplicate']
+
+    @action(detail=True, methods=['post'])
+    def dismiss(self, request, pk=None):
+        """Mark a suggestion as not a duplicate; the pair is not suggested again."""
+        candidate = self.get_object()
+        candidate.status = LeadMergeCandidate.Status.DISMISSED
+        candidate.reviewed_by = request.user
+        candidate.reviewed_at = timezone.now()
+        candidate.save(update_fields=['status', 'reviewed_by', 'reviewed_at', 'updated_at'])
+        return Response(self.get_serializer(candidate).data)
+
+
+class LeadBulkJobViewSet(BranchIsolationMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Progress of bulk lead actions queued through /leads/bulk-action/.
+    Users see the jobs they requested; managers see their branch's jobs.
+    """
+    queryset = LeadBulkJob.objects.select_related('requested_by').all()
+    serializer_class = LeadBulkJobSerializer
+    permission_classes = [IsAuthenticated, LeadPermission]
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['status', 'action']
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        user = self.request.user
+        if not user.is_superuser and getattr(user, 'role', None) == User.Role.COUNSELOR:
+            return queryset.filter(requested_by=user)
+        return queryset
+
+    @action(detail=True, methods=['post'])
+    def resume(self, request, pk=None):
+        """Re-queue a failed or stalled job from its first unprocessed chunk."""
+        job = self.get_object()
+        if not can_resume(job) or not resume_job(job):
+            return Response({'error': 'Only failed or stalled jobs can be resumed'}, status=400)
+        return Response(self.get_serializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+
 class WhatsAppTemplateViewSet(AuditLogMixin, BranchIsolationMixin, BranchIsolationCreateMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing WhatsApp Message Templates.
@@ -414,9 +468,6 @@ class WhatsAppTemplateViewSet(AuditLogMixin, BranchIsolationMixin, BranchIsolati
 
 # Dashboard Statistics API
 from rest_framework.views import APIView
-from rest_framework.response import Response
-from applications.models import Application
-from visas.models import VisaCase
 from core.utils.branch_context import resolve_branch_from_request, is_hq_user
 
 
@@ -489,89 +540,30 @@ class DashboardStatsView(APIView):
                 'visa_alerts': []
             })
         
-        # Build querysets with branch filter
-        if branch is None:
-            # Full access
-            students_qs = Student.objects.all()
-            leads_qs = Lead.objects.all()
-            applications_qs = Application.objects.all()
-            visas_qs = VisaCase.objects.all()
-        else:
-            # Branch filtered
-            students_qs = Student.objects.filter(branch=branch)
-            leads_qs = Lead.objects.filter(branch=branch)
-            applications_qs = Application.objects.filter(student__branch=branch)
-            visas_qs = VisaCase.objects.filter(student__branch=branch)
-
-        # Counselor scope: only own students/leads
+        # Shared cards for the scope (cached); counselors only see their own students/leads
+        counselor = None
         if not user.is_superuser and getattr(user, 'role', None) == User.Role.COUNSELOR:
-            students_qs = students_qs.filter(counselor=user)
-            leads_qs = leads_qs.filter(assigned_to=user)
-            applications_qs = applications_qs.filter(student__counselor=user)
-            visas_qs = visas_qs.filter(student__counselor=user)
-        
-        # Calculate statistics
-        total_students = students_qs.count()
-        total_leads = leads_qs.count()
-        
-        # New leads today
-        today = datetime.datetime.now().date()
-        new_leads_today = leads_qs.filter(created_at__date=today).count()
-        
-        # Active applications (not rejected or draft)
-        active_applications = applications_qs.exclude(
-            status__in=[
-                Application.Status.REJECTED,
-                Application.Status.DOCUMENTS_READY,  # Treating as "draft"
-            ]
-        ).count()
-        
-        # Pending visas
-        pending_visas = visas_qs.filter(
-            decision_status=VisaCase.DecisionStatus.PENDING
-        ).count()
-        
-        # Visa success rate
-        total_decided = visas_qs.exclude(
-            decision_status=VisaCase.DecisionStatus.PENDING
-        ).count()
-        
-        granted_visas = visas_qs.filter(
-            decision_status=VisaCase.DecisionStatus.APPROVED
-        ).count()
-        
-        if total_decided > 0:
-            visa_success_rate = round((granted_visas / total_decided) * 100, 1)
-        else:
-            visa_success_rate = 0.0
+            counselor = user
+        scope = scope_stats(branch, counselor)
+        total_students = scope['total_students']
+        total_leads = scope['total_leads']
+        active_applications = scope['active_applications']
+        total_revenue = scope['total_revenue']
         
         # --------------------------------------------------------
-        # NEW: Tasks List
+        # Tasks List (per user, not cached)
         # --------------------------------------------------------
         pending_tasks_count = 0
         recent_tasks_data = []
         try:
             from tasks.models import Task
             
-            # Base task query
-            tasks_qs = Task.objects.filter(status='PENDING')
-            
-            # Filter by branch if needed
-            if branch:
-                # If tasks have branch field via TenantAwareModel logic or student connection
-                # For now assume tasks are filtered by assigned_to or student branch if possible
-                # But safer to filter by assigned_to for now
-                pass
-
-            # Filter by user (everyone sees their own tasks)
-            # If manager/admin want to see team tasks, we can adjust logic later
-            # For now: Only show tasks assigned TO the user
-            my_tasks_qs = tasks_qs.filter(assigned_to=user).order_by('due_date')
-            
+            # Only show tasks assigned TO the user
+            my_tasks_qs = Task.objects.filter(status='PENDING', assigned_to=user)
             pending_tasks_count = my_tasks_qs.count()
             
             # Get top 5 urgent/upcoming
-            recent_tasks = my_tasks_qs[:5]
+            recent_tasks = my_tasks_qs.select_related('student').order_by('due_date')[:5]
             for t in recent_tasks:
                 recent_tasks_data.append({
                     'id': str(t.id),
@@ -583,28 +575,15 @@ class DashboardStatsView(APIView):
                 })
         except Exception:
             pass
-        
-        # --------------------------------------------------------
-        # NEW: Pipeline Statistics (Funnel)
-        # --------------------------------------------------------
-        from django.db.models import Count
-        p_stats = applications_qs.values('status').annotate(count=Count('id')).order_by('count')
-        pipeline_data = []
-        # Mapping status to readable label if needed, or just use status code
-        for item in p_stats:
-            pipeline_data.append({
-                'stage': item['status'],
-                'count': item['count']
-            })
 
         # --------------------------------------------------------
-        # NEW: Recent Activity Feed
+        # Recent Activity Feed (not cached)
         # --------------------------------------------------------
         recent_activities_data = []
         try:
             from audit.models import AuditLog
             # Filter logs relevant to this branch or user
-            audit_qs = AuditLog.objects.all()
+            audit_qs = AuditLog.objects.select_related('actor')
             if branch:
                 audit_qs = audit_qs.filter(branch=branch)
             
@@ -623,52 +602,6 @@ class DashboardStatsView(APIView):
         except Exception:
             pass
 
-        # --------------------------------------------------------
-        # NEW: Visa Alerts (Urgent Cases)
-        # --------------------------------------------------------
-        visa_alerts_data = []
-        # Simple logic: Pending visas created > 14 days ago (stalled)
-        fourteen_days_ago = timezone.now() - timezone.timedelta(days=14)
-        stalled_visas = visas_qs.filter(
-            decision_status=VisaCase.DecisionStatus.PENDING,
-            created_at__lte=fourteen_days_ago
-        ).order_by('created_at')[:5]
-        
-        for v in stalled_visas:
-            visa_alerts_data.append({
-                'id': str(v.id),
-                'student_name': str(v.student),
-                'country': v.student.target_country if v.student else 'Unknown',
-                'days_pending': (timezone.now().date() - v.created_at.date()).days
-            })
-
-        # --------------------------------------------------------
-        # NEW: Analytics & Revenue
-        # --------------------------------------------------------
-        from django.db.models import Sum, Count
-        from finance.models import Transaction
-        
-        # Revenue calculation (Sum of PAID CREDIT transactions)
-        if branch is None:
-            revenue_qs = Transaction.objects.filter(status='PAID', transaction_type='CREDIT')
-        else:
-            revenue_qs = Transaction.objects.filter(student__branch=branch, status='PAID', transaction_type='CREDIT')
-            
-        total_revenue = revenue_qs.aggregate(total=Sum('amount'))['total'] or 0.0
-        
-        # Monthly Revenue Trend (Last 6 months)
-        six_months_ago = timezone.now() - timezone.timedelta(days=180)
-        revenue_trend = (
-            revenue_qs.filter(created_at__gte=six_months_ago)
-            .annotate(month=TruncMonth('created_at'))
-            .values('month')
-            .annotate(amount=Sum('amount'))
-            .order_by('month')
-        )
-            
-        # Lead Source Breakdown
-        source_stats = leads_qs.values('source').annotate(count=Count('id')).order_by('-count')
-        
         # Build quick stats for dashboard cards
         quick_stats = [
             {'label': 'Total Students', 'value': total_students, 'icon': 'users', 'color': 'blue'},
@@ -683,21 +616,21 @@ class DashboardStatsView(APIView):
                 'total_students': total_students,
                 'total_leads': total_leads,
                 'active_applications': active_applications,
-                'pending_visas': pending_visas,
-                'visa_success_rate': visa_success_rate,
-                'new_leads_today': new_leads_today,
+                'pending_visas': scope['pending_visas'],
+                'visa_success_rate': scope['visa_success_rate'],
+                'new_leads_today': scope['new_leads_today'],
                 'pending_tasks': pending_tasks_count,
                 'total_revenue': float(total_revenue),
             },
             'analytics': {
-                'revenue_trend': list(revenue_trend),
-                'lead_sources': list(source_stats),
+                'revenue_trend': scope['revenue_trend'],
+                'lead_sources': scope['lead_sources'],
             },
             'quick_stats': quick_stats,
             'recent_tasks': recent_tasks_data,
             'recent_activities': recent_activities_data,
-            'pipeline_stats': pipeline_data,
-            'visa_alerts': visa_alerts_data
+            'pipeline_stats': scope['pipeline_stats'],
+            'visa_alerts': scope['visa_alerts']
         })
     
     def _get_user_permissions(self, user):
@@ -1,24 +1,21 @@
-from django.db.models.signals import post_save
-from django.dispatch import receiver
 from django.utils import timezone
 from django.db.models import Q
 from datetime import timedelta
-from applications.models import Application
+from applications.events import on_status_changed
 from .models import Task, TaskTemplate
 from accounts.models import User
 
-@receiver(post_save, sender=Application)
-def auto_generate_tasks(sender, instance, created, **kwargs):
+@on_status_changed()
+def auto_generate_tasks(application, event):
     """
-    Automatically generate tasks based on Application status and country.
+    Automatically generate tasks based on Application status and country,
+    for every status an application enters (an applications.events handler).
     """
-    # Determine the trigger status
-    # If the application was just created, we might want to trigger 'NEW' or 'DRAFT' tasks.
-    # Otherwise, we check if the status changed (though post_save doesn't directly tell us the old status
-    # without some tricks, but for this CRM, we can trigger based on current status if no task exists yet).
-    
-    current_status = instance.status
-    country = instance.university.country if instance.university else None
+    # The trigger status is the one the application just entered; new
+    # applications also get the 'Global' templates without a status.
+    current_status = event.to_status
+    created = event.created
+    country = application.university.country if application.university else None
     
     # Find active templates matching country and current status
     templates = TaskTemplate.objects.filter(is_active=True).filter(
@@ -34,16 +31,16 @@ def auto_generate_tasks(sender, instance, created, **kwargs):
 
     for template in templates:
         # Check if this task already exists for this student to avoid duplicates
-        if not Task.objects.filter(student=instance.student, title=template.title).exists():
+        if not Task.objects.filter(student=application.student, title=template.title).exists():
             # Determine assignee: Counselor or Manager
-            assignee = instance.student.counselor
-            if not assignee and instance.branch:
+            assignee = application.student.counselor
+            if not assignee and application.branch:
                 # Fallback to any branch manager
-                assignee = User.objects.filter(branch=instance.branch, role=User.Role.BRANCH_MANAGER).first()
+                assignee = User.objects.filter(branch=application.branch, role=User.Role.BRANCH_MANAGER).first()
             
             if not assignee:
                 # Final fallback to whoever created the app if they have a role
-                assignee = getattr(instance, 'created_by', None)
+                assignee = getattr(application, 'created_by', None)
 
             if assignee:
                 Task.objects.create(
@@ -52,8 +49,8 @@ def auto_generate_tasks(sender, instance, created, **kwargs):
                     category=template.category,
                     assigned_to=assignee,
                     created_by=assignee, # Can be system user later if needed
-                    student=instance.student,
+                    student=application.student,
                     due_date=timezone.now() + timedelta(days=template.due_days_offset),
-                    branch=instance.branch,
+                    branch=application.branch,
                     priority=Task.Priority.MEDIUM
                 )
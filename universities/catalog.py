@@ -0,0 +1,124 @@
+"""
+Catalog versioning and read cache for university/course master data.
+
+The catalog version is a token stored in the default cache and replaced on
+every University/Course/CourseRequirement/Scholarship/IntakeDate (and
+LivingCostEstimate) write, see universities.signals. Read-heavy consumers
+(eligibility engine, recommendations, catalog endpoints) key their cached
+state on it, so nothing has to be deleted on invalidation: entries for an
+old version simply stop being read and expire.
+
+Production uses the Redis cache backend (REDIS_CACHE_URL); development
+falls back to local memory, which is per-process.
+"""
+import hashlib
+import json
+import uuid
+
+from django.core.cache import cache, caches
+from django.db import transaction
+
+from .models import University, Course, CourseRequirement, Scholarship, IntakeDate, LivingCostEstimate
+
+
+CATALOG_MODELS = (University, Course, CourseRequirement, Scholarship, IntakeDate, LivingCostEstimate)
+
+CATALOG_VERSION_KEY = 'catalog:version'
+CATALOG_CACHE_TIMEOUT = 60 * 60 * 6
+
+# Endpoints served through catalog_cached(), reported by catalog_cache_stats()
+CATALOG_CACHE_NAMESPACES = (
+    'course_stats',
+    'course_facets',
+    'intake_calendar',
+    'university_analytics',
+    'compare_courses',
+    'course_requirements',
+    'living_cost',
+    'lead_suggestions',
+)
+
+_MISSING = object()
+
+
+def get_catalog_version():
+    """Return the current catalog version token."""
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        cache.add(CATALOG_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+        version = cache.get(CATALOG_VERSION_KEY)
+    return version
+
+
+def bump_catalog_version():
+    """
+    Invalidate everything keyed on the catalog version.
+    Bumped immediately and again on commit, so readers that cached
+    pre-commit data during the write transaction are invalidated too.
+    """
+    cache.set(CATALOG_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+    transaction.on_commit(lambda: cache.set(CATALOG_VERSION_KEY, uuid.uuid4().hex, timeout=None))
+
+
+def _stats_key(namespace, outcome):
+    return f'catalog:stats:{namespace}:{outcome}'
+
+
+def _record(namespace, outcome):
+    key = _stats_key(namespace, outcome)
+    if not cache.add(key, 1, timeout=None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            # Expired/evicted between add() and incr()
+            cache.set(key, 1, timeout=None)
+
+
+def catalog_cached(namespace, params, compute, timeout=CATALOG_CACHE_TIMEOUT):
+    """
+    Return compute() for the given request params, cached until the
+    catalog version changes. params must be JSON-serializable; a None
+    result (e.g. not found) is returned but not cached.
+    """
+    signature = hashlib.md5(
+        json.dumps(params, sort_keys=True, default=str).encode()
+    ).hexdigest()
+    key = f'catalog:{namespace}:{get_catalog_version()}:{signature}'
+
+    value = cache.get(key, _MISSING)
+    if value is not _MISSING:
+        _record(namespace, 'hits')
+        return value
+
+    _record(namespace, 'misses')
+    value = compute()
+    if value is not None:
+        cache.set(key, value, timeout)
+    return value
+
+
+def catalog_cache_stats():
+    """Hit/miss counters per cached endpoint, for monitoring."""
+    keys = [
+        _stats_key(namespace, outcome)
+        for namespace in CATALOG_CACHE_NAMESPACES
+        for outcome in ('hits', 'misses')
+    ]
+    counters = cache.get_many(keys)
+
+    endpoints = {}
+    for namespace in CATALOG_CACHE_NAMESPACES:
+        hits = counters.get(_stats_key(namespace, 'hits'), 0)
+        misses = counters.get(_stats_key(namespace, 'misses'), 0)
+        total = hits + misses
+        endpoints[namespace] = {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / total, 3) if total else None,
+        }
+
+    return {
+        'version': get_catalog_version(),
+        'backend': caches['default'].__class__.__name__,
+        'endpoints': endpoints,
+    }
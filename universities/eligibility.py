@@ -0,0 +1,327 @@
+"""
+In-memory eligibility engine for the Course Finder.
+
+Partner courses, their country-specific requirements and active scholarships
+are loaded into compact NumPy column arrays once per catalog version. Each
+eligibility request is then scored as a single vectorized pass over every
+partner course, and only the top-k rows are materialized for the response.
+"""
+import threading
+
+import numpy as np
+
+from .catalog import get_catalog_version
+from .models import Course, CourseRequirement, Scholarship
+
+
+def _truthy_float(value):
+    """Nullable decimal -> float, with None mapped to 0 (treated as 'no requirement')."""
+    return float(value) if value else 0.0
+
+
+def _top_k(scores, k):
+    """
+    Indices of the k highest scores, ties broken by catalog order.
+    Uses argpartition so ranking cost does not grow with a full sort.
+    """
+    n = len(scores)
+    if n == 0 or k <= 0:
+        return np.empty(0, dtype=np.int64)
+    # Unique composite key: higher score first, then earlier position first
+    key = scores.astype(np.int64) * n + (n - 1 - np.arange(n, dtype=np.int64))
+    if k < n:
+        candidates = np.argpartition(-key, k - 1)[:k]
+    else:
+        candidates = np.arange(n)
+    return candidates[np.argsort(-key[candidates])]
+
+
+class CatalogSnapshot:
+    """
+    Column-oriented snapshot of the partner course catalog.
+    Row i of every course column describes the same course.
+    """
+
+    def __init__(self, version):
+        self.version = version
+
+        rows = list(
+            Course.objects.filter(university__is_partner=True)
+            .order_by('university__name', 'name')
+            .values_list(
+                'id', 'university_id', 'level', 'tuition_fee', 'ielts_overall',
+                'intake_january', 'intake_may', 'intake_september',
+                'work_experience_required', 'is_data_verified',
+            )
+        )
+
+        self.course_ids = [row[0] for row in rows]
+        self.course_index = {course_id: i for i, course_id in enumerate(self.course_ids)}
+
+        self.university_ids = list(dict.fromkeys(row[1] for row in rows))
+        university_index = {uni_id: i for i, uni_id in enumerate(self.university_ids)}
+
+        self.course_university = np.array([university_index[row[1]] for row in rows], dtype=np.int64)
+        self.level = np.array([(row[2] or '').upper() for row in rows], dtype=str)
+        self.tuition = np.array([float(row[3] or 0) for row in rows], dtype=np.float64)
+        self.ielts = np.array([_truthy_float(row[4]) for row in rows], dtype=np.float64)
+        self.intake_jan = np.array([row[5] for row in rows], dtype=bool)
+        self.intake_may = np.array([row[6] for row in rows], dtype=bool)
+        self.intake_sep = np.array([row[7] for row in rows], dtype=bool)
+        self.work_required = np.array([row[8] for row in rows], dtype=bool)
+        self.verified = np.array([row[9] for row in rows], dtype=bool)
+
+        self._load_requirements()
+        self._load_scholarships(university_index)
+
+    def __len__(self):
+        return len(self.course_ids)
+
+    def _load_requirements(self):
+        """Group country requirements into per-country column arrays."""
+        grouped = {}
+        for course_id, country, min_pct, work_req, work_years, min_qual in (
+            CourseRequirement.objects.filter(course__university__is_partner=True)
+            .values_list(
+                'course_id', 'country', 'min_percentage',
+                'work_experience_required', 'work_experience_years', 'min_qualification',
+            )
+        ):
+            position = self.course_index.get(course_id)
+            if position is None:
+                continue
+            bucket = grouped.setdefault(country, {
+                'course': [], 'min_percentage': [], 'work_required': [],
+                'work_years': [], 'min_qualification': [],
+            })
+            bucket['course'].append(position)
+            bucket['min_percentage'].append(min_pct or 0)
+            bucket['work_required'].append(bool(work_req))
+            bucket['work_years'].append(work_years or 0)
+            bucket['min_qualification'].append(min_qual)
+
+        self.requirements = {}
+        for country, bucket in grouped.items():
+            self.requirements[country] = {
+                'course': np.array(bucket['course'], dtype=np.int64),
+                'min_percentage': np.array(bucket['min_percentage'], dtype=np.int64),
+                'work_required': np.array(bucket['work_required'], dtype=bool),
+                'work_years': np.array(bucket['work_years'], dtype=np.int64),
+                'min_qualification': bucket['min_qualification'],
+            }
+
+    def _load_scholarships(self, university_index):
+        """Load active scholarships, ordered by value (highest first)."""
+        rows = [
+            row for row in Scholarship.objects.filter(is_active=True)
+            .order_by('-value')
+            .values_list('university_id', 'name', 'amount_type', 'value', 'min_cgpa', 'min_ielts')
+            if row[0] in university_index
+        ]
+        self.scholarship_university = np.array([university_index[row[0]] for row in rows], dtype=np.int64)
+        self.scholarship_names = [row[1] for row in rows]
+        self.scholarship_types = [row[2] for row in rows]
+        self.scholarship_is_pct = np.array(
+            [row[2] == Scholarship.AmountType.PERCENTAGE for row in rows], dtype=bool
+        )
+        self.scholarship_value = np.array([float(row[3]) for row in rows], dtype=np.float64)
+        self.scholarship_min_cgpa = np.array([_truthy_float(row[4]) for row in rows], dtype=np.float64)
+        self.scholarship_min_ielts = np.array([_truthy_float(row[5]) for row in rows], dtype=np.float64)
+
+    def _first_per_university(self, mask):
+        """For each university, the first (highest value) scholarship index under mask, else -1."""
+        best = np.full(len(self.university_ids), -1, dtype=np.int64)
+        indices = np.flatnonzero(mask)
+        if len(indices):
+            universities, first = np.unique(self.scholarship_university[indices], return_index=True)
+            best[universities] = indices[first]
+        return best
+
+    def best_scholarships(self, ielts, percentage):
+        """
+        Best eligible scholarship per course.
+        Returns (scholarship index or -1, potential savings) arrays.
+        """
+        n = len(self)
+        if not len(self.scholarship_value):
+            return np.full(n, -1, dtype=np.int64), np.zeros(n, dtype=np.float64)
+
+        eligible = ~(
+            ((self.scholarship_min_cgpa > 0) & (percentage < self.scholarship_min_cgpa)) |
+            ((self.scholarship_min_ielts > 0) & (ielts < self.scholarship_min_ielts))
+        )
+        pct_idx = self._first_per_university(eligible & self.scholarship_is_pct)[self.course_university]
+        fixed_idx = self._first_per_university(eligible & ~self.scholarship_is_pct)[self.course_university]
+
+        pct_savings = np.where(pct_idx >= 0, self.tuition * self.scholarship_value[pct_idx] / 100, 0.0)
+        fixed_savings = np.where(fixed_idx >= 0, self.scholarship_value[fixed_idx], 0.0)
+
+        # On equal savings keep whichever scholarship ranks first by value
+        use_pct = (pct_savings > fixed_savings) | (
+            (pct_savings == fixed_savings) & (pct_idx >= 0) & ((fixed_idx < 0) | (pct_idx < fixed_idx))
+        )
+        best = np.where(use_pct, pct_idx, fixed_idx)
+        savings = np.where(use_pct, pct_savings, fixed_savings)
+        best = np.where(savings > 0, best, -1)
+        savings = np.where(best >= 0, savings, 0.0)
+        return best, savings
+
+
+class EligibilityEngine:
+    """
+    Scores a student profile against the partner catalog.
+    The snapshot is rebuilt lazily whenever the catalog version changes.
+    """
+
+    _snapshot = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_snapshot(cls):
+        version = get_catalog_version()
+        snapshot = cls._snapshot
+        if snapshot is None or snapshot.version != version:
+            with cls._lock:
+                if cls._snapshot is None or cls._snapshot.version != version:
+                    cls._snapshot = CatalogSnapshot(version)
+                snapshot = cls._snapshot
+        return snapshot
+
+    @classmethod
+    def match(cls, profile: dict, top_k=50, request=None):
+        """
+        Match partner courses against a student profile.
+
+        profile keys: country, ielts_score (Decimal), percentage, has_work_exp,
+        work_exp_years, level, max_fee, intake ('jan'/'may'/'sep').
+        Returns (total_matches, ranked course result dicts).
+        """
+        snapshot = cls.get_snapshot()
+        n = len(snapshot)
+        if n == 0:
+            return 0, []
+
+        ielts_score = profile['ielts_score']
+        ielts = float(ielts_score)
+        percentage = profile['percentage']
+        has_work_exp = bool(profile['has_work_exp'])
+        work_exp_years = profile['work_exp_years']
+
+        # Candidate filters
+        mask = np.ones(n, dtype=bool)
+        if profile.get('level'):
+            mask &= snapshot.level == str(profile['level']).upper()
+        if profile.get('max_fee'):
+            mask &= snapshot.tuition <= float(profile['max_fee'])
+        intake = profile.get('intake')
+        if intake == 'jan':
+            mask &= snapshot.intake_jan
+        elif intake == 'may':
+            mask &= snapshot.intake_may
+        elif intake == 'sep':
+            mask &= snapshot.intake_sep
+        if not has_work_exp:
+            mask &= ~snapshot.work_required
+
+        # IELTS check
+        ielts_short = (snapshot.ielts > 0) & (ielts < snapshot.ielts)
+        score = np.where(ielts_short, 0, 20).astype(np.int64)
+
+        # Country-specific requirements scattered onto course positions
+        has_req = np.zeros(n, dtype=bool)
+        req_row = np.full(n, -1, dtype=np.int64)
+        min_pct = np.zeros(n, dtype=np.int64)
+        work_req = np.zeros(n, dtype=bool)
+        work_years = np.zeros(n, dtype=np.int64)
+        requirement = snapshot.requirements.get(profile['country'])
+        if requirement:
+            positions = requirement['course']
+            has_req[positions] = True
+            req_row[positions] = np.arange(len(positions))
+            min_pct[positions] = requirement['min_percentage']
+            work_req[positions] = requirement['work_required']
+            work_years[positions] = requirement['work_years']
+
+        pct_short = has_req & (min_pct > 0) & (percentage < min_pct)
+        work_missing = has_req & work_req & (not has_work_exp)
+        years_short = has_req & ~work_missing & (work_years > work_exp_years)
+        score += np.where(
+            has_req,
+            np.where(pct_short, 0, 20) + np.where(work_missing | years_short, 0, 20),
+            40,
+        )
+
+        # Scholarship, partner and verified-data bonuses
+        best_scholarship, savings = snapshot.best_scholarships(ielts, percentage)
+        score += np.where(best_scholarship >= 0, 15, 0)
+        score += 15
+        score += np.where(snapshot.verified, 10, 0)
+        score = np.minimum(score, 100)
+
+        candidates = np.flatnonzero(mask)
+        top = candidates[_top_k(score[candidates], top_k)]
+
+        courses = Course.objects.select_related('university').in_bulk(
+            [snapshot.course_ids[i] for i in top]
+        )
+
+        results = []
+        for i in top:
+            course = courses.get(snapshot.course_ids[i])
+            if course is None:
+                continue
+
+            issues = []
+            if ielts_short[i]:
+                issues.append(f"IELTS {course.ielts_overall} required, you have {ielts_score}")
+            if pct_short[i]:
+                issues.append(f"Min {min_pct[i]}% required, you have {percentage}%")
+            if work_missing[i]:
+                issues.append("Work experience required")
+            elif years_short[i]:
+                issues.append(f"{work_years[i]} years experience required")
+
+            if work_missing[i]:
+                eligibility_status = 'ineligible'
+            elif issues:
+                eligibility_status = 'conditional'
+            else:
+                eligibility_status = 'eligible'
+
+            matching_s = None
+            s_idx = best_scholarship[i]
+            if s_idx >= 0:
+                matching_s = {
+                    'name': snapshot.scholarship_names[s_idx],
+                    'value': float(snapshot.scholarship_value[s_idx]),
+                    'amount_type': snapshot.scholarship_types[s_idx],
+                    'potential_savings': round(float(savings[i]), 2),
+                }
+
+            university = course.university
+            logo = None
+            if university.logo:
+                logo = request.build_absolute_uri(university.logo.url) if request else university.logo.url
+
+            results.append({
+                'id': course.id,
+                'name': course.name,
+                'university_name': university.name,
+                'university_city': university.city,
+                'university_logo': logo,
+                'is_partner': university.is_partner,
+                'level': course.level,
+                'tuition_fee': float(course.tuition_fee),
+                'currency': course.currency,
+                'ielts_required': float(course.ielts_overall) if course.ielts_overall else None,
+                'intakes': course.intakes,
+                'official_url': course.official_url,
+                'match_score': int(score[i]),
+                'eligibility_status': eligibility_status,
+                'issues': issues,
+                'country_requirements': requirement['min_qualification'][req_row[i]] if has_req[i] else None,
+                'matching_scholarship': matching_s,
+                'total_savings': round(float(savings[i]), 2) if savings[i] > 0 else None,
+            })
+
+        return int(mask.sum()), results
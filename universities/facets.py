@@ -0,0 +1,113 @@
+"""
+Facet counts for the course finder filter chips.
+
+All dimensions are counted from one GROUP BY over the filtered Course
+queryset: each group is a distinct combination of facet values, and the
+per-dimension counts are rolled up from those groups in Python. The number
+of groups is bounded by the (small) facet domains, not by the catalog size.
+"""
+from decimal import Decimal
+
+from django.db.models import Case, CharField, Count, Value, When
+
+from .models import Course, University
+
+
+# (key, label, exclusive upper bound); the last band is open-ended
+FEE_BANDS = (
+    ('under_10k', 'Under 10,000', Decimal('10000')),
+    ('10k_15k', '10,000 - 15,000', Decimal('15000')),
+    ('15k_20k', '15,000 - 20,000', Decimal('20000')),
+    ('20k_30k', '20,000 - 30,000', Decimal('30000')),
+    ('30k_plus', '30,000+', None),
+)
+
+IELTS_BANDS = (
+    ('none', 'No IELTS requirement', None),
+    ('under_6', 'Below 6.0', Decimal('6.0')),
+    ('6_0', '6.0', Decimal('6.5')),
+    ('6_5', '6.5', Decimal('7.0')),
+    ('7_plus', '7.0+', None),
+)
+
+INTAKES = (
+    ('january', 'January', 'intake_january'),
+    ('may', 'May', 'intake_may'),
+    ('september', 'September', 'intake_september'),
+)
+
+
+def _fee_band():
+    bounded = [When(tuition_fee__lt=bound, then=Value(key)) for key, _label, bound in FEE_BANDS if bound]
+    return Case(*bounded, default=Value(FEE_BANDS[-1][0]), output_field=CharField())
+
+
+def _ielts_band():
+    bounded = [When(ielts_overall__lt=bound, then=Value(key)) for key, _label, bound in IELTS_BANDS if bound]
+    return Case(
+        When(ielts_overall__isnull=True, then=Value(IELTS_BANDS[0][0])),
+        *bounded,
+        default=Value(IELTS_BANDS[-1][0]),
+        output_field=CharField(),
+    )
+
+
+def course_facets(queryset):
+    """
+    Counts per facet value for a (filtered) Course queryset.
+    Returns {'total': n, 'facets': {dimension: [{value, label, count}]}}.
+    """
+    groups = (
+        queryset
+        .order_by()
+        .annotate(facet_fee_band=_fee_band(), facet_ielts_band=_ielts_band())
+        .values(
+            'level', 'university__country', 'university__is_partner', 'is_data_verified',
+            'intake_january', 'intake_may', 'intake_september',
+            'facet_fee_band', 'facet_ielts_band',
+        )
+        .annotate(count=Count('id'))
+    )
+
+    total = 0
+    level, country, fee_band, ielts_band = {}, {}, {}, {}
+    intake = {key: 0 for key, _label, _field in INTAKES}
+    partner = {True: 0, False: 0}
+    verified = {True: 0, False: 0}
+    for group in groups:
+        count = group['count']
+        total += count
+        level[group['level']] = level.get(group['level'], 0) + count
+        country[group['university__country']] = country.get(group['university__country'], 0) + count
+        fee_band[group['facet_fee_band']] = fee_band.get(group['facet_fee_band'], 0) + count
+        ielts_band[group['facet_ielts_band']] = ielts_band.get(group['facet_ielts_band'], 0) + count
+        partner[group['university__is_partner']] += count
+        verified[group['is_data_verified']] += count
+        for key, _label, field in INTAKES:
+            if group[field]:
+                intake[key] += count
+
+    level_labels = dict(Course.Level.choices)
+    country_labels = dict(University.Country.choices)
+    return {
+        'total': total,
+        'facets': {
+            'level': _ranked(level, level_labels),
+            'country': _ranked(country, country_labels),
+            'intake': [{'value': key, 'label': label, 'count': intake[key]} for key, label, _field in INTAKES],
+            'fee_band': [{'value': key, 'label': label, 'count': fee_band.get(key, 0)} for key, label, _bound in FEE_BANDS],
+            'ielts_band': [
+                {'value': key, 'label': label, 'count': ielts_band.get(key, 0)} for key, label, _bound in IELTS_BANDS
+            ],
+            'is_partner': [{'value': value, 'count': partner[value]} for value in (True, False)],
+            'verified': [{'value': value, 'count': verified[value]} for value in (True, False)],
+        },
+    }
+
+
+def _ranked(counts, labels):
+    """Facet values with their counts, most common first."""
+    return [
+        {'value': value, 'label': labels.get(value, value), 'count': count}
+        for value, count in sorted(counts.items(), key=lambda item: (-item[1], str(item[0])))
+    ]
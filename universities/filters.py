@@ -1,6 +1,8 @@
 import django_filters
 from django.db.models import Q
+from rest_framework.filters import OrderingFilter
 from .models import Course
+from .search import search_courses
 
 
 class CourseFilter(django_filters.FilterSet):
@@ -46,14 +48,22 @@ class CourseFilter(django_filters.FilterSet):
         ]
     
     def filter_search(self, queryset, name, value):
-        """Full-text search across course and university."""
+        """Indexed full-text search across course and university, ranked by relevance."""
         if not value:
             return queryset
-        return queryset.filter(
-            Q(name__icontains=value) |
-            Q(university__name__icontains=value) |
-            Q(department__icontains=value)
-        )
+        return search_courses(queryset, value)
+
+
+class RelevanceOrderingFilter(OrderingFilter):
+    """
+    OrderingFilter that keeps relevance order on searched querysets.
+    An explicit ?ordering= still wins.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        if 'search_rank' in queryset.query.annotations and not request.query_params.get(self.ordering_param):
+            return queryset
+        return super().filter_queryset(request, queryset, view)
 
 
 class EligibilityFilter(django_filters.FilterSet):
@@ -0,0 +1,91 @@
+"""
+Materialized commission pipeline.
+
+UniversityCommissionForecast keeps, per university, the number of
+applications and their tuition total in each forecast bucket. Rows are
+computed with one conditional-aggregation GROUP BY and refreshed for the
+affected universities whenever an Application's status, tuition fee,
+university or deletion flag changes (see universities.signals).
+"""
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, DecimalField, Q, Sum, Value
+from django.db.models.functions import Coalesce
+
+from .models import UniversityCommissionForecast
+
+
+# bucket -> (application statuses, probability of the commission landing)
+FORECAST_BUCKETS = {
+    'pending': (('SUBMITTED', 'UNDER_REVIEW', 'DOCUMENTS_READY'), Decimal('0.3')),
+    'offer': (('UNCONDITIONAL_OFFER', 'OFFER_ACCEPTED', 'CONDITIONAL_OFFER'), Decimal('0.6')),
+    'cas_received': (('CAS_RECEIVED', 'CAS_REQUESTED'), Decimal('0.9')),
+    'enrolled': (('ENROLLED',), Decimal('1')),
+}
+
+
+def bucket_for(status):
+    """Forecast bucket for an application status, or None if it does not count."""
+    for bucket, (statuses, _probability) in FORECAST_BUCKETS.items():
+        if status in statuses:
+            return bucket
+    return None
+
+
+def pipeline_aggregates(applications):
+    """
+    Per-university bucket counts and tuition totals for an Application
+    queryset, as one GROUP BY with conditional aggregation.
+    """
+    aggregates = {}
+    for bucket, (statuses, _probability) in FORECAST_BUCKETS.items():
+        in_bucket = Q(status__in=statuses)
+        aggregates[f'{bucket}_count'] = Count('id', filter=in_bucket)
+        aggregates[f'{bucket}_tuition'] = Coalesce(
+            Sum('tuition_fee', filter=in_bucket),
+            Value(Decimal('0')),
+            output_field=DecimalField(max_digits=14, decimal_places=2),
+        )
+    return (
+        applications
+        .filter(university__isnull=False)
+        .order_by()
+        .values('university_id')
+        .annotate(**aggregates)
+    )
+
+
+def refresh_forecast(university_ids=None):
+    """
+    Recompute forecast rows for the given universities (all when None).
+    Universities with no counted applications lose their row.
+    """
+    from applications.models import Application
+
+    applications = Application.objects.all()
+    existing = UniversityCommissionForecast.objects.all()
+    if university_ids is not None:
+        university_ids = [uid for uid in university_ids if uid]
+        if not university_ids:
+            return 0
+        applications = applications.filter(university_id__in=university_ids)
+        existing = existing.filter(university_id__in=university_ids)
+
+    rows = [
+        UniversityCommissionForecast(**row)
+        for row in pipeline_aggregates(applications)
+        if any(row[f'{bucket}_count'] for bucket in FORECAST_BUCKETS)
+    ]
+    update_fields = [field for bucket in FORECAST_BUCKETS for field in (f'{bucket}_count', f'{bucket}_tuition')]
+
+    with transaction.atomic():
+        existing.exclude(university_id__in=[row.university_id for row in rows]).delete()
+        UniversityCommissionForecast.objects.bulk_create(
+            rows,
+            batch_size=500,
+            update_conflicts=True,
+            unique_fields=['university'],
+            update_fields=update_fields + ['updated_at'],
+        )
+    return len(rows)
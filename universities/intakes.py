@@ -0,0 +1,86 @@
+"""
+Intake calendar.
+
+IntakeDate.month is free text; month_num/intake_date hold its normalized
+form and are indexed together with year, so the calendar is read with one
+query already ordered by (year, month) and grouped into month buckets as
+rows stream in. Buckets are cached through the catalog cache, which every
+IntakeDate write invalidates.
+"""
+from itertools import groupby
+
+from django.db import transaction
+from django.db.models import Case, F, Value, When
+
+from .models import IntakeDate, MONTH_NAMES, month_number
+
+
+def backfill_intake_months(model=IntakeDate, batch_size=1000):
+    """
+    Recompute month_num/intake_date for every intake (including
+    soft-deleted ones) whose stored values are stale. `model` may be a
+    historical model inside a migration. Returns (updated, unparseable).
+    """
+    stale, unparseable = [], 0
+    rows = model._base_manager.order_by().values_list('id', 'month', 'year', 'month_num', 'intake_date')
+    for pk, month, year, current_num, current_date in rows.iterator(chunk_size=batch_size):
+        month_num, intake_date = IntakeDate.normalized_month(month, year)
+        if month_num is None:
+            unparseable += 1
+        if (month_num, intake_date) != (current_num, current_date):
+            stale.append(model(id=pk, month_num=month_num, intake_date=intake_date))
+
+    for start in range(0, len(stale), batch_size):
+        with transaction.atomic():
+            model._base_manager.bulk_update(stale[start:start + batch_size], ['month_num', 'intake_date'])
+    return len(stale), unparseable
+
+
+def _bucket(row):
+    year, month_num, month = row[:3]
+    return year, month_num or 0, '' if month_num else month
+
+
+def intake_calendar(years, month=None, university_id=None, level=None):
+    """
+    Active intakes for the given years grouped into month buckets, in
+    calendar order. Intakes whose month could not be parsed sort first
+    within their year, under their raw month text.
+    """
+    queryset = IntakeDate.objects.filter(is_active=True, year__in=years)
+
+    if month:
+        number = month_number(month)
+        queryset = queryset.filter(month_num=number) if number else queryset.filter(month__iexact=month)
+    if university_id:
+        queryset = queryset.filter(course__university_id=university_id)
+    if level:
+        queryset = queryset.filter(course__level__iexact=level)
+
+    # Unparsed months are bucketed by their raw text, parsed ones by number only
+    raw_month = Case(When(month_num__isnull=True, then=F('month')), default=Value(''))
+    rows = queryset.order_by(
+        'year', F('month_num').asc(nulls_first=True), raw_month, 'course__name', 'id'
+    ).values_list(
+        'year', 'month_num', 'month', 'deadline',
+        'course_id', 'course__name', 'course__university__name', 'course__level', 'course__tuition_fee',
+    )
+
+    calendar = []
+    for (year, month_num, raw_month), intakes in groupby(rows, key=_bucket):
+        calendar.append({
+            'month': MONTH_NAMES[month_num - 1] if month_num else raw_month,
+            'year': year,
+            'courses': [
+                {
+                    'id': course_id,
+                    'name': name,
+                    'university': university,
+                    'level': course_level,
+                    'deadline': deadline.isoformat() if deadline else None,
+                    'tuition_fee': float(tuition_fee),
+                }
+                for _y, _n, _m, deadline, course_id, name, university, course_level, tuition_fee in intakes
+            ],
+        })
+    return calendar
@@ -0,0 +1,30 @@
+"""
+Recompute the normalized month columns of IntakeDate.
+
+Usage:
+    python manage.py backfill_intake_months
+
+IntakeDate.save() keeps month_num/intake_date current; run this after bulk
+loads (bulk_create/update) or raw SQL edits to intake dates.
+"""
+from django.core.management.base import BaseCommand
+
+from universities.catalog import bump_catalog_version
+from universities.intakes import backfill_intake_months
+
+
+class Command(BaseCommand):
+    help = 'Backfill month_num/intake_date on intake dates'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows written per transaction')
+
+    def handle(self, *args, **options):
+        updated, unparseable = backfill_intake_months(batch_size=max(1, options['batch_size']))
+        if updated:
+            bump_catalog_version()
+        self.stdout.write(self.style.SUCCESS(f"Updated {updated} intake dates"))
+        if unparseable:
+            self.stdout.write(self.style.WARNING(
+                f"{unparseable} intake dates have a month that could not be parsed"
+            ))
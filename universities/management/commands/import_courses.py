@@ -4,13 +4,70 @@ Import courses from Excel file into database.
 Usage:
     python manage.py import_courses --file=courses.xlsx
     python manage.py import_courses --file=courses.xlsx --university="University of Manchester"
+    python manage.py import_courses --file=courses.xlsx --dry-run
     python manage.py import_courses --generate-template
+
+Rows are normalized column-wise with pandas, matched against existing
+courses on (university, name, level) and written with bulk_create /
+bulk_update in chunked transactions. Bulk writes bypass model signals, so
+the catalog version and search index are refreshed explicitly at the end.
 """
 from django.core.management.base import BaseCommand
-from datetime import datetime
+from django.db import transaction
+from django.utils import timezone
 from decimal import Decimal
 import pandas as pd
+from universities.catalog import bump_catalog_version
 from universities.models import University, Course, CourseRequirement
+from universities.search import index_courses
+
+
+# Course columns written by the import: field -> (spreadsheet column, kind, default)
+COURSE_COLUMNS = {
+    'duration': ('duration', 'text', '1 Year'),
+    'duration_months': ('duration_months', 'int', None),
+    'tuition_fee': ('tuition_fee_intl', 'decimal', None),
+    'tuition_fee_home': ('tuition_fee_home', 'decimal', None),
+    'currency': ('currency', 'upper', 'GBP'),
+    'deposit_required': ('deposit_required', 'decimal', None),
+    'intake_january': ('intake_january', 'bool', False),
+    'intake_may': ('intake_may', 'bool', False),
+    'intake_september': ('intake_september', 'bool', True),
+    'intakes': ('intakes', 'text', ''),
+    'ielts_overall': ('ielts_overall', 'decimal', None),
+    'ielts_each_band': ('ielts_each_band', 'decimal', None),
+    'academic_requirement': ('academic_requirement', 'text', ''),
+    'work_experience_required': ('work_experience_required', 'bool', False),
+    'work_experience_years': ('work_experience_years', 'int', 0),
+    'official_url': ('official_url', 'text', ''),
+    'department': ('department', 'text', ''),
+    'course_code': ('course_code', 'text', ''),
+}
+
+REQUIREMENT_COLUMNS = {
+    'min_qualification': ('min_qualification', 'text', ''),
+    'accepted_qualifications': ('accepted_qualifications', 'list', None),
+    'min_gpa': ('min_gpa', 'decimal', None),
+    'min_percentage': ('min_percentage', 'int', None),
+    'min_cgpa': ('min_cgpa', 'decimal', None),
+    'ielts_overall': ('ielts_overall', 'decimal', None),
+    'ielts_speaking': ('ielts_speaking', 'decimal', None),
+    'ielts_writing': ('ielts_writing', 'decimal', None),
+    'ielts_reading': ('ielts_reading', 'decimal', None),
+    'ielts_listening': ('ielts_listening', 'decimal', None),
+    'toefl_score': ('toefl_score', 'int', None),
+    'pte_score': ('pte_score', 'int', None),
+    'duolingo_score': ('duolingo_score', 'int', None),
+    'work_experience_required': ('work_experience_required', 'bool', False),
+    'work_experience_years': ('work_experience_years', 'int', 0),
+    'required_documents': ('required_documents', 'list', None),
+    'additional_notes': ('additional_notes', 'text', ''),
+}
+
+TRUTHY = ('yes', 'true', '1', 'y')
+
+# Changes listed in a dry run before the output is truncated (all with -v 2)
+DIFF_PREVIEW_LIMIT = 50
 
 
 class Command(BaseCommand):
@@ -35,7 +92,13 @@ class Command(BaseCommand):
         parser.add_argument(
             '--dry-run',
             action='store_true',
-            help='Preview import without saving'
+            help='Show what would be created/updated without saving'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Rows written per transaction (default: 500)'
         )
 
     def handle(self, *args, **options):
@@ -47,10 +110,12 @@ class Command(BaseCommand):
             self.stderr.write('Please provide --file or --generate-template')
             return
 
+        self.verbosity = options.get('verbosity', 1)
         self.import_courses(
             options['file'],
             options.get('university'),
-            options.get('dry_run', False)
+            options.get('dry_run', False),
+            max(1, options.get('batch_size') or 500)
         )
 
     def generate_template(self):
@@ -160,155 +225,62 @@ class Command(BaseCommand):
         wb.save(output_path)
         self.stdout.write(self.style.SUCCESS(f'Template saved to: {output_path}'))
 
-    def import_courses(self, file_path, university_filter=None, dry_run=False):
-        """Import courses from Excel file."""
+    def import_courses(self, file_path, university_filter=None, dry_run=False, batch_size=500):
+        """Import courses (and country requirements) from an Excel file."""
         try:
             df_courses = pd.read_excel(file_path, sheet_name='Courses')
         except Exception as e:
             self.stderr.write(f'Error reading file: {e}')
             return
-        
-        # Try to read country requirements sheet
+
+        # Country requirements sheet is optional
         try:
             df_requirements = pd.read_excel(file_path, sheet_name='Country_Requirements')
-            has_requirements = True
-        except:
+        except Exception:
             df_requirements = None
-            has_requirements = False
-        
+
         self.stdout.write(f'\n=== Importing {len(df_courses)} courses ===\n')
-        
-        created = 0
-        updated = 0
         errors = []
-        
-        for idx, row in df_courses.iterrows():
-            try:
-                university_name = str(row['university_name']).strip()
-                
-                if university_filter and university_filter.lower() not in university_name.lower():
-                    continue
-                
-                # Find university
-                university = University.objects.filter(name__icontains=university_name).first()
-                if not university:
-                    # Auto-create university if not found (as non-partner)
-                    university = University.objects.create(
-                        name=university_name,
-                        is_partner=False,
-                        country='UK'  # Default to UK, can be updated later
-                    )
-                    self.stdout.write(self.style.WARNING(f"  Auto-created university: {university_name}"))
-                
-                course_name = str(row['course_name']).strip()
-                
-                # Parse data
-                course_data = {
-                    'name': course_name,
-                    'level': str(row.get('level', 'PG')).upper(),
-                    'duration': str(row.get('duration', '1 Year')),
-                    'duration_months': self.safe_int(row.get('duration_months')),
-                    'tuition_fee': self.safe_decimal(row.get('tuition_fee_intl', 0)),
-                    'tuition_fee_home': self.safe_decimal(row.get('tuition_fee_home')),
-                    'currency': str(row.get('currency', 'GBP')).upper(),
-                    'deposit_required': self.safe_decimal(row.get('deposit_required')),
-                    'intake_january': self.parse_bool(row.get('intake_january')),
-                    'intake_may': self.parse_bool(row.get('intake_may')),
-                    'intake_september': self.parse_bool(row.get('intake_september', True)),
-                    'intakes': str(row.get('intakes', '')) if pd.notna(row.get('intakes')) else '',
-                    'ielts_overall': self.safe_decimal(row.get('ielts_overall')),
-                    'ielts_each_band': self.safe_decimal(row.get('ielts_each_band')),
-                    'academic_requirement': str(row.get('academic_requirement', '')) if pd.notna(row.get('academic_requirement')) else '',
-                    'work_experience_required': self.parse_bool(row.get('work_experience_required')),
-                    'work_experience_years': self.safe_int(row.get('work_experience_years', 0)),
-                    'official_url': str(row.get('official_url', '')) if pd.notna(row.get('official_url')) else '',
-                    'department': str(row.get('department', '')) if pd.notna(row.get('department')) else '',
-                    'course_code': str(row.get('course_code', '')) if pd.notna(row.get('course_code')) else '',
-                    'data_source': 'EXCEL_IMPORT',
-                    'last_verified': datetime.now(),
-                    'is_data_verified': True,
-                }
-                
-                if dry_run:
-                    self.stdout.write(f"  Would create/update: {course_name} at {university.name}")
-                    created += 1
-                    continue
-                
-                # Create or update course
-                course, is_created = Course.objects.update_or_create(
-                    university=university,
-                    name=course_name,
-                    defaults=course_data
-                )
-                
-                if is_created:
-                    created += 1
-                    self.stdout.write(f"  Created: {course_name}")
-                else:
-                    updated += 1
-                    self.stdout.write(f"  Updated: {course_name}")
-                    
-            except Exception as e:
-                errors.append(f"Row {idx+2}: {e}")
-        
-        # Import country requirements
-        if has_requirements and df_requirements is not None and not dry_run:
-            self.stdout.write(f'\n=== Importing Country Requirements ===\n')
-            req_created = 0
-            
-            for idx, row in df_requirements.iterrows():
-                try:
-                    course_name = str(row['course_name']).strip()
-                    university_name = str(row['university_name']).strip()
-                    country_code = str(row['country_code']).strip().upper()
-                    
-                    # Find course
-                    course = Course.objects.filter(
-                        name__iexact=course_name,
-                        university__name__icontains=university_name
-                    ).first()
-                    
-                    if not course:
-                        continue
-                    
-                    req_data = {
-                        'min_qualification': str(row.get('min_qualification', '')),
-                        'accepted_qualifications': str(row.get('accepted_qualifications', '')).split(', ') if pd.notna(row.get('accepted_qualifications')) else [],
-                        'min_gpa': self.safe_decimal(row.get('min_gpa')),
-                        'min_percentage': self.safe_int(row.get('min_percentage')),
-                        'min_cgpa': self.safe_decimal(row.get('min_cgpa')),
-                        'ielts_overall': self.safe_decimal(row.get('ielts_overall')),
-                        'ielts_speaking': self.safe_decimal(row.get('ielts_speaking')),
-                        'ielts_writing': self.safe_decimal(row.get('ielts_writing')),
-                        'ielts_reading': self.safe_decimal(row.get('ielts_reading')),
-                        'ielts_listening': self.safe_decimal(row.get('ielts_listening')),
-                        'toefl_score': self.safe_int(row.get('toefl_score')),
-                        'pte_score': self.safe_int(row.get('pte_score')),
-                        'duolingo_score': self.safe_int(row.get('duolingo_score')),
-                        'work_experience_required': self.parse_bool(row.get('work_experience_required')),
-                        'work_experience_years': self.safe_int(row.get('work_experience_years', 0)),
-                        'required_documents': str(row.get('required_documents', '')).split(', ') if pd.notna(row.get('required_documents')) else [],
-                        'additional_notes': str(row.get('additional_notes', '')) if pd.notna(row.get('additional_notes')) else '',
-                    }
-                    
-                    CourseRequirement.objects.update_or_create(
-                        course=course,
-                        country=country_code,
-                        defaults=req_data
-                    )
-                    req_created += 1
-                    
-                except Exception as e:
-                    errors.append(f"Requirements Row {idx+2}: {e}")
-            
-            self.stdout.write(f'  Country requirements processed: {req_created}')
-        
+
+        courses = self.normalize_courses(df_courses, errors)
+        if university_filter:
+            courses = courses[
+                courses['university_name'].str.lower().str.contains(university_filter.lower(), regex=False)
+            ]
+
+        universities, new_universities = self.resolve_universities(courses['university_name'].unique(), dry_run)
+        creates, updates, unchanged = self.plan_courses(courses, universities)
+
+        if dry_run:
+            self.report_diff(new_universities, creates, updates)
+        else:
+            self.write_courses(creates, updates, unchanged, batch_size)
+
+        req_created = req_updated = 0
+        if df_requirements is not None:
+            self.stdout.write('\n=== Importing Country Requirements ===\n')
+            req_created, req_updated = self.import_requirements(
+                df_requirements, universities, creates + [course for course, _fields in updates] + unchanged,
+                errors, dry_run, batch_size
+            )
+            self.stdout.write(f'  Country requirements {"to create" if dry_run else "created"}: {req_created}')
+            self.stdout.write(f'  Country requirements {"to update" if dry_run else "updated"}: {req_updated}')
+
+        if not dry_run:
+            touched = [course.id for course in creates] + [course.id for course, _fields in updates]
+            if touched or new_universities or req_created or req_updated:
+                bump_catalog_version()
+            if touched:
+                index_courses(touched)
+
         # Summary
-        self.stdout.write(f'\n=== IMPORT SUMMARY ===')
-        self.stdout.write(f'Created: {created}')
-        self.stdout.write(f'Updated: {updated}')
+        self.stdout.write(f'\n=== {"DRY RUN " if dry_run else ""}IMPORT SUMMARY ===')
+        self.stdout.write(f'Universities {"to create" if dry_run else "created"}: {len(new_universities)}')
+        self.stdout.write(f'{"To create" if dry_run else "Created"}: {len(creates)}')
+        self.stdout.write(f'{"To update" if dry_run else "Updated"}: {len(updates)}')
+        self.stdout.write(f'Unchanged: {len(unchanged)}')
         self.stdout.write(f'Errors: {len(errors)}')
-        
+
         if errors:
             self.stdout.write('\nErrors:')
             for err in errors[:10]:
@@ -316,30 +288,273 @@ class Command(BaseCommand):
             if len(errors) > 10:
                 self.stderr.write(f'  ... and {len(errors)-10} more')
 
-    def safe_decimal(self, value):
-        """Safely convert to Decimal."""
-        if pd.isna(value) or value == '' or value is None:
-            return None
-        try:
-            return Decimal(str(value))
-        except:
-            return None
-
-    def safe_int(self, value):
-        """Safely convert to int."""
-        if pd.isna(value) or value == '' or value is None:
-            return None
-        try:
-            return int(float(value))
-        except:
-            return None
+    # ============================================================
+    # NORMALIZATION (column-wise)
+    # ============================================================
+
+    def normalize_courses(self, df, errors):
+        """
+        Return a frame with one normalized column per Course field plus
+        university_name and the lower-cased university/name keys. Invalid rows are dropped and reported; when a
+        (university, name, level) key repeats, the last row wins.
+        """
+        out = pd.DataFrame(index=df.index)
+        out['row'] = df.index + 2
+        out['university_name'] = self.text_column(df, 'university_name', '')
+        out['name'] = self.text_column(df, 'course_name', '')
+        out['level'] = self.text_column(df, 'level', 'PG').str.upper()
+        out = out.join(self.normalize_columns(df, COURSE_COLUMNS))
+
+        invalid = {
+            'missing university_name': out['university_name'] == '',
+            'missing course_name': out['name'] == '',
+            'invalid level': ~out['level'].isin(Course.Level.values),
+            'missing tuition_fee_intl': out['tuition_fee'].isna(),
+        }
+        bad = pd.Series(False, index=out.index)
+        for reason, mask in invalid.items():
+            for row in out.loc[mask & ~bad, 'row']:
+                errors.append(f'Row {row}: {reason}')
+            bad |= mask
+        out = out[~bad]
 
-    def parse_bool(self, value):
-        """Parse boolean from various formats."""
-        if pd.isna(value):
+        out['university_key'] = out['university_name'].str.lower()
+        out['name_key'] = out['name'].str.lower()
+        return out.drop_duplicates(subset=['university_key', 'name_key', 'level'], keep='last')
+
+    def normalize_columns(self, df, columns):
+        """Convert spreadsheet columns to model field values, one vectorized pass per column."""
+        out = pd.DataFrame(index=df.index)
+        for field, (column, kind, default) in columns.items():
+            if kind == 'text':
+                out[field] = self.text_column(df, column, default)
+            elif kind == 'upper':
+                out[field] = self.text_column(df, column, default).str.upper()
+            elif kind == 'list':
+                text = self.text_column(df, column, '')
+                out[field] = text.map(lambda value: value.split(', ') if value else [])
+            elif kind == 'bool':
+                out[field] = self.bool_column(df, column, default)
+            else:
+                numbers = pd.to_numeric(df[column], errors='coerce') if column in df else pd.Series(float('nan'), index=df.index)
+                if default is not None:
+                    numbers = numbers.fillna(default)
+                out[field] = numbers.astype(object).where(numbers.notna(), None)
+                if kind == 'int':
+                    out[field] = out[field].map(lambda value: None if value is None else int(value))
+                else:
+                    out[field] = out[field].map(lambda value: None if value is None else Decimal(str(value)))
+        return out
+
+    @staticmethod
+    def text_column(df, column, default):
+        """Stripped strings; blank or missing cells become default."""
+        if column not in df:
+            return pd.Series(default, index=df.index, dtype=object)
+        text = df[column].where(df[column].notna(), '').astype(str).str.strip()
+        return text.where(text != '', default)
+
+    @staticmethod
+    def bool_column(df, column, default):
+        """Yes/True/1/Y (any case) or a non-zero number; blank cells are False."""
+        if column not in df:
+            return pd.Series(default, index=df.index, dtype=bool)
+        values = df[column]
+        truthy_text = values.astype(str).str.strip().str.lower().isin(TRUTHY)
+        numeric = pd.to_numeric(values.where(values.map(lambda v: not isinstance(v, str)), None), errors='coerce')
+        return truthy_text | (numeric.fillna(0) != 0)
+
+    # ============================================================
+    # UNIVERSITIES
+    # ============================================================
+
+    def resolve_universities(self, names, dry_run, create=True):
+        """
+        Map lower-cased spreadsheet university names to ids with one lookup
+        query. Exact (case-insensitive) names win, otherwise the first
+        university whose name contains the given one. Unknown universities
+        are auto-created as non-partners when create is set; in a dry run
+        they get unsaved ids.
+        """
+        known = list(University.objects.order_by('name').values_list('id', 'name'))
+        exact = {}
+        for university_id, name in known:
+            exact.setdefault(name.lower(), university_id)
+
+        resolved, missing = {}, {}
+        for name in names:
+            key = name.lower()
+            university_id = exact.get(key)
+            if university_id is None:
+                university_id = next((uid for uid, known_name in known if key in known_name.lower()), None)
+            if university_id is None:
+                missing.setdefault(key, name)
+            else:
+                resolved[key] = university_id
+
+        if not create:
+            return resolved, []
+
+        new_universities = [University(name=name, is_partner=False, country='UK') for name in missing.values()]
+        if new_universities and not dry_run:
+            with transaction.atomic():
+                University.objects.bulk_create(new_universities, batch_size=500)
+            for university in new_universities:
+                self.stdout.write(self.style.WARNING(f"  Auto-created university: {university.name}"))
+        resolved.update({university.name.lower(): university.id for university in new_universities})
+        return resolved, new_universities
+
+    # ============================================================
+    # COURSES
+    # ============================================================
+
+    def plan_courses(self, courses, universities):
+        """
+        Split rows into new courses, (course, changed fields) updates and
+        unchanged courses, loading existing courses in one query.
+        """
+        existing = {}
+        for course in Course.objects.filter(university_id__in=set(universities.values())).order_by():
+            existing[(course.university_id, course.name.lower(), course.level)] = course
+
+        now = timezone.now()
+        fields = list(COURSE_COLUMNS)
+        creates, updates, unchanged = [], [], []
+        for record in courses.to_dict('records'):
+            university_id = universities[record['university_key']]
+            values = {field: record[field] for field in fields}
+            course = existing.get((university_id, record['name_key'], record['level']))
+
+            if course is None:
+                course = Course(university_id=university_id, name=record['name'], level=record['level'], **values)
+                creates.append(course)
+            else:
+                changed = [field for field in fields if self.differs(getattr(course, field), values[field])]
+                for field in changed:
+                    setattr(course, field, values[field])
+                if changed:
+                    course.updated_at = now
+                    updates.append((course, changed))
+                else:
+                    unchanged.append(course)
+
+            course.data_source = Course.DataSource.EXCEL_IMPORT
+            course.last_verified = now
+            course.is_data_verified = True
+        return creates, updates, unchanged
+
+    @staticmethod
+    def differs(current, new):
+        if current in (None, '') and new in (None, ''):
             return False
-        if isinstance(value, bool):
-            return value
-        if isinstance(value, str):
-            return value.lower() in ['yes', 'true', '1', 'y']
-        return bool(value)
+        return current != new
+
+    def write_courses(self, creates, updates, unchanged, batch_size):
+        """Write the plan in chunked transactions, reporting progress per chunk."""
+        update_fields = list(COURSE_COLUMNS) + ['data_source', 'last_verified', 'is_data_verified', 'updated_at']
+        updated = [course for course, _fields in updates]
+        total = len(creates) + len(updated) + len(unchanged)
+        now = timezone.now()
+        done = 0
+
+        for start in range(0, max(len(creates), len(updated), len(unchanged)), batch_size):
+            chunk_creates = creates[start:start + batch_size]
+            chunk_updates = updated[start:start + batch_size]
+            chunk_unchanged = unchanged[start:start + batch_size]
+            with transaction.atomic():
+                Course.objects.bulk_create(chunk_creates)
+                Course.objects.bulk_update(chunk_updates, update_fields)
+                # Unchanged rows were still re-verified against the source sheet
+                Course.objects.filter(id__in=[course.id for course in chunk_unchanged]).update(
+                    last_verified=now, data_source=Course.DataSource.EXCEL_IMPORT, is_data_verified=True
+                )
+            done += len(chunk_creates) + len(chunk_updates) + len(chunk_unchanged)
+            self.stdout.write(f'  {done}/{total} courses written')
+
+    def report_diff(self, new_universities, creates, updates):
+        """Print what an import would change."""
+        names = {}
+        for course in creates + [course for course, _fields in updates]:
+            names.setdefault(course.university_id, None)
+        names.update(University.objects.filter(id__in=list(names)).values_list('id', 'name'))
+        names.update({university.id: university.name for university in new_universities})
+
+        for university in new_universities:
+            self.stdout.write(self.style.WARNING(f"  + university: {university.name}"))
+
+        changes = [f"  + {course.name} [{course.level}] at {names[course.university_id]}" for course in creates]
+        changes += [
+            f"  ~ {course.name} [{course.level}] at {names[course.university_id]}: {', '.join(fields)}"
+            for course, fields in updates
+        ]
+        limit = None if self.verbosity >= 2 else DIFF_PREVIEW_LIMIT
+        for line in changes[:limit]:
+            self.stdout.write(line)
+        if limit is not None and len(changes) > limit:
+            self.stdout.write(f'  ... and {len(changes) - limit} more (use -v 2 to list all)')
+
+    # ============================================================
+    # COUNTRY REQUIREMENTS
+    # ============================================================
+
+    def import_requirements(self, df, universities, courses, errors, dry_run, batch_size):
+        """
+        Upsert country requirements on (course, country).
+        Returns (created, updated) counts.
+        """
+        rows = pd.DataFrame(index=df.index)
+        rows['row'] = df.index + 2
+        rows['university_key'] = self.text_column(df, 'university_name', '').str.lower()
+        rows['name_key'] = self.text_column(df, 'course_name', '').str.lower()
+        rows['country'] = self.text_column(df, 'country_code', '').str.upper()
+        rows = rows.join(self.normalize_columns(df, REQUIREMENT_COLUMNS))
+
+        invalid = ~rows['country'].isin(CourseRequirement.Country.values)
+        for row in rows.loc[invalid, 'row']:
+            errors.append(f'Requirements Row {row}: invalid country_code')
+        rows = rows[~invalid].drop_duplicates(subset=['university_key', 'name_key', 'country'], keep='last')
+
+        # Universities only referenced by this sheet are looked up, never created
+        unresolved = set(rows['university_key']) - set(universities)
+        if unresolved:
+            universities = {**universities, **self.resolve_universities(unresolved, dry_run, create=False)[0]}
+
+        # Resolve courses from the import plus any existing courses at known universities
+        course_ids = {}
+        for course in courses:
+            course_ids.setdefault((course.university_id, course.name.lower()), course.id)
+        for course_id, university_id, name in Course.objects.filter(
+            university_id__in=set(universities.values())
+        ).order_by('university_id', 'name').values_list('id', 'university_id', 'name'):
+            course_ids.setdefault((university_id, name.lower()), course_id)
+
+        requirements = []
+        for record in rows.to_dict('records'):
+            university_id = universities.get(record['university_key'])
+            course_id = course_ids.get((university_id, record['name_key']))
+            if course_id is None:
+                continue
+            values = {field: record[field] for field in REQUIREMENT_COLUMNS}
+            requirements.append(CourseRequirement(course_id=course_id, country=record['country'], **values))
+        requirements = list({(req.course_id, req.country): req for req in requirements}.values())
+
+        existing = set()
+        for start in range(0, len(requirements), batch_size):
+            chunk = requirements[start:start + batch_size]
+            existing.update(
+                CourseRequirement.all_objects.filter(course_id__in={req.course_id for req in chunk})
+                .values_list('course_id', 'country')
+            )
+        updated = sum(1 for req in requirements if (req.course_id, req.country) in existing)
+
+        if not dry_run:
+            update_fields = list(REQUIREMENT_COLUMNS) + ['is_deleted', 'deleted_at', 'updated_at']
+            for start in range(0, len(requirements), batch_size):
+                with transaction.atomic():
+                    CourseRequirement.objects.bulk_create(
+                        requirements[start:start + batch_size],
+                        update_conflicts=True,
+                        unique_fields=['course', 'country'],
+                        update_fields=update_fields,
+                    )
+        return len(requirements) - updated, updated
@@ -1,121 +1,248 @@
-import pandas as pd
+"""
+Import partner universities from the multi-sheet partners workbook.
+
+Usage:
+    python manage.py import_partners data/partners.xlsx
+    python manage.py import_partners data/partners.xlsx --full
+
+One sheet per country; each row carries University / Territories /
+Priority. The workbook is streamed once in openpyxl read-only mode and
+every row is hashed. University and AdmissionCriteria keep the hash of the
+row they were last imported from, so a re-run only writes rows that are
+new or changed, and retires partners that disappeared from the workbook.
+Manual edits to imported fields are only overwritten once the source row
+changes; use --full to re-apply the whole workbook.
+"""
+import hashlib
+import json
+from itertools import chain
+from decimal import Decimal
+
+import openpyxl
 from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from universities.catalog import bump_catalog_version
 from universities.models import University, AdmissionCriteria
-from decimal import Decimal
+
+
+SHEET_COUNTRIES = {
+    'UK': 'UK', 'UNITED KINGDOM': 'UK', 'ENGLAND': 'UK',
+    'USA': 'USA', 'UNITED STATES': 'USA', 'US': 'USA',
+    'CANADA': 'CANADA', 'CA': 'CANADA',
+    'AUSTRALIA': 'AUSTRALIA', 'OZ': 'AUSTRALIA', 'AU': 'AUSTRALIA',
+    'IRELAND': 'IRELAND', 'IE': 'IRELAND',
+    'GERMANY': 'GERMANY', 'DE': 'GERMANY',
+}
+
+# The sheet has no columns for these; every imported partner gets them
+CRITERIA_DEFAULTS = {
+    'min_percentage': Decimal('60.0'),
+    'min_ielts': Decimal('6.0'),
+    'gap_limit': 5,
+}
+
+BATCH_SIZE = 500
+
+
+def sheet_country(sheet_name):
+    """University.Country for a sheet name, falling back to UK."""
+    key = sheet_name.strip().upper()
+    if key in SHEET_COUNTRIES:
+        return SHEET_COUNTRIES[key]
+    return key if key in University.Country.values else 'UK'
+
+
+def priority_rank(priority):
+    """Map the Priority column (Super High / High / Medium / Low) to a rank."""
+    priority = priority.lower()
+    if 'super high' in priority:
+        return 1
+    if 'high' in priority:
+        return 2
+    if 'medium' in priority:
+        return 3
+    return 5  # Low (default)
+
+
+def content_hash(values):
+    """Stable hash of the values a row imports."""
+    return hashlib.sha256(json.dumps(values, sort_keys=True, default=str).encode()).hexdigest()
+
 
 class Command(BaseCommand):
     help = 'Import universities from multi-sheet Excel (partners.xlsx)'
 
     def add_arguments(self, parser):
         parser.add_argument('file_path', type=str, help='Path to the Excel file')
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Re-apply every row, ignoring stored content hashes'
+        )
+        parser.add_argument(
+            '--keep-missing',
+            action='store_true',
+            help='Do not retire partners that are no longer in the workbook'
+        )
 
     def handle(self, *args, **options):
         file_path = options['file_path']
         self.stdout.write(f"Reading Excel: {file_path}")
 
         try:
-            # First read without header to detect column names
-            xls_raw = pd.read_excel(file_path, sheet_name=None, header=None)
-            
-            total_imported = 0
-            
-            # Iterate through each sheet (Country)
-            for sheet_name, df_raw in xls_raw.items():
-                country_raw = sheet_name.strip()
-                self.stdout.write(f"Processing Sheet: {country_raw}...")
-                
-                # Detect if row 0 is a title row (only 1 non-empty cell) or header
-                # We'll check if 'University' is in row 0 or row 1
-                row0 = df_raw.iloc[0].values.tolist()
-                row1 = df_raw.iloc[1].values.tolist() if len(df_raw) > 1 else []
-                
-                if 'University' in [str(x) for x in row0]:
-                    df = pd.read_excel(file_path, sheet_name=sheet_name, header=0)
-                elif 'University' in [str(x) for x in row1]:
-                    df = pd.read_excel(file_path, sheet_name=sheet_name, header=1)
-                else:
-                    # Fallback: try header=0
-                    df = pd.read_excel(file_path, sheet_name=sheet_name, header=0)
-                
-                # Map sheet name to Country Code if possible
-                uni_country = 'UK' # Default fallback
-                c_upper = country_raw.upper()
-                
-                if c_upper in ['UK', 'UNITED KINGDOM', 'ENGLAND']: uni_country = 'UK'
-                elif c_upper in ['USA', 'UNITED STATES', 'US']: uni_country = 'USA'
-                elif c_upper in ['CANADA', 'CA']: uni_country = 'CANADA'
-                elif c_upper in ['AUSTRALIA', 'OZ', 'AU']: uni_country = 'AUSTRALIA'
-                elif c_upper in ['IRELAND', 'IE']: uni_country = 'IRELAND'
-                elif c_upper in ['GERMANY', 'DE']: uni_country = 'GERMANY'
-                else: 
-                     # If generic or unknown, try to use as is if it fits choices, else default
-                     uni_country = 'UK' # Fallback for safety, or we could leave it to model validation
-                
-                # Fill NaN with empty strings for easier text handling
-                df = df.fillna('')
-                
-                sheet_count = 0
-                
-                for index, row in df.iterrows():
-                    try:
-                        # Column A: University
-                        name = str(row.get('University', '')).strip()
-                        if not name:
-                            continue
-                        
-                        # Column B: Territories
-                        territories = str(row.get('Territories', 'Global')).strip()
-                        
-                        # Column C: Priority
-                        priority_raw = str(row.get('Priority', 'Low')).strip()
-                        
-                        # Priority Logic
-                        p_lower = priority_raw.lower()
-                        if 'super high' in p_lower:
-                            priority_rank = 1
-                        elif 'high' in p_lower:
-                            priority_rank = 2
-                        elif 'medium' in p_lower:
-                            priority_rank = 3
-                        else:
-                            priority_rank = 5 # Low (default)
-
-                        # Create/Update University
-                        uni, created = University.objects.get_or_create(
-                            name=name,
-                            defaults={'country': uni_country}
-                        )
-                        
-                        # Update country if it was created or if we want to enforce sheet country
-                        # Assuming sheet country is authoritative for these entries
-                        if not created:
-                             uni.country = uni_country
-                             
-                        uni.is_partner = True
-                        uni.save()
-                        
-                        # Create/Update Criteria
-                        criteria, _ = AdmissionCriteria.objects.get_or_create(university=uni)
-                        criteria.accepted_territories = territories
-                        criteria.priority_rank = priority_rank
-                        
-                        # Defaults for missing columns
-                        criteria.min_percentage = Decimal('60.0')
-                        criteria.min_ielts = Decimal('6.0')
-                        criteria.gap_limit = 5
-                        
-                        criteria.save()
-                        
-                        sheet_count += 1
-                        total_imported += 1
-                        # self.stdout.write(self.style.SUCCESS(f"Imported {name}")) # Too verbose for many sheets?
-                        
-                    except Exception as row_e:
-                        self.stdout.write(self.style.ERROR(f"Error row {index} in {country_raw}: {row_e}"))
-                
-                self.stdout.write(self.style.SUCCESS(f"Sheet [{country_raw}]: Imported {sheet_count} universities."))
-
-            self.stdout.write(self.style.SUCCESS(f"Global Success! Total Imported: {total_imported} universities."))
-
+            rows = self.read_workbook(file_path)
         except Exception as e:
             self.stdout.write(self.style.ERROR(f"Critical Error: {e}"))
+            return
+
+        created, updated, unchanged = self.apply(rows, full=options['full'])
+        retired = 0 if options['keep_missing'] else self.retire(rows)
+
+        if created or updated or retired:
+            bump_catalog_version()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Global Success! {len(rows)} universities: {created} created, {updated} updated, "
+            f"{unchanged} unchanged, {retired} retired."
+        ))
+
+    def read_workbook(self, file_path):
+        """
+        Stream every sheet once and return {name: row values}. The header
+        is row 1, or row 2 when row 1 is a title; a name repeated across
+        sheets takes its last occurrence.
+        """
+        workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+        rows = {}
+        try:
+            for sheet in workbook.worksheets:
+                country = sheet_country(sheet.title)
+                sheet_count = 0
+                for row in self.sheet_records(sheet):
+                    name = row.get('University', '')
+                    if not name:
+                        continue
+                    rows[name] = {
+                        'country': country,
+                        'territories': row.get('Territories', 'Global'),
+                        'priority_rank': priority_rank(row.get('Priority', 'Low')),
+                    }
+                    sheet_count += 1
+                self.stdout.write(f"Sheet [{sheet.title.strip()}]: {sheet_count} universities.")
+        finally:
+            workbook.close()
+        return rows
+
+    @staticmethod
+    def sheet_records(sheet):
+        """Yield {column: stripped text} for each data row of a sheet."""
+        lines = (
+            ['' if value is None else str(value).strip() for value in cells]
+            for cells in sheet.iter_rows(values_only=True)
+        )
+        first = next(lines, None)
+        if first is None:
+            return
+        header, pending = first, []
+        if 'University' not in first:
+            second = next(lines, None)
+            if second is not None and 'University' in second:
+                header = second
+            elif second is not None:
+                pending = [second]
+
+        columns = [(index, column) for index, column in enumerate(header) if column]
+        for cells in chain(pending, lines):
+            yield {column: cells[index] if index < len(cells) else '' for index, column in columns}
+
+    def apply(self, rows, full=False):
+        """
+        Insert new partners and update the ones whose row hash changed, in
+        bulk. Returns (created, updated, unchanged) counts.
+        """
+        universities = {}
+        for university in University.objects.filter(name__in=list(rows)).order_by('created_at'):
+            universities.setdefault(university.name, university)
+        criteria = {
+            item.university_id: item
+            for item in AdmissionCriteria.all_objects.filter(
+                university_id__in=[university.id for university in universities.values()]
+            )
+        }
+
+        now = timezone.now()
+        new_universities, changed_universities = [], []
+        new_criteria, changed_criteria = [], []
+        for name, row in rows.items():
+            university_hash = content_hash({'name': name, 'country': row['country'], 'is_partner': True})
+            criteria_values = {
+                'accepted_territories': row['territories'],
+                'priority_rank': row['priority_rank'],
+                **CRITERIA_DEFAULTS,
+            }
+            criteria_hash = content_hash(criteria_values)
+
+            university = universities.get(name)
+            if university is None:
+                university = University(name=name, country=row['country'], is_partner=True,
+                                        import_hash=university_hash)
+                new_universities.append(university)
+            elif full or university.import_hash != university_hash:
+                university.country = row['country']
+                university.is_partner = True
+                university.import_hash = university_hash
+                university.updated_at = now
+                changed_universities.append(university)
+
+            item = criteria.get(university.id)
+            if item is None:
+                new_criteria.append(AdmissionCriteria(
+                    university_id=university.id, import_hash=criteria_hash, **criteria_values
+                ))
+            elif full or item.import_hash != criteria_hash or item.is_deleted:
+                for field, value in criteria_values.items():
+                    setattr(item, field, value)
+                item.is_deleted = False
+                item.deleted_at = None
+                item.import_hash = criteria_hash
+                item.updated_at = now
+                changed_criteria.append(item)
+
+        with transaction.atomic():
+            University.objects.bulk_create(new_universities, batch_size=BATCH_SIZE)
+            University.objects.bulk_update(
+                changed_universities, ['country', 'is_partner', 'import_hash', 'updated_at'], batch_size=BATCH_SIZE
+            )
+            AdmissionCriteria.objects.bulk_create(new_criteria, batch_size=BATCH_SIZE)
+            AdmissionCriteria.objects.bulk_update(
+                changed_criteria,
+                list(CRITERIA_DEFAULTS) + [
+                    'accepted_territories', 'priority_rank', 'is_deleted', 'deleted_at', 'import_hash', 'updated_at',
+                ],
+                batch_size=BATCH_SIZE,
+            )
+
+        touched = {university.id for university in new_universities + changed_universities}
+        touched.update(item.university_id for item in new_criteria + changed_criteria)
+        created = len(new_universities)
+        return created, len(touched) - created, len(rows) - len(touched)
+
+    def retire(self, rows):
+        """
+        Partners imported by an earlier run that are no longer in the
+        workbook stop being partners; their records are kept.
+        """
+        retired = University.objects.exclude(import_hash='').exclude(name__in=list(rows))
+        retired_ids = list(retired.values_list('id', flat=True))
+        if not retired_ids:
+            return 0
+        with transaction.atomic():
+            University.objects.filter(id__in=retired_ids).update(
+                is_partner=False, import_hash='', updated_at=timezone.now()
+            )
+            AdmissionCriteria.all_objects.filter(university_id__in=retired_ids).update(import_hash='')
+        for name in University.objects.filter(id__in=retired_ids).values_list('name', flat=True):
+            self.stdout.write(self.style.WARNING(f"  Retired partner: {name}"))
+        return len(retired_ids)
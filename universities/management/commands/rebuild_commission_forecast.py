@@ -0,0 +1,20 @@
+"""
+Rebuild the materialized commission forecast.
+
+Usage:
+    python manage.py rebuild_commission_forecast
+
+Application saves keep the forecast current on their own; run this after
+bulk status changes done with queryset.update() or raw SQL.
+"""
+from django.core.management.base import BaseCommand
+
+from universities.forecast import refresh_forecast
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the materialized commission forecast'
+
+    def handle(self, *args, **options):
+        rows = refresh_forecast()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt forecast for {rows} universities"))
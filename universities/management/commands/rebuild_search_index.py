@@ -0,0 +1,20 @@
+"""
+Rebuild the course search index from scratch.
+
+Usage:
+    python manage.py rebuild_search_index
+
+Saves through the ORM keep the index current on their own; run this after
+bulk loads (bulk_create/update) or raw SQL edits to the catalog.
+"""
+from django.core.management.base import BaseCommand
+
+from universities.search import index_courses
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the course search index'
+
+    def handle(self, *args, **options):
+        indexed = index_courses()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} courses"))
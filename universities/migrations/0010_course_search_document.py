@@ -0,0 +1,96 @@
+# Generated by Django 6.0.2 on 2026-10-17 04:33
+
+import django.contrib.postgres.search
+import django.db.models.deletion
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+
+FTS_TABLE = 'universities_course_fts'
+FTS_VOCAB_TABLE = 'universities_course_fts_vocab'
+DOCUMENT_TABLE = 'universities_coursesearchdocument'
+
+
+def create_search_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS csd_search_vector_gin ON {DOCUMENT_TABLE} USING gin (search_vector)'
+        )
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS csd_title_trgm ON {DOCUMENT_TABLE} USING gin (title gin_trgm_ops)'
+        )
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS csd_body_trgm ON {DOCUMENT_TABLE} USING gin (body gin_trgm_ops)'
+        )
+    elif vendor == 'sqlite':
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+            f"course_id UNINDEXED, title, body, tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+        )
+        schema_editor.execute(
+            f'CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_VOCAB_TABLE} USING fts5vocab({FTS_TABLE}, row)'
+        )
+
+
+def drop_search_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        for name in ('csd_search_vector_gin', 'csd_title_trgm', 'csd_body_trgm'):
+            schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+    elif vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_VOCAB_TABLE}')
+        schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+def build_search_documents(apps, schema_editor):
+    from universities.search import build_document
+
+    Course = apps.get_model('universities', 'Course')
+    CourseSearchDocument = apps.get_model('universities', 'CourseSearchDocument')
+    connection = schema_editor.connection
+
+    documents = []
+    for course_id, name, department, code, level, uni_name, uni_city in (
+        Course.objects.filter(is_deleted=False, university__is_deleted=False)
+        .values_list('id', 'name', 'department', 'course_code', 'level', 'university__name', 'university__city')
+    ):
+        title, body = build_document(name, department, code, level, uni_name, uni_city)
+        documents.append(CourseSearchDocument(course_id=course_id, title=title, body=body))
+    CourseSearchDocument.objects.bulk_create(documents, batch_size=500)
+
+    if connection.vendor == 'postgresql':
+        schema_editor.execute(
+            f"UPDATE {DOCUMENT_TABLE} SET search_vector = "
+            f"setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+            f"setweight(to_tsvector('simple', coalesce(body, '')), 'B')"
+        )
+    elif connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT INTO {FTS_TABLE} (course_id, title, body) VALUES (%s, %s, %s)',
+                [(doc.course_id.hex, doc.title, doc.body) for doc in documents],
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('universities', '0009_add_reviews_careers_quickapply'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CourseSearchDocument',
+            fields=[
+                ('course', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_document', serialize=False, to='universities.course')),
+                ('title', models.CharField(help_text='Course name (weighted highest)', max_length=255)),
+                ('body', models.TextField(help_text='Department, university, city, code and level synonyms')),
+                ('search_vector', django.contrib.postgres.search.SearchVectorField(editable=False, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        TrigramExtension(),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+        migrations.RunPython(build_search_documents, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 6.0.2 on 2026-10-17 04:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def build_forecast(apps, schema_editor):
+    from universities.forecast import FORECAST_BUCKETS, pipeline_aggregates
+
+    Application = apps.get_model('applications', 'Application')
+    UniversityCommissionForecast = apps.get_model('universities', 'UniversityCommissionForecast')
+
+    rows = [
+        UniversityCommissionForecast(**row)
+        for row in pipeline_aggregates(Application.objects.filter(is_deleted=False))
+        if any(row[f'{bucket}_count'] for bucket in FORECAST_BUCKETS)
+    ]
+    UniversityCommissionForecast.objects.bulk_create(rows, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('applications', '0006_alter_applicationnote_application'),
+        ('universities', '0010_course_search_document'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UniversityCommissionForecast',
+            fields=[
+                ('university', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='commission_forecast', serialize=False, to='universities.university')),
+                ('pending_count', models.PositiveIntegerField(default=0)),
+                ('pending_tuition', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('offer_count', models.PositiveIntegerField(default=0)),
+                ('offer_tuition', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('cas_received_count', models.PositiveIntegerField(default=0)),
+                ('cas_received_tuition', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('enrolled_count', models.PositiveIntegerField(default=0)),
+                ('enrolled_tuition', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(build_forecast, migrations.RunPython.noop),
+    ]
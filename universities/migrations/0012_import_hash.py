@@ -0,0 +1,23 @@
+# Generated by Django 6.0.2 on 2026-10-17 04:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('universities', '0011_university_commission_forecast'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='admissioncriteria',
+            name='import_hash',
+            field=models.CharField(blank=True, default='', editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='university',
+            name='import_hash',
+            field=models.CharField(blank=True, default='', editable=False, max_length=64),
+        ),
+    ]
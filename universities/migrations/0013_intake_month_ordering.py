@@ -0,0 +1,35 @@
+# Generated by Django 6.0.2 on 2026-10-17 05:00
+
+from django.db import migrations, models
+
+
+def backfill_months(apps, schema_editor):
+    from universities.intakes import backfill_intake_months
+
+    backfill_intake_months(apps.get_model('universities', 'IntakeDate'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('branches', '0007_alter_branchanalyticssnapshot_snapshot_date'),
+        ('universities', '0012_import_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='intakedate',
+            name='intake_date',
+            field=models.DateField(blank=True, editable=False, help_text='First day of the intake month', null=True),
+        ),
+        migrations.AddField(
+            model_name='intakedate',
+            name='month_num',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='intakedate',
+            index=models.Index(fields=['year', 'month_num'], name='idx_intake_year_month'),
+        ),
+        migrations.RunPython(backfill_months, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,7 @@
+import datetime
+
 from django.db import models
+from django.contrib.postgres.search import SearchVectorField
 from django.conf import settings
 from django.utils import timezone
 from core.models import TenantAwareModel
@@ -55,6 +58,9 @@ class University(TenantAwareModel):
     
     is_active = models.BooleanField(default=True)
     
+    # Delta imports (import_partners): hash of the source row last applied
+    import_hash = models.CharField(max_length=64, blank=True, default='', editable=False)
+    
     class Meta:
         verbose_name = "University"
         verbose_name_plural = "Universities"
@@ -140,6 +146,24 @@ class Course(TenantAwareModel):
         return f"{self.name} - {self.university.name}"
 
 
+class CourseSearchDocument(models.Model):
+    """
+    Denormalized search document for a Course.
+    Maintained by universities.search; the backend-specific index
+    (Postgres tsvector/trigram or SQLite FTS5) is built from these rows.
+    """
+    course = models.OneToOneField(
+        Course, on_delete=models.CASCADE, primary_key=True, related_name='search_document'
+    )
+    title = models.CharField(max_length=255, help_text="Course name (weighted highest)")
+    body = models.TextField(help_text="Department, university, city, code and level synonyms")
+    search_vector = SearchVectorField(null=True, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.title
+
+
 class CourseRequirement(TenantAwareModel):
     """
     Country-specific admission requirements for a course.
@@ -218,6 +242,9 @@ class AdmissionCriteria(TenantAwareModel):
     
     notes = models.TextField(blank=True, null=True)
     
+    # Delta imports (import_partners): hash of the source row last applied
+    import_hash = models.CharField(max_length=64, blank=True, default='', editable=False)
+    
     def __str__(self):
         return f"Criteria for {self.university.name}"
 
@@ -259,6 +286,32 @@ class Scholarship(TenantAwareModel):
         return f"{self.name} - {self.university.name}"
 
 
+class UniversityCommissionForecast(models.Model):
+    """
+    Materialized application pipeline per university for the commission forecast.
+    Holds counts and tuition totals per forecast bucket rather than commission
+    amounts, so rate or agreement changes apply without a rebuild.
+    Maintained by universities.forecast.
+    """
+    university = models.OneToOneField(
+        University, on_delete=models.CASCADE, primary_key=True, related_name='commission_forecast'
+    )
+
+    pending_count = models.PositiveIntegerField(default=0)
+    pending_tuition = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    offer_count = models.PositiveIntegerField(default=0)
+    offer_tuition = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    cas_received_count = models.PositiveIntegerField(default=0)
+    cas_received_tuition = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    enrolled_count = models.PositiveIntegerField(default=0)
+    enrolled_tuition = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Commission forecast: {self.university_id}"
+
+
 class PartnershipAgreement(TenantAwareModel):
     """
     Contracts and commission agreements between the agency and university.
@@ -325,17 +378,66 @@ class UniversityDocument(TenantAwareModel):
         return f"{self.title} - {self.university.name}"
 
 
+MONTH_NAMES = (
+    'January', 'February', 'March', 'April', 'May', 'June',
+    'July', 'August', 'September', 'October', 'November', 'December',
+)
+
+
+def month_number(value):
+    """
+    Month number (1-12) for free-text month input such as "September",
+    "sep", "Sept" or "9"; None when it cannot be parsed.
+    """
+    text = str(value or '').strip().lower().rstrip('.')
+    if text.isdigit():
+        number = int(text)
+        return number if 1 <= number <= 12 else None
+    if len(text) >= 3:
+        for number, name in enumerate(MONTH_NAMES, 1):
+            if name.lower().startswith(text):
+                return number
+    return None
+
+
 class IntakeDate(TenantAwareModel):
     """
     Specific intake periods for courses.
+    month_num/intake_date are derived from month/year on save (or by
+    `manage.py backfill_intake_months` after bulk loads) for ordering.
     """
     course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='intake_dates')
     month = models.CharField(max_length=20, help_text="e.g. September")
     year = models.IntegerField(default=2024)
     deadline = models.DateField(null=True, blank=True)
     
+    # Normalized from month/year; None when month is not a recognizable month
+    month_num = models.PositiveSmallIntegerField(null=True, blank=True, editable=False)
+    intake_date = models.DateField(null=True, blank=True, editable=False, help_text="First day of the intake month")
+    
     is_active = models.BooleanField(default=True)
 
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['year', 'month_num'], name='idx_intake_year_month'),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.month_num, self.intake_date = self.normalized_month(self.month, self.year)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'month', 'year'} & set(update_fields):
+            kwargs['update_fields'] = set(update_fields) | {'month_num', 'intake_date'}
+        super().save(*args, **kwargs)
+
+    @staticmethod
+    def normalized_month(month, year):
+        """(month_num, intake_date) for a month/year pair."""
+        number = month_number(month)
+        if number is None or not year or not 1 <= int(year) <= 9999:
+            return number, None
+        return number, datetime.date(int(year), number, 1)
+
     def __str__(self):
         return f"{self.month} {self.year} - {self.course.name}"
 
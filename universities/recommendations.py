@@ -0,0 +1,232 @@
+"""
+Course recommendation pipeline for the Course Finder.
+
+Candidate courses are loaded as plain columns and scored in one vectorized
+NumPy pass. Review aggregates come from a single grouped query over the
+candidate set and career paths from a single query over the returned
+courses, so the query count does not grow with the candidate limit.
+Interest matching runs against per-course token postings that are built
+once per catalog version.
+"""
+import re
+import threading
+
+import numpy as np
+from django.db.models import Avg, Count
+
+from .catalog import get_catalog_version
+from .models import Course, CourseReview, CareerPath
+
+
+CANDIDATE_LIMIT = 100
+RESULT_LIMIT = 20
+CAREER_PATHS_PER_COURSE = 3
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def _tokens(text):
+    return {token.lower() for token in _TOKEN_RE.findall(text or '')}
+
+
+class CourseTokenIndex:
+    """
+    Inverted index of course name/department tokens.
+    postings[token] holds the sorted positions of courses containing it.
+    """
+
+    def __init__(self, version):
+        self.version = version
+        self.course_index = {}
+        postings = {}
+        for position, (course_id, name, department) in enumerate(
+            Course.objects.values_list('id', 'name', 'department')
+        ):
+            self.course_index[course_id] = position
+            for token in _tokens(f"{name} {department or ''}"):
+                postings.setdefault(token, []).append(position)
+        self.size = len(self.course_index)
+        self.postings = {token: np.array(positions, dtype=np.int64) for token, positions in postings.items()}
+
+    def phrase_mask(self, phrase):
+        """Boolean mask over indexed courses containing every token of phrase."""
+        mask = np.zeros(self.size, dtype=bool)
+        tokens = _tokens(phrase)
+        if not tokens:
+            return mask
+        positions = None
+        for token in tokens:
+            posting = self.postings.get(token)
+            if posting is None:
+                return mask
+            positions = posting if positions is None else np.intersect1d(positions, posting, assume_unique=True)
+        mask[positions] = True
+        return mask
+
+
+class CourseRecommender:
+    """
+    Scores active courses against a student profile.
+    The token index is rebuilt lazily whenever the catalog version changes.
+    """
+
+    _token_index = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_token_index(cls):
+        version = get_catalog_version()
+        index = cls._token_index
+        if index is None or index.version != version:
+            with cls._lock:
+                if cls._token_index is None or cls._token_index.version != version:
+                    cls._token_index = CourseTokenIndex(version)
+                index = cls._token_index
+        return index
+
+    @classmethod
+    def recommend(cls, profile: dict, candidate_limit=CANDIDATE_LIMIT, result_limit=RESULT_LIMIT):
+        """
+        Rank candidate courses for a profile.
+
+        profile keys: ielts_score, budget, preferred_level, preferred_country,
+        has_work_experience, work_exp_years, interests.
+        Returns (total candidates scored, top result dicts).
+        """
+        ielts_score = float(profile.get('ielts_score') or 0)
+        budget = float(profile.get('budget') or 0)
+        has_work_exp = bool(profile.get('has_work_experience'))
+        work_exp_years = int(profile.get('work_exp_years') or 0)
+        interests = [i for i in (profile.get('interests') or []) if isinstance(i, str) and i.strip()]
+
+        # Base queryset - active courses within budget
+        queryset = Course.objects.filter(is_active=True, tuition_fee__lte=budget)
+        if profile.get('preferred_country'):
+            queryset = queryset.filter(university__country__iexact=profile['preferred_country'])
+        if profile.get('preferred_level'):
+            queryset = queryset.filter(level__iexact=profile['preferred_level'])
+
+        rows = list(queryset.values_list(
+            'id', 'name', 'level', 'duration', 'currency', 'tuition_fee', 'ielts_overall',
+            'work_experience_required', 'work_experience_years', 'is_data_verified', 'official_url',
+            'university__name', 'university__country', 'university__is_partner',
+        )[:candidate_limit])
+        n = len(rows)
+        if n == 0:
+            return 0, []
+
+        course_ids = [row[0] for row in rows]
+        fee = np.array([float(row[5]) for row in rows], dtype=np.float64)
+        ielts_req = np.array([float(row[6]) if row[6] else 0.0 for row in rows], dtype=np.float64)
+        work_required = np.array([row[7] for row in rows], dtype=bool)
+        work_years = np.array([row[8] or 0 for row in rows], dtype=np.int64)
+        verified = np.array([row[9] for row in rows], dtype=bool)
+        has_url = np.array([bool(row[10]) for row in rows], dtype=bool)
+        partner = np.array([row[13] for row in rows], dtype=bool)
+
+        # Review aggregates for the whole candidate set
+        ratings = {
+            stat['course_id']: stat
+            for stat in CourseReview.objects.filter(is_approved=True, course_id__in=course_ids)
+            .order_by()
+            .values('course_id')
+            .annotate(avg=Avg('overall_rating'), count=Count('id'))
+        }
+        avg_rating = np.array([ratings[cid]['avg'] if cid in ratings else 0.0 for cid in course_ids], dtype=np.float64)
+
+        # IELTS match (max 25 points, -10 when not met, 15 if no requirement)
+        ielts_margin = ielts_score - ielts_req
+        ielts_points = np.where(
+            ielts_req > 0,
+            np.where(ielts_margin >= 0, np.minimum(25, 15 + ielts_margin * 5), -10),
+            15,
+        )
+        # Budget fit (max 25 points)
+        budget_points = np.where(fee <= budget * 0.7, 25, np.where(fee <= budget * 0.9, 20, 10))
+        # Work experience (10 if met, -15 if not, 5 when not required)
+        work_met = has_work_exp & (work_exp_years >= work_years)
+        work_points = np.where(work_required, np.where(work_met, 10, -15), 5)
+
+        # Interest matching (max 15 points)
+        interest_hits = np.zeros(n, dtype=np.int64)
+        if interests:
+            index = cls.get_token_index()
+            positions = np.array([index.course_index.get(cid, -1) for cid in course_ids], dtype=np.int64)
+            indexed = positions >= 0
+            for interest in interests:
+                hits = np.zeros(n, dtype=bool)
+                hits[indexed] = index.phrase_mask(interest)[positions[indexed]]
+                interest_hits += hits
+        interest_points = np.minimum(15, interest_hits * 5)
+
+        score = (
+            ielts_points + budget_points + np.where(partner, 15, 0) + work_points + interest_points +
+            np.where(verified, 5, 0) + np.where(has_url, 5, 0) + np.where(avg_rating >= 4, 10, 0)
+        )
+
+        # Stable sort keeps catalog order between equal scores
+        top = np.argsort(-score, kind='stable')[:result_limit]
+        career_paths = cls._career_paths([course_ids[i] for i in top])
+
+        results = []
+        for i in top:
+            row = rows[i]
+            reasons = []
+            if ielts_req[i] > 0 and ielts_margin[i] >= 0.5:
+                reasons.append("✓ Strong IELTS match")
+            if budget_points[i] == 25:
+                reasons.append("✓ Well within budget")
+            elif budget_points[i] == 20:
+                reasons.append("✓ Good budget fit")
+            if partner[i]:
+                reasons.append("✓ Partner university (faster processing)")
+            if work_required[i] and work_met[i]:
+                reasons.append("✓ Work experience requirement met")
+            if interest_hits[i]:
+                reasons.append(f"✓ Matches {interest_hits[i]} interest(s)")
+            if verified[i]:
+                reasons.append("✓ Verified data")
+            if avg_rating[i] >= 4:
+                reasons.append(f"✓ Highly rated ({avg_rating[i]:.1f}★)")
+
+            course_score = float(score[i])
+            if course_score.is_integer():
+                course_score = int(course_score)
+            rating = ratings.get(row[0])
+
+            results.append({
+                'id': row[0],
+                'name': row[1],
+                'university': row[11],
+                'university_country': row[12],
+                'level': row[2],
+                'tuition_fee': float(fee[i]),
+                'currency': row[4],
+                'duration': row[3],
+                'ielts_overall': float(ielts_req[i]) if ielts_req[i] else None,
+                'is_partner': bool(partner[i]),
+                'match_score': max(0, course_score),
+                'match_percentage': min(100, max(0, course_score)),
+                'reasons': reasons,
+                'avg_rating': round(rating['avg'], 1) if rating and rating['avg'] else None,
+                'review_count': rating['count'] if rating else 0,
+                'career_paths': career_paths.get(row[0], []),
+            })
+
+        return n, results
+
+    @staticmethod
+    def _career_paths(course_ids):
+        """Up to CAREER_PATHS_PER_COURSE active career paths per course, in one query."""
+        career_paths = {}
+        links = (
+            CareerPath.courses.through.objects
+            .filter(course_id__in=course_ids, careerpath__is_active=True)
+            .order_by('careerpath__sector', 'careerpath__name')
+            .values_list('course_id', 'careerpath__name', 'careerpath__salary_median')
+        )
+        for course_id, name, salary_median in links:
+            paths = career_paths.setdefault(course_id, [])
+            if len(paths) < CAREER_PATHS_PER_COURSE:
+                paths.append({'name': name, 'salary_median': salary_median})
+        return career_paths
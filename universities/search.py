@@ -0,0 +1,254 @@
+"""
+Course search index.
+
+Every Course has a CourseSearchDocument holding its searchable text: the
+course name as the title, plus department, university name/city, course
+code and level synonyms as the body. The documents feed a backend-specific
+index:
+
+- PostgreSQL: weighted tsvector (GIN) for ranked prefix matching, and
+  trigram (GIN) indexes on title/body for typo tolerance.
+- SQLite (dev): an FTS5 virtual table ranked with bm25; misspelt terms are
+  corrected against the FTS5 vocabulary.
+
+Documents are refreshed incrementally by universities.signals and can be
+rebuilt in full with `manage.py rebuild_search_index`.
+"""
+import difflib
+import re
+import uuid
+
+from django.contrib.postgres.search import (
+    SearchQuery, SearchRank, SearchVector, TrigramWordSimilarity,
+)
+from django.db import connections, transaction
+from django.db.models import Case, F, FloatField, Q, Value, When
+from django.db.models.functions import Greatest
+
+from .models import Course, CourseSearchDocument
+
+
+FTS_TABLE = 'universities_course_fts'
+FTS_VOCAB_TABLE = 'universities_course_fts_vocab'
+
+LEVEL_SYNONYMS = {
+    'FOUNDATION': 'foundation year',
+    'UG': 'undergraduate bachelor bachelors degree bsc ba beng llb',
+    'PG': 'postgraduate master masters msc ma mba meng llm',
+    'PHD': 'phd doctorate doctoral research',
+    'PRE_MASTERS': 'pre-masters premasters pre masters',
+    'DIPLOMA': 'diploma certificate',
+}
+
+# SQLite results are ranked in Python, so cap how many ids are pulled back
+FTS_MAX_RESULTS = 500
+MAX_TERMS = 8
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(text):
+    """Lower-cased word tokens of text."""
+    return [token.lower() for token in _TOKEN_RE.findall(text or '')]
+
+
+def build_document(name, department, course_code, level, university_name, university_city):
+    """Return the (title, body) search text for a course."""
+    parts = (
+        department, university_name, university_city, course_code,
+        level, LEVEL_SYNONYMS.get((level or '').upper()),
+    )
+    return (name or '')[:255], ' '.join(part for part in parts if part)
+
+
+def _chunks(items, size=500):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _hex(course_id):
+    return course_id.hex if isinstance(course_id, uuid.UUID) else uuid.UUID(str(course_id)).hex
+
+
+def _document_vector():
+    return (
+        SearchVector('title', weight='A', config='simple') +
+        SearchVector('body', weight='B', config='simple')
+    )
+
+
+# ============================================================
+# INDEXING
+# ============================================================
+
+def index_courses(course_ids=None, using='default'):
+    """
+    Refresh search documents for the given courses, or for the whole
+    catalog when course_ids is None. Courses that no longer exist (or are
+    soft-deleted) drop out of the index. Returns the number indexed.
+    """
+    scoped = course_ids is not None
+    if scoped:
+        course_ids = list(course_ids)
+        if not course_ids:
+            return 0
+
+    rows = Course.objects.using(using).filter(university__is_deleted=False)
+    if scoped:
+        rows = rows.filter(id__in=course_ids)
+
+    documents = []
+    for course_id, name, department, code, level, uni_name, uni_city in rows.values_list(
+        'id', 'name', 'department', 'course_code', 'level', 'university__name', 'university__city'
+    ):
+        title, body = build_document(name, department, code, level, uni_name, uni_city)
+        documents.append(CourseSearchDocument(course_id=course_id, title=title, body=body))
+
+    with transaction.atomic(using=using):
+        existing = CourseSearchDocument.objects.using(using).all()
+        if scoped:
+            existing = existing.filter(course_id__in=course_ids)
+        existing.delete()
+        CourseSearchDocument.objects.using(using).bulk_create(documents, batch_size=500)
+        _sync_backend(using, documents, course_ids if scoped else None)
+
+    return len(documents)
+
+
+def _sync_backend(using, documents, course_ids):
+    """Mirror freshly written documents into the vendor-specific index."""
+    connection = connections[using]
+
+    if connection.vendor == 'postgresql':
+        refreshed = CourseSearchDocument.objects.using(using).all()
+        if course_ids is not None:
+            refreshed = refreshed.filter(course_id__in=course_ids)
+        refreshed.update(search_vector=_document_vector())
+
+    elif connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            if course_ids is None:
+                cursor.execute(f'DELETE FROM {FTS_TABLE}')
+            else:
+                for chunk in _chunks([_hex(course_id) for course_id in course_ids]):
+                    placeholders = ', '.join(['%s'] * len(chunk))
+                    cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE course_id IN ({placeholders})', chunk)
+            cursor.executemany(
+                f'INSERT INTO {FTS_TABLE} (course_id, title, body) VALUES (%s, %s, %s)',
+                [(_hex(doc.course_id), doc.title, doc.body) for doc in documents],
+            )
+
+
+# ============================================================
+# QUERYING
+# ============================================================
+
+def search_courses(queryset, query):
+    """
+    Restrict a Course queryset to matches for query.
+
+    The result is annotated with `search_rank` (higher is more relevant)
+    and ordered by it. Every term is matched as a prefix, so partial input
+    from the course finder works, and near-miss spellings still match.
+    """
+    terms = tokenize(query)[:MAX_TERMS]
+    if not terms:
+        return queryset
+
+    vendor = connections[queryset.db].vendor
+    if vendor == 'postgresql':
+        queryset = _postgres_search(queryset, query, terms)
+    elif vendor == 'sqlite':
+        queryset = _fts5_search(queryset, terms)
+    else:
+        queryset = _fallback_search(queryset, query)
+
+    return queryset.order_by('-search_rank', 'name')
+
+
+def autocomplete(queryset, query, limit=10):
+    """Top `limit` courses for a partially typed query."""
+    return search_courses(queryset, query)[:limit]
+
+
+def _postgres_search(queryset, query, terms):
+    ts_query = SearchQuery(
+        ' & '.join(f'{term}:*' for term in terms), search_type='raw', config='simple'
+    )
+    # `trigram_word_similar` (%>) is served by the trigram GIN indexes and
+    # catches misspellings that the prefix tsquery misses
+    return queryset.filter(
+        Q(search_document__search_vector=ts_query) |
+        Q(search_document__title__trigram_word_similar=query) |
+        Q(search_document__body__trigram_word_similar=query)
+    ).annotate(
+        search_rank=SearchRank(F('search_document__search_vector'), ts_query) + Greatest(
+            TrigramWordSimilarity(query, 'search_document__title'),
+            TrigramWordSimilarity(query, 'search_document__body'),
+        ),
+    )
+
+
+def _fts5_search(queryset, terms):
+    connection = connections[queryset.db]
+    ranked = _fts5_ranked_ids(connection, terms)
+    if not ranked:
+        corrected = _fts5_correct_terms(connection, terms)
+        if corrected != terms:
+            ranked = _fts5_ranked_ids(connection, corrected)
+
+    if not ranked:
+        return queryset.none().annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+    ids = [uuid.UUID(course_hex) for course_hex in ranked]
+    ranks = [
+        When(id=course_id, then=Value(float(len(ids) - position)))
+        for position, course_id in enumerate(ids)
+    ]
+    return queryset.filter(id__in=ids).annotate(
+        search_rank=Case(*ranks, default=Value(0.0), output_field=FloatField())
+    )
+
+
+def _fts5_ranked_ids(connection, terms):
+    """Course ids (hex) matching every term as a prefix, best bm25 first."""
+    match = ' '.join(f'"{term}"*' for term in terms)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT course_id FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+            f'ORDER BY bm25({FTS_TABLE}, 0.0, 10.0, 2.0) LIMIT %s',
+            [match, FTS_MAX_RESULTS],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _fts5_correct_terms(connection, terms):
+    """Replace terms that are not a prefix of any indexed word with the closest indexed word."""
+    corrected = []
+    with connection.cursor() as cursor:
+        for term in terms:
+            cursor.execute(
+                f'SELECT 1 FROM {FTS_VOCAB_TABLE} WHERE term >= %s AND term < %s LIMIT 1',
+                [term, term + '\uffff'],
+            )
+            if cursor.fetchone() or len(term) < 3:
+                corrected.append(term)
+                continue
+            # Block candidates on the first letter to keep the comparison cheap
+            cursor.execute(
+                f'SELECT term FROM {FTS_VOCAB_TABLE} WHERE term >= %s AND term < %s',
+                [term[0], term[0] + '\uffff'],
+            )
+            candidates = [row[0] for row in cursor.fetchall()]
+            matches = difflib.get_close_matches(term, candidates, n=1, cutoff=0.75)
+            corrected.append(matches[0] if matches else term)
+    return corrected
+
+
+def _fallback_search(queryset, query):
+    """Unindexed substring match for database backends without a search index."""
+    return queryset.filter(
+        Q(name__icontains=query) |
+        Q(university__name__icontains=query) |
+        Q(department__icontains=query)
+    ).annotate(search_rank=Value(0.0, output_field=FloatField()))
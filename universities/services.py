@@ -1,6 +1,11 @@
 from decimal import Decimal
-from .models import University
+from django.db.models import (
+    Case, DecimalField, Exists, F, IntegerField, OuterRef, Prefetch, Q, Value, When,
+)
+from django.db.models.functions import Coalesce, Floor, Greatest, Least, Round
+from .models import University, AdmissionCriteria, IntakeDate, Scholarship
 from .serializers import UniversityMatchSerializer
+from .forecast import FORECAST_BUCKETS
 
 class UniversityMatchingService:
     """
@@ -33,94 +38,90 @@ class UniversityMatchingService:
              return []
 
         # Build base queryset
-        universities = University.objects.filter(
-            is_active=True
-        ).select_related('admission_criteria', 'partnership_agreement').prefetch_related('scholarships', 'courses__intake_dates')
+        universities = University.objects.filter(is_active=True)
         
         # Country filter
         if target_country and target_country.lower() != 'any':
             universities = universities.filter(country__iexact=target_country)
         
-        matched_universities = []
+        universities = universities.annotate(
+            has_criteria=Exists(AdmissionCriteria.all_objects.filter(university=OuterRef('pk'))),
+            min_pct=Coalesce('admission_criteria__min_percentage', Value(Decimal('0')), output_field=DecimalField()),
+            min_ielts=Coalesce('admission_criteria__min_ielts', Value(Decimal('0')), output_field=DecimalField()),
+            gap_limit=Case(
+                When(admission_criteria__gap_limit__gt=0, then=F('admission_criteria__gap_limit')),
+                default=Value(10),
+                output_field=IntegerField(),
+            ),
+            rank=Coalesce('admission_criteria__priority_rank', Value(10), output_field=IntegerField()),
+            has_scholarship=Exists(
+                UniversityMatchingService._eligible_scholarships(cgpa, ielts).filter(university=OuterRef('pk'))
+            ),
+        )
         
-        for uni in universities:
-            criteria = getattr(uni, 'admission_criteria', None)
-            
-            if not criteria:
-                # No criteria defined - include with low priority
-                uni.match_score = 50
-                uni.matched_scholarships = []
-                matched_universities.append(uni)
-                continue
-            
-            # Academic Check
-            min_pct = criteria.min_percentage or Decimal('0')
-            if cgpa < min_pct:
-                continue
-            
-            # Language Check
-            min_ielts = criteria.min_ielts or Decimal('0')
-            if ielts < min_ielts:
-                continue
-            
-            # Gap Check
-            gap_limit = criteria.gap_limit or 10
-            if gap_years > gap_limit:
-                continue
-            
-            # Intake Matching (Optional Filter)
-            if target_intake:
-                has_intake = False
-                for course in uni.courses.all():
-                    if course.intake_dates.filter(month__iexact=target_intake, is_active=True).exists():
-                        has_intake = True
-                        break
-                if not has_intake:
-                    continue
-            
-            # Scholarship Matching Logic
-            eligible_scholarships = []
-            for scholarship in uni.scholarships.all():
-                if not scholarship.is_active:
-                    continue
-                    
-                s_min_cgpa = scholarship.min_cgpa or Decimal('0')
-                s_min_ielts = scholarship.min_ielts or Decimal('0')
-                
-                if cgpa >= s_min_cgpa and ielts >= s_min_ielts:
-                    eligible_scholarships.append(scholarship)
-            
-            uni.matched_scholarships = eligible_scholarships
-            
-            # Calculate Match Score
-            base_score = 100
-            
-            # Partner Bonus
-            partner_bonus = 30 if uni.is_partner else 0
-            
-            priority_bonus = max(0, 50 - (criteria.priority_rank * 10))
-            academic_bonus = min(20, int((cgpa - min_pct) / 2))
-            ielts_bonus = min(15, int((ielts - min_ielts) * 10))
-            scholarship_bonus = 20 if eligible_scholarships else 0
-            
-            uni.match_score = base_score + partner_bonus + priority_bonus + academic_bonus + ielts_bonus + scholarship_bonus
-            matched_universities.append(uni)
+        # Criteria checks (academic, language, gap) - universities without
+        # criteria are always included with a flat low score
+        eligible = (
+            Q(min_pct__lte=cgpa) &
+            Q(min_ielts__lte=ielts) &
+            Q(gap_limit__gte=gap_years)
+        )
         
-        # Ranking Engine
-        matched_universities.sort(
-            key=lambda x: (
-                getattr(x.admission_criteria, 'priority_rank', 10) if hasattr(x, 'admission_criteria') and x.admission_criteria else 10,
-                -getattr(x, 'match_score', 0)
+        # Intake Matching (Optional Filter)
+        if target_intake:
+            universities = universities.annotate(
+                has_intake=Exists(IntakeDate.objects.filter(
+                    course__university=OuterRef('pk'),
+                    course__is_deleted=False,
+                    month__iexact=target_intake,
+                    is_active=True,
+                ))
             )
+            eligible &= Q(has_intake=True)
+        
+        universities = universities.filter(Q(has_criteria=False) | eligible)
+        
+        # Score: base 100 + partner 30 + priority (50 - rank*10) + academic
+        # headroom (max 20) + IELTS headroom (max 15) + scholarship 20.
+        # Round() before Floor() absorbs float drift on SQLite decimals.
+        universities = universities.annotate(
+            match_score=Case(
+                When(has_criteria=False, then=Value(50)),
+                default=(
+                    Value(100) +
+                    Case(When(is_partner=True, then=Value(30)), default=Value(0)) +
+                    Greatest(Value(0), Value(50) - F('rank') * 10) +
+                    Least(Value(20), Floor(Round((Value(cgpa) - F('min_pct')) / 2, 4)), output_field=IntegerField()) +
+                    Least(Value(15), Floor(Round((Value(ielts) - F('min_ielts')) * 10, 4)), output_field=IntegerField()) +
+                    Case(When(has_scholarship=True, then=Value(20)), default=Value(0))
+                ),
+                output_field=IntegerField(),
+            ),
         )
         
-        # Slicing
-        top_matches = matched_universities[:10]
+        total_matches = universities.count()
+        
+        # Ranking Engine: priority rank first, then score; only the top 10
+        # are materialized
+        top_matches = list(
+            universities
+            .order_by('rank', '-match_score', 'name', 'id')
+            .select_related('admission_criteria')
+            .prefetch_related(Prefetch(
+                'scholarships',
+                queryset=UniversityMatchingService._eligible_scholarships(cgpa, ielts),
+                to_attr='matched_scholarships',
+            ))[:10]
+        )
+        for uni in top_matches:
+            uni.match_score = int(uni.match_score)
+            if not uni.has_criteria:
+                uni.matched_scholarships = []
         
         # We return the data dict for the response
         serializer = UniversityMatchSerializer(top_matches, many=True)
         return {
-            'total_matches': len(matched_universities),
+            'total_matches': total_matches,
             'showing': len(top_matches),
             'input': {
                 'cgpa': str(cgpa),
@@ -131,6 +132,14 @@ class UniversityMatchingService:
             'results': serializer.data
         }
 
+    @staticmethod
+    def _eligible_scholarships(cgpa, ielts):
+        """Active scholarships whose CGPA/IELTS thresholds the student meets."""
+        return Scholarship.objects.filter(is_active=True).filter(
+            Q(min_cgpa__isnull=True) | Q(min_cgpa__lte=cgpa),
+            Q(min_ielts__isnull=True) | Q(min_ielts__lte=ielts),
+        )
+
 
 class CommissionIntelligenceService:
     """
@@ -147,13 +156,11 @@ class CommissionIntelligenceService:
             - Per-university breakdown
             - Pipeline projections by status
         """
-        from applications.models import Application
-        from django.db.models import Sum, Count, F, Case, When, DecimalField
-
-        # Get partner universities with commission data
+        # Partner universities with their agreement and materialized
+        # pipeline (maintained by universities.forecast) in one query
         partners = University.objects.filter(
             is_partner=True, is_active=True
-        ).select_related('partnership_agreement').prefetch_related('applications')
+        ).select_related('partnership_agreement', 'commission_forecast')
 
         university_commissions = []
         total_earned = Decimal('0')
@@ -166,6 +173,10 @@ class CommissionIntelligenceService:
         }
 
         for university in partners:
+            forecast = getattr(university, 'commission_forecast', None)
+            if forecast is None:
+                continue
+
             # Get commission rate from partnership agreement or fallback to university rate
             agreement = getattr(university, 'partnership_agreement', None)
             if agreement and agreement.is_active_contract():
@@ -175,44 +186,24 @@ class CommissionIntelligenceService:
                 commission_rate = university.commission_rate or Decimal('0')
                 flat_fee = Decimal('0')
 
-            # Get applications for this university
-            applications = Application.objects.filter(
-                university=university,
-                is_deleted=False
-            )
-
-            # Calculate per-status
+            # Commission per bucket = (tuition total * rate + count * flat fee) * probability
             uni_earned = Decimal('0')
             uni_projected = Decimal('0')
-            uni_pending = 0
-            uni_offer = 0
-            uni_cas = 0
-            uni_enrolled = 0
-
-            for app in applications:
-                tuition = app.tuition_fee or Decimal('0')
-                commission_amount = (tuition * commission_rate / Decimal('100')) + flat_fee
-
-                if app.status == 'ENROLLED':
-                    uni_earned += commission_amount
-                    uni_enrolled += 1
-                    pipeline_stats['enrolled']['count'] += 1
-                    pipeline_stats['enrolled']['earned'] += commission_amount
-                elif app.status in ['CAS_RECEIVED', 'CAS_REQUESTED']:
-                    uni_projected += commission_amount * Decimal('0.9')  # 90% likely
-                    uni_cas += 1
-                    pipeline_stats['cas_received']['count'] += 1
-                    pipeline_stats['cas_received']['projected'] += commission_amount * Decimal('0.9')
-                elif app.status in ['UNCONDITIONAL_OFFER', 'OFFER_ACCEPTED', 'CONDITIONAL_OFFER']:
-                    uni_projected += commission_amount * Decimal('0.6')  # 60% likely
-                    uni_offer += 1
-                    pipeline_stats['offer']['count'] += 1
-                    pipeline_stats['offer']['projected'] += commission_amount * Decimal('0.6')
-                elif app.status in ['SUBMITTED', 'UNDER_REVIEW', 'DOCUMENTS_READY']:
-                    uni_projected += commission_amount * Decimal('0.3')  # 30% likely
-                    uni_pending += 1
-                    pipeline_stats['pending']['count'] += 1
-                    pipeline_stats['pending']['projected'] += commission_amount * Decimal('0.3')
+            stats = {}
+            for bucket, (_statuses, probability) in FORECAST_BUCKETS.items():
+                count = getattr(forecast, f'{bucket}_count')
+                stats[bucket] = count
+                if not count:
+                    continue
+                tuition = getattr(forecast, f'{bucket}_tuition')
+                amount = (tuition * commission_rate / Decimal('100')) + flat_fee * count
+                pipeline_stats[bucket]['count'] += count
+                if bucket == 'enrolled':
+                    uni_earned += amount
+                    pipeline_stats[bucket]['earned'] += amount
+                else:
+                    uni_projected += amount * probability
+                    pipeline_stats[bucket]['projected'] += amount * probability
 
             total_earned += uni_earned
             total_projected += uni_projected
@@ -226,12 +217,7 @@ class CommissionIntelligenceService:
                     'flat_fee': str(flat_fee),
                     'earned': str(uni_earned),
                     'projected': str(uni_projected),
-                    'stats': {
-                        'pending': uni_pending,
-                        'offer': uni_offer,
-                        'cas_received': uni_cas,
-                        'enrolled': uni_enrolled,
-                    }
+                    'stats': stats,
                 })
 
         # Sort by earned + projected (top performers first)
@@ -0,0 +1,92 @@
+"""
+Signals for university/course master data.
+Bumps the catalog version and keeps the course search index in step with
+catalog edits, and the materialized commission forecast in step with
+application changes.
+"""
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .catalog import CATALOG_MODELS, bump_catalog_version
+from .forecast import bucket_for, refresh_forecast
+from .models import Course, University
+from .search import index_courses
+
+
+# ============================================================
+# CATALOG VERSION
+# ============================================================
+def bump_catalog_on_write(sender, **kwargs):
+    """Any catalog write invalidates catalog-versioned caches."""
+    bump_catalog_version()
+
+
+for _model in CATALOG_MODELS:
+    post_save.connect(bump_catalog_on_write, sender=_model, dispatch_uid=f'catalog_version_save_{_model.__name__}')
+    post_delete.connect(bump_catalog_on_write, sender=_model, dispatch_uid=f'catalog_version_delete_{_model.__name__}')
+
+
+# ============================================================
+# COURSE SEARCH INDEX
+# ============================================================
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+def refresh_course_search_document(sender, instance, **kwargs):
+    """Re-index a single course (soft/hard deletes drop it from the index)."""
+    index_courses([instance.pk], using=kwargs.get('using') or 'default')
+
+
+@receiver(post_save, sender=University)
+def refresh_university_course_documents(sender, instance, created, update_fields=None, **kwargs):
+    """University name/city are part of every course document."""
+    if created:
+        return
+    if update_fields is not None and not {'name', 'city', 'is_deleted'} & set(update_fields):
+        return
+    using = kwargs.get('using') or 'default'
+    index_courses(
+        Course.all_objects.using(using).filter(university=instance).values_list('id', flat=True),
+        using=using,
+    )
+
+
+# ============================================================
+# COMMISSION FORECAST
+# ============================================================
+def _forecast_state(status, tuition_fee, university_id, is_deleted):
+    """The part of an application the forecast depends on (None if it does not count)."""
+    bucket = None if is_deleted else bucket_for(status)
+    if bucket is None or university_id is None:
+        return None
+    return bucket, tuition_fee, university_id
+
+
+@receiver(pre_save, sender='applications.Application')
+def capture_application_forecast_state(sender, instance, **kwargs):
+    instance._forecast_previous = None
+    if instance._state.adding:
+        return
+    fields = ('status', 'tuition_fee', 'university_id', 'is_deleted')
+    if instance.is_tracking(*fields):
+        previous = [instance.previous_value(field) for field in fields]
+    else:
+        # Not loaded from the database (or fields deferred): read the stored row
+        previous = sender.all_objects.filter(pk=instance.pk).values_list(*fields).first()
+    if previous:
+        instance._forecast_previous = _forecast_state(*previous)
+
+
+@receiver(post_save, sender='applications.Application')
+def refresh_application_forecast(sender, instance, **kwargs):
+    """Refresh the forecast rows of the universities an application moved between."""
+    previous = getattr(instance, '_forecast_previous', None)
+    current = _forecast_state(instance.status, instance.tuition_fee, instance.university_id, instance.is_deleted)
+    if previous == current:
+        return
+    refresh_forecast({state[2] for state in (previous, current) if state})
+
+
+@receiver(post_delete, sender='applications.Application')
+def refresh_deleted_application_forecast(sender, instance, **kwargs):
+    if _forecast_state(instance.status, instance.tuition_fee, instance.university_id, instance.is_deleted):
+        refresh_forecast([instance.university_id])
@@ -1,3 +1,514 @@
+import os
+import tempfile
+from decimal import Decimal
+from io import StringIO
+
+import openpyxl
+import pandas as pd
+
+from django.core.cache import cache
+from django.core.management import call_command
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from applications.models import Application
+from branches.models import Branch
+from students.models import Student
+
+from .catalog import catalog_cache_stats
+from .eligibility import EligibilityEngine
+from .models import (
+    University, Course, CourseRequirement, Scholarship, AdmissionCriteria, IntakeDate,
+    CourseReview, CareerPath, UniversityCommissionForecast,
+)
+from .recommendations import CourseRecommender
+from .search import search_courses
+from .services import UniversityMatchingService, CommissionIntelligenceService
+
+
+class EligibilityEngineTests(TestCase):
+    def setUp(self):
+        self.partner = University.objects.create(name='Partner University', country='UK', is_partner=True)
+        self.other = University.objects.create(name='Other University', country='UK', is_partner=False)
+
+        self.data_science = Course.objects.create(
+            university=self.partner,
+            name='MSc Data Science',
+            level='PG',
+            duration='1 Year',
+            tuition_fee=Decimal('20000'),
+            ielts_overall=Decimal('6.5'),
+            is_data_verified=True,
+        )
+        self.finance = Course.objects.create(
+            university=self.partner,
+            name='MSc Finance',
+            level='PG',
+            duration='1 Year',
+            tuition_fee=Decimal('18000'),
+            ielts_overall=Decimal('7.0'),
+        )
+        Course.objects.create(
+            university=self.other,
+            name='MSc Non Partner',
+            level='PG',
+            duration='1 Year',
+            tuition_fee=Decimal('10000'),
+        )
+        CourseRequirement.objects.create(
+            course=self.finance,
+            country='PK',
+            min_qualification='16 years education',
+            min_percentage=70,
+        )
+        Scholarship.objects.create(
+            university=self.partner,
+            name='Merit Award',
+            amount_type=Scholarship.AmountType.PERCENTAGE,
+            value=Decimal('10'),
+            min_cgpa=Decimal('60'),
+        )
+
+    def _profile(self, **overrides):
+        profile = {
+            'country': 'PK',
+            'ielts_score': Decimal('6.5'),
+            'percentage': 65,
+            'has_work_exp': False,
+            'work_exp_years': 0,
+            'level': 'PG',
+            'max_fee': None,
+            'intake': 'sep',
+        }
+        profile.update(overrides)
+        return profile
+
+    def test_scores_partner_courses_with_issues_and_scholarship(self):
+        total, results = EligibilityEngine.match(self._profile())
+
+        self.assertEqual(total, 2)
+        self.assertEqual([r['name'] for r in results], ['MSc Data Science', 'MSc Finance'])
+
+        best, second = results
+        self.assertEqual(best['eligibility_status'], 'eligible')
+        self.assertEqual(best['match_score'], 100)
+        self.assertEqual(best['matching_scholarship']['name'], 'Merit Award')
+        self.assertEqual(best['total_savings'], 2000.0)
+
+        self.assertEqual(second['eligibility_status'], 'conditional')
+        self.assertEqual(len(second['issues']), 2)
+        self.assertEqual(second['country_requirements'], '16 years education')
+
+    def test_filters_and_snapshot_refresh(self):
+        total, results = EligibilityEngine.match(self._profile(max_fee=19000))
+        self.assertEqual(total, 1)
+        self.assertEqual(results[0]['id'], self.finance.id)
+
+        self.finance.tuition_fee = Decimal('25000')
+        self.finance.save()
+        total, _ = EligibilityEngine.match(self._profile(max_fee=19000))
+        self.assertEqual(total, 0)
+
+
+class CourseSearchTests(TestCase):
+    def setUp(self):
+        self.manchester = University.objects.create(name='University of Manchester', city='Manchester')
+        self.leeds = University.objects.create(name='University of Leeds', city='Leeds')
+        self.data_science = Course.objects.create(
+            university=self.manchester, name='MSc Data Science', level='PG',
+            duration='1 Year', tuition_fee=Decimal('25000'), department='Computer Science',
+        )
+        self.accounting = Course.objects.create(
+            university=self.leeds, name='BSc Accounting', level='UG',
+            duration='3 Years', tuition_fee=Decimal('20000'), department='Business School',
+        )
+
+    def _search(self, query):
+        return list(search_courses(Course.objects.all(), query))
+
+    def test_prefix_synonym_and_typo_matching(self):
+        self.assertEqual(self._search('data sci'), [self.data_science])
+        self.assertEqual(self._search('postgraduate'), [self.data_science])
+        self.assertEqual(self._search('acounting'), [self.accounting])
+        self.assertEqual(self._search('astrophysics'), [])
+
+    def test_index_follows_course_and_university_saves(self):
+        self.leeds.name = 'Leeds Beckett University'
+        self.leeds.save()
+        self.assertEqual(self._search('beckett'), [self.accounting])
+
+        self.accounting.delete()
+        self.assertEqual(self._search('beckett'), [])
+
+
+class UniversityMatchingServiceTests(TestCase):
+    def setUp(self):
+        self.partner = University.objects.create(name='Partner University', country='UK', is_partner=True)
+        AdmissionCriteria.objects.create(
+            university=self.partner, min_percentage=Decimal('55'), min_ielts=Decimal('6.0'),
+            gap_limit=2, priority_rank=1,
+        )
+        Scholarship.objects.create(
+            university=self.partner, name='Merit Award', value=Decimal('10'), min_cgpa=Decimal('60'),
+        )
+        course = Course.objects.create(
+            university=self.partner, name='MSc Finance', level='PG',
+            duration='1 Year', tuition_fee=Decimal('18000'),
+        )
+        IntakeDate.objects.create(course=course, month='September', year=2026)
+
+        self.strict = University.objects.create(name='Strict University', country='UK')
+        AdmissionCriteria.objects.create(university=self.strict, min_percentage=Decimal('80'), priority_rank=2)
+        self.open = University.objects.create(name='Open University', country='UK')
+
+    def test_filters_scores_and_ranks_in_the_database(self):
+        with self.assertNumQueries(3):
+            result = UniversityMatchingService.find_matches(
+                {'cgpa': 65, 'ielts': '6.5', 'gap_years': 1, 'target_country': 'UK'}
+            )
+
+        self.assertEqual(result['total_matches'], 2)
+        best, fallback = result['results']
+        self.assertEqual(best['name'], 'Partner University')
+        # 100 base + 30 partner + 40 priority + 5 academic + 5 IELTS + 20 scholarship
+        self.assertEqual(best['match_score'], 200)
+        self.assertEqual([s['name'] for s in best['scholarships']], ['Merit Award'])
+        self.assertEqual(fallback['name'], 'Open University')
+        self.assertEqual(fallback['match_score'], 50)
+
+    def test_target_intake_requires_an_active_intake(self):
+        result = UniversityMatchingService.find_matches(
+            {'cgpa': 85, 'ielts': '7.0', 'target_country': 'UK', 'target_intake': 'january'}
+        )
+        self.assertEqual([r['name'] for r in result['results']], ['Open University'])
+
+
+class CourseRecommenderTests(TestCase):
+    def setUp(self):
+        partner = University.objects.create(name='Partner University', country='UK', is_partner=True)
+        other = University.objects.create(name='Other University', country='UK')
+        self.ai = Course.objects.create(
+            university=partner, name='MSc Artificial Intelligence', level='PG', duration='1 Year',
+            tuition_fee=Decimal('15000'), ielts_overall=Decimal('6.0'), department='Computer Science',
+        )
+        self.maintenance = Course.objects.create(
+            university=other, name='MSc Maintenance Engineering', level='PG', duration='1 Year',
+            tuition_fee=Decimal('24000'), work_experience_required=True, work_experience_years=2,
+        )
+        reviewer = User.objects.create_user(username='reviewer', email='reviewer@example.com', password='pass')
+        CourseReview.objects.create(course=self.ai, user=reviewer, overall_rating=5)
+        career = CareerPath.objects.create(name='ML Engineer', salary_median=60000)
+        career.courses.add(self.ai)
+
+    def test_vectorized_scores_with_bulk_enrichment(self):
+        profile = {'ielts_score': 7.0, 'budget': 25000, 'preferred_country': 'UK', 'preferred_level': 'PG'}
+        with self.assertNumQueries(3):
+            total, results = CourseRecommender.recommend(profile)
+
+        self.assertEqual(total, 2)
+        best, worst = results
+        self.assertEqual(best['id'], self.ai.id)
+        # IELTS 20 + budget 25 + partner 15 + no work req 5 + rating 10
+        self.assertEqual(best['match_score'], 75)
+        self.assertEqual(best['avg_rating'], 5.0)
+        self.assertEqual(best['career_paths'], [{'name': 'ML Engineer', 'salary_median': 60000}])
+        # no IELTS req 15 + budget 10 + work req not met -15
+        self.assertEqual(worst['match_score'], 10)
+        self.assertEqual(worst['career_paths'], [])
+
+    def test_interests_match_whole_tokens(self):
+        total, results = CourseRecommender.recommend(
+            {'ielts_score': 7.0, 'budget': 25000, 'interests': ['artificial intelligence', 'ai']}
+        )
+        scores = {r['id']: r for r in results}
+        self.assertIn('✓ Matches 1 interest(s)', scores[self.ai.id]['reasons'])
+        self.assertFalse(any('interest' in reason for reason in scores[self.maintenance.id]['reasons']))
+
+
+class CommissionForecastTests(TestCase):
+    def setUp(self):
+        branch = Branch.objects.create(code='CF', name='Forecast Branch', country='Testland', currency='USD')
+        student = Student.objects.create(branch=branch, first_name='Fore', last_name='Cast', email='forecast@example.com')
+        self.partner = University.objects.create(name='Partner University', is_partner=True, commission_rate=Decimal('10'))
+        self.offer = Application.objects.create(
+            student=student, branch=branch, university=self.partner,
+            status=Application.Status.CONDITIONAL_OFFER, tuition_fee=Decimal('20000'),
+        )
+        self.enrolled = Application.objects.create(
+            student=student, branch=branch, university=self.partner,
+            status=Application.Status.ENROLLED, tuition_fee=Decimal('15000'),
+        )
+
+    def test_forecast_reads_materialized_pipeline(self):
+        with self.assertNumQueries(1):
+            forecast = CommissionIntelligenceService.get_commission_forecast()
+
+        self.assertEqual(Decimal(forecast['summary']['total_earned']), Decimal('1500'))
+        self.assertEqual(Decimal(forecast['summary']['total_projected']), Decimal('1200'))
+        self.assertEqual(forecast['pipeline']['offer']['count'], 1)
+        self.assertEqual(forecast['universities'][0]['stats']['enrolled'], 1)
+
+    def test_status_and_fee_changes_update_the_pipeline(self):
+        self.offer.status = Application.Status.CAS_RECEIVED
+        self.offer.tuition_fee = Decimal('22000')
+        self.offer.save()
+        self.enrolled.delete()
+
+        row = UniversityCommissionForecast.objects.get(university=self.partner)
+        self.assertEqual((row.offer_count, row.cas_received_count, row.enrolled_count), (0, 1, 0))
+        self.assertEqual(row.cas_received_tuition, Decimal('22000'))
+
+        self.offer.status = Application.Status.WITHDRAWN
+        self.offer.save()
+        self.assertFalse(UniversityCommissionForecast.objects.filter(university=self.partner).exists())
+
+
+class CatalogCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.university = University.objects.create(name='Cached University', is_partner=True)
+        self.course = Course.objects.create(
+            university=self.university, name='MSc Cached', level='PG',
+            duration='1 Year', tuition_fee=Decimal('10000'),
+        )
+        user = User.objects.create_superuser(username='hq', email='hq@example.com', password='pass')
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+
+    def test_course_stats_served_from_cache_until_catalog_write(self):
+        first = self.client.get('/api/v1/courses/stats/').json()
+        with self.assertNumQueries(0):
+            second = self.client.get('/api/v1/courses/stats/').json()
+        self.assertEqual(first, second)
+
+        Course.objects.create(
+            university=self.university, name='MSc Fresh', level='UG',
+            duration='1 Year', tuition_fee=Decimal('20000'),
+        )
+        third = self.client.get('/api/v1/courses/stats/').json()
+        self.assertEqual(third['total_courses'], 2)
+
+        counters = catalog_cache_stats()['endpoints']['course_stats']
+        self.assertEqual((counters['hits'], counters['misses']), (1, 2))
+
+    def test_cached_requirements_still_look_up_the_course(self):
+        url = f'/api/v1/courses/{self.course.id}/requirements/'
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+        # Hidden without a catalog write: the cached payload must not be served
+        Course.objects.filter(pk=self.course.pk).update(is_deleted=True)
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_compare_accepts_uuid_ids(self):
+        response = self.client.get(f'/api/v1/courses/compare/?ids={self.course.id}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['count'], 1)
+
+        stats = self.client.get('/api/v1/universities/cache-stats/').json()
+        self.assertEqual(stats['endpoints']['compare_courses']['misses'], 1)
+
+    def test_compare_keeps_the_first_four_ids_requested(self):
+        others = [
+            Course.objects.create(
+                university=self.university, name=f'MSc Compared {i}', level='PG',
+                duration='1 Year', tuition_fee=Decimal('10000'),
+            )
+            for i in range(4)
+        ]
+        ids = [self.course.id, self.course.id, *(course.id for course in others)]
+        response = self.client.get(f"/api/v1/courses/compare/?ids={','.join(map(str, ids))}")
+        compared = {row['id'] for row in response.json()['courses']}
+        self.assertEqual(compared, {str(course_id) for course_id in ids[1:5]})
+
+
+class CourseFacetsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        partner = University.objects.create(name='Facet Partner University', country='UK', is_partner=True)
+        other = University.objects.create(name='Facet Other University', country='CANADA')
+        Course.objects.create(
+            university=partner, name='MSc Facet Analytics', level='PG', duration='1 Year',
+            tuition_fee=Decimal('18000'), ielts_overall=Decimal('6.5'), intake_january=True,
+        )
+        Course.objects.create(
+            university=partner, name='BSc Facet Computing', level='UG', duration='3 Years',
+            tuition_fee=Decimal('9000'), is_data_verified=True,
+        )
+        Course.objects.create(
+            university=other, name='MBA Facet Leadership', level='PG', duration='2 Years',
+            tuition_fee=Decimal('35000'), ielts_overall=Decimal('7.0'), intake_september=False,
+        )
+        user = User.objects.create_superuser(username='facets', email='facets@example.com', password='pass')
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+
+    def counts(self, facet):
+        return {item['value']: item['count'] for item in facet}
+
+    def test_counts_every_dimension_in_one_query(self):
+        with self.assertNumQueries(1):
+            data = self.client.get('/api/v1/courses/facets/').json()
+
+        facets = data['facets']
+        self.assertEqual(data['total'], 3)
+        self.assertEqual(self.counts(facets['level']), {'PG': 2, 'UG': 1})
+        self.assertEqual(self.counts(facets['country']), {'UK': 2, 'CANADA': 1})
+        self.assertEqual(self.counts(facets['intake']), {'january': 1, 'may': 0, 'september': 2})
+        self.assertEqual(
+            self.counts(facets['fee_band']),
+            {'under_10k': 1, '10k_15k': 0, '15k_20k': 1, '20k_30k': 0, '30k_plus': 1},
+        )
+        self.assertEqual(self.counts(facets['ielts_band'])['none'], 1)
+        self.assertEqual(self.counts(facets['ielts_band'])['6_5'], 1)
+        self.assertEqual(self.counts(facets['is_partner']), {True: 2, False: 1})
+        self.assertEqual(self.counts(facets['verified']), {True: 1, False: 2})
+
+    def test_applies_course_filter_and_caches_per_signature(self):
+        data = self.client.get('/api/v1/courses/facets/?level=pg&search=facet').json()
+        self.assertEqual(data['total'], 2)
+        self.assertEqual(self.counts(data['facets']['country']), {'UK': 1, 'CANADA': 1})
+
+        with self.assertNumQueries(0):
+            cached = self.client.get('/api/v1/courses/facets/?search=facet&level=pg').json()
+        self.assertEqual(cached, data)
+        self.assertEqual(self.client.get('/api/v1/courses/facets/?level=ug').json()['total'], 1)
+
+
+class IntakeCalendarTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        university = University.objects.create(name='Calendar University')
+        self.course = Course.objects.create(
+            university=university, name='MSc Calendar', level='PG',
+            duration='1 Year', tuition_fee=Decimal('15000'),
+        )
+        user = User.objects.create_superuser(username='calendar', email='calendar@example.com', password='pass')
+        self.client = APIClient()
+        self.client.force_authenticate(user)
+
+    def test_month_is_normalized_on_save(self):
+        intake = IntakeDate.objects.create(course=self.course, month='Sept', year=2030)
+        self.assertEqual((intake.month_num, intake.intake_date.isoformat()), (9, '2030-09-01'))
+
+        intake.month = 'jan'
+        intake.save(update_fields=['month'])
+        intake.refresh_from_db()
+        self.assertEqual(intake.month_num, 1)
+        self.assertIsNone(IntakeDate.objects.create(course=self.course, month='Rolling', year=2030).month_num)
+
+    def test_calendar_buckets_in_month_order(self):
+        for month, year in [('September', 2031), ('sep', 2031), ('January', 2031), ('May', 2030)]:
+            IntakeDate.objects.create(course=self.course, month=month, year=year)
+
+        data = self.client.get('/api/v1/courses/calendar/?year=2031').json()
+        self.assertEqual([(m['month'], len(m['courses'])) for m in data['calendar']], [('January', 1), ('September', 2)])
+        self.assertEqual(data['total_intakes'], 3)
+
+        data = self.client.get('/api/v1/courses/calendar/?year=2031&month=Sep').json()
+        self.assertEqual(data['total_intakes'], 2)
+
+    def test_backfill_command_repairs_bulk_loaded_rows(self):
+        IntakeDate.objects.bulk_create([IntakeDate(course=self.course, month='March', year=2032)])
+        out = StringIO()
+        call_command('backfill_intake_months', stdout=out)
+        self.assertIn('Updated 1 intake dates', out.getvalue())
+        self.assertEqual(IntakeDate.objects.get().month_num, 3)
+
+
+class ImportCoursesCommandTests(TestCase):
+    def setUp(self):
+        self.university = University.objects.create(name='Import University')
+        self.course = Course.objects.create(
+            university=self.university, name='MSc Imported', level='PG',
+            duration='1 Year', tuition_fee=Decimal('10000'),
+        )
+        courses = pd.DataFrame([
+            {'university_name': 'import university', 'course_name': 'MSc Imported', 'level': 'pg',
+             'tuition_fee_intl': 12000, 'intake_january': 'Yes'},
+            {'university_name': 'Import University', 'course_name': 'BSc Imported', 'level': 'UG',
+             'tuition_fee_intl': 9000},
+            {'university_name': 'New Import University', 'course_name': 'MA Imported', 'level': 'PG',
+             'tuition_fee_intl': 8000},
+            {'university_name': 'Import University', 'course_name': 'Broken', 'level': 'XX',
+             'tuition_fee_intl': 1},
+        ])
+        requirements = pd.DataFrame([
+            {'course_name': 'MSc Imported', 'university_name': 'Import University',
+             'country_code': 'pk', 'min_qualification': '16 years', 'accepted_qualifications': 'BSc, BE'},
+        ])
+        self.path = os.path.join(tempfile.mkdtemp(), 'courses.xlsx')
+        with pd.ExcelWriter(self.path) as writer:
+            courses.to_excel(writer, sheet_name='Courses', index=False)
+            requirements.to_excel(writer, sheet_name='Country_Requirements', index=False)
+
+    def run_import(self, **options):
+        out = StringIO()
+        call_command('import_courses', file=self.path, stdout=out, stderr=out, **options)
+        return out.getvalue()
+
+    def test_dry_run_reports_diff_without_writing(self):
+        output = self.run_import(dry_run=True)
+
+        self.assertIn('~ MSc Imported [PG] at Import University: tuition_fee, intake_january', output)
+        self.assertIn('+ BSc Imported [UG] at Import University', output)
+        self.assertIn('Row 5: invalid level', output)
+        self.assertEqual(Course.objects.count(), 1)
+        self.assertEqual(University.objects.count(), 1)
+        self.assertFalse(CourseRequirement.objects.exists())
+
+    def test_upserts_on_university_name_and_level(self):
+        self.run_import()
+
+        self.course.refresh_from_db()
+        self.assertEqual(self.course.tuition_fee, Decimal('12000'))
+        self.assertTrue(self.course.intake_january)
+        self.assertEqual(self.course.data_source, Course.DataSource.EXCEL_IMPORT)
+        self.assertEqual(Course.objects.count(), 3)
+        self.assertTrue(University.objects.filter(name='New Import University').exists())
+        requirement = CourseRequirement.objects.get(course=self.course)
+        self.assertEqual((requirement.country, requirement.accepted_qualifications), ('PK', ['BSc', 'BE']))
+        self.assertEqual(search_courses(Course.objects.all(), 'BSc Imported').count(), 1)
+
+        output = self.run_import()
+        self.assertIn('Unchanged: 3', output)
+        self.assertEqual(Course.objects.count(), 3)
+
+
+class ImportPartnersCommandTests(TestCase):
+    def write_workbook(self, rows):
+        workbook = openpyxl.Workbook()
+        sheet = workbook.active
+        sheet.title = 'UK'
+        sheet.append(['Bachelor and Masters Programs'])
+        sheet.append(['University', 'Territories', 'Priority'])
+        for row in rows:
+            sheet.append(row)
+        path = os.path.join(tempfile.mkdtemp(), 'partners.xlsx')
+        workbook.save(path)
+        return path
+
+    def run_import(self, path):
+        out = StringIO()
+        call_command('import_partners', path, stdout=out)
+        return out.getvalue()
+
+    def test_rerun_only_applies_changed_rows_and_retires_missing(self):
+        path = self.write_workbook([
+            ['Alpha University', 'Global', 'Super High'],
+            ['Beta University', 'Global', 'Low'],
+        ])
+        self.assertIn('2 created, 0 updated, 0 unchanged', self.run_import(path))
+        self.assertEqual(AdmissionCriteria.objects.get(university__name='Alpha University').priority_rank, 1)
+
+        with self.assertNumQueries(5):
+            output = self.run_import(path)
+        self.assertIn('0 created, 0 updated, 2 unchanged, 0 retired', output)
 
-# Create your tests here.
+        path = self.write_workbook([
+            ['Alpha University', 'South Asia', 'Medium'],
+        ])
+        self.assertIn('0 created, 1 updated, 0 unchanged, 1 retired', self.run_import(path))
+        criteria = AdmissionCriteria.objects.get(university__name='Alpha University')
+        self.assertEqual((criteria.priority_rank, criteria.accepted_territories), (3, 'South Asia'))
+        self.assertFalse(University.objects.get(name='Beta University').is_partner)
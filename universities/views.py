@@ -1,8 +1,11 @@
+import uuid
+
 from rest_framework import viewsets, filters, status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
+from django.core.exceptions import ValidationError
 from django.db.models import Q, Count, Avg, Sum, Min, Max
 from decimal import Decimal
 from .models import University, Course, AdmissionCriteria, CourseWishlist, LivingCostEstimate
@@ -14,8 +17,13 @@ from .serializers import (
     CourseWishlistSerializer, LivingCostEstimateSerializer
 )
 from .services import UniversityMatchingService
-from .filters import CourseFilter
+from .catalog import catalog_cached, catalog_cache_stats
+from .facets import course_facets
+from .intakes import intake_calendar
+from .filters import CourseFilter, RelevanceOrderingFilter
+from .search import search_courses, autocomplete as autocomplete_courses
 from accounts.permissions import UniversityPermission
+from core.utils.branch_context import is_hq_user
 from audit.mixins import AuditLogMixin
 
 
@@ -65,19 +73,32 @@ class UniversityViewSet(AuditLogMixin, viewsets.ModelViewSet):
         HQ Aggregate Analytics for University partnerships.
         """
         from django.db.models import Count, Sum
-        total_partners = University.objects.filter(is_partner=True).count()
-        total_universities = University.objects.count()
-        countries = University.objects.values('country').annotate(count=Count('id'))
-        
-        # Placeholder for enrollment stats if linkable
-        # This can be expanded as application logic is confirmed
-        
-        return Response({
-            'total_partners': total_partners,
-            'total_universities': total_universities,
-            'geographic_reach': countries,
-            'health_scores': [], # Placeholder for real algorithmic health
-        })
+
+        def compute():
+            total_partners = University.objects.filter(is_partner=True).count()
+            total_universities = University.objects.count()
+            countries = University.objects.order_by('country').values('country').annotate(count=Count('id'))
+
+            # Placeholder for enrollment stats if linkable
+            # This can be expanded as application logic is confirmed
+
+            return {
+                'total_partners': total_partners,
+                'total_universities': total_universities,
+                'geographic_reach': list(countries),
+                'health_scores': [], # Placeholder for real algorithmic health
+            }
+
+        return Response(catalog_cached('university_analytics', {}, compute))
+
+    @action(detail=False, methods=['get'], url_path='cache-stats')
+    def cache_stats(self, request):
+        """
+        Catalog cache monitoring: current version and hit/miss counters per endpoint.
+        """
+        if not is_hq_user(request.user):
+            return Response({'error': 'HQ access required'}, status=status.HTTP_403_FORBIDDEN)
+        return Response(catalog_cache_stats())
 
     @action(detail=False, methods=['get'], url_path='commission-forecast')
     def commission_forecast(self, request):
@@ -175,7 +196,8 @@ class CourseViewSet(AuditLogMixin, viewsets.ModelViewSet):
     ViewSet for Course CRUD operations with advanced search and eligibility matching.
     
     Features:
-    - Full-text search across course name, university, department
+    - Indexed full-text search (ranked, prefix/typo tolerant) with autocomplete
+    - Faceted filter counts for the course finder
     - Filter by price range, IELTS, intakes, work experience
     - Eligibility matching based on student profile
     - Country-specific requirements lookup
@@ -184,9 +206,9 @@ class CourseViewSet(AuditLogMixin, viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated, UniversityPermission]
     
     # Enable search and filtering
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    # ?search= is served by CourseFilter.filter_search via the search index
+    filter_backends = [DjangoFilterBackend, RelevanceOrderingFilter]
     filterset_class = CourseFilter
-    search_fields = ['name', 'university__name', 'department']
     ordering_fields = ['name', 'tuition_fee', 'ielts_overall', 'created_at', 'university__name']
     ordering = ['name']
     
@@ -215,11 +237,7 @@ class CourseViewSet(AuditLogMixin, viewsets.ModelViewSet):
         # Apply search term
         q = request.query_params.get('q')
         if q:
-            queryset = queryset.filter(
-                Q(name__icontains=q) |
-                Q(university__name__icontains=q) |
-                Q(department__icontains=q)
-            )
+            queryset = search_courses(queryset, q)
         
         # Apply filters
         min_fee = request.query_params.get('min_fee')
@@ -259,8 +277,14 @@ class CourseViewSet(AuditLogMixin, viewsets.ModelViewSet):
         if request.query_params.get('verified_only') == 'true':
             queryset = queryset.filter(is_data_verified=True)
         
+        # Most relevant first when searching, cheapest first otherwise
+        if q:
+            queryset = queryset.order_by('-search_rank', 'tuition_fee')
+        else:
+            queryset = queryset.order_by('tuition_fee')
+        
         # Pagination
-        page = self.paginate_queryset(queryset.order_by('tuition_fee'))
+        page = self.paginate_queryset(queryset)
         if page is not None:
             serializer = CourseListSerializer(page, many=True)
             return self.get_paginated_response(serializer.data)
@@ -268,6 +292,58 @@ class CourseViewSet(AuditLogMixin, viewsets.ModelViewSet):
         serializer = CourseListSerializer(queryset[:100], many=True)
         return Response(serializer.data)
 
+    @action(detail=False, methods=['get'], url_path='facets')
+    def facets(self, request):
+        """
+        Filter chip counts for the course finder.
+        
+        Accepts the same query params as the course list (CourseFilter) and
+        returns counts per level, country, intake, fee band, IELTS band,
+        partner and verified flag, computed in one grouped query and cached
+        per filter signature until the catalog changes.
+        """
+        filters = self.filterset_class.base_filters
+        signature = {
+            key: sorted(request.query_params.getlist(key))
+            for key in request.query_params
+            if key in filters
+        }
+        return Response(catalog_cached(
+            'course_facets', signature, lambda: course_facets(self.filter_queryset(Course.objects.all()))
+        ))
+
+    @action(detail=False, methods=['get'], url_path='autocomplete')
+    def autocomplete(self, request):
+        """
+        Course finder type-ahead.
+        
+        Query params:
+        - q: Partial search text (prefix and typo tolerant)
+        - limit: Max suggestions (default 10, max 25)
+        """
+        q = request.query_params.get('q', '').strip()
+        if len(q) < 2:
+            return Response([])
+        
+        try:
+            limit = min(max(int(request.query_params.get('limit', 10)), 1), 25)
+        except ValueError:
+            limit = 10
+        
+        courses = autocomplete_courses(
+            Course.objects.filter(is_active=True).select_related('university'), q, limit=limit
+        )
+        return Response([
+            {
+                'id': course.id,
+                'name': course.name,
+                'level': course.level,
+                'university_name': course.university.name,
+                'university_city': course.university.city,
+            }
+            for course in courses
+        ])
+
     @action(detail=False, methods=['post'], url_path='eligibility-match')
     def eligibility_match(self, request):
         """
@@ -287,7 +363,7 @@ class CourseViewSet(AuditLogMixin, viewsets.ModelViewSet):
         
         Returns courses with eligibility status and match score.
         """
-        from .models import CourseRequirement
+        from .eligibility import EligibilityEngine
         
         data = request.data
         country = data.get('country', 'PK').upper()
@@ -299,136 +375,17 @@ class CourseViewSet(AuditLogMixin, viewsets.ModelViewSet):
         max_fee = data.get('max_fee')
         intake = data.get('intake', 'sep').lower()
         
-        # Start with base queryset
-        queryset = Course.objects.select_related('university').prefetch_related('country_requirements')
-        
-        # Filter by level
-        if level:
-            queryset = queryset.filter(level__iexact=level)
-        
-        # Filter by max fee
-        if max_fee:
-            queryset = queryset.filter(tuition_fee__lte=Decimal(str(max_fee)))
-        
-        # Filter by intake
-        if intake == 'jan':
-            queryset = queryset.filter(intake_january=True)
-        elif intake == 'may':
-            queryset = queryset.filter(intake_may=True)
-        elif intake == 'sep':
-            queryset = queryset.filter(intake_september=True)
-        
-        # Filter by work experience requirement
-        if not has_work_exp:
-            queryset = queryset.filter(work_experience_required=False)
-        
-        # Partner universities only
-        queryset = queryset.filter(university__is_partner=True)
-        
-        # Process eligibility and calculate match scores
-        results = []
-        for course in queryset[:200]:  # Limit for performance
-            match_score = 0
-            eligibility_status = 'eligible'
-            issues = []
-            
-            # Check IELTS requirement
-            if course.ielts_overall and ielts_score < course.ielts_overall:
-                eligibility_status = 'conditional'
-                issues.append(f"IELTS {course.ielts_overall} required, you have {ielts_score}")
-            else:
-                match_score += 20
-            
-            # Check country-specific requirements
-            country_req = course.country_requirements.filter(country=country).first()
-            if country_req:
-                if country_req.min_percentage and percentage < country_req.min_percentage:
-                    eligibility_status = 'conditional'
-                    issues.append(f"Min {country_req.min_percentage}% required, you have {percentage}%")
-                else:
-                    match_score += 20
-                
-                # Check work experience
-                if country_req.work_experience_required and not has_work_exp:
-                    eligibility_status = 'ineligible'
-                    issues.append(f"Work experience required")
-                elif country_req.work_experience_years > work_exp_years:
-                    eligibility_status = 'conditional'
-                    issues.append(f"{country_req.work_experience_years} years experience required")
-                else:
-                    match_score += 20
-            else:
-                match_score += 40  # No specific requirements = assume eligible
-            
-            # Scholarship Matching (Phase 5)
-            matching_s = None
-            total_savings = 0
-            
-            university_scholarships = Scholarship.objects.filter(
-                university=course.university,
-                is_active=True
-            )
-            
-            for s in university_scholarships:
-                # Basic check - can we get this scholarship?
-                s_eligible = True
-                if s.min_cgpa and percentage < s.min_cgpa:
-                    s_eligible = False
-                if s.min_ielts and ielts_score < s.min_ielts:
-                    s_eligible = False
-                    
-                if s_eligible:
-                    # Calculate potential savings
-                    s_savings = 0
-                    if s.amount_type == 'PERCENTAGE':
-                        s_savings = (course.tuition_fee * s.value) / 100
-                    else:
-                        s_savings = s.value
-                    
-                    # Keep track of the best scholarship
-                    if s_savings > total_savings:
-                        total_savings = s_savings
-                        matching_s = {
-                            'name': s.name,
-                            'value': float(s.value),
-                            'amount_type': s.amount_type,
-                            'potential_savings': float(s_savings)
-                        }
-            
-            if matching_s:
-                match_score += 15
-            
-            # Bonus for partner university
-            if course.university.is_partner:
-                match_score += 15
-            
-            # Bonus for verified data
-            if course.is_data_verified:
-                match_score += 10
-            
-            results.append({
-                'id': course.id,
-                'name': course.name,
-                'university_name': course.university.name,
-                'university_city': course.university.city,
-                'university_logo': request.build_absolute_uri(course.university.logo.url) if course.university.logo else None,
-                'is_partner': course.university.is_partner,
-                'level': course.level,
-                'tuition_fee': float(course.tuition_fee),
-                'currency': course.currency,
-                'ielts_required': float(course.ielts_overall) if course.ielts_overall else None,
-                'intakes': course.intakes,
-                'official_url': course.official_url,
-                'match_score': min(match_score, 100),
-                'eligibility_status': eligibility_status,
-                'issues': issues,
-                'country_requirements': country_req.min_qualification if country_req else None,
-                'matching_scholarship': matching_s,
-                'total_savings': float(total_savings) if total_savings > 0 else None
-            })
-        
-        # Sort by match score descending
-        results.sort(key=lambda x: x['match_score'], reverse=True)
+        # Score the whole partner catalog in one vectorized pass, ranked top 50
+        total_matches, results = EligibilityEngine.match({
+            'country': country,
+            'ielts_score': ielts_score,
+            'percentage': percentage,
+            'has_work_exp': has_work_exp,
+            'work_exp_years': work_exp_years,
+            'level': level,
+            'max_fee': max_fee,
+            'intake': intake,
+        }, top_k=50, request=request)
         
         return Response({
             'student_profile': {
@@ -437,8 +394,8 @@ class CourseViewSet(AuditLogMixin, viewsets.ModelViewSet):
                 'percentage': percentage,
                 'has_work_exp': has_work_exp
             },
-            'total_matches': len(results),
-            'courses': results[:50]  # Return top 50 matches
+            'total_matches': total_matches,
+            'courses': results
         })
 
     @action(detail=True, methods=['get'], url_path='requirements')
@@ -447,24 +404,29 @@ class CourseViewSet(AuditLogMixin, viewsets.ModelViewSet):
         Get country-specific requirements for a course.
         """
         from .serializers import CourseRequirementSerializer
-        
+
+        # Looked up (and permission-checked) on every request, cached or not
         course = self.get_object()
-        requirements = course.country_requirements.all()
-        serializer = CourseRequirementSerializer(requirements, many=True)
-        
-        return Response({
-            'course_id': course.id,
-            'course_name': course.name,
-            'university': course.university.name,
-            'general_requirements': {
-                'ielts_overall': float(course.ielts_overall) if course.ielts_overall else None,
-                'ielts_each_band': float(course.ielts_each_band) if course.ielts_each_band else None,
-                'academic_requirement': course.academic_requirement,
-                'work_experience_required': course.work_experience_required,
-                'work_experience_years': course.work_experience_years
-            },
-            'country_requirements': serializer.data
-        })
+
+        def compute():
+            requirements = course.country_requirements.all()
+            serializer = CourseRequirementSerializer(requirements, many=True)
+
+            return {
+                'course_id': course.id,
+                'course_name': course.name,
+                'university': course.university.name,
+                'general_requirements': {
+                    'ielts_overall': float(course.ielts_overall) if course.ielts_overall else None,
+                    'ielts_each_band': float(course.ielts_each_band) if course.ielts_each_band else None,
+                    'academic_requirement': course.academic_requirement,
+                    'work_experience_required': course.work_experience_required,
+                    'work_experience_years': course.work_experience_years
+                },
+                'country_requirements': list(serializer.data)
+            }
+
+        return Response(catalog_cached('course_requirements', {'course': str(course.pk)}, compute))
 
     @action(detail=True, methods=['get'], url_path='check-eligibility')
     def check_eligibility(self, request, pk=None):
@@ -534,36 +496,39 @@ class CourseViewSet(AuditLogMixin, viewsets.ModelViewSet):
         Get course statistics for dashboard.
         """
         from django.db.models import Avg, Min, Max, Count
-        
-        stats = Course.objects.aggregate(
-            total_courses=Count('id'),
-            avg_fee=Avg('tuition_fee'),
-            min_fee=Min('tuition_fee'),
-            max_fee=Max('tuition_fee'),
-            avg_ielts=Avg('ielts_overall')
-        )
-        
-        # Courses by level
-        by_level = Course.objects.values('level').annotate(count=Count('id'))
-        
-        # Partner university courses
-        partner_courses = Course.objects.filter(university__is_partner=True).count()
-        
-        # Verified courses
-        verified_courses = Course.objects.filter(is_data_verified=True).count()
-        
-        return Response({
-            'total_courses': stats['total_courses'],
-            'average_fee': round(float(stats['avg_fee'] or 0), 2),
-            'fee_range': {
-                'min': float(stats['min_fee'] or 0),
-                'max': float(stats['max_fee'] or 0)
-            },
-            'average_ielts': round(float(stats['avg_ielts'] or 0), 1),
-            'partner_courses': partner_courses,
-            'verified_courses': verified_courses,
-            'by_level': list(by_level)
-        })
+
+        def compute():
+            stats = Course.objects.aggregate(
+                total_courses=Count('id'),
+                avg_fee=Avg('tuition_fee'),
+                min_fee=Min('tuition_fee'),
+                max_fee=Max('tuition_fee'),
+                avg_ielts=Avg('ielts_overall')
+            )
+
+            # Courses by level
+            by_level = Course.objects.order_by('level').values('level').annotate(count=Count('id'))
+
+            # Partner university courses
+            partner_courses = Course.objects.filter(university__is_partner=True).count()
+
+            # Verified courses
+            verified_courses = Course.objects.filter(is_data_verified=True).count()
+
+            return {
+                'total_courses': stats['total_courses'],
+                'average_fee': round(float(stats['avg_fee'] or 0), 2),
+                'fee_range': {
+                    'min': float(stats['min_fee'] or 0),
+                    'max': float(stats['max_fee'] or 0)
+                },
+                'average_ielts': round(float(stats['avg_ielts'] or 0), 1),
+                'partner_courses': partner_courses,
+                'verified_courses': verified_courses,
+                'by_level': list(by_level)
+            }
+
+        return Response(catalog_cached('course_stats', {}, compute))
 
     @action(detail=False, methods=['get'], url_path='compare')
     def compare_courses(self, request):
@@ -580,82 +545,88 @@ class CourseViewSet(AuditLogMixin, viewsets.ModelViewSet):
             return Response({'error': 'No course IDs provided'}, status=status.HTTP_400_BAD_REQUEST)
         
         try:
-            course_ids = [int(id.strip()) for id in ids_param.split(',')][:4]
+            course_ids = list(dict.fromkeys(str(uuid.UUID(id.strip())) for id in ids_param.split(',') if id.strip()))[:4]
         except ValueError:
             return Response({'error': 'Invalid course ID format'}, status=status.HTTP_400_BAD_REQUEST)
-        
-        courses = Course.objects.filter(id__in=course_ids).select_related('university').prefetch_related('country_requirements')
-        
-        if not courses.exists():
-            return Response({'error': 'No courses found'}, status=status.HTTP_404_NOT_FOUND)
-        
-        # Build comparison data
-        comparison_data = []
-        fees = []
-        ielts_scores = []
-        
-        for course in courses:
-            fees.append(float(course.tuition_fee))
-            if course.ielts_overall:
-                ielts_scores.append(float(course.ielts_overall))
-            
-            country_reqs = {}
-            for req in course.country_requirements.all():
-                country_reqs[req.country] = {
-                    'min_percentage': req.min_percentage,
-                    'min_qualification': req.min_qualification,
-                    'ielts_overall': float(req.ielts_overall) if req.ielts_overall else None,
-                    'work_experience_years': req.work_experience_years
+
+        def compute():
+            courses = Course.objects.filter(id__in=course_ids).select_related('university').prefetch_related('country_requirements')
+
+            if not courses.exists():
+                return None
+
+            # Build comparison data
+            comparison_data = []
+            fees = []
+            ielts_scores = []
+
+            for course in courses:
+                fees.append(float(course.tuition_fee))
+                if course.ielts_overall:
+                    ielts_scores.append(float(course.ielts_overall))
+
+                country_reqs = {}
+                for req in course.country_requirements.all():
+                    country_reqs[req.country] = {
+                        'min_percentage': req.min_percentage,
+                        'min_qualification': req.min_qualification,
+                        'ielts_overall': float(req.ielts_overall) if req.ielts_overall else None,
+                        'work_experience_years': req.work_experience_years
+                    }
+
+                comparison_data.append({
+                    'id': course.id,
+                    'name': course.name,
+                    'university_name': course.university.name,
+                    'university_city': course.university.city,
+                    'university_country': course.university.country,
+                    'is_partner': course.university.is_partner,
+                    'level': course.level,
+                    'duration': course.duration,
+                    'tuition_fee': float(course.tuition_fee),
+                    'currency': course.currency,
+                    'ielts_overall': float(course.ielts_overall) if course.ielts_overall else None,
+                    'ielts_each_band': float(course.ielts_each_band) if course.ielts_each_band else None,
+                    'intakes': course.intakes,
+                    'intake_january': course.intake_january,
+                    'intake_may': course.intake_may,
+                    'intake_september': course.intake_september,
+                    'work_experience_required': course.work_experience_required,
+                    'work_experience_years': course.work_experience_years,
+                    'official_url': course.official_url,
+                    'is_data_verified': course.is_data_verified,
+                    'country_requirements': country_reqs
+                })
+
+            # Calculate best/worst indicators
+            best_fee = min(fees) if fees else None
+            worst_fee = max(fees) if fees else None
+            best_ielts = min(ielts_scores) if ielts_scores else None
+            worst_ielts = max(ielts_scores) if ielts_scores else None
+
+            # Add indicators to each course
+            for course in comparison_data:
+                course['indicators'] = {
+                    'best_fee': course['tuition_fee'] == best_fee if best_fee else False,
+                    'worst_fee': course['tuition_fee'] == worst_fee if worst_fee else False,
+                    'easiest_ielts': course['ielts_overall'] == best_ielts if best_ielts and course['ielts_overall'] else False,
+                    'hardest_ielts': course['ielts_overall'] == worst_ielts if worst_ielts and course['ielts_overall'] else False,
+                    'is_partner': course['is_partner']
+                }
+
+            return {
+                'count': len(comparison_data),
+                'courses': comparison_data,
+                'summary': {
+                    'fee_range': {'min': best_fee, 'max': worst_fee},
+                    'ielts_range': {'min': best_ielts, 'max': worst_ielts}
                 }
-            
-            comparison_data.append({
-                'id': course.id,
-                'name': course.name,
-                'university_name': course.university.name,
-                'university_city': course.university.city,
-                'university_country': course.university.country,
-                'is_partner': course.university.is_partner,
-                'level': course.level,
-                'duration': course.duration,
-                'tuition_fee': float(course.tuition_fee),
-                'currency': course.currency,
-                'ielts_overall': float(course.ielts_overall) if course.ielts_overall else None,
-                'ielts_each_band': float(course.ielts_each_band) if course.ielts_each_band else None,
-                'intakes': course.intakes,
-                'intake_january': course.intake_january,
-                'intake_may': course.intake_may,
-                'intake_september': course.intake_september,
-                'work_experience_required': course.work_experience_required,
-                'work_experience_years': course.work_experience_years,
-                'official_url': course.official_url,
-                'is_data_verified': course.is_data_verified,
-                'country_requirements': country_reqs
-            })
-        
-        # Calculate best/worst indicators
-        best_fee = min(fees) if fees else None
-        worst_fee = max(fees) if fees else None
-        best_ielts = min(ielts_scores) if ielts_scores else None
-        worst_ielts = max(ielts_scores) if ielts_scores else None
-        
-        # Add indicators to each course
-        for course in comparison_data:
-            course['indicators'] = {
-                'best_fee': course['tuition_fee'] == best_fee if best_fee else False,
-                'worst_fee': course['tuition_fee'] == worst_fee if worst_fee else False,
-                'easiest_ielts': course['ielts_overall'] == best_ielts if best_ielts and course['ielts_overall'] else False,
-                'hardest_ielts': course['ielts_overall'] == worst_ielts if worst_ielts and course['ielts_overall'] else False,
-                'is_partner': course['is_partner']
-            }
-        
-        return Response({
-            'count': len(comparison_data),
-            'courses': comparison_data,
-            'summary': {
-                'fee_range': {'min': best_fee, 'max': worst_fee},
-                'ielts_range': {'min': best_ielts, 'max': worst_ielts}
             }
-        })
+
+        comparison = catalog_cached('compare_courses', {'ids': course_ids}, compute)
+        if comparison is None:
+            return Response({'error': 'No courses found'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(comparison)
 
     @action(detail=True, methods=['get'], url_path='scholarships')
     def course_scholarships(self, request, pk=None):
@@ -826,7 +797,6 @@ class CourseViewSet(AuditLogMixin, viewsets.ModelViewSet):
         - level: Filter by course level
         """
         from django.utils import timezone
-        from .models import IntakeDate
         
         current_year = timezone.now().year
         year = request.query_params.get('year')
@@ -834,57 +804,20 @@ class CourseViewSet(AuditLogMixin, viewsets.ModelViewSet):
         university_id = request.query_params.get('university')
         level = request.query_params.get('level')
         
-        # Base queryset
-        queryset = IntakeDate.objects.filter(
-            is_active=True
-        ).select_related('course__university')
-        
-        # Apply filters
-        if year:
-            queryset = queryset.filter(year=int(year))
-        else:
-            queryset = queryset.filter(year__in=[current_year, current_year + 1])
-        
-        if month:
-            queryset = queryset.filter(month__iexact=month)
-        
-        if university_id:
-            queryset = queryset.filter(course__university_id=university_id)
-        
-        if level:
-            queryset = queryset.filter(course__level__iexact=level)
-        
-        # Group by month/year
-        calendar_data = {}
-        for intake in queryset:
-            key = f"{intake.month} {intake.year}"
-            if key not in calendar_data:
-                calendar_data[key] = {
-                    'month': intake.month,
-                    'year': intake.year,
-                    'courses': []
-                }
-            
-            calendar_data[key]['courses'].append({
-                'id': intake.course.id,
-                'name': intake.course.name,
-                'university': intake.course.university.name,
-                'level': intake.course.level,
-                'deadline': intake.deadline.isoformat() if intake.deadline else None,
-                'tuition_fee': float(intake.course.tuition_fee)
-            })
-        
-        # Sort by date
-        sorted_calendar = sorted(
-            calendar_data.values(),
-            key=lambda x: (x['year'], ['January', 'February', 'March', 'April', 'May', 'June', 
-                                        'July', 'August', 'September', 'October', 'November', 'December'].index(x['month']) if x['month'] in ['January', 'February', 'March', 'April', 'May', 'June', 'July', 'August', 'September', 'October', 'November', 'December'] else 0)
-        )
+        try:
+            years = [int(year)] if year else [current_year, current_year + 1]
+        except ValueError:
+            return Response({'error': 'year must be a number'}, status=status.HTTP_400_BAD_REQUEST)
         
-        return Response({
-            'calendar': sorted_calendar,
-            'total_intakes': sum(len(m['courses']) for m in sorted_calendar)
-        })
+        def compute():
+            calendar = intake_calendar(years, month=month, university_id=university_id, level=level)
+            return {
+                'calendar': calendar,
+                'total_intakes': sum(len(m['courses']) for m in calendar)
+            }
+
+        params = {'year': years, 'month': month, 'university': university_id, 'level': level}
+        return Response(catalog_cached('intake_calendar', params, compute))
 
     @action(detail=False, methods=['post'], url_path='recommendations')
     def ai_recommendations(self, request):
@@ -904,9 +837,6 @@ class CourseViewSet(AuditLogMixin, viewsets.ModelViewSet):
             "interests": ["data science", "AI", "machine learning"]
         }
         """
-        from django.db.models import Avg, Count, F, Value, FloatField
-        from django.db.models.functions import Coalesce
-        
         # Extract profile from request
         ielts_score = request.data.get('ielts_score', 6.0)
         percentage = request.data.get('percentage', 60)
@@ -918,128 +848,19 @@ class CourseViewSet(AuditLogMixin, viewsets.ModelViewSet):
         work_exp_years = request.data.get('work_exp_years', 0)
         interests = request.data.get('interests', [])
         
-        # Base queryset - active courses within budget
-        queryset = Course.objects.filter(
-            is_active=True,
-            tuition_fee__lte=budget
-        ).select_related('university')
-        
-        # Filter by preferred country if specified
-        if preferred_country:
-            queryset = queryset.filter(university__country__iexact=preferred_country)
-        
-        # Filter by level if specified
-        if preferred_level:
-            queryset = queryset.filter(level__iexact=preferred_level)
-        
-        # Calculate match scores
-        recommendations = []
-        for course in queryset[:100]:  # Limit for performance
-            score = 0
-            reasons = []
-            
-            # IELTS match (max 25 points)
-            if course.ielts_overall:
-                if ielts_score >= float(course.ielts_overall):
-                    ielts_margin = ielts_score - float(course.ielts_overall)
-                    score += min(25, 15 + (ielts_margin * 5))
-                    if ielts_margin >= 0.5:
-                        reasons.append("✓ Strong IELTS match")
-                else:
-                    score -= 10  # Penalty for not meeting requirement
-            else:
-                score += 15  # Default if no requirement specified
-            
-            # Budget fit (max 25 points)
-            fee = float(course.tuition_fee)
-            if fee <= budget * 0.7:
-                score += 25
-                reasons.append("✓ Well within budget")
-            elif fee <= budget * 0.9:
-                score += 20
-                reasons.append("✓ Good budget fit")
-            else:
-                score += 10
-            
-            # Partner university bonus (max 15 points)
-            if course.university.is_partner:
-                score += 15
-                reasons.append("✓ Partner university (faster processing)")
-            
-            # Work experience match (max 10 points)
-            if course.work_experience_required:
-                if has_work_exp and work_exp_years >= course.work_experience_years:
-                    score += 10
-                    reasons.append("✓ Work experience requirement met")
-                else:
-                    score -= 15  # Penalty for not meeting requirement
-            else:
-                score += 5  # Bonus for no work experience requirement
-            
-            # Interest matching (max 15 points)
-            if interests:
-                course_text = f"{course.name} {course.department or ''}".lower()
-                matched = sum(1 for i in interests if i.lower() in course_text)
-                if matched > 0:
-                    score += min(15, matched * 5)
-                    reasons.append(f"✓ Matches {matched} interest(s)")
-            
-            # Data quality bonus (max 10 points)
-            if course.is_data_verified:
-                score += 5
-                reasons.append("✓ Verified data")
-            if course.official_url:
-                score += 5
-            
-            # Get review stats
-            avg_rating = None
-            review_count = 0
-            try:
-                from .models import CourseReview
-                review_stats = CourseReview.objects.filter(
-                    course=course, is_approved=True
-                ).aggregate(Avg('overall_rating'), Count('id'))
-                avg_rating = review_stats['overall_rating__avg']
-                review_count = review_stats['id__count']
-                if avg_rating and avg_rating >= 4:
-                    score += 10
-                    reasons.append(f"✓ Highly rated ({avg_rating:.1f}★)")
-            except:
-                pass
-            
-            # Get career paths
-            career_paths = []
-            try:
-                from .models import CareerPath
-                careers = CareerPath.objects.filter(courses=course, is_active=True)[:3]
-                career_paths = [
-                    {'name': c.name, 'salary_median': c.salary_median}
-                    for c in careers
-                ]
-            except:
-                pass
-            
-            recommendations.append({
-                'id': course.id,
-                'name': course.name,
-                'university': course.university.name,
-                'university_country': course.university.country,
-                'level': course.level,
-                'tuition_fee': fee,
-                'currency': course.currency,
-                'duration': course.duration,
-                'ielts_overall': float(course.ielts_overall) if course.ielts_overall else None,
-                'is_partner': course.university.is_partner,
-                'match_score': max(0, score),
-                'match_percentage': min(100, max(0, score)),
-                'reasons': reasons,
-                'avg_rating': round(avg_rating, 1) if avg_rating else None,
-                'review_count': review_count,
-                'career_paths': career_paths
-            })
-        
-        # Sort by match score
-        recommendations.sort(key=lambda x: x['match_score'], reverse=True)
+        from .recommendations import CourseRecommender
+        
+        # Vectorized scoring over the candidate set; reviews and career paths
+        # are fetched in bulk rather than per course
+        total_matches, recommendations = CourseRecommender.recommend({
+            'ielts_score': ielts_score,
+            'budget': budget,
+            'preferred_level': preferred_level,
+            'preferred_country': preferred_country,
+            'has_work_experience': has_work_exp,
+            'work_exp_years': work_exp_years,
+            'interests': interests,
+        })
         
         # Return top 20 recommendations
         return Response({
@@ -1051,9 +872,9 @@ class CourseViewSet(AuditLogMixin, viewsets.ModelViewSet):
                 'level': preferred_level,
                 'work_experience': work_exp_years if has_work_exp else 0
             },
-            'total_matches': len(recommendations),
-            'recommendations': recommendations[:20],
-            'message': f"Found {len(recommendations)} courses matching your profile"
+            'total_matches': total_matches,
+            'recommendations': recommendations,
+            'message': f"Found {total_matches} courses matching your profile"
         })
 
 
@@ -1130,79 +951,86 @@ class LivingCostViewSet(viewsets.ReadOnlyModelViewSet):
         if not course_id:
             return Response({'error': 'course_id required'}, status=status.HTTP_400_BAD_REQUEST)
         
-        try:
-            course = Course.objects.select_related('university').get(id=course_id)
-        except Course.DoesNotExist:
-            return Response({'error': 'Course not found'}, status=status.HTTP_404_NOT_FOUND)
-        
-        # Get living costs for the city
-        city = course.university.city
-        living_costs = LivingCostEstimate.objects.filter(city=city).first()
-        
-        # Use default UK costs if city-specific not found
-        if not living_costs:
-            living_costs = LivingCostEstimate.objects.filter(country='UK').first()
-        
-        # Currency conversion rates (approximate)
-        conversion_rates = {
-            'GBP': 1,
-            'PKR': 350,
-            'BDT': 130,
-            'INR': 105,
-            'NGN': 1600,
-            'USD': 1.25,
-            'EUR': 1.15
-        }
-        rate = conversion_rates.get(target_currency, 1)
-        
-        tuition_total = float(course.tuition_fee) * duration_years
-        
-        if living_costs:
-            monthly_living = float(living_costs.monthly_total)
-            living_total = monthly_living * 12 * duration_years
-            visa_fee = float(living_costs.visa_fee)
-            ihs_total = float(living_costs.ihs_per_year) * duration_years
-        else:
-            living_total = 12000 * duration_years  # Default estimate
-            visa_fee = 490
-            ihs_total = 776 * duration_years
-        
-        grand_total = tuition_total + living_total + visa_fee + ihs_total
-        
-        return Response({
-            'course': {
-                'id': course.id,
-                'name': course.name,
-                'university': course.university.name,
-                'city': city
-            },
-            'breakdown': {
-                'tuition': {
-                    'gbp': tuition_total,
-                    'converted': round(tuition_total * rate, 2)
+        def compute():
+            try:
+                course = Course.objects.select_related('university').get(id=course_id)
+            except (Course.DoesNotExist, ValueError, ValidationError):
+                return None
+
+            # Get living costs for the city
+            city = course.university.city
+            living_costs = LivingCostEstimate.objects.filter(city=city).first()
+
+            # Use default UK costs if city-specific not found
+            if not living_costs:
+                living_costs = LivingCostEstimate.objects.filter(country='UK').first()
+
+            # Currency conversion rates (approximate)
+            conversion_rates = {
+                'GBP': 1,
+                'PKR': 350,
+                'BDT': 130,
+                'INR': 105,
+                'NGN': 1600,
+                'USD': 1.25,
+                'EUR': 1.15
+            }
+            rate = conversion_rates.get(target_currency, 1)
+
+            tuition_total = float(course.tuition_fee) * duration_years
+
+            if living_costs:
+                monthly_living = float(living_costs.monthly_total)
+                living_total = monthly_living * 12 * duration_years
+                visa_fee = float(living_costs.visa_fee)
+                ihs_total = float(living_costs.ihs_per_year) * duration_years
+            else:
+                living_total = 12000 * duration_years  # Default estimate
+                visa_fee = 490
+                ihs_total = 776 * duration_years
+
+            grand_total = tuition_total + living_total + visa_fee + ihs_total
+
+            return {
+                'course': {
+                    'id': course.id,
+                    'name': course.name,
+                    'university': course.university.name,
+                    'city': city
                 },
-                'living_costs': {
-                    'monthly_gbp': monthly_living if living_costs else 1000,
-                    'total_gbp': living_total,
-                    'converted': round(living_total * rate, 2)
+                'breakdown': {
+                    'tuition': {
+                        'gbp': tuition_total,
+                        'converted': round(tuition_total * rate, 2)
+                    },
+                    'living_costs': {
+                        'monthly_gbp': monthly_living if living_costs else 1000,
+                        'total_gbp': living_total,
+                        'converted': round(living_total * rate, 2)
+                    },
+                    'visa_fee': {
+                        'gbp': visa_fee,
+                        'converted': round(visa_fee * rate, 2)
+                    },
+                    'health_surcharge': {
+                        'gbp': ihs_total,
+                        'converted': round(ihs_total * rate, 2)
+                    }
                 },
-                'visa_fee': {
-                    'gbp': visa_fee,
-                    'converted': round(visa_fee * rate, 2)
+                'grand_total': {
+                    'gbp': round(grand_total, 2),
+                    'converted': round(grand_total * rate, 2),
+                    'currency': target_currency
                 },
-                'health_surcharge': {
-                    'gbp': ihs_total,
-                    'converted': round(ihs_total * rate, 2)
-                }
-            },
-            'grand_total': {
-                'gbp': round(grand_total, 2),
-                'converted': round(grand_total * rate, 2),
-                'currency': target_currency
-            },
-            'duration_years': duration_years,
-            'exchange_rate': rate
-        })
+                'duration_years': duration_years,
+                'exchange_rate': rate
+            }
+
+        params = {'course': str(course_id), 'duration_years': duration_years, 'currency': target_currency}
+        result = catalog_cached('living_cost', params, compute)
+        if result is None:
+            return Response({'error': 'Course not found'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(result)
 
 
 # =========================================================================
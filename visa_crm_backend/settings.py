@@ -37,6 +37,10 @@ ALLOWED_HOSTS = env.list('ALLOWED_HOSTS', default=['localhost', '127.0.0.1'])
 # Payroll configuration
 PAYROLL_TAX_RATE = Decimal(env('PAYROLL_TAX_RATE', default='0.20'))
 
+# Country calling code assumed for phone numbers entered in national format
+# (leading 0), used when normalizing lead/student contacts
+DEFAULT_PHONE_COUNTRY_CODE = env('DEFAULT_PHONE_COUNTRY_CODE', default='92')
+
 # -----------------------------------------------------------------------------
 # Security Hardening (enabled automatically when DEBUG=False)
 # -----------------------------------------------------------------------------
@@ -64,6 +68,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     
     # Third-party apps
     'rest_framework',
@@ -172,6 +177,27 @@ else:
     }
 
 
+# Cache
+# Redis in production (shared by all workers), local memory for development.
+REDIS_CACHE_URL = env('REDIS_CACHE_URL', default=None)
+if REDIS_CACHE_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_CACHE_URL,
+            'KEY_PREFIX': 'visa_crm',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'visa-crm',
+            'OPTIONS': {'MAX_ENTRIES': 5000},
+        }
+    }
+
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -216,7 +242,9 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
 
-# Optional Celery beat schedules
+# Optional Celery beat schedules. Leave disabled only where another scheduler
+# runs these tasks: the leaderboard counters (?window=30d) drop leads older
+# than 30 days only when rebuild-leaderboards-nightly recounts them.
 ENABLE_CELERY_BEAT = env.bool('ENABLE_CELERY_BEAT', False)
 if ENABLE_CELERY_BEAT:
     CELERY_BEAT_SCHEDULE = {
@@ -232,6 +260,22 @@ if ENABLE_CELERY_BEAT:
             'task': 'core.tasks.check_document_expiries',
             'schedule': 24 * 60 * 60,  # Once every 24 hours
         },
+        'detect-lead-duplicates-nightly': {
+            'task': 'students.tasks.detect_lead_duplicates',
+            'schedule': 24 * 60 * 60,
+        },
+        'rescore-leads-nightly': {
+            'task': 'students.tasks.rescore_leads',
+            'schedule': 24 * 60 * 60,
+        },
+        'rebuild-leaderboards-nightly': {
+            'task': 'students.tasks.rebuild_leaderboard_counters',
+            'schedule': 24 * 60 * 60,
+        },
+        'rollup-stage-durations-nightly': {
+            'task': 'analytics.tasks.rollup_application_stage_durations',
+            'schedule': 24 * 60 * 60,
+        },
     }
 
 
@@ -18,7 +18,7 @@ from branches.views import (
 )
 from students.views import (
     LeadViewSet, StudentViewSet, DocumentViewSet, DocumentAlertViewSet, 
-    DashboardStatsView, LeadInteractionViewSet, WhatsAppTemplateViewSet,
+    DashboardStatsView, LeadInteractionViewSet, LeadMergeCandidateViewSet, LeadBulkJobViewSet, WhatsAppTemplateViewSet,
     CounselorAvailabilityViewSet
 )
 from applications.views import (
@@ -64,6 +64,8 @@ router.register(r'attendance', AttendanceLogViewSet, basename='attendance')
 router.register(r'leave-requests', LeaveRequestViewSet, basename='leave-request')
 router.register(r'leads', LeadViewSet, basename='lead')
 router.register(r'lead-interactions', LeadInteractionViewSet, basename='lead-interaction')
+router.register(r'lead-merge-candidates', LeadMergeCandidateViewSet, basename='lead-merge-candidate')
+router.register(r'lead-bulk-jobs', LeadBulkJobViewSet, basename='lead-bulk-job')
 router.register(r'lead-whatsapp-templates', WhatsAppTemplateViewSet, basename='whatsapp-template')
 router.register(r'counselor-availability', CounselorAvailabilityViewSet, basename='counselor-availability')
 router.register(r'students', StudentViewSet, basename='student')